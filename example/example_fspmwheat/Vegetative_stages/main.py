@@ -130,6 +130,9 @@ def main(simulation_length, forced_start_time=0, run_simu=True, run_postprocessi
     ELEMENTS_OUTPUTS_FILENAME = 'elements_outputs.csv'
     SOILS_OUTPUTS_FILENAME = 'soils_outputs.csv'
 
+    # Name of the CSV file which will contain the statistics of the solver of CN-Wheat
+    CNWHEAT_SOLVER_STATISTICS_FILENAME = 'cnwheat_solver_statistics.csv'
+
     # -- INPUTS CONFIGURATION --
 
     # Path of the directory which contains the inputs of the model
@@ -535,6 +538,8 @@ def main(simulation_length, forced_start_time=0, run_simu=True, run_postprocessi
                 outputs_file_basename = outputs_filename.split('.')[0]
                 outputs_df_dict[outputs_file_basename] = outputs_df.reset_index()
 
+            cnwheat_facade_.write_solver_statistics(os.path.join(OUTPUTS_DIRPATH, CNWHEAT_SOLVER_STATISTICS_FILENAME), OUTPUTS_PRECISION)
+
     # ---------------------------------------------
     # -----      POST-PROCESSING      -------
     # ---------------------------------------------
@@ -11,6 +11,12 @@ import logging
     
         * :mod:`cnwheat.simulation`: the simulator (front-end) to run the model,
         * :mod:`cnwheat.model`: the state and the equations of the model,
+        * :mod:`cnwheat.layout`: the layout of the compartments in the vector integrated by the solver,
+        * :mod:`cnwheat.vectorized`: the equations of the model computed on arrays,
+        * :mod:`cnwheat.kernels`: the kernel of the equations of the elements, compiled with Numba when it is installed,
+        * :mod:`cnwheat.forcings`: the interpolation of the forcings inside the time step,
+        * :mod:`cnwheat.trace`: the recorder of the compartments and of their derivatives during the runs,
+        * :mod:`cnwheat.conservation`: the monitor of the conservation of C and N during the runs,
         * :mod:`cnwheat.parameters`: the parameters of the model,
         * :mod:`cnwheat.postprocessing`: the post-processing and graph functions,
         * :mod:`cnwheat.tools`: tools to help for the validation of the outputs,
@@ -0,0 +1,209 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from openalea.cnwheat import layout, model, parameters, simulation
+
+"""
+    cnwheat.conservation
+    ~~~~~~~~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.conservation` defines a monitor of the conservation of carbon and nitrogen during the runs of a simulation.
+
+    At the end of each run, the monitor computes the total amounts of C and N of the population and of its soils from the vectors of compartments
+    at the beginning and at the end of the run, and compares their changes to the exchanges with the outside of the system:
+    photosynthesis, respiration and exudation for C, mineralisation in the soils and exudation for N.
+    It is a cheap check of the accuracy of the solver, for example when its tolerances are loosened.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+#: the ratio between the number of mol of C and the number of mol of N in the amino acids and the proteins
+AMINO_ACIDS_C_N_RATIO = model.EcophysiologicalConstants.AMINO_ACIDS_C_RATIO / model.EcophysiologicalConstants.AMINO_ACIDS_N_RATIO
+
+#: the amount of C in each compartment, per unit of the compartment: {compartment_name: mol of C, ...}.
+#: The respiration and the exudation accumulated in the compartments of the axes are included, so that they are counted as C of the system.
+COMPARTMENTS_C = {'triosesP': 1, 'sucrose': 1, 'starch': 1, 'fructan': 1, 'structure': 1,
+                  'amino_acids': AMINO_ACIDS_C_N_RATIO, 'proteins': AMINO_ACIDS_C_N_RATIO,
+                  'C_exudated': 1, 'sum_respi_shoot': 1, 'sum_respi_roots': 1}
+
+#: the amount of N in each compartment, per unit of the compartment: {compartment_name: mol of N, ...}
+COMPARTMENTS_N = {'nitrates': 1, 'amino_acids': 1, 'proteins': 1}
+
+#: the classes of the model objects whose compartments are counted ; the compartments of the other model objects are aggregated from them
+MONITORED_CLASSES = (model.Axis, model.Roots, model.Phloem, model.Grains, model.HiddenZone, model.PhotosyntheticOrganElement)
+
+#: the columns of the records of the monitor (see :meth:`ConservationMonitor.to_dataframe`)
+RECORDS_COLUMNS = ['t', 'C_total', 'C_imbalance', 'C_relative_imbalance', 'N_total', 'N_imbalance', 'N_relative_imbalance']
+
+
+class ConservationWarning(UserWarning):
+    """Raised when the imbalance of C or N of a run exceeds the threshold of a :class:`ConservationMonitor`."""
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return repr(self.message)
+
+
+class ConservationMonitor(object):
+    """
+    A monitor of the conservation of C and N, to attach to a :class:`cnwheat.simulation.Simulation` (see its parameter `conservation_monitor`).
+
+    C is counted in the population (per culm), including the respiration and the exudation accumulated in the compartments of the axes.
+    Its change during a run must be equal to the photosynthesis of the elements, which is constant during a run.
+
+    N is counted in the population, weighted by the culm density, and in the soils.
+    Its change during a run must be equal to the mineralisation in the soils minus the exudation of amino acids by the roots.
+    The exudation of N is not accumulated by the model: it is estimated from the change of `C_exudated`, with the mean ratio between
+    the amino acids and the sucrose of the roots at the beginning and at the end of the run.
+    The axes whose soil has a constant concentration of nitrates are not counted, since their uptake of nitrates is not accumulated by the model.
+
+    The imbalances are relative to the total amounts at the beginning of the run.
+
+    :param float threshold: the maximum relative imbalance of C and N ; None to only record the imbalances (default).
+    :param str action: what to do when the threshold is exceeded: `'warn'` to issue a :class:`ConservationWarning` (default),
+                       or `'raise'` to raise a :class:`cnwheat.simulation.SimulationConservationError`.
+    """
+
+    #: the actions available when the threshold is exceeded
+    ACTIONS = ('warn', 'raise')
+
+    def __init__(self, threshold=None, action='warn'):
+        if action not in ConservationMonitor.ACTIONS:
+            raise ValueError('Unknown action `{}`. Please choose an action among {}.'.format(action, ConservationMonitor.ACTIONS))
+        self.threshold = threshold  #: the maximum relative imbalance of C and N
+        self.action = action  #: the action when the threshold is exceeded
+        self.records = []  #: the totals and the imbalances of C and N at each run: a list of dictionaries with keys :attr:`RECORDS_COLUMNS`
+        self._C_weights = np.zeros(0)  #: the amount of C per unit of each compartment of the vector of compartments
+        self._N_weights = np.zeros(0)  #: the amount of N per unit of each compartment of the vector of compartments
+        self._elements = []  #: the photosynthetic organ elements of the population
+        self._elements_replications = np.zeros(0)  #: the number of replications of each element
+        self._variable_soils = []  #: the soils whose concentration of nitrates is not constant
+        #: the indexes of the compartments needed to estimate the exudation of N of each counted axis: the columns are
+        #: C_exudated, the amino acids and the sucrose of the roots, and the amino acids of the phloem
+        self._exudation_indexes = np.zeros((0, 4), dtype=int)
+        self._axes_culm_density = np.zeros(0)  #: the culm density of each counted axis
+        self._axes_N_EXUDATION_MAX = np.zeros(0)  #: the maximal ratio between the N and the C exudated by the roots of each counted axis
+
+    def set_layout(self, layout_, population, axes_soils, culm_density):
+        """Set the layout of the compartments of the next runs.
+
+        :param cnwheat.layout.CompartmentsLayout layout_: the layout of the compartments.
+        :param model.Population population: the population of the layout.
+        :param list axes_soils: the soil of each axis of `population`, in the order of the plants and of their axes.
+        :param dict culm_density: the culm density of each plant: {plant_index: culm_density, ...}.
+        """
+        self._C_weights = np.zeros(layout_.size)
+        self._N_weights = np.zeros(layout_.size)
+        self._elements = []
+        exudation_indexes = []
+        axes_culm_density = []
+        axes_N_EXUDATION_MAX = []
+        variable_soils = []
+        axes_soils = iter(axes_soils)
+        for plant in population.plants:
+            for axis in plant.axes:
+                soil = next(axes_soils)
+                is_N_counted = not soil.constant_Conc_Nitrates
+                axis_culm_density = culm_density[plant.index] if is_N_counted else 0
+                for model_object in layout.axis_model_objects(axis):
+                    if not isinstance(model_object, MONITORED_CLASSES):
+                        continue
+                    nb_replications = getattr(model_object, 'nb_replications', 1)
+                    for compartment_name, compartment_index in layout_.mapping[model_object].items():
+                        self._C_weights[compartment_index] = COMPARTMENTS_C.get(compartment_name, 0) * nb_replications
+                        self._N_weights[compartment_index] = COMPARTMENTS_N.get(compartment_name, 0) * nb_replications * axis_culm_density
+                    if isinstance(model_object, model.PhotosyntheticOrganElement):
+                        self._elements.append(model_object)
+                if is_N_counted:
+                    if all(soil is not variable_soil for variable_soil in variable_soils):
+                        variable_soils.append(soil)
+                        self._N_weights[layout_.mapping[soil]['nitrates']] = 1
+                    exudation_indexes.append((layout_.mapping[axis]['C_exudated'], layout_.mapping[axis.roots]['amino_acids'],
+                                              layout_.mapping[axis.roots]['sucrose'], layout_.mapping[axis.phloem]['amino_acids']))
+                    axes_culm_density.append(axis_culm_density)
+                    axes_N_EXUDATION_MAX.append(axis.roots.PARAMETERS.N_EXUDATION_MAX)
+        self._elements_replications = np.array([element.nb_replications for element in self._elements], dtype=float)
+        self._variable_soils = variable_soils
+        self._exudation_indexes = np.array(exudation_indexes, dtype=int).reshape(len(exudation_indexes), 4)
+        self._axes_culm_density = np.array(axes_culm_density, dtype=float)
+        self._axes_N_EXUDATION_MAX = np.array(axes_N_EXUDATION_MAX, dtype=float)
+
+    def check(self, t, y0, y1, duration):
+        """Record the totals and the imbalances of C and N of a run, and warn or raise if they exceed :attr:`threshold`.
+
+        :param float t: the time at the beginning of the run (in hours).
+        :param numpy.ndarray y0: the compartments at the beginning of the run.
+        :param numpy.ndarray y1: the compartments at the end of the run.
+        :param float duration: the duration of the run (in hours).
+
+        :return: The record of the run (see :attr:`RECORDS_COLUMNS`).
+        :rtype: dict
+        """
+        photosynthesis = np.dot([element.Ag * element.green_area for element in self._elements], self._elements_replications) \
+            * parameters.SECOND_TO_HOUR_RATE_CONVERSION * duration
+        C_total = np.dot(self._C_weights, y0)
+        C_imbalance = np.dot(self._C_weights, y1) - C_total - photosynthesis
+
+        mineralisation = sum(soil.calculate_mineralisation(soil.calculate_temperature_effect_on_Vmax(soil.Tsoil)) for soil in self._variable_soils) * duration
+        C_exudated_index, roots_amino_acids_index, roots_sucrose_index, phloem_amino_acids_index = self._exudation_indexes.T
+        exudation_ratio = (_exudation_ratio(y0[roots_amino_acids_index], y0[roots_sucrose_index], y0[phloem_amino_acids_index], self._axes_N_EXUDATION_MAX) +
+                           _exudation_ratio(y1[roots_amino_acids_index], y1[roots_sucrose_index], y1[phloem_amino_acids_index], self._axes_N_EXUDATION_MAX)) / 2.0
+        N_exudated = (y1[C_exudated_index] - y0[C_exudated_index]) * exudation_ratio / (1 + exudation_ratio * AMINO_ACIDS_C_N_RATIO)
+        N_total = np.dot(self._N_weights, y0)
+        N_imbalance = np.dot(self._N_weights, y1) - N_total - mineralisation + np.dot(N_exudated, self._axes_culm_density)
+
+        record = {'t': t, 'C_total': C_total, 'C_imbalance': C_imbalance, 'C_relative_imbalance': _relative(C_imbalance, C_total),
+                  'N_total': N_total, 'N_imbalance': N_imbalance, 'N_relative_imbalance': _relative(N_imbalance, N_total)}
+        self.records.append(record)
+
+        if self.threshold is not None:
+            relative_imbalances = [abs(record[relative_imbalance_name]) for relative_imbalance_name in ('C_relative_imbalance', 'N_relative_imbalance')
+                                   if not np.isnan(record[relative_imbalance_name])]
+            if len(relative_imbalances) != 0 and max(relative_imbalances) > self.threshold:
+                message = 'Imbalance of C ({:.3g}) or N ({:.3g}) above {} during the run starting at t = {} h.'.format(record['C_relative_imbalance'],
+                                                                                                                   record['N_relative_imbalance'],
+                                                                                                                   self.threshold, t)
+                if self.action == 'raise':
+                    logger = logging.getLogger(__name__)
+                    logger.exception(message)
+                    raise simulation.SimulationConservationError(message)
+                warnings.warn(ConservationWarning(message))
+
+        return record
+
+    def to_dataframe(self):
+        """Return the records of the monitor at each run.
+
+        :return: The records, with columns :attr:`RECORDS_COLUMNS`.
+        :rtype: pandas.DataFrame
+        """
+        return pd.DataFrame(self.records, columns=RECORDS_COLUMNS)
+
+
+def _exudation_ratio(roots_amino_acids, roots_sucrose, phloem_amino_acids, N_EXUDATION_MAX):
+    """Ratio between the N and the C exudated by the roots (see :meth:`model.Roots.calculate_exudation`).
+    """
+    is_exudating = (phloem_amino_acids > 0) & (roots_amino_acids > 0) & (roots_sucrose > 0)
+    ratio = np.minimum(roots_amino_acids / np.where(is_exudating, roots_sucrose, 1), N_EXUDATION_MAX)
+    return np.where(is_exudating, ratio, 0)
+
+
+def _relative(imbalance, total):
+    """Imbalance relative to the total amount ; NaN if the total amount is 0.
+    """
+    return imbalance / total if total != 0 else np.nan
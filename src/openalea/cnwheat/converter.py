@@ -2,7 +2,7 @@
 import numpy as np
 import pandas as pd
 
-from openalea.cnwheat import model, simulation
+from openalea.cnwheat import model, parameters, simulation
 
 """
     cnwheat.converter
@@ -65,6 +65,8 @@ def from_dataframes(organs_inputs=None, hiddenzones_inputs=None, elements_inputs
     :param pandas.DataFrame elements_inputs: Elements inputs, with one line by element.
     :param pandas.DataFrame soils_inputs: Soils inputs, with one line by soil.
     :param dict update_parameters: A dictionary with the parameters to update, should have the form {'Organ_label1': {'param1': value1, 'param2': value2}, ...}.
+           The updated parameters are owned by the model objects of the returned population: the parameters of the classes of :mod:`cnwheat.model`,
+           and thus of the other populations, are not changed.
 
 
     :return:
@@ -82,39 +84,65 @@ def from_dataframes(organs_inputs=None, hiddenzones_inputs=None, elements_inputs
     convert_dataframes_to_population = organs_inputs is not None and hiddenzones_inputs is not None and elements_inputs is not None
     convert_dataframe_to_soils_dict = soils_inputs is not None
 
+    def first_valid_rows(inputs, indexes, columns):
+        # function to group the rows of `inputs` by `indexes` in one pass, and return the first valid row of each group as a dictionary {column: value, ...}
+        columns_inputs = inputs.loc[:, columns]
+        is_valid = columns_inputs.notna().any(axis=1).values
+        first_valid_positions = {}
+        for indexes_values, positions in inputs.groupby(indexes, sort=False).indices.items():
+            valid_positions = positions[is_valid[positions]]
+            if len(valid_positions) != 0:
+                first_valid_positions[indexes_values] = valid_positions[0]
+        rows_values = columns_inputs.values[list(first_valid_positions.values())].tolist()
+        return {indexes_values: dict(zip(columns, row_values)) for indexes_values, row_values in zip(first_valid_positions, rows_values)}
+
+    population_parameters = {}
+
+    def copy_parameters(model_class, *parameters_values):
+        # function to return the copy of the parameters of `model_class` owned by the population, updated with `parameters_values` when it is created
+        if model_class not in population_parameters:
+            population_parameters[model_class] = parameters.copy_parameters(model_class.PARAMETERS, *parameters_values)
+        return population_parameters[model_class]
+
     if convert_dataframes_to_population:
 
         population = model.Population()
 
+        # index the inputs by topology
+        organs_positions = organs_inputs.groupby(['plant', 'axis', 'organ'], sort=False).indices
+        hiddenzones_rows = first_valid_rows(hiddenzones_inputs, ['plant', 'axis', 'metamer'], simulation.Simulation.HIDDENZONE_STATE)
+        elements_rows = first_valid_rows(elements_inputs, ['plant', 'axis', 'metamer', 'organ', 'element'], simulation.Simulation.ELEMENTS_STATE)
+        elements_organs = set(elements_inputs.groupby(['plant', 'axis', 'metamer', 'organ'], sort=False).indices)
+        plants_axes_labels = organs_inputs.groupby('plant', sort=False)['axis'].unique().to_dict()
+        axes_metamers_indexes_for_hiddenzones = hiddenzones_inputs.groupby(['plant', 'axis'], sort=False)['metamer'].unique().to_dict()
+        axes_metamers_indexes_for_elements = elements_inputs.groupby(['plant', 'axis'], sort=False)['metamer'].unique().to_dict()
+
         for plant_index in organs_inputs.plant.unique():
             # create a new plant
             plant = model.Plant(plant_index)
             population.plants.append(plant)
-            curr_axes_labels = organs_inputs[organs_inputs['plant'] == plant_index].axis.unique()
-            for axis_label in curr_axes_labels:
+            for axis_label in plants_axes_labels[plant_index]:
                 # create a new axis
                 axis = model.Axis(axis_label)
-                curr_organs_inputs = organs_inputs[(organs_inputs['plant'] == plant_index) & (organs_inputs['axis'] == axis_label)]
                 for axis_attribute_name, axis_attribute_class in (('roots', model.Roots), ('phloem', model.Phloem), ('grains', model.Grains)):
                     organ_label = CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[axis_attribute_class]
-                    organ_inputs = curr_organs_inputs[curr_organs_inputs['organ'] == organ_label]
-                    if not organ_inputs.empty:
+                    organ_positions = organs_positions.get((plant_index, axis_label, organ_label))
+                    if organ_positions is not None:
                         # create a new organ
                         organ = axis_attribute_class(organ_label)
                         organ_attributes_names = [state_var_name for state_var_name in simulation.Simulation.ORGANS_STATE if hasattr(organ, state_var_name)]
-                        organ_row = organ_inputs.loc[organ_inputs.first_valid_index()]
+                        organ_row = organs_inputs.iloc[organ_positions[0]]
                         organ_attributes_values = organ_row[organ_attributes_names].tolist()
                         organ_attributes = dict(zip(organ_attributes_names, organ_attributes_values))
                         organ.__dict__.update(organ_attributes)
                         # Update parameters if specified
-                        if organ_label in update_parameters:
-                            organ.PARAMETERS.__dict__.update(update_parameters[organ_label])
+                        organ.PARAMETERS = copy_parameters(axis_attribute_class, update_parameters.get(organ_label, {}))
 
                         organ.initialize()
                         setattr(axis, axis_attribute_name, organ)
 
-                curr_metamers_indexes_for_hiddenzones = hiddenzones_inputs[(hiddenzones_inputs['plant'] == plant_index) & (hiddenzones_inputs['axis'] == axis_label)].metamer.unique()
-                curr_metamers_indexes_for_elements = elements_inputs[(elements_inputs['plant'] == plant_index) & (elements_inputs['axis'] == axis_label)].metamer.unique()
+                curr_metamers_indexes_for_hiddenzones = axes_metamers_indexes_for_hiddenzones.get((plant_index, axis_label), np.array([], dtype=hiddenzones_inputs['metamer'].dtype))
+                curr_metamers_indexes_for_elements = axes_metamers_indexes_for_elements.get((plant_index, axis_label), np.array([], dtype=elements_inputs['metamer'].dtype))
                 curr_metamers_indexes = np.unique(np.concatenate((curr_metamers_indexes_for_hiddenzones, curr_metamers_indexes_for_elements)))
                 for metamer_index in curr_metamers_indexes:
                     # create a new phytomer
@@ -130,48 +158,36 @@ def from_dataframes(organs_inputs=None, hiddenzones_inputs=None, elements_inputs
 
                         organ_label = CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[phytomer_attribute_class]
 
-                        if metamer_index in curr_metamers_indexes_for_elements:
-                            curr_elements_inputs = elements_inputs[(elements_inputs['plant'] == plant_index) & (elements_inputs['axis'] == axis_label) & (elements_inputs['metamer'] == metamer_index) &
-                                                                   (elements_inputs['organ'] == organ_label)]
-                            if organ_label not in curr_elements_inputs.organ.values:
-                                continue
-                            # create a new organ
-                            organ = phytomer_attribute_class(organ_label)
-
-                            # Update parameters if specified
-                            if 'PhotosyntheticOrgan' in update_parameters:
-                                organ.PARAMETERS.__dict__.update(update_parameters['PhotosyntheticOrgan'])
-
-                            organ.initialize()
-                            setattr(phytomer, phytomer_attribute_name, organ)
-
-                            for mtg_element_label, cnwheat_element_name in DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING.items():
-                                element_inputs = curr_elements_inputs[curr_elements_inputs['element'] == mtg_element_label]
-                                if len(element_inputs) == 0:
-                                    continue
-                                element_inputs = element_inputs.loc[:, simulation.Simulation.ELEMENTS_STATE]
-                                element_dict = element_inputs.loc[element_inputs.first_valid_index()].to_dict()
-                                # create a new element
-                                element = phytomer_attribute_element_class(mtg_element_label, **element_dict)
-
-                                # Add parameters from organ scale
-                                element.PARAMETERS.__dict__.update(organ.PARAMETERS.__dict__)
-
-                                setattr(organ, cnwheat_element_name, element)
-
-                    if metamer_index in curr_metamers_indexes_for_hiddenzones:
-                        hiddenzone_inputs = hiddenzones_inputs[(hiddenzones_inputs['plant'] == plant_index) & (hiddenzones_inputs['axis'] == axis_label) &
-                                                               (hiddenzones_inputs['metamer'] == metamer_index)]
-                        if len(hiddenzone_inputs) == 0:
+                        if (plant_index, axis_label, metamer_index, organ_label) not in elements_organs:
                             continue
-                        hiddenzone_inputs = hiddenzone_inputs.loc[:, simulation.Simulation.HIDDENZONE_STATE]
-                        hiddenzone_dict = hiddenzone_inputs.loc[hiddenzone_inputs.first_valid_index()].to_dict()
+                        # create a new organ
+                        organ = phytomer_attribute_class(organ_label)
+
+                        # Update parameters if specified
+                        organ.PARAMETERS = copy_parameters(phytomer_attribute_class, update_parameters.get('PhotosyntheticOrgan', {}))
+
+                        organ.initialize()
+                        setattr(phytomer, phytomer_attribute_name, organ)
+
+                        for mtg_element_label, cnwheat_element_name in DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING.items():
+                            element_row = elements_rows.get((plant_index, axis_label, metamer_index, organ_label, mtg_element_label))
+                            if element_row is None:
+                                continue
+                            # create a new element
+                            element = phytomer_attribute_element_class(mtg_element_label, **element_row)
+
+                            # Add parameters from organ scale
+                            element.PARAMETERS = copy_parameters(phytomer_attribute_element_class, organ.PARAMETERS.__dict__)
+
+                            setattr(organ, cnwheat_element_name, element)
+
+                    hiddenzone_row = hiddenzones_rows.get((plant_index, axis_label, metamer_index))
+                    if hiddenzone_row is not None:
                         # create a new hidden zone
-                        hiddenzone = model.HiddenZone(CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[model.HiddenZone], **hiddenzone_dict)
+                        hiddenzone = model.HiddenZone(CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[model.HiddenZone], **hiddenzone_row)
 
                         # Update parameters if specified
-                        if hiddenzone.label in update_parameters:
-                            hiddenzone.PARAMETERS.__dict__.update(update_parameters[hiddenzone.label])
+                        hiddenzone.PARAMETERS = copy_parameters(model.HiddenZone, update_parameters.get(hiddenzone.label, {}))
 
                         hiddenzone.initialize()
                         phytomer.hiddenzone = hiddenzone
@@ -230,72 +246,64 @@ def to_dataframes(population=None, soils=None):
     convert_population_to_dataframes = population is not None
     convert_soils_to_dataframe = soils is not None
 
-    def append_row(model_object, indexes, attributes_names, inputs_df):
-        # function to append a row to a dataframe
-        attributes_values = []
-        for attribute_name in attributes_names:
-            attributes_values.append(getattr(model_object, attribute_name, np.nan))
-        inputs_df.loc[len(inputs_df), :] = indexes + attributes_values
+    def append_row(model_object, indexes, attributes_names, columns_values):
+        # function to append the values of a row to the lists of values of the columns of a dataframe
+        for column_values, index in zip(columns_values, indexes):
+            column_values.append(index)
+        for column_values, attribute_name in zip(columns_values[len(indexes):], attributes_names):
+            column_values.append(getattr(model_object, attribute_name, np.nan))
+
+    def build_dataframe(columns_values, columns, integer_columns):
+        # function to build a dataframe from the lists of values of its columns, with the rows sorted by columns
+        dataframe = pd.DataFrame(dict(zip(columns, columns_values)), columns=columns)
+        # convert the indexes of plants, metamers and elements to integers
+        dataframe = dataframe.astype({column: int for column in integer_columns})
+        dataframe.sort_values(by=columns, inplace=True)
+        dataframe.reset_index(drop=True, inplace=True)
+        return dataframe
 
     if convert_population_to_dataframes:
-        # initialize the dataframes
-        all_plants_df = pd.DataFrame(columns=PLANTS_VARIABLES)
-        all_axes_df = pd.DataFrame(columns=AXES_VARIABLES)
-        all_phytomers_df = pd.DataFrame(columns=PHYTOMERS_VARIABLES)
-        all_organs_df = pd.DataFrame(columns=ORGANS_VARIABLES)
-        all_hiddenzones_df = pd.DataFrame(columns=HIDDENZONE_OUTPUTS_VARIABLES)
-        all_elements_df = pd.DataFrame(columns=ELEMENTS_OUTPUTS_VARIABLES)
-
-        # run through the population tree and fill the dataframes
+        # initialize the lists of values of the columns of the dataframes
+        plants_values = [[] for _ in PLANTS_VARIABLES]
+        axes_values = [[] for _ in AXES_VARIABLES]
+        phytomers_values = [[] for _ in PHYTOMERS_VARIABLES]
+        organs_values = [[] for _ in ORGANS_VARIABLES]
+        hiddenzones_values = [[] for _ in HIDDENZONE_OUTPUTS_VARIABLES]
+        elements_values = [[] for _ in ELEMENTS_OUTPUTS_VARIABLES]
+
+        # run through the population tree and fill the columns
         for plant in population.plants:
-            append_row(plant, [plant.index], simulation.Simulation.PLANTS_RUN_VARIABLES, all_plants_df)
+            append_row(plant, [plant.index], simulation.Simulation.PLANTS_RUN_VARIABLES, plants_values)
             for axis in plant.axes:
-                append_row(axis, [plant.index, axis.label], simulation.Simulation.AXES_RUN_VARIABLES, all_axes_df)
+                append_row(axis, [plant.index, axis.label], simulation.Simulation.AXES_RUN_VARIABLES, axes_values)
                 for organ in (axis.roots, axis.phloem, axis.grains):
                     if organ is not None:
-                        append_row(organ, [plant.index, axis.label, organ.label], simulation.Simulation.ORGANS_RUN_VARIABLES, all_organs_df)
+                        append_row(organ, [plant.index, axis.label, organ.label], simulation.Simulation.ORGANS_RUN_VARIABLES, organs_values)
                 for phytomer in axis.phytomers:
-                    append_row(phytomer, [plant.index, axis.label, phytomer.index], simulation.Simulation.PHYTOMERS_RUN_VARIABLES, all_phytomers_df)
+                    append_row(phytomer, [plant.index, axis.label, phytomer.index], simulation.Simulation.PHYTOMERS_RUN_VARIABLES, phytomers_values)
                     if phytomer.hiddenzone is not None:
-                        append_row(phytomer.hiddenzone, [plant.index, axis.label, phytomer.index], HIDDENZONE_OUTPUTS_RUN_VARIABLES, all_hiddenzones_df)
+                        append_row(phytomer.hiddenzone, [plant.index, axis.label, phytomer.index], HIDDENZONE_OUTPUTS_RUN_VARIABLES, hiddenzones_values)
                     for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
                         if organ is None:
                             continue
                         for element in (organ.exposed_element, organ.enclosed_element):
                             if element is None:
                                 continue
-                            append_row(element, [plant.index, axis.label, phytomer.index, organ.label, element.label], ELEMENTS_OUTPUTS_RUN_VARIABLES, all_elements_df)
-
-        # sort the rows of the dataframes by columns
-        all_plants_df.sort_values(by=PLANTS_VARIABLES, inplace=True)
-        all_axes_df.sort_values(by=AXES_VARIABLES, inplace=True)
-        all_phytomers_df.sort_values(by=PHYTOMERS_VARIABLES, inplace=True)
-        all_organs_df.sort_values(by=ORGANS_VARIABLES, inplace=True)
-        all_hiddenzones_df.sort_values(by=HIDDENZONE_OUTPUTS_VARIABLES, inplace=True)
-        all_elements_df.sort_values(by=ELEMENTS_OUTPUTS_VARIABLES, inplace=True)
-
-        # convert the indexes of plants, metamers and elements to integers in the dataframes
-        all_plants_df['plant'] = all_plants_df['plant'].astype(int)
-        all_axes_df['plant'] = all_axes_df['plant'].astype(int)
-        all_phytomers_df[['plant', 'metamer']] = all_phytomers_df[['plant', 'metamer']].astype(int)
-        all_organs_df['plant'] = all_organs_df['plant'].astype(int)
-        all_hiddenzones_df[['plant', 'metamer']] = all_hiddenzones_df[['plant', 'metamer']].astype(int)
-        all_elements_df[['plant', 'metamer']] = all_elements_df[['plant', 'metamer']].astype(int)
-
-        all_plants_df.reset_index(drop=True, inplace=True)
-        all_axes_df.reset_index(drop=True, inplace=True)
-        all_phytomers_df.reset_index(drop=True, inplace=True)
-        all_organs_df.reset_index(drop=True, inplace=True)
-        all_hiddenzones_df.reset_index(drop=True, inplace=True)
-        all_elements_df.reset_index(drop=True, inplace=True)
+                            append_row(element, [plant.index, axis.label, phytomer.index, organ.label, element.label], ELEMENTS_OUTPUTS_RUN_VARIABLES, elements_values)
+
+        # build the dataframes
+        all_plants_df = build_dataframe(plants_values, PLANTS_VARIABLES, ['plant'])
+        all_axes_df = build_dataframe(axes_values, AXES_VARIABLES, ['plant'])
+        all_phytomers_df = build_dataframe(phytomers_values, PHYTOMERS_VARIABLES, ['plant', 'metamer'])
+        all_organs_df = build_dataframe(organs_values, ORGANS_VARIABLES, ['plant'])
+        all_hiddenzones_df = build_dataframe(hiddenzones_values, HIDDENZONE_OUTPUTS_VARIABLES, ['plant', 'metamer'])
+        all_elements_df = build_dataframe(elements_values, ELEMENTS_OUTPUTS_VARIABLES, ['plant', 'metamer'])
 
     if convert_soils_to_dataframe:
-        all_soils_df = pd.DataFrame(columns=SOILS_VARIABLES)
+        soils_values = [[] for _ in SOILS_VARIABLES]
         for soil_id, soil in soils.items():
-            append_row(soil, list(soil_id), simulation.Simulation.SOILS_RUN_VARIABLES, all_soils_df)
-        all_soils_df.sort_values(by=SOILS_VARIABLES, inplace=True)
-        all_soils_df['plant'] = all_soils_df['plant'].astype(int)
-        all_soils_df.reset_index(drop=True, inplace=True)
+            append_row(soil, list(soil_id), simulation.Simulation.SOILS_RUN_VARIABLES, soils_values)
+        all_soils_df = build_dataframe(soils_values, SOILS_VARIABLES, ['plant'])
 
     if convert_population_to_dataframes and convert_soils_to_dataframe:
         return all_plants_df, all_axes_df, all_phytomers_df, all_organs_df, all_hiddenzones_df, all_elements_df, all_soils_df
@@ -303,3 +311,26 @@ def to_dataframes(population=None, soils=None):
         return all_plants_df, all_axes_df, all_phytomers_df, all_organs_df, all_hiddenzones_df, all_elements_df
     else:
         return all_soils_df
+
+
+def ensemble_to_dataframes(ensemble):
+    """ Convert the members of a CN-Wheat :class:`ensemble <simulation.EnsembleSimulation>` to Pandas dataframes.
+
+    The dataframes are the same as the ones returned by :func:`to_dataframes` for a population and soils, with an extra first column `member`
+    which contains the index of the member in :attr:`simulation.EnsembleSimulation.members_parameters`.
+    The plants keep the indexes they have in the population passed to :meth:`simulation.EnsembleSimulation.initialize`.
+
+    :param simulation.EnsembleSimulation ensemble: The CN-Wheat ensemble to convert.
+
+    :return: The :class:`dataframes <pandas.DataFrame>` of the members at plant, axis, phytomer, organ, hidden zone, element and soil scales.
+    :rtype: (pandas.DataFrame)
+    """
+    members_dataframes = []
+    for member, (member_population, member_soils, plants_indexes) in enumerate(zip(ensemble.members_populations, ensemble.members_soils,
+                                                                                   ensemble.members_plants_indexes)):
+        dataframes = to_dataframes(member_population, member_soils)
+        for dataframe in dataframes:
+            dataframe['plant'] = dataframe['plant'].map(plants_indexes).astype(int)
+            dataframe.insert(0, 'member', member)
+        members_dataframes.append(dataframes)
+    return tuple(pd.concat(scale_dataframes, ignore_index=True) for scale_dataframes in zip(*members_dataframes))
@@ -0,0 +1,85 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+import numpy as np
+
+"""
+    cnwheat.forcings
+    ~~~~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.forcings` defines the table of the forcings of the model interpolated inside a time step.
+
+    All the forcings of all the model objects are stored in flat arrays of values at the beginning of the time step and of slopes,
+    so that the forcings at any time of the time step are computed with one NumPy expression.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+
+class ForcingsTable(object):
+    """
+    The table of the forcings of the model objects over a time step.
+
+    :param str scheme: the scheme of interpolation of the forcings inside the time step ; must be one of :attr:`SCHEMES`.
+           With `'linear'` (default), each forcing varies linearly from its value at the beginning of the time step to its value at the end of the time step.
+           With `'constant'`, each forcing keeps its value at the beginning of the time step during the whole time step.
+    """
+
+    #: the schemes of interpolation of the forcings
+    SCHEMES = ('linear', 'constant')
+
+    def __init__(self, scheme='linear'):
+        self.scheme = scheme  #: the scheme of interpolation of the forcings
+        self.model_objects = []  #: the model object of each forcing
+        self.forcings_labels = []  #: the label of each forcing
+        self.start_values = np.zeros(0)  #: the value of each forcing at the beginning of the time step
+        self.slopes = np.zeros(0)  #: the slope of each forcing inside the time step
+        self.varying_forcings = np.zeros(0, dtype=int)  #: the indexes of the forcings which vary inside the time step
+
+    def build(self, model_objects, forcings_labels, start_values, end_values, duration):
+        """Build the table from the values of the forcings at the beginning and at the end of the time step,
+        and set the forcings of the model objects to their values at the beginning of the time step.
+
+        :param list model_objects: the model object of each forcing.
+        :param list [str] forcings_labels: the label of each forcing.
+        :param list [float] start_values: the value of each forcing at the beginning of the time step.
+        :param list [float] end_values: the value of each forcing at the end of the time step.
+        :param float duration: the duration of the time step.
+        """
+        self.model_objects = list(model_objects)
+        self.forcings_labels = list(forcings_labels)
+        self.start_values = np.array(start_values, dtype=float)
+        if self.scheme == 'linear':
+            self.slopes = (np.array(end_values, dtype=float) - self.start_values) / duration
+        else:
+            self.slopes = np.zeros_like(self.start_values)
+        self.varying_forcings = np.flatnonzero(self.slopes != 0)
+        for model_object, forcing_label, value in zip(self.model_objects, self.forcings_labels, self.start_values.tolist()):
+            setattr(model_object, forcing_label, value)
+
+    def evaluate(self, t):
+        """Compute the values of all the forcings at `t`.
+
+        :param float t: the time since the beginning of the time step.
+
+        :return: The values of the forcings at `t`.
+        :rtype: numpy.ndarray
+        """
+        return self.start_values + self.slopes * t
+
+    def apply(self, t):
+        """Set the forcings of the model objects which vary inside the time step to their values at `t`.
+
+        :param float t: the time since the beginning of the time step.
+        """
+        values = self.start_values[self.varying_forcings] + self.slopes[self.varying_forcings] * t
+        for i, value in zip(self.varying_forcings.tolist(), values.tolist()):
+            setattr(self.model_objects[i], self.forcings_labels[i], value)
@@ -0,0 +1,229 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+import numpy as np
+
+from openalea.cnwheat import model, parameters
+
+try:
+    import numba
+except ImportError:  # Numba is optional: the vectorized engine falls back to its NumPy implementation
+    numba = None
+
+"""
+    cnwheat.kernels
+    ~~~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.kernels` defines the kernel which computes the fluxes and the derivatives of the compartments
+    of the photosynthetic organ elements in one loop over the elements.
+
+    The kernel is compiled with Numba when Numba is installed (see :attr:`IS_COMPILED`). In this case, it can replace the array operations
+    of :class:`cnwheat.vectorized.VectorizedSystem` on the elements, which create many temporary arrays (see the parameter `jit_kernel`
+    of :class:`cnwheat.simulation.Simulation`). Otherwise, the vectorized engine keeps its NumPy implementation.
+    The equations are the same as in :mod:`cnwheat.model` and in :mod:`cnwheat.vectorized`. The respiration follows the equations of :mod:`respiwheat.model`.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+#: True if the kernels are compiled with Numba, False if Numba is not installed
+IS_COMPILED = numba is not None
+
+#: the fluxes and intermediate variables of the elements computed by :func:`elements_kernel`, in the order of the rows of its second output
+ELEMENTS_VARIABLES = ('Photosynthesis', 'Loading_Sucrose', 'Loading_Amino_Acids', 'Regul_S_Fructan', 'S_Fructan', 'D_Fructan', 'S_Starch', 'D_Starch',
+                      'S_Sucrose', 'R_phloem_loading', 'Nitrates_import', 'Amino_Acids_import', 'S_Amino_Acids', 'R_Nnit_red', 'S_Proteins', 'D_Proteins',
+                      'cytokinins_import', 'D_cytokinins', 'R_residual', 'sum_respi')
+
+#: the constants of the model of respiration used by :func:`elements_kernel`, in the order of its argument `respiration_constants`
+RESPIRATION_CONSTANTS = ('CPHLOEM', 'F_NIT_RED_SH_CS', 'C_NIT_RED', 'KM_MAX', 'KM', 'SECOND_TO_HOUR_RATE_CONVERSION')
+
+#: conversion factor from seconds to hours
+HOUR = parameters.SECOND_TO_HOUR_RATE_CONVERSION
+
+#: ratio between the number of mol of C and the number of mol of N in amino acids
+AMINO_ACIDS_C_N_RATIO = model.EcophysiologicalConstants.AMINO_ACIDS_C_RATIO / model.EcophysiologicalConstants.AMINO_ACIDS_N_RATIO
+
+
+def elements_kernel(compartments, parameters_values, mstruct, Photosynthesis, T_effect_Vmax, T_effect_conductivity, conc_sucrose_phloem, conc_amino_acids_phloem,
+                    transpiration, axis_Total_Transpiration, exports, is_growing, hiddenzones_compartments, hiddenzones_mstruct, Total_Organic_Nitrogen, Ts,
+                    hiddenzones_SIGMA, respiration_constants):
+    """Compute the fluxes and the derivatives of the compartments of the photosynthetic organ elements.
+    The arrays are aligned with the elements, which must have a positive structural mass.
+
+    :param numpy.ndarray compartments: the compartments of the elements, in the order of :attr:`cnwheat.vectorized.ELEMENTS_COMPARTMENTS` (shape (8, number of elements)).
+    :param numpy.ndarray parameters_values: the internal parameters of the elements, in the order of :attr:`cnwheat.vectorized.ELEMENTS_PARAMETERS`
+           (shape (26, number of elements)).
+    :param numpy.ndarray mstruct: the structural mass of the elements (g).
+    :param numpy.ndarray Photosynthesis: the photosynthesis of the elements integrated over an hour (mol` C).
+    :param numpy.ndarray T_effect_Vmax: the effect of the temperature of the axis on the maximal enzyme activities.
+    :param numpy.ndarray T_effect_conductivity: the effect of the temperature of the axis on the conductivities.
+    :param numpy.ndarray conc_sucrose_phloem: the concentration of sucrose in the phloem of the axis (mol` C g-1 mstruct).
+    :param numpy.ndarray conc_amino_acids_phloem: the concentration of amino acids in the phloem of the axis (mol` N g-1 mstruct).
+    :param numpy.ndarray transpiration: the transpiration of the elements (mmol s-1).
+    :param numpy.ndarray axis_Total_Transpiration: the total transpiration of the axis (mmol s-1).
+    :param numpy.ndarray exports: the exports of nitrates, amino acids and cytokinins by the roots of the axis (shape (3, number of elements)).
+    :param numpy.ndarray is_growing: True for the growing elements, which export to the hidden zone of their phytomer instead of loading the phloem.
+    :param numpy.ndarray hiddenzones_compartments: the sucrose and the amino acids of the hidden zone of the growing elements (shape (2, number of elements)).
+    :param numpy.ndarray hiddenzones_mstruct: the structural mass of the hidden zone of the growing elements (g).
+    :param numpy.ndarray Total_Organic_Nitrogen: the total organic nitrogen of the elements (mol` N).
+    :param numpy.ndarray Ts: the temperature of the elements (C).
+    :param numpy.ndarray hiddenzones_SIGMA: the conductivity of the hidden zone of the growing elements (see :attr:`cnwheat.parameters.HiddenZoneParameters.SIGMA`).
+    :param tuple respiration_constants: the constants of the model of respiration, in the order of :attr:`RESPIRATION_CONSTANTS`.
+
+    :return: The derivatives of the compartments (shape (8, number of elements)), and the fluxes and intermediate variables
+             in the order of :attr:`ELEMENTS_VARIABLES` (shape (20, number of elements)).
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    CPHLOEM, F_NIT_RED_SH_CS, C_NIT_RED, KM_MAX, KM, SECOND_TO_HOUR_RATE_CONVERSION = respiration_constants
+    nb_elements = mstruct.shape[0]
+    derivatives = np.empty((8, nb_elements))
+    variables = np.empty((20, nb_elements))
+
+    for i in range(nb_elements):
+        starch = compartments[0, i]
+        sucrose = compartments[1, i]
+        triosesP = compartments[2, i]
+        fructan = compartments[3, i]
+        nitrates = compartments[4, i]
+        amino_acids = compartments[5, i]
+        proteins = compartments[6, i]
+        cytokinins = compartments[7, i]
+
+        ALPHA = parameters_values[0, i]
+        BETA = parameters_values[1, i]
+        SIGMA_SUCROSE = parameters_values[2, i]
+        SIGMA_AMINO_ACIDS = parameters_values[3, i]
+        VMAX_SFRUCTAN_POT = parameters_values[4, i]
+        K_REGUL_SFRUCTAN = parameters_values[5, i]
+        N_REGUL_SFRUCTAN = parameters_values[6, i]
+        K_SFRUCTAN = parameters_values[7, i]
+        VMAX_DFRUCTAN = parameters_values[8, i]
+        K_DFRUCTAN = parameters_values[9, i]
+        VMAX_STARCH = parameters_values[10, i]
+        K_STARCH = parameters_values[11, i]
+        DELTA_DSTARCH = parameters_values[12, i]
+        VMAX_SUCROSE = parameters_values[13, i]
+        K_SUCROSE = parameters_values[14, i]
+        VMAX_AMINO_ACIDS = parameters_values[15, i]
+        K_AMINO_ACIDS_NITRATES = parameters_values[16, i]
+        K_AMINO_ACIDS_TRIOSESP = parameters_values[17, i]
+        VMAX_SPROTEINS = parameters_values[18, i]
+        K_SPROTEINS = parameters_values[19, i]
+        VMAX_DPROTEINS_CYTOK = parameters_values[20, i]
+        K_DPROTEINS_CYTOK = parameters_values[21, i]
+        N_DPROTEINS = parameters_values[22, i]
+        VMAX_DPROTEINS = parameters_values[23, i]
+        K_DPROTEINS = parameters_values[24, i]
+        DELTA_D_CYTOKININS = parameters_values[25, i]
+
+        element_mstruct = mstruct[i]
+        mstruct_alpha = element_mstruct * ALPHA
+        element_T_effect_Vmax = T_effect_Vmax[i]
+
+        # loading to the phloem, or export to the hidden zone for growing elements
+        conc_sucrose_element = sucrose / mstruct_alpha
+        conc_amino_acids_element = amino_acids / mstruct_alpha
+        if is_growing[i]:
+            hiddenzone_mstruct = hiddenzones_mstruct[i]
+            hiddenzone_conductance = hiddenzones_SIGMA[i] * BETA * hiddenzone_mstruct ** (2 / 3) * T_effect_conductivity[i] * HOUR
+            Loading_Sucrose = (conc_sucrose_element - hiddenzones_compartments[0, i] / hiddenzone_mstruct) * hiddenzone_conductance
+            Loading_Amino_Acids = (conc_amino_acids_element - hiddenzones_compartments[1, i] / hiddenzone_mstruct) * hiddenzone_conductance
+        else:
+            mstruct_conductance = element_mstruct ** (2 / 3) * T_effect_conductivity[i]
+            Loading_Sucrose = max(conc_sucrose_element, conc_sucrose_phloem[i]) * (conc_sucrose_element - conc_sucrose_phloem[i]) * \
+                SIGMA_SUCROSE * BETA * mstruct_conductance * HOUR
+            Loading_Amino_Acids = max(conc_amino_acids_element, conc_amino_acids_phloem[i]) * (conc_amino_acids_element - conc_amino_acids_phloem[i]) * \
+                SIGMA_AMINO_ACIDS * BETA * mstruct_conductance * HOUR
+
+        # fructan
+        K_REGUL_SFRUCTAN_N = K_REGUL_SFRUCTAN ** N_REGUL_SFRUCTAN
+        if Loading_Sucrose <= 0:
+            Regul_S_Fructan = VMAX_SFRUCTAN_POT
+        else:
+            rate_Loading_Sucrose_massic = Loading_Sucrose / element_mstruct / HOUR
+            Regul_S_Fructan = (VMAX_SFRUCTAN_POT * K_REGUL_SFRUCTAN_N) / (max(0., rate_Loading_Sucrose_massic ** N_REGUL_SFRUCTAN) + K_REGUL_SFRUCTAN_N)
+        conc_sucrose_positive = max(0., sucrose) / mstruct_alpha
+        S_Fructan = (conc_sucrose_positive * Regul_S_Fructan) / (conc_sucrose_positive + K_SFRUCTAN) * HOUR * element_T_effect_Vmax
+        D_Fructan = min((K_DFRUCTAN * VMAX_DFRUCTAN) / (conc_sucrose_positive + K_DFRUCTAN) * HOUR * element_T_effect_Vmax, max(0., fructan))
+
+        # starch and sucrose
+        conc_triosesP_positive = max(triosesP, 0.) / mstruct_alpha
+        S_Starch = ((conc_triosesP_positive * VMAX_STARCH) / (conc_triosesP_positive + K_STARCH)) * HOUR * element_T_effect_Vmax
+        D_Starch = max(0., DELTA_DSTARCH * (starch / mstruct_alpha)) * HOUR * element_T_effect_Vmax
+        S_Sucrose = ((conc_triosesP_positive * VMAX_SUCROSE) / (conc_triosesP_positive + K_SUCROSE)) * HOUR * element_T_effect_Vmax
+        R_phloem_loading = max(0., CPHLOEM * Loading_Sucrose * mstruct_alpha)
+
+        # imports from roots
+        transpiration_ratio = 0.
+        if axis_Total_Transpiration[i] > 0:
+            transpiration_ratio = transpiration[i] / axis_Total_Transpiration[i]
+        Nitrates_import = exports[0, i] * transpiration_ratio
+        Amino_Acids_import = exports[1, i] * transpiration_ratio
+        cytokinins_import = exports[2, i] * transpiration_ratio
+
+        # amino acids and proteins
+        S_Amino_Acids = 0.
+        if nitrates > 0 and triosesP > 0:
+            S_Amino_Acids = VMAX_AMINO_ACIDS / ((1 + K_AMINO_ACIDS_NITRATES / (nitrates / mstruct_alpha)) *
+                                                (1 + K_AMINO_ACIDS_TRIOSESP / (triosesP / mstruct_alpha))) * HOUR * element_T_effect_Vmax
+        R_Nnit_red = F_NIT_RED_SH_CS * C_NIT_RED * S_Amino_Acids * mstruct_alpha
+        conc_amino_acids_positive = max(0., amino_acids) / mstruct_alpha
+        S_Proteins = ((conc_amino_acids_positive * VMAX_SPROTEINS) / (conc_amino_acids_positive + K_SPROTEINS)) * HOUR * element_T_effect_Vmax
+        conc_proteins = proteins / mstruct_alpha
+        conc_cytokinins = max(0., cytokinins / element_mstruct)
+        K_DPROTEINS_CYTOK_N = K_DPROTEINS_CYTOK ** N_DPROTEINS
+        regul_cytokinins = (VMAX_DPROTEINS_CYTOK * K_DPROTEINS_CYTOK_N) / (conc_cytokinins ** N_DPROTEINS + K_DPROTEINS_CYTOK_N)
+        D_Proteins = max(0., (conc_proteins * VMAX_DPROTEINS / (conc_proteins + K_DPROTEINS)) * HOUR * regul_cytokinins * element_T_effect_Vmax)
+        D_cytokinins = max(0., DELTA_D_CYTOKININS * (cytokinins / mstruct_alpha)) * HOUR * element_T_effect_Vmax
+
+        # respiration
+        R_residual = 0.
+        if sucrose > 0. and mstruct_alpha > 0.:
+            conc_sucrose = sucrose / mstruct_alpha
+            R_residual = ((KM_MAX * conc_sucrose) / (KM + conc_sucrose)) * Total_Organic_Nitrogen[i] * 2. ** ((Ts[i] - 20.) / 10) * SECOND_TO_HOUR_RATE_CONVERSION
+        sum_respi = R_phloem_loading + R_Nnit_red + R_residual
+
+        # compartments derivatives
+        derivatives[0, i] = (S_Starch - D_Starch) * mstruct_alpha
+        derivatives[1, i] = (S_Sucrose + D_Starch + D_Fructan - S_Fructan) * element_mstruct - sum_respi - Loading_Sucrose
+        derivatives[2, i] = Photosynthesis[i] - (S_Sucrose + S_Starch + S_Amino_Acids * AMINO_ACIDS_C_N_RATIO) * mstruct_alpha
+        derivatives[3, i] = (S_Fructan - D_Fructan) * mstruct_alpha
+        derivatives[4, i] = Nitrates_import - (S_Amino_Acids * element_mstruct * ALPHA)
+        derivatives[5, i] = Amino_Acids_import - Loading_Amino_Acids + (S_Amino_Acids + D_Proteins - S_Proteins) * mstruct_alpha
+        derivatives[6, i] = (S_Proteins - D_Proteins) * mstruct_alpha
+        derivatives[7, i] = cytokinins_import - D_cytokinins * mstruct_alpha
+
+        variables[0, i] = Photosynthesis[i]
+        variables[1, i] = Loading_Sucrose
+        variables[2, i] = Loading_Amino_Acids
+        variables[3, i] = Regul_S_Fructan
+        variables[4, i] = S_Fructan
+        variables[5, i] = D_Fructan
+        variables[6, i] = S_Starch
+        variables[7, i] = D_Starch
+        variables[8, i] = S_Sucrose
+        variables[9, i] = R_phloem_loading
+        variables[10, i] = Nitrates_import
+        variables[11, i] = Amino_Acids_import
+        variables[12, i] = S_Amino_Acids
+        variables[13, i] = R_Nnit_red
+        variables[14, i] = S_Proteins
+        variables[15, i] = D_Proteins
+        variables[16, i] = cytokinins_import
+        variables[17, i] = D_cytokinins
+        variables[18, i] = R_residual
+        variables[19, i] = sum_respi
+
+    return derivatives, variables
+
+
+if IS_COMPILED:
+    # the divisions by zero give infinite values or NaN as with NumPy, instead of raising an exception
+    elements_kernel = numba.njit(cache=True, error_model='numpy')(elements_kernel)
@@ -0,0 +1,257 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+from collections import OrderedDict
+
+import numpy as np
+
+from openalea.cnwheat import model
+
+"""
+    cnwheat.layout
+    ~~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.layout` defines the layout of the compartments of a population of plants and its soils
+    in the vector of compartments integrated by the solver.
+
+    The layout is compiled once from the topology of the population, then the compartments are gathered from the model objects
+    into the vector of compartments, and scattered from the vector of compartments to the model objects, with integer indexing
+    of NumPy arrays. It is used by :class:`cnwheat.simulation.Simulation`, and can be reused by any code which needs to read
+    the vector of compartments (loggers, checkpoints...).
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+
+class CompartmentsLayout(object):
+    """
+    The layout of the compartments of a population of plants and its soils in the vector of compartments.
+
+    The model objects are gathered into groups: one group per class of model object. The photosynthetic organ elements
+    are gathered into the group :class:`model.PhotosyntheticOrganElement`, the hidden zones into the group :class:`model.HiddenZone`,
+    and the other organs into the group of their own class (e.g. :class:`model.Roots`).
+    For each group and each compartment, the layout stores the indexes of the compartment of the objects of the group
+    as an array of integers.
+
+    :param model.Population population: the population of plants.
+    :param dict soils: the soil associated to each axis: {(plant_index, axis_label): soil_object, ...}
+    :param dict model_compartments_names: the names of the compartments of each class of model object
+           (see :attr:`cnwheat.simulation.Simulation.MODEL_COMPARTMENTS_NAMES`).
+    """
+
+    def __init__(self, population, soils, model_compartments_names):
+
+        self.size = 0  #: the number of compartments
+
+        #: the index of each compartment of each model object: {model_object: {compartment_name: index, ...}, ...}
+        self.mapping = {}
+
+        #: the model objects of each group: {group_class: [model_object, ...], ...}
+        self.groups_objects = OrderedDict()
+
+        #: the indexes of the compartments of each group: {group_class: {compartment_name: numpy.ndarray [int], ...}, ...}
+        self.groups_indexes = OrderedDict()
+
+        self.model_objects = []  #: the model objects of the layout, in the order of the layout
+
+        groups_indexes = OrderedDict()
+
+        def add(model_object):
+            group_class = _group_class(model_object)
+            compartments_names = [compartment_name for compartment_name in model_compartments_names[_compartments_class(model_object)]
+                                  if hasattr(model_object, compartment_name)]
+            self.mapping[model_object] = {}
+            self.model_objects.append(model_object)
+            if len(compartments_names) == 0:
+                return
+            if group_class not in self.groups_objects:
+                self.groups_objects[group_class] = []
+                groups_indexes[group_class] = OrderedDict((compartment_name, []) for compartment_name in compartments_names)
+            self.groups_objects[group_class].append(model_object)
+            for compartment_name in compartments_names:
+                self.mapping[model_object][compartment_name] = self.size
+                groups_indexes[group_class][compartment_name].append(self.size)
+                self.size += 1
+
+        for model_object in _iter_model_objects(population, soils):
+            add(model_object)
+
+        for group_class, compartments_indexes in groups_indexes.items():
+            self.groups_indexes[group_class] = OrderedDict((compartment_name, np.array(indexes, dtype=int))
+                                                           for compartment_name, indexes in compartments_indexes.items())
+
+    @property
+    def signature(self):
+        """The structure of the layout: the classes of the groups, and the names and indexes of their compartments.
+        Two layouts with the same signature have the same vector of compartments, even if they map different model objects.
+
+        :rtype: tuple
+        """
+        return tuple((group_class, tuple((compartment_name, tuple(indexes.tolist())) for compartment_name, indexes in compartments_indexes.items()))
+                     for group_class, compartments_indexes in self.groups_indexes.items())
+
+    def indexes(self, model_objects, compartments_names):
+        """Return the indexes of the compartments `compartments_names` of `model_objects`.
+
+        :param list model_objects: the model objects.
+        :param tuple [str] compartments_names: the names of the compartments.
+
+        :return: The indexes of the compartments, as an array of shape (number of compartments, number of objects).
+        :rtype: numpy.ndarray
+        """
+        indexes = [[self.mapping[model_object][compartment_name] for model_object in model_objects] for compartment_name in compartments_names]
+        return np.array(indexes, dtype=int).reshape(len(compartments_names), len(model_objects))
+
+    def gather(self, y=None):
+        """Gather the values of the compartments of the model objects into a vector of compartments.
+
+        :param numpy.ndarray y: the vector of compartments to fill. If None, a new vector is created.
+
+        :return: The vector of compartments.
+        :rtype: numpy.ndarray
+        """
+        if y is None:
+            y = np.zeros(self.size)
+        for group_class, model_objects in self.groups_objects.items():
+            for compartment_name, indexes in self.groups_indexes[group_class].items():
+                y[indexes] = [getattr(model_object, compartment_name) for model_object in model_objects]
+        return y
+
+    def subset(self, model_objects):
+        """Return the layout of the compartments of `model_objects` only. The compartments keep their indexes in the vector of compartments,
+        so that the returned layout gathers and scatters a part of the same vector of compartments.
+
+        :param list model_objects: the model objects of the subset ; they must belong to this layout.
+
+        :return: The layout of the compartments of `model_objects`.
+        :rtype: CompartmentsLayout
+        """
+        model_objects = set(model_objects)
+        subset_layout = CompartmentsLayout.__new__(CompartmentsLayout)
+        subset_layout.size = self.size
+        subset_layout.mapping = {model_object: self.mapping[model_object] for model_object in model_objects}
+        subset_layout.model_objects = [model_object for model_object in self.model_objects if model_object in model_objects]
+        subset_layout.groups_objects = OrderedDict()
+        subset_layout.groups_indexes = OrderedDict()
+        for group_class, group_objects in self.groups_objects.items():
+            positions = [i for i, model_object in enumerate(group_objects) if model_object in model_objects]
+            if len(positions) == 0:
+                continue
+            subset_layout.groups_objects[group_class] = [group_objects[i] for i in positions]
+            subset_layout.groups_indexes[group_class] = OrderedDict((compartment_name, indexes[positions])
+                                                                    for compartment_name, indexes in self.groups_indexes[group_class].items())
+        return subset_layout
+
+    def rebind(self, population, soils):
+        """Map the compartments to the model objects of `population` and `soils`, in place of the model objects of the layout.
+        `population` and `soils` must have the same topology as the population and the soils of the layout (see :func:`topology_fingerprint`):
+        the indexes of the compartments are kept, so that the layout does not need to be compiled again.
+
+        :param model.Population population: the population of plants.
+        :param dict soils: the soil associated to each axis: {(plant_index, axis_label): soil_object, ...}
+        """
+        new_model_objects = dict(zip(self.model_objects, _iter_model_objects(population, soils)))
+        self.mapping = {new_model_objects[model_object]: self.mapping[model_object] for model_object in self.model_objects}
+        for group_class, group_objects in self.groups_objects.items():
+            self.groups_objects[group_class] = [new_model_objects[model_object] for model_object in group_objects]
+        self.model_objects = [new_model_objects[model_object] for model_object in self.model_objects]
+
+    def scatter(self, y):
+        """Set the compartments of the model objects from the vector of compartments `y`.
+
+        :param numpy.ndarray y: the vector of compartments.
+        """
+        y = np.asarray(y, dtype=float)
+        for group_class, model_objects in self.groups_objects.items():
+            for compartment_name, indexes in self.groups_indexes[group_class].items():
+                for model_object, value in zip(model_objects, y[indexes].tolist()):
+                    setattr(model_object, compartment_name, value)
+
+
+def topology_fingerprint(population, soils):
+    """Return the topology of `population` and `soils`: the identifiers of the soils, and the classes of the model objects of each axis.
+    Two populations with the same fingerprint have the same layout of compartments (see :meth:`CompartmentsLayout.rebind`),
+    and pass the same consistency checks (see :meth:`cnwheat.simulation.Simulation.initialize`).
+
+    :param model.Population population: the population of plants.
+    :param dict soils: the soil associated to each axis: {(plant_index, axis_label): soil_object, ...}
+
+    :return: The fingerprint of the topology, which can be compared to another fingerprint.
+    :rtype: tuple
+    """
+    return (tuple(soils),
+            tuple((plant.index, tuple((axis.label, tuple(model_object.__class__ for model_object in axis_model_objects(axis))) for axis in plant.axes))
+                  for plant in population.plants))
+
+
+def axis_model_objects(axis):
+    """Return the model objects which belong to `axis`: the axis itself, its roots, phloem and grains, its phytomers,
+    and the organs and elements of its phytomers.
+
+    :param model.Axis axis: the axis.
+
+    :return: The model objects of the axis, in the order of the layout.
+    :rtype: list
+    """
+    model_objects = [axis]
+    for organ in (axis.roots, axis.phloem, axis.grains):
+        if organ is None:
+            continue
+        model_objects.append(organ)
+    for phytomer in axis.phytomers:
+        model_objects.append(phytomer)
+        for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath, phytomer.hiddenzone):
+            if organ is None:
+                continue
+            model_objects.append(organ)
+            if organ is phytomer.hiddenzone:
+                continue
+            for element in (organ.exposed_element, organ.enclosed_element):
+                if element is None:
+                    continue
+                model_objects.append(element)
+    return model_objects
+
+
+def _iter_model_objects(population, soils):
+    """Iterate over the model objects of `population` and `soils`, in the order of the layout.
+    """
+    for soil in soils.values():
+        yield soil
+    for plant in population.plants:
+        yield plant
+        for axis in plant.axes:
+            for model_object in axis_model_objects(axis):
+                yield model_object
+
+
+def _compartments_class(model_object):
+    """Return the class used to find the names of the compartments of `model_object` (see :attr:`cnwheat.simulation.Simulation.MODEL_COMPARTMENTS_NAMES`).
+    """
+    class_ = model_object.__class__
+    if issubclass(class_, model.HiddenZone):
+        class_ = model.HiddenZone
+    elif issubclass(class_, model.Organ):
+        class_ = model.Organ
+    elif issubclass(class_, model.PhotosyntheticOrganElement):
+        class_ = model.PhotosyntheticOrganElement
+    return class_
+
+
+def _group_class(model_object):
+    """Return the class of the group of `model_object` in the layout.
+    """
+    class_ = model_object.__class__
+    if issubclass(class_, model.HiddenZone):
+        class_ = model.HiddenZone
+    elif issubclass(class_, model.PhotosyntheticOrganElement):
+        class_ = model.PhotosyntheticOrganElement
+    return class_
@@ -260,6 +260,9 @@ class Organ(object):
     The class :class:`Organ` defines the CN exchanges at organ scale.
 
     :class:`Organ` is the base class of all organs. DO NOT INSTANTIATE IT.
+
+    The internal parameters of an organ are read from its attribute `PARAMETERS`, which is the parameters of its class
+    unless the organ owns a copy of them (see :func:`parameters.copy_parameters`).
     """
 
     def __init__(self, label):
@@ -361,7 +364,7 @@ class HiddenZone(Organ):
         """
         conc_sucrose_phloem = (sucrose_phloem / mstruct_axis)
         conc_sucrose_HZ = (sucrose / self.mstruct)
-        conductance = HiddenZone.PARAMETERS.SIGMA * HiddenZone.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity  # TODO: choix valeurs paramq par rapport flux phloem-hgz
+        conductance = self.PARAMETERS.SIGMA * self.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity  # TODO: choix valeurs paramq par rapport flux phloem-hgz
 
         return (conc_sucrose_phloem - conc_sucrose_HZ) * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
@@ -379,7 +382,7 @@ class HiddenZone(Organ):
         """
         conc_amino_acids_phloem = (amino_acids_phloem / mstruct_axis)
         conc_amino_acids_HZ = (amino_acids / self.mstruct)
-        conductance = HiddenZone.PARAMETERS.SIGMA * HiddenZone.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
+        conductance = self.PARAMETERS.SIGMA * self.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
         return (conc_amino_acids_phloem - conc_amino_acids_HZ) * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
     def calculate_S_proteins(self, amino_acids, T_effect_Vmax):
@@ -392,8 +395,8 @@ class HiddenZone(Organ):
         :return: Rate of Protein synthesis (mol` N g-1 mstruct h-1)
         :rtype: float
         """
-        vmax = HiddenZone.PARAMETERS.VMAX_SPROTEINS_EMZ * (1 - self.ratio_DZ) + HiddenZone.PARAMETERS.VMAX_SPROTEINS_DZ * self.ratio_DZ  #: 'Mean' Vmax for the whole hidden zone
-        return ((vmax * max(0, (amino_acids / self.mstruct))) / (HiddenZone.PARAMETERS.K_SPROTEINS + max(0, (amino_acids / self.mstruct)))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        vmax = self.PARAMETERS.VMAX_SPROTEINS_EMZ * (1 - self.ratio_DZ) + self.PARAMETERS.VMAX_SPROTEINS_DZ * self.ratio_DZ  #: 'Mean' Vmax for the whole hidden zone
+        return ((vmax * max(0, (amino_acids / self.mstruct))) / (self.PARAMETERS.K_SPROTEINS + max(0, (amino_acids / self.mstruct)))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     def calculate_D_Proteins(self, proteins, T_effect_Vmax):
         """Rate of protein degradation (mol` N proteins h-1 g-1 MS).
@@ -405,7 +408,7 @@ class HiddenZone(Organ):
         :return: Rate of Protein degradation (mol` N g-1 mstruct h-1)
         :rtype: float
         """
-        return max(0, (HiddenZone.PARAMETERS.delta_Dproteins * (proteins / self.mstruct))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        return max(0, (self.PARAMETERS.delta_Dproteins * (proteins / self.mstruct))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     def calculate_Regul_S_Fructan(self, Unloading_Sucrose):
         """Regulating function for fructan maximal rate of synthesis.
@@ -418,12 +421,12 @@ class HiddenZone(Organ):
         """
 
         if Unloading_Sucrose >= 0:
-            Vmax_Sfructans = HiddenZone.PARAMETERS.VMAX_SFRUCTAN_POT
+            Vmax_Sfructans = self.PARAMETERS.VMAX_SFRUCTAN_POT
         else:  # Regulation by sucrose unloading if hidden zone is a source for C
             rate_Loading_Sucrose_massic = -Unloading_Sucrose / self.mstruct / parameters.SECOND_TO_HOUR_RATE_CONVERSION
-            Vmax_Sfructans = HiddenZone.PARAMETERS.VMAX_SFRUCTAN_POT * (HiddenZone.PARAMETERS.K_REGUL_SFRUCTAN ** HiddenZone.PARAMETERS.N_REGUL_SFRUCTAN /
-                                                                        (max(0., rate_Loading_Sucrose_massic ** HiddenZone.PARAMETERS.N_REGUL_SFRUCTAN) +
-                                                                         HiddenZone.PARAMETERS.K_REGUL_SFRUCTAN ** HiddenZone.PARAMETERS.N_REGUL_SFRUCTAN))
+            Vmax_Sfructans = self.PARAMETERS.VMAX_SFRUCTAN_POT * (self.PARAMETERS.K_REGUL_SFRUCTAN ** self.PARAMETERS.N_REGUL_SFRUCTAN /
+                                                                        (max(0., rate_Loading_Sucrose_massic ** self.PARAMETERS.N_REGUL_SFRUCTAN) +
+                                                                         self.PARAMETERS.K_REGUL_SFRUCTAN ** self.PARAMETERS.N_REGUL_SFRUCTAN))
         return Vmax_Sfructans
 
     def calculate_S_Fructan(self, sucrose, Regul_S_Fructan, T_effect_Vmax):
@@ -437,8 +440,8 @@ class HiddenZone(Organ):
         :return: Rate of Fructan synthesis (mol` C g-1 mstruct)
         :rtype: float
         """
-        return ((max(0., sucrose) / self.mstruct) * HiddenZone.PARAMETERS.VMAX_SFRUCTAN_RELATIVE * Regul_S_Fructan) / \
-               ((max(0., sucrose) / self.mstruct) + HiddenZone.PARAMETERS.K_SFRUCTAN) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        return ((max(0., sucrose) / self.mstruct) * self.PARAMETERS.VMAX_SFRUCTAN_RELATIVE * Regul_S_Fructan) / \
+               ((max(0., sucrose) / self.mstruct) + self.PARAMETERS.K_SFRUCTAN) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     def calculate_D_Fructan(self, sucrose, fructan, T_effect_Vmax):
         """Rate of fructan degradation (mol` C fructan g-1 mstruct h-1).
@@ -451,8 +454,8 @@ class HiddenZone(Organ):
         :return: Rate of Fructan degradation (mol` C g-1 mstruct)
         :rtype: float
         """
-        d_potential = ((HiddenZone.PARAMETERS.K_DFRUCTAN * HiddenZone.PARAMETERS.VMAX_DFRUCTAN * T_effect_Vmax) /
-                       ((max(0., sucrose) / self.mstruct) + HiddenZone.PARAMETERS.K_DFRUCTAN)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION
+        d_potential = ((self.PARAMETERS.K_DFRUCTAN * self.PARAMETERS.VMAX_DFRUCTAN * T_effect_Vmax) /
+                       ((max(0., sucrose) / self.mstruct) + self.PARAMETERS.K_DFRUCTAN)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION
         d_actual = min(d_potential, max(0., fructan))
         return d_actual
 
@@ -542,7 +545,7 @@ class Phloem(Organ):
             elif isinstance(contributor, Grains):
                 sucrose_derivative -= contributor.S_grain_structure + (contributor.S_grain_starch * contributor.structural_dry_mass)
             elif isinstance(contributor, Roots):
-                sucrose_derivative -= contributor.Unloading_Sucrose * contributor.mstruct * contributor.__class__.PARAMETERS.ALPHA
+                sucrose_derivative -= contributor.Unloading_Sucrose * contributor.mstruct * contributor.PARAMETERS.ALPHA
             elif isinstance(contributor, HiddenZone):
                 sucrose_derivative -= contributor.Unloading_Sucrose * contributor.nb_replications
 
@@ -564,7 +567,7 @@ class Phloem(Organ):
             elif isinstance(contributor, Grains):
                 amino_acids_derivative -= contributor.S_Proteins
             elif isinstance(contributor, Roots):
-                amino_acids_derivative -= contributor.Unloading_Amino_Acids * contributor.mstruct * contributor.__class__.PARAMETERS.ALPHA
+                amino_acids_derivative -= contributor.Unloading_Amino_Acids * contributor.mstruct * contributor.PARAMETERS.ALPHA
             elif isinstance(contributor, HiddenZone):
                 amino_acids_derivative -= contributor.Unloading_Amino_Acids * contributor.nb_replications
 
@@ -663,10 +666,9 @@ class Grains(Organ):
         :return: Correction to apply to RGR Structure of the grains (dimensionless)
         :rtype: float
         """
-        return self.modified_Arrhenius_equation(Tair) / Grains.PARAMETERS.Arrhenius_ref
+        return self.modified_Arrhenius_equation(Tair) / self.PARAMETERS.Arrhenius_ref
 
-    @staticmethod
-    def calculate_RGR_Structure(sucrose_phloem, mstruct_axis, T_effect_growth):
+    def calculate_RGR_Structure(self, sucrose_phloem, mstruct_axis, T_effect_growth):
         """Relative Growth Rate of grain structure, regulated by sucrose concentration in phloem.
 
         :param float sucrose_phloem: Sucrose amount in phloem (mol` C)
@@ -676,8 +678,8 @@ class Grains(Organ):
         :return: RGR of grain structure at 20C (s-1)
         :rtype: float
         """
-        return ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) * Grains.PARAMETERS.VMAX_RGR) / ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) +
-                                                                                                                    Grains.PARAMETERS.K_RGR) * T_effect_growth
+        return ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) * self.PARAMETERS.VMAX_RGR) / ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) +
+                                                                                                                    self.PARAMETERS.K_RGR) * T_effect_growth
 
     # FLUXES
 
@@ -691,7 +693,7 @@ class Grains(Organ):
         :return: Rate of Synthesis of grain structure (mol` C h-1)
         :rtype: float
         """
-        if self.age_from_flowering <= Grains.PARAMETERS.FILLING_INIT:  #: Grain enlargment
+        if self.age_from_flowering <= self.PARAMETERS.FILLING_INIT:  #: Grain enlargment
             S_grain_structure = prec_structure * RGR_Structure * parameters.SECOND_TO_HOUR_RATE_CONVERSION
         else:  #: Grain filling
             S_grain_structure = 0
@@ -709,13 +711,13 @@ class Grains(Organ):
         :return: Rate of Synthesis of grain starch (mol` C g-1 mstruct h-1)
         :rtype: float
         """
-        if self.age_from_flowering <= Grains.PARAMETERS.FILLING_INIT:  #: Grain enlargment
+        if self.age_from_flowering <= self.PARAMETERS.FILLING_INIT:  #: Grain enlargment
             S_grain_starch = 0
-        elif self.age_from_flowering > Grains.PARAMETERS.FILLING_END:  #: Grain maturity
+        elif self.age_from_flowering > self.PARAMETERS.FILLING_END:  #: Grain maturity
             S_grain_starch = 0
         else:  #: Grain filling
-            S_grain_starch = (((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) * Grains.PARAMETERS.VMAX_STARCH) /
-                              ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) + Grains.PARAMETERS.K_STARCH)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+            S_grain_starch = (((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) * self.PARAMETERS.VMAX_STARCH) /
+                              ((max(0., sucrose_phloem) / (mstruct_axis * Axis.PARAMETERS.ALPHA)) + self.PARAMETERS.K_STARCH)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return S_grain_starch
 
     @staticmethod
@@ -869,14 +871,14 @@ class Roots(Organ):
         :return: Rate of Sucrose Unloading (mol` C g-1 mstruct h-1)
         :rtype: float
         """
-        conc_sucrose_roots = sucrose_roots / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        conc_sucrose_roots = sucrose_roots / (self.mstruct * self.PARAMETERS.ALPHA)
         conc_sucrose_phloem = sucrose_phloem / (mstruct_axis * parameters.AXIS_PARAMETERS.ALPHA)
         #: Driving compartment (mol` C g-1 mstruct)
         driving_sucrose_compartment = max(conc_sucrose_roots, conc_sucrose_phloem)
         #: Gradient of sucrose between the roots and the phloem (mol` C g-1 mstruct)
         diff_sucrose = conc_sucrose_phloem - conc_sucrose_roots
         #: Conductance depending on mstruct (g2 mol`-1 s-1)
-        conductance = Roots.PARAMETERS.SIGMA_SUCROSE * Roots.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
+        conductance = self.PARAMETERS.SIGMA_SUCROSE * self.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
 
         return driving_sucrose_compartment * diff_sucrose * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
@@ -917,13 +919,13 @@ class Roots(Organ):
 
         #: High Affinity Transport System (HATS)
         VMAX_HATS_MAX = max(0.,
-                            Roots.PARAMETERS.A_VMAX_HATS * conc_nitrates_roots + Roots.PARAMETERS.B_VMAX_HATS)  #: Maximal rate of nitrates influx at saturating soil N concentration;HATS (  mol` N nitrates g-1 mstruct s-1)
+                            self.PARAMETERS.A_VMAX_HATS * conc_nitrates_roots + self.PARAMETERS.B_VMAX_HATS)  #: Maximal rate of nitrates influx at saturating soil N concentration;HATS (  mol` N nitrates g-1 mstruct s-1)
         K_HATS = max(0.,
-                     Roots.PARAMETERS.A_K_HATS * conc_nitrates_roots + Roots.PARAMETERS.B_K_HATS)  #: Affinity coefficient of nitrates influx at saturating soil N concentration;HATS (mol` m-3)
+                     self.PARAMETERS.A_K_HATS * conc_nitrates_roots + self.PARAMETERS.B_K_HATS)  #: Affinity coefficient of nitrates influx at saturating soil N concentration;HATS (mol` m-3)
         HATS = (VMAX_HATS_MAX * Conc_Nitrates_Soil) / (K_HATS + Conc_Nitrates_Soil)  #: Rate of nitrate influx by HATS (mol` N nitrates uptaked s-1 g-1 mstruct)
 
         #: Low Affinity Transport System (LATS)
-        K_LATS = max(0., Roots.PARAMETERS.A_LATS * conc_nitrates_roots + Roots.PARAMETERS.B_LATS)  #: Rate constant for nitrates influx at low soil N concentration; LATS (m3 g-1 mstruct s-1)
+        K_LATS = max(0., self.PARAMETERS.A_LATS * conc_nitrates_roots + self.PARAMETERS.B_LATS)  #: Rate constant for nitrates influx at low soil N concentration; LATS (m3 g-1 mstruct s-1)
         LATS = (K_LATS * Conc_Nitrates_Soil)  #: Rate of nitrate influx by LATS (mol` N nitrates g-1 mstruct)
 
         #: Nitrate influx (mol` N)
@@ -931,11 +933,11 @@ class Roots(Organ):
         nitrate_influx = HATS_LATS * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax * self.mstruct
 
         # Regulations
-        regul_C = (sucrose_roots / self.mstruct) * Roots.PARAMETERS.RELATIVE_VMAX_N_UPTAKE / ((sucrose_roots / self.mstruct) + Roots.PARAMETERS.K_C)  #: Nitrate uptake regulation by root C
-        if HATS_LATS < Roots.PARAMETERS.MIN_INFLUX_FOR_UPTAKE:
+        regul_C = (sucrose_roots / self.mstruct) * self.PARAMETERS.RELATIVE_VMAX_N_UPTAKE / ((sucrose_roots / self.mstruct) + self.PARAMETERS.K_C)  #: Nitrate uptake regulation by root C
+        if HATS_LATS < self.PARAMETERS.MIN_INFLUX_FOR_UPTAKE:
             net_nitrate_uptake = 0
         else:
-            net_nitrate_uptake = nitrate_influx * Roots.PARAMETERS.NET_INFLUX_UPTAKE_RATIO * regul_C  #: Net nitrate uptake (mol` N nitrates uptaked by roots)
+            net_nitrate_uptake = nitrate_influx * self.PARAMETERS.NET_INFLUX_UPTAKE_RATIO * regul_C  #: Net nitrate uptake (mol` N nitrates uptaked by roots)
         return net_nitrate_uptake, nitrate_influx
 
     def calculate_S_amino_acids(self, nitrates, sucrose, T_effect_Vmax):
@@ -950,8 +952,8 @@ class Roots(Organ):
         :return: Amino acids synthesis (mol` N g-1 mstruct h-1)
         :rtype: float
         """
-        return T_effect_Vmax * Roots.PARAMETERS.VMAX_AMINO_ACIDS / ((1 + Roots.PARAMETERS.K_AMINO_ACIDS_NITRATES / (nitrates / (self.mstruct * Roots.PARAMETERS.ALPHA))) *
-                                                                    (1 + Roots.PARAMETERS.K_AMINO_ACIDS_SUCROSE / (sucrose / (self.mstruct * Roots.PARAMETERS.ALPHA)))
+        return T_effect_Vmax * self.PARAMETERS.VMAX_AMINO_ACIDS / ((1 + self.PARAMETERS.K_AMINO_ACIDS_NITRATES / (nitrates / (self.mstruct * self.PARAMETERS.ALPHA))) *
+                                                                    (1 + self.PARAMETERS.K_AMINO_ACIDS_SUCROSE / (sucrose / (self.mstruct * self.PARAMETERS.ALPHA)))
                                                                     ) * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
     def calculate_Export_Nitrates(self, nitrates, regul_transpiration):
@@ -965,7 +967,7 @@ class Roots(Organ):
         :rtype: float
         """
 
-        f_nitrates = (nitrates / (self.mstruct * Roots.PARAMETERS.ALPHA)) * Roots.PARAMETERS.K_NITRATE_EXPORT  #: mol` g-1 s-1
+        f_nitrates = (nitrates / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.K_NITRATE_EXPORT  #: mol` g-1 s-1
         Export_Nitrates = f_nitrates * self.mstruct * regul_transpiration * parameters.SECOND_TO_HOUR_RATE_CONVERSION  #: Nitrate export regulation by transpiration (mol` N)
         return max(min(Export_Nitrates, nitrates), 0.)
 
@@ -981,12 +983,11 @@ class Roots(Organ):
         :Returns Type:
             :class:`float`
         """
-        f_amino_acids = (amino_acids / (self.mstruct * Roots.PARAMETERS.ALPHA)) * Roots.PARAMETERS.K_AMINO_ACIDS_EXPORT  #: mol` g-1 s-1
+        f_amino_acids = (amino_acids / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.K_AMINO_ACIDS_EXPORT  #: mol` g-1 s-1
         Export_Amino_Acids = f_amino_acids * self.mstruct * regul_transpiration * parameters.SECOND_TO_HOUR_RATE_CONVERSION  #: Amino acids export regulation by plant transpiration (mol` N)
         return max(min(Export_Amino_Acids, amino_acids), 0.)
 
-    @staticmethod
-    def calculate_exudation(Unloading_Sucrose, sucrose_roots, amino_acids_roots, amino_acids_phloem):
+    def calculate_exudation(self, Unloading_Sucrose, sucrose_roots, amino_acids_roots, amino_acids_phloem):
         """C sucrose and N amino acids lost by root exudation (mol` C or N g-1 mstruct).
             - C exudation is calculated as a fraction of C Unloading from phloem
             - N exudation is calculated from C exudation using the ratio amino acids:sucrose of the phloem
@@ -1002,11 +1003,11 @@ class Roots(Organ):
         if sucrose_roots <= 0 or Unloading_Sucrose <= 0:
             C_exudation = 0
         else:
-            C_exudation = min(sucrose_roots, Unloading_Sucrose * Roots.PARAMETERS.C_EXUDATION)  #: C exudated (mol` g-1 mstruct)
+            C_exudation = min(sucrose_roots, Unloading_Sucrose * self.PARAMETERS.C_EXUDATION)  #: C exudated (mol` g-1 mstruct)
         if amino_acids_phloem <= 0 or amino_acids_roots <= 0 or sucrose_roots <= 0:
             N_exudation = 0
         else:
-            N_exudation = min((amino_acids_roots / sucrose_roots), Roots.PARAMETERS.N_EXUDATION_MAX) * C_exudation
+            N_exudation = min((amino_acids_roots / sucrose_roots), self.PARAMETERS.N_EXUDATION_MAX) * C_exudation
         return C_exudation, N_exudation  # TODO: C_exudation and N_exudation should be renamed as the exudation of AA result in a loss of both C and N
 
     def calculate_S_cytokinins(self, sucrose_roots, nitrates_roots, T_effect_Vmax):
@@ -1024,11 +1025,11 @@ class Roots(Organ):
         conc_sucrose = max(0, (sucrose_roots / self.mstruct))
         conc_Nitrates = max(0, (nitrates_roots / self.mstruct))
 
-        f_sucrose = conc_sucrose ** Roots.PARAMETERS.N_SUC_CYTOKININS / (conc_sucrose ** Roots.PARAMETERS.N_SUC_CYTOKININS + Roots.PARAMETERS.K_SUCROSE_CYTOKININS ** Roots.PARAMETERS.N_SUC_CYTOKININS)
-        f_nitrates = conc_Nitrates ** Roots.PARAMETERS.N_NIT_CYTOKININS / (
-                conc_Nitrates ** Roots.PARAMETERS.N_NIT_CYTOKININS + Roots.PARAMETERS.K_NITRATES_CYTOKININS ** Roots.PARAMETERS.N_NIT_CYTOKININS)
+        f_sucrose = conc_sucrose ** self.PARAMETERS.N_SUC_CYTOKININS / (conc_sucrose ** self.PARAMETERS.N_SUC_CYTOKININS + self.PARAMETERS.K_SUCROSE_CYTOKININS ** self.PARAMETERS.N_SUC_CYTOKININS)
+        f_nitrates = conc_Nitrates ** self.PARAMETERS.N_NIT_CYTOKININS / (
+                conc_Nitrates ** self.PARAMETERS.N_NIT_CYTOKININS + self.PARAMETERS.K_NITRATES_CYTOKININS ** self.PARAMETERS.N_NIT_CYTOKININS)
 
-        S_cytokinins = Roots.PARAMETERS.VMAX_S_CYTOKININS * f_sucrose * f_nitrates * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        S_cytokinins = self.PARAMETERS.VMAX_S_CYTOKININS * f_sucrose * f_nitrates * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return S_cytokinins
 
     def calculate_Export_cytokinins(self, cytokinins, regul_transpiration):
@@ -1041,7 +1042,7 @@ class Roots(Organ):
         :return: Rate of Cytokinin export (AU h-1)
         :rtype: float
         """
-        f_cytokinins = (cytokinins / (self.mstruct * Roots.PARAMETERS.ALPHA)) * Roots.PARAMETERS.K_CYTOKININS_EXPORT  #: AU g-1 s-1
+        f_cytokinins = (cytokinins / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.K_CYTOKININS_EXPORT  #: AU g-1 s-1
         Export_cytokinins = f_cytokinins * self.mstruct * regul_transpiration * parameters.SECOND_TO_HOUR_RATE_CONVERSION  #: Cytokinin export regulation by plant transpiration (AU)
 
         return max(min(Export_cytokinins, cytokinins), 0.)
@@ -1201,6 +1202,9 @@ class PhotosyntheticOrganElement(object):
     An element must belong to an organ of the same type (e.g. a class:`LaminaElement` must belong to a class:`Lamina`).
 
     :class:`PhotosyntheticOrganElement` is the base class of all photosynthetic organs elements. DO NOT INSTANTIATE IT.
+
+    As for the organs, the internal parameters of an element are read from its attribute `PARAMETERS`, which is the parameters
+    of its class unless the element owns a copy of them (see :func:`parameters.copy_parameters`).
     """
 
     PARAMETERS = parameters.PHOTOSYNTHETIC_ORGAN_ELEMENT_PARAMETERS  #: the internal parameters of the photosynthetic organs elements
@@ -1318,12 +1322,12 @@ class PhotosyntheticOrganElement(object):
         :rtype: float
         """
         if Loading_Sucrose <= 0:
-            Vmax_Sfructans = self.__class__.PARAMETERS.VMAX_SFRUCTAN_POT
+            Vmax_Sfructans = self.PARAMETERS.VMAX_SFRUCTAN_POT
         else:  # Regulation by sucrose loading
             rate_Loading_Sucrose_massic = Loading_Sucrose / self.mstruct / parameters.SECOND_TO_HOUR_RATE_CONVERSION
-            Vmax_Sfructans = ((self.__class__.PARAMETERS.VMAX_SFRUCTAN_POT * self.__class__.PARAMETERS.K_REGUL_SFRUCTAN ** self.__class__.PARAMETERS.N_REGUL_SFRUCTAN) /
-                              (max(0, rate_Loading_Sucrose_massic ** self.__class__.PARAMETERS.N_REGUL_SFRUCTAN) +
-                               self.__class__.PARAMETERS.K_REGUL_SFRUCTAN ** self.__class__.PARAMETERS.N_REGUL_SFRUCTAN))
+            Vmax_Sfructans = ((self.PARAMETERS.VMAX_SFRUCTAN_POT * self.PARAMETERS.K_REGUL_SFRUCTAN ** self.PARAMETERS.N_REGUL_SFRUCTAN) /
+                              (max(0, rate_Loading_Sucrose_massic ** self.PARAMETERS.N_REGUL_SFRUCTAN) +
+                               self.PARAMETERS.K_REGUL_SFRUCTAN ** self.PARAMETERS.N_REGUL_SFRUCTAN))
         return Vmax_Sfructans
 
     @staticmethod
@@ -1355,8 +1359,8 @@ class PhotosyntheticOrganElement(object):
         if triosesP <= 0:
             S_Starch = 0
         else:
-            S_Starch = (((triosesP / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) * self.__class__.PARAMETERS.VMAX_STARCH) /
-                        ((triosesP / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) + self.__class__.PARAMETERS.K_STARCH)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+            S_Starch = (((triosesP / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.VMAX_STARCH) /
+                        ((triosesP / (self.mstruct * self.PARAMETERS.ALPHA)) + self.PARAMETERS.K_STARCH)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return S_Starch
 
     def calculate_D_Starch(self, starch, T_effect_Vmax):
@@ -1369,7 +1373,7 @@ class PhotosyntheticOrganElement(object):
         :return: Starch degradation (mol` C g-1 mstruct h-1)
         :rtype: float
         """
-        return max(0, self.__class__.PARAMETERS.DELTA_DSTARCH * (starch / (self.mstruct * self.__class__.PARAMETERS.ALPHA))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        return max(0, self.PARAMETERS.DELTA_DSTARCH * (starch / (self.mstruct * self.PARAMETERS.ALPHA))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     def calculate_S_Sucrose(self, triosesP, T_effect_Vmax):
         """Rate of sucrose synthesis (mol` C sucrose g-1 mstruct h-1).
@@ -1384,8 +1388,8 @@ class PhotosyntheticOrganElement(object):
         if triosesP <= 0:
             S_Sucrose = 0
         else:
-            S_Sucrose = (((triosesP / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) * self.__class__.PARAMETERS.VMAX_SUCROSE) /
-                         ((triosesP / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) + self.__class__.PARAMETERS.K_SUCROSE)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+            S_Sucrose = (((triosesP / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.VMAX_SUCROSE) /
+                         ((triosesP / (self.mstruct * self.PARAMETERS.ALPHA)) + self.PARAMETERS.K_SUCROSE)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return S_Sucrose
 
     def calculate_Loading_Sucrose(self, sucrose, sucrose_phloem, mstruct_axis, T_effect_conductivity):
@@ -1400,18 +1404,18 @@ class PhotosyntheticOrganElement(object):
         :return: Rate of Sucrose loading (mol` C h-1)
         :rtype: float
         """
-        conc_sucrose_element = sucrose / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        conc_sucrose_element = sucrose / (self.mstruct * self.PARAMETERS.ALPHA)
         conc_sucrose_phloem = sucrose_phloem / (mstruct_axis * parameters.AXIS_PARAMETERS.ALPHA)
         #: Driving compartment (mol` C g-1 mstruct)
         driving_sucrose_compartment = max(conc_sucrose_element, conc_sucrose_phloem)
         #: Gradient of sucrose between the element and the phloem (mol` C g-1 mstruct)
         diff_sucrose = conc_sucrose_element - conc_sucrose_phloem
         #: Conductance depending on mstruct (g2 mol`-1 s-1)
-        conductance = self.__class__.PARAMETERS.SIGMA_SUCROSE * self.__class__.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
+        conductance = self.PARAMETERS.SIGMA_SUCROSE * self.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
 
         return driving_sucrose_compartment * diff_sucrose * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
-    def calculate_export_sucrose(self, sucrose, sucrose_hiddenzone, mstruct_hiddenzone, T_effect_conductivity):
+    def calculate_export_sucrose(self, sucrose, sucrose_hiddenzone, mstruct_hiddenzone, T_effect_conductivity, hiddenzone_parameters=None):
         """Rate of sucrose exportation to hidden zone (mol` C sucrose h-1).
         Transport-resistance model.
 
@@ -1419,17 +1423,19 @@ class PhotosyntheticOrganElement(object):
         :param float sucrose_hiddenzone: Sucrose amount in the hidden zone (mol` C)
         :param float mstruct_hiddenzone: mstruct of the hidden zone (g)
         :param float T_effect_conductivity: Effect of the temperature on the conductivity rate at 20C (AU)
-
+        :param parameters.HiddenZoneParameters hiddenzone_parameters: the internal parameters of the hidden zone ; None to use :attr:`HiddenZone.PARAMETERS`
 
         :return: Rate of Sucrose export (mol` C h-1)
         :rtype: float
         """
-        conc_sucrose_element = sucrose / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        conc_sucrose_element = sucrose / (self.mstruct * self.PARAMETERS.ALPHA)
         conc_sucrose_hiddenzone = sucrose_hiddenzone / mstruct_hiddenzone
         #: Gradient of sucrose between the element and the hidden zone (mol` C g-1 mstruct)
         diff_sucrose = conc_sucrose_element - conc_sucrose_hiddenzone
         #: Conductance depending on mstruct
-        conductance = HiddenZone.PARAMETERS.SIGMA * self.__class__.PARAMETERS.BETA * mstruct_hiddenzone ** (2 / 3) * T_effect_conductivity
+        if hiddenzone_parameters is None:
+            hiddenzone_parameters = HiddenZone.PARAMETERS
+        conductance = hiddenzone_parameters.SIGMA * self.PARAMETERS.BETA * mstruct_hiddenzone ** (2 / 3) * T_effect_conductivity
 
         return diff_sucrose * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
@@ -1444,8 +1450,8 @@ class PhotosyntheticOrganElement(object):
         :return: Rate of Fructan synthesis (mol` C g-1 mstruct h-1)
         :rtype: float
         """
-        return ((max(0., sucrose) / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) * Regul_S_Fructan) / \
-               ((max(0., sucrose) / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) + self.__class__.PARAMETERS.K_SFRUCTAN) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        return ((max(0., sucrose) / (self.mstruct * self.PARAMETERS.ALPHA)) * Regul_S_Fructan) / \
+               ((max(0., sucrose) / (self.mstruct * self.PARAMETERS.ALPHA)) + self.PARAMETERS.K_SFRUCTAN) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     def calculate_D_Fructan(self, sucrose, fructan, T_effect_Vmax):
         """Rate of fructan degradation (mol` C fructan g-1 mstruct h-1).
@@ -1458,8 +1464,8 @@ class PhotosyntheticOrganElement(object):
         :return: Rate of Fructan degradation (mol` C g-1 mstruct h-1)
         :rtype: float
         """
-        d_potential = ((self.__class__.PARAMETERS.K_DFRUCTAN * self.__class__.PARAMETERS.VMAX_DFRUCTAN) /
-                       ((max(0., sucrose) / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) + self.__class__.PARAMETERS.K_DFRUCTAN)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        d_potential = ((self.PARAMETERS.K_DFRUCTAN * self.PARAMETERS.VMAX_DFRUCTAN) /
+                       ((max(0., sucrose) / (self.mstruct * self.PARAMETERS.ALPHA)) + self.PARAMETERS.K_DFRUCTAN)) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         d_actual = min(d_potential, max(0., fructan))
         return d_actual
 
@@ -1513,9 +1519,9 @@ class PhotosyntheticOrganElement(object):
         if nitrates <= 0 or triosesP <= 0:
             calculate_S_amino_acids = 0
         else:
-            calculate_S_amino_acids = self.__class__.PARAMETERS.VMAX_AMINO_ACIDS / \
-                                      ((1 + self.__class__.PARAMETERS.K_AMINO_ACIDS_NITRATES / (nitrates / (self.mstruct * self.__class__.PARAMETERS.ALPHA))) *
-                                       (1 + self.__class__.PARAMETERS.K_AMINO_ACIDS_TRIOSESP / (triosesP / (self.mstruct * self.__class__.PARAMETERS.ALPHA)))) * \
+            calculate_S_amino_acids = self.PARAMETERS.VMAX_AMINO_ACIDS / \
+                                      ((1 + self.PARAMETERS.K_AMINO_ACIDS_NITRATES / (nitrates / (self.mstruct * self.PARAMETERS.ALPHA))) *
+                                       (1 + self.PARAMETERS.K_AMINO_ACIDS_TRIOSESP / (triosesP / (self.mstruct * self.PARAMETERS.ALPHA)))) * \
                                       parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return calculate_S_amino_acids
 
@@ -1529,8 +1535,8 @@ class PhotosyntheticOrganElement(object):
         :return: Protein synthesis (mol` N h-1 g-1 mstruct)
         :rtype: float
         """
-        calculate_S_proteins = (((max(0., amino_acids) / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) * self.__class__.PARAMETERS.VMAX_SPROTEINS) /
-                                ((max(0., amino_acids) / (self.mstruct * self.__class__.PARAMETERS.ALPHA)) + self.__class__.PARAMETERS.K_SPROTEINS)
+        calculate_S_proteins = (((max(0., amino_acids) / (self.mstruct * self.PARAMETERS.ALPHA)) * self.PARAMETERS.VMAX_SPROTEINS) /
+                                ((max(0., amino_acids) / (self.mstruct * self.PARAMETERS.ALPHA)) + self.PARAMETERS.K_SPROTEINS)
                                 ) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
         return calculate_S_proteins
 
@@ -1545,13 +1551,13 @@ class PhotosyntheticOrganElement(object):
         :return: Rate of protein degradation (mol` N g-1 mstruct)
         :rtype: float
         """
-        conc_proteins = proteins / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        conc_proteins = proteins / (self.mstruct * self.PARAMETERS.ALPHA)
         conc_cytokinins = max(0, cytokinins / self.mstruct)
 
-        regul_cytokinins = (self.__class__.PARAMETERS.VMAX_DPROTEINS_CYTOK * self.__class__.PARAMETERS.K_DPROTEINS_CYTOK ** self.__class__.PARAMETERS.N_DPROTEINS) / \
-                           (conc_cytokinins ** self.__class__.PARAMETERS.N_DPROTEINS + self.__class__.PARAMETERS.K_DPROTEINS_CYTOK ** self.__class__.PARAMETERS.N_DPROTEINS)
+        regul_cytokinins = (self.PARAMETERS.VMAX_DPROTEINS_CYTOK * self.PARAMETERS.K_DPROTEINS_CYTOK ** self.PARAMETERS.N_DPROTEINS) / \
+                           (conc_cytokinins ** self.PARAMETERS.N_DPROTEINS + self.PARAMETERS.K_DPROTEINS_CYTOK ** self.PARAMETERS.N_DPROTEINS)
 
-        return max(0, (conc_proteins * self.__class__.PARAMETERS.VMAX_DPROTEINS / (conc_proteins + self.__class__.PARAMETERS.K_DPROTEINS)) *
+        return max(0, (conc_proteins * self.PARAMETERS.VMAX_DPROTEINS / (conc_proteins + self.PARAMETERS.K_DPROTEINS)) *
                    parameters.SECOND_TO_HOUR_RATE_CONVERSION * regul_cytokinins * T_effect_Vmax)
 
     def calculate_Loading_Amino_Acids(self, amino_acids, amino_acids_phloem, mstruct_axis, T_effect_conductivity):
@@ -1566,18 +1572,18 @@ class PhotosyntheticOrganElement(object):
         :return: Amino acids loading (mol` N h-1)
         :rtype: float
         """
-        Conc_Amino_Acids_element = amino_acids / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        Conc_Amino_Acids_element = amino_acids / (self.mstruct * self.PARAMETERS.ALPHA)
         Conc_Amino_Acids_phloem = amino_acids_phloem / (mstruct_axis * parameters.AXIS_PARAMETERS.ALPHA)
         #: Driving compartment (mol` N g-1 mstruct)
         driving_amino_acids_compartment = max(Conc_Amino_Acids_element, Conc_Amino_Acids_phloem)
         #: Gradient of amino acids between the element and the phloem (mol` N g-1 mstruct)
         diff_amino_acids = Conc_Amino_Acids_element - Conc_Amino_Acids_phloem
         #: Conductance depending on mstruct (g2 mol`-1 s-1)
-        conductance = self.__class__.PARAMETERS.SIGMA_AMINO_ACIDS * self.__class__.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
+        conductance = self.PARAMETERS.SIGMA_AMINO_ACIDS * self.PARAMETERS.BETA * self.mstruct ** (2 / 3) * T_effect_conductivity
 
         return driving_amino_acids_compartment * diff_amino_acids * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
-    def calculate_Export_Amino_Acids(self, amino_acids, amino_acids_hiddenzone, mstruct_hiddenzone, T_effect_conductivity):
+    def calculate_Export_Amino_Acids(self, amino_acids, amino_acids_hiddenzone, mstruct_hiddenzone, T_effect_conductivity, hiddenzone_parameters=None):
         """Rate of amino acids exportation to hidden zone (mol` N amino acids h-1).
         Transport-resistance model.
 
@@ -1585,16 +1591,19 @@ class PhotosyntheticOrganElement(object):
         :param float amino_acids_hiddenzone: Amino acids amount in the hidden zone (mol` N)
         :param float mstruct_hiddenzone: mstruct of the hidden zone (g)
         :param float T_effect_conductivity: Effect of the temperature on the conductivity rate at 20C (AU)
+        :param parameters.HiddenZoneParameters hiddenzone_parameters: the internal parameters of the hidden zone ; None to use :attr:`HiddenZone.PARAMETERS`
 
         :return: Rate of Amino acids export (mol` N h-1)
         :rtype: float
         """
-        Conc_Amino_Acids_element = amino_acids / (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        Conc_Amino_Acids_element = amino_acids / (self.mstruct * self.PARAMETERS.ALPHA)
         Conc_Amino_Acids_hiddenzone = amino_acids_hiddenzone / mstruct_hiddenzone
         #: Gradient of amino acids between the element and the hidden zone (mol` N g-1 mstruct)
         diff_amino_acids = Conc_Amino_Acids_element - Conc_Amino_Acids_hiddenzone
         #: Conductance depending on mstruct
-        conductance = HiddenZone.PARAMETERS.SIGMA * self.__class__.PARAMETERS.BETA * mstruct_hiddenzone ** (2 / 3) * T_effect_conductivity
+        if hiddenzone_parameters is None:
+            hiddenzone_parameters = HiddenZone.PARAMETERS
+        conductance = hiddenzone_parameters.SIGMA * self.PARAMETERS.BETA * mstruct_hiddenzone ** (2 / 3) * T_effect_conductivity
 
         return diff_amino_acids * conductance * parameters.SECOND_TO_HOUR_RATE_CONVERSION
 
@@ -1626,7 +1635,7 @@ class PhotosyntheticOrganElement(object):
         :return: Rate of Cytokinin degradation (AU g-1 mstruct h-1)
         :rtype: float
         """
-        return max(0, self.__class__.PARAMETERS.DELTA_D_CYTOKININS * (cytokinins / (self.mstruct * self.__class__.PARAMETERS.ALPHA))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
+        return max(0, self.PARAMETERS.DELTA_D_CYTOKININS * (cytokinins / (self.mstruct * self.PARAMETERS.ALPHA))) * parameters.SECOND_TO_HOUR_RATE_CONVERSION * T_effect_Vmax
 
     # COMPARTMENTS
 
@@ -1643,7 +1652,7 @@ class PhotosyntheticOrganElement(object):
         """
         #: Contribution of triosesP to the synthesis of amino_acids
         triosesP_consumption_AA = (S_Amino_Acids / EcophysiologicalConstants.AMINO_ACIDS_N_RATIO) * EcophysiologicalConstants.AMINO_ACIDS_C_RATIO
-        return Photosynthesis - (S_Sucrose + S_Starch + triosesP_consumption_AA) * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return Photosynthesis - (S_Sucrose + S_Starch + triosesP_consumption_AA) * (self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_starch_derivative(self, S_Starch, D_Starch):
         """delta starch of element.
@@ -1654,7 +1663,7 @@ class PhotosyntheticOrganElement(object):
         :return: delta starch (mol` C starch)
         :rtype: float
         """
-        return (S_Starch - D_Starch) * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return (S_Starch - D_Starch) * (self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_sucrose_derivative(self, S_Sucrose, D_Starch, Loading_Sucrose, S_Fructan, D_Fructan, sum_respi):
         """delta sucrose of element.
@@ -1680,7 +1689,7 @@ class PhotosyntheticOrganElement(object):
         :return: delta fructan (mol` C fructan)
         :rtype: float
         """
-        return (S_Fructan - D_Fructan) * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return (S_Fructan - D_Fructan) * (self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_nitrates_derivative(self, Nitrates_import, S_Amino_Acids):
         """delta nitrates of element.
@@ -1692,7 +1701,7 @@ class PhotosyntheticOrganElement(object):
         :rtype: float
         """
         nitrate_reduction_AA = S_Amino_Acids  #: Contribution of nitrates to the synthesis of amino_acids
-        return Nitrates_import - (nitrate_reduction_AA * self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return Nitrates_import - (nitrate_reduction_AA * self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_amino_acids_derivative(self, Amino_Acids_import, S_Amino_Acids, S_Proteins, D_Proteins, Loading_Amino_Acids):
         """delta amino acids of element.
@@ -1706,7 +1715,7 @@ class PhotosyntheticOrganElement(object):
         :return: delta amino acids (mol` N amino acids)
         :rtype: float
         """
-        return Amino_Acids_import - Loading_Amino_Acids + (S_Amino_Acids + D_Proteins - S_Proteins) * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return Amino_Acids_import - Loading_Amino_Acids + (S_Amino_Acids + D_Proteins - S_Proteins) * (self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_proteins_derivative(self, S_Proteins, D_Proteins):
         """delta proteins of element.
@@ -1717,7 +1726,7 @@ class PhotosyntheticOrganElement(object):
         :return: delta proteins (mol` N proteins)
         :rtype: float
         """
-        return (S_Proteins - D_Proteins) * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return (S_Proteins - D_Proteins) * (self.mstruct * self.PARAMETERS.ALPHA)
 
     def calculate_cytokinins_derivative(self, import_cytokinins, D_cytokinins):
         """delta cytokinins of element.
@@ -1728,7 +1737,7 @@ class PhotosyntheticOrganElement(object):
         :return: delta cytokinins (AU cytokinins)
         :rtype: float
         """
-        return import_cytokinins - D_cytokinins * (self.mstruct * self.__class__.PARAMETERS.ALPHA)
+        return import_cytokinins - D_cytokinins * (self.mstruct * self.PARAMETERS.ALPHA)
 
 
 class ChaffElement(PhotosyntheticOrganElement):
@@ -1,4 +1,6 @@
 # -*- coding: latin-1 -*-
+import copy
+
 import pandas as pd
 
 """
@@ -53,6 +55,30 @@ def to_dataframe(object_):
     return pd.DataFrame(object_.__dict__, index=[0]).sort_index(axis=1)
 
 
+def copy_parameters(parameters_, *parameters_values):
+    """Create and return a copy of the parameters *parameters_*, updated with *parameters_values*.
+
+    The instances of the parameters classes defined in this module are shared by all the model objects of the current process.
+    Set the copy as the attribute `PARAMETERS` of some model objects to give them their own parameters,
+    without changing the parameters of the other model objects.
+
+    :Parameters:
+        - `parameters_` (:class:`object`) - The parameters to copy.
+        - `parameters_values` (:class:`dict`) - The values of the parameters to update: {parameter_name: parameter_value, ...},
+          applied in order.
+
+    :Returns:
+        The copy of *parameters_*.
+
+    :Returns Type:
+        :class:`object`
+    """
+    parameters_copy = copy.copy(parameters_)
+    for values in parameters_values:
+        parameters_copy.__dict__.update(values)
+    return parameters_copy
+
+
 class PopulationParameters(object):
     """
     Internal parameters of populations.
@@ -1,14 +1,20 @@
 # -*- coding: latin-1 -*-
 
 from __future__ import division  # use "//" to do integer division
+import copy
 import logging
+from timeit import default_timer
 
 import numpy as np
-from scipy.integrate import solve_ivp
-from scipy import interpolate
+import pandas as pd
+from scipy.integrate import solve_ivp, BDF, Radau, LSODA, OdeSolution
+from scipy import sparse
 
 from openalea.cnwheat import model
+from openalea.cnwheat import forcings
+from openalea.cnwheat import layout
 from openalea.cnwheat import tools
+from openalea.cnwheat import vectorized
 
 """
     cnwheat.simulation
@@ -59,6 +65,76 @@ class SimulationRunError(SimulationError):
     pass
 
 
+class SimulationConservationError(SimulationRunError):
+    """
+    Exception raised when the imbalance of C or N of a run exceeds the threshold of the monitor of conservation
+    (see :class:`cnwheat.conservation.ConservationMonitor`).
+    """
+    pass
+
+
+class SolverPolicy(object):
+    """
+    The settings of the solver used to integrate the system of differential equations over each time step
+    (see :func:`scipy.integrate.solve_ivp`).
+
+    :param str method: the integration method ; must be one of :attr:`METHODS`. Default is `'BDF'`.
+    :param float rtol: the relative tolerance of the solver ; default is :attr:`DEFAULT_RTOL`.
+    :param float or dict atol: the absolute tolerance of the solver. Either a float used for all the compartments,
+           or a dictionary {compartment_name: atol, ...} to set the absolute tolerance of each compartment
+           (see :attr:`Simulation.MODEL_COMPARTMENTS_NAMES`) ; the compartments missing in the dictionary use :attr:`DEFAULT_ATOL`.
+           Default is :attr:`DEFAULT_ATOL`.
+    :param float max_step: the maximum step allowed to the solver (in hours) ; default is `numpy.inf`.
+    :param float first_step: the initial step of the solver (in hours) ; default is `None`: the solver chooses the initial step.
+    """
+
+    #: the integration methods available (see :func:`scipy.integrate.solve_ivp`)
+    METHODS = ('BDF', 'Radau', 'LSODA')
+
+    #: the integrator of :mod:`scipy.integrate` of each method
+    INTEGRATORS = {'BDF': BDF, 'Radau': Radau, 'LSODA': LSODA}
+
+    DEFAULT_RTOL = 1E-3  #: the default relative tolerance, as in :func:`scipy.integrate.solve_ivp`
+    DEFAULT_ATOL = 1E-6  #: the default absolute tolerance, as in :func:`scipy.integrate.solve_ivp`
+
+    def __init__(self, method='BDF', rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL, max_step=np.inf, first_step=None):
+        self.method = method  #: the integration method
+        self.rtol = rtol  #: the relative tolerance
+        self.atol = atol  #: the absolute tolerance, for all the compartments or for each compartment name
+        self.max_step = max_step  #: the maximum step allowed to the solver (in hours)
+        self.first_step = first_step  #: the initial step of the solver (in hours)
+
+    def build_atol(self, layout):
+        """Build the absolute tolerance of each compartment of `layout`.
+
+        :param cnwheat.layout.CompartmentsLayout layout: the layout of the compartments.
+
+        :return: The absolute tolerance of the compartments: a float if :attr:`atol` is a float, an array of size `layout.size` otherwise.
+        :rtype: float or numpy.ndarray
+        """
+        if not isinstance(self.atol, dict):
+            return self.atol
+        atol = np.full(layout.size, SolverPolicy.DEFAULT_ATOL)
+        for compartments_indexes in layout.groups_indexes.values():
+            for compartment_name, indexes in compartments_indexes.items():
+                if compartment_name in self.atol:
+                    atol[indexes] = self.atol[compartment_name]
+        return atol
+
+    def solver_options(self, layout):
+        """Return the options to pass to :func:`scipy.integrate.solve_ivp` for the compartments of `layout`.
+
+        :param cnwheat.layout.CompartmentsLayout layout: the layout of the compartments.
+
+        :return: The options of the solver.
+        :rtype: dict
+        """
+        solver_options = {'method': self.method, 'rtol': self.rtol, 'atol': self.build_atol(layout), 'max_step': self.max_step}
+        if self.first_step is not None:
+            solver_options['first_step'] = self.first_step
+        return solver_options
+
+
 class Simulation(object):
     """
     The Simulation class permits to initialize and run the model.
@@ -66,21 +142,24 @@ class Simulation(object):
     User should use method :meth:`initialize` to initialize the model, and method
     :meth:`run` to run the model.
 
+    The internal parameters of the model are read from the model objects of the population (see :func:`cnwheat.parameters.copy_parameters`):
+    simulations of populations which own different parameters can run in the same process.
+
     :param class respiration_model: the model of respiration to use.
           This model must define a class implementing these functions:
             * R_Nnit_upt(U_Nnit, sucrose): Nitrate uptake respiration.
                 * Parameters:
-                    - `U_Nnit` (:class:`float`) - uptake of N nitrates (mol` N)
-                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (mol` C)
-                * Returns: _R_Nnit_upt (mol` C respired)
+                    - `U_Nnit` (:class:`float`) - uptake of N nitrates (�mol` N)
+                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (�mol` C)
+                * Returns: _R_Nnit_upt (�mol` C respired)
                 * Returns Type: :class:`float`
 
             * R_phloem(sucrose_loading, sucrose, mstruct): Phloem loading respiration
                 * Parameters:
-                    - `sucrose_loading` (:class:`float`) -  Loading flux from the C substrate pool to phloem (mol` C g-1 mstruct)
-                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (mol` C)
+                    - `sucrose_loading` (:class:`float`) -  Loading flux from the C substrate pool to phloem (�mol` C g-1 mstruct)
+                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (�mol` C)
                     - `mstruct` (:class:`float`) -  structural dry mass of organ (g)
-                * Returns: _R_phloem (mol` C respired)
+                * Returns: _R_phloem (�mol` C respired)
                 * Returns Type: :class:`float`
 
             * R_Nnit_red(s_amino_acids, sucrose, mstruct, root=False): Nitrate reduction-linked respiration
@@ -88,30 +167,30 @@ class Simulation(object):
               and reducing power obtained directly from photosynthesis (rather than C substrate)
 
                 * Parameters:
-                    - `s_amino_acids` (:class:`float`) - consumption of N for the synthesis of amino acids (mol` N g-1 mstruct)
+                    - `s_amino_acids` (:class:`float`) - consumption of N for the synthesis of amino acids (�mol` N g-1 mstruct)
                       (in the present version, this is used to approximate nitrate reduction needed in the original model of Thornley and Cannell, 2000)
-                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (mol` C)
+                    - `sucrose` (:class:`float`) -  amount of C sucrose in organ (�mol` C)
                     - `mstruct` (:class:`float`) -  structural dry mass of organ (g)
                     - `root` (:class:`bool`) - specifies if the nitrate reduction-linked respiration is computed for shoot (False) or root (True) tissues.
-                * Returns: _R_Nnit_upt (mol` C respired)
+                * Returns: _R_Nnit_upt (�mol` C respired)
                 * Returns Type: :class:`float`
 
             * R_residual(sucrose, mstruct, Ntot, delta_t, Ts): Residual maintenance respiration (cost from protein turn-over, cell ion gradients, futile cycles...)
                 * Parameters:
-                    - `sucrose` (:class:`float`) - amount of C sucrose (mol` C)
+                    - `sucrose` (:class:`float`) - amount of C sucrose (�mol` C)
                     - `mstruct` (:class:`float`) - structural dry mass of organ (g)
-                    - `Ntot` (:class:`float`) - total N in organ (mol` N)
+                    - `Ntot` (:class:`float`) - total N in organ (�mol` N)
                     - `delta_t` (:class:`float`) - timestep (s)
-                    - `Ts` (:class:`float`) - organ temperature (C)
-                * Returns: _R_residual (mol` C respired)
+                    - `Ts` (:class:`float`) - organ temperature (�C)
+                * Returns: _R_residual (�mol` C respired)
                 * Returns Type: :class:`float`
 
             * R_grain_growth(mstruct_growth, starch_filling, mstruct): Grain growth respiration
                 * Parameters:
-                    - `mstruct_growth` (:class:`float`) - gross growth of grain structure (mol` C added in grain structure)
-                    - `starch_filling` (:class:`float`) - gross growth of grain starch (mol` C added in grain starch g-1 mstruct)
+                    - `mstruct_growth` (:class:`float`) - gross growth of grain structure (�mol` C added in grain structure)
+                    - `starch_filling` (:class:`float`) - gross growth of grain starch (�mol` C added in grain starch g-1 mstruct)
                     - `mstruct` (:class:`float`) -  structural dry mass of organ (g)
-                * Returns: R_grain_growth (mol` C respired)
+                * Returns: R_grain_growth (�mol` C respired)
                 * Returns Type: :class:`float`
 
     :param int delta_t: the delta t of the simulation (in seconds) ; default is `1`.
@@ -124,6 +203,40 @@ class Simulation(object):
      :param int photosynthesis_forcings_delta_t: the delta t of the photosynthesis forcings (in seconds) ; default is `None`.
            If the user sets `interpolate_forcings` to `True`, then he/she must also set `photosynthesis_forcings_delta_t` to an integer value greater or equal to `delta_t`.
            For example, if `interpolate_forcings` is `True` and `delta_t==3600`, then `photosynthesis_forcings_delta_t` must be greater or equal to `3600`, that is for example `7200`.
+    :param str engine: the engine used to compute the derivatives of the compartments ; must be one of :attr:`ENGINES`. Default is `'objects'`:
+           the derivatives are computed by the methods of the model objects. With `'vectorized'`, the derivatives are computed with
+           array operations on a struct-of-arrays view of the population (see :class:`cnwheat.vectorized.VectorizedSystem`).
+    :param bool analytic_jacobian: if True: the Jacobian of the system is computed analytically and passed to the solver
+           (see :meth:`cnwheat.vectorized.VectorizedSystem.calculate_jacobian`). `analytic_jacobian` requires `engine='vectorized'`.
+           Default is `False`: the Jacobian is estimated by finite differences by the solver, using :attr:`jacobian_sparsity`.
+    :param bool jit_kernel: if True: the fluxes and the derivatives of the photosynthetic organ elements are computed by the kernel compiled with Numba
+           (see :func:`cnwheat.kernels.elements_kernel`), which follows the equations of :mod:`respiwheat.model` for the respiration.
+           If Numba is not installed, they are computed with array operations. `jit_kernel` requires `engine='vectorized'`. Default is `False`.
+    :param SolverPolicy solver_policy: the settings of the solver (method, tolerances and steps) ; default is `None`:
+           use the default settings of :class:`SolverPolicy`, that is the BDF method with the default tolerances of :func:`scipy.integrate.solve_ivp`.
+    :param str forcings_interpolation_scheme: the scheme used to interpolate the forcings inside the time step when `interpolate_forcings` is True ;
+           must be one of :attr:`cnwheat.forcings.ForcingsTable.SCHEMES`. Default is `'linear'` (see :class:`cnwheat.forcings.ForcingsTable`).
+    :param bool compact_state: if True: the compartments which are inactive during the whole time step are not integrated by the solver,
+           and keep their values (see :meth:`_find_active_compartments`). Default is `False`: all the compartments are integrated.
+    :param str axes_splitting: the scheme of operator splitting used to integrate each axis as its own system, the axes being coupled
+           through the nitrates of the soil only ; must be one of :attr:`SPLITTING_SCHEMES` (see :meth:`_integrate_axes_split`).
+           `axes_splitting` requires `engine='objects'` and `interpolate_forcings=False`.
+           Default is `None`: the whole system is integrated at once.
+    :param concurrent.futures.Executor axes_executor: the executor used to integrate the systems of the axes in parallel when `axes_splitting` is set,
+           for example a :class:`concurrent.futures.ThreadPoolExecutor`. Default is `None`: the systems of the axes are integrated sequentially.
+    :param bool estimate_splitting_error: if True and `axes_splitting` is set, the whole system is also integrated at each call to :meth:`run`
+           to compute :attr:`splitting_error`. Default is `False`.
+    :param cnwheat.trace.TraceRecorder trace_recorder: the recorder of the compartments and of their derivatives at each evaluation of the derivatives
+           of the whole system. The caller must call :meth:`cnwheat.trace.TraceRecorder.flush` at the end of the simulation.
+           Default is `None`: do not record. Unlike the loggers `cnwheat.compartments` and `cnwheat.derivatives`, the recorder does not format the values during the run.
+    :param tuple [str] quasi_steady_state: the compartments of the photosynthetic organ elements which are not integrated by the solver,
+           but set to their quasi-steady state at each evaluation of the derivatives (see :meth:`_reduce_system`), for example `('triosesP',)`.
+           The sucrose is not a valid quasi-steady-state pool for this model: it is not fast, as it is exchanged with the phloem and stored as starch
+           and fructan on the time scale of the run, so that its quasi-steady state does not conserve C (see :mod:`cnwheat.conservation`).
+           `quasi_steady_state` requires `engine='vectorized'` and `compact_state=False`.
+           Default is `None`: all the compartments are integrated.
+    :param cnwheat.conservation.ConservationMonitor conservation_monitor: the monitor of the conservation of C and N, which checks the compartments
+           at the end of each run. Default is `None`: do not check the conservation.
 
         - interpolate_forcings (:class:`bool`) - if True: interpolate senescence and photosynthesis forcings from values of `senescence_forcings_delta_t`
           and `senescence_forcings_delta_t`. Default is `False` (do not interpolate the forcings).
@@ -344,7 +457,48 @@ class Simulation(object):
                                      model.PhotosyntheticOrganElement: 'cnwheat.derivatives.elements',
                                      model.Soil: 'cnwheat.derivatives.soils'}}
 
-    def __init__(self, respiration_model, delta_t=1, culm_density=None, interpolate_forcings=False, senescence_forcings_delta_t=None, photosynthesis_forcings_delta_t=None):
+    #: the engines available to compute the derivatives of the compartments
+    ENGINES = ('objects', 'vectorized')
+
+    #: the statistics of the solver recorded at each run (see :meth:`solver_statistics_to_dataframe`):
+    #:     * t: the time at the beginning of the run, since the first run (in hours),
+    #:     * method: the integration method,
+    #:     * state_size: the number of compartments integrated by the solver,
+    #:     * nfev, njev, nlu: the number of evaluations of the derivatives, of evaluations of the Jacobian, and of LU decompositions,
+    #:     * nb_accepted_steps: the number of steps accepted by the solver,
+    #:     * nb_rejected_steps: the number of accepted steps which were rejected at least once before (the integrators of SciPy
+    #:       do not count the successive rejections of a step),
+    #:     * last_step_size: the size of the last step accepted by the solver (in hours),
+    #:     * rhs_time, linear_algebra_time, total_time: the wall time spent in the computation of the derivatives (including the estimation
+    #:       of the Jacobian by finite differences), in the LU decompositions and the linear solves, and in the whole integration (in seconds).
+    #: The statistics which the integrator does not expose (the steps and the linear algebra of LSODA, the steps of the splitting of the axes) are NaN.
+    SOLVER_STATISTICS = ['t', 'method', 'state_size', 'nfev', 'njev', 'nlu', 'nb_accepted_steps', 'nb_rejected_steps', 'last_step_size',
+                         'rhs_time', 'linear_algebra_time', 'total_time']
+
+    #: the schemes of operator splitting available to couple the axes through the soil
+    SPLITTING_SCHEMES = ('lie', 'strang')
+
+    #: the version of the format of the checkpoints written by :meth:`save_checkpoint`
+    CHECKPOINT_VERSION = 2
+    #: the tables of the model objects saved in the checkpoints (see :meth:`save_checkpoint`): the name of the table, its topology ids,
+    #: and its state, that is the state parameters and the compartments read by :func:`cnwheat.converter.from_dataframes`
+    CHECKPOINT_TABLES = (('organs', ORGANS_INDEXES, ORGANS_STATE),
+                         ('hiddenzones', HIDDENZONE_INDEXES, HIDDENZONE_STATE),
+                         ('elements', ELEMENTS_INDEXES, ELEMENTS_STATE),
+                         ('soils', SOILS_INDEXES, SOILS_STATE))
+    #: the tables of the forcings saved in the checkpoints when :attr:`interpolate_forcings` is True: the name of the table, its topology ids, and the forcings
+    CHECKPOINT_FORCINGS_TABLES = (('roots', AXES_INDEXES, ROOTS_FORCINGS),
+                                  ('elements', ELEMENTS_INDEXES, ELEMENTS_FORCINGS))
+
+    #: the maximum number of Newton iterations to compute the quasi-steady state of the compartments :attr:`quasi_steady_state`
+    QUASI_STEADY_STATE_MAX_ITERATIONS = 10
+    #: the tolerance of the Newton iterations of the quasi-steady state, relative to the tolerance of the solver (as the Newton iterations of :class:`scipy.integrate.BDF`)
+    QUASI_STEADY_STATE_TOLERANCE = 0.03
+
+    def __init__(self, respiration_model, delta_t=1, culm_density=None, interpolate_forcings=False, senescence_forcings_delta_t=None, photosynthesis_forcings_delta_t=None,
+                 engine='objects', analytic_jacobian=False, solver_policy=None,
+                 forcings_interpolation_scheme='linear', compact_state=False, axes_splitting=None, axes_executor=None, estimate_splitting_error=False,
+                 trace_recorder=None, quasi_steady_state=None, conservation_monitor=None, jit_kernel=False):
 
         self.respiration_model = respiration_model  #: the model of respiration to use
 
@@ -356,8 +510,14 @@ class Simulation(object):
         #:     {(plant_index, axis_label): soil_object, ...}
         self.soils = {}
 
-        self.initial_conditions = []  #: the initial conditions of the compartments in the population and soils
+        self.initial_conditions = np.zeros(0)  #: the initial conditions of the compartments in the population and soils
         self.initial_conditions_mapping = {}  #: dictionary to map the compartments to their indexes in :attr:`initial_conditions`
+        self.layout = None  #: the layout of the compartments in :attr:`initial_conditions` (see :class:`cnwheat.layout.CompartmentsLayout`)
+        self._topology_fingerprint = None  #: the topology of :attr:`population` and :attr:`soils` at the last initialization (see :func:`cnwheat.layout.topology_fingerprint`)
+
+        #: the sparsity structure of the Jacobian matrix of the system, built from the topology of :attr:`population` and :attr:`soils`
+        #: (see :meth:`_build_jacobian_sparsity`). It is passed to the solver when the population has several axes.
+        self.jacobian_sparsity = None
 
         self.progressbar = tools.ProgressBar(title='Solver progress')  #: progress bar to show the progress of the solver
         self.show_progressbar = False  #: True: show the progress bar ; False: DO NOT show the progress bar
@@ -366,7 +526,12 @@ class Simulation(object):
 
         self.time_step = self.delta_t / 3600.0  #: time step of the simulation (in hours)
 
-        self.time_grid = np.array([0.0, self.time_step])  #: the time grid of the simulation (in hours)
+        self.time_grid = np.array([0.0, self.time_step])  #: the time grid of the last run (in hours)
+
+        #: the continuous solution of the last run which covered several time steps (see :meth:`run`), as a function of the time since
+        #: the beginning of the run (in hours) returning the vector of compartments (see :class:`scipy.integrate.OdeSolution`) ;
+        #: None if the last run covered only 1 time step
+        self.dense_output = None
 
         self.culm_density = culm_density  #: culm density (culm m-2)
 
@@ -438,26 +603,131 @@ class Simulation(object):
                 logger.exception(message)
                 raise SimulationConstructionError(message)
 
+            if forcings_interpolation_scheme not in forcings.ForcingsTable.SCHEMES:
+                message = 'Unknown forcings interpolation scheme `{}` passed to the Simulation constructor. Please choose a scheme among {}.'.format(forcings_interpolation_scheme,
+                                                                                                                                               forcings.ForcingsTable.SCHEMES)
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+
             self.previous_forcings_values = {}  #: previous values of the forcings
             self.new_forcings_values = {}  #: new values of the forcings
-            self.interpolation_functions = {}  #: functions to interpolate the forcings
+            self.forcings_table = forcings.ForcingsTable(forcings_interpolation_scheme)  #: the table to interpolate the forcings inside the time step
 
         self.nfev_total = 0  #: cumulative number of RHS function evaluations
+        self.solver_statistics = []  #: the statistics of the solver at each run: a list of dictionaries with keys :attr:`SOLVER_STATISTICS`
+        self._timings = {}  #: the wall time spent in the derivatives and in the linear algebra during the current run (in seconds)
+        self._run_start_time = 0.0  #: the time at the beginning of the current run, since the first run (in hours)
+        self._elapsed_time = 0.0  #: the time integrated by all the runs, since the first run (in hours)
+        self._Tair = None  #: the air temperature given at the last initialization (C)
+        self._Tsoil = None  #: the soil temperature given at the last initialization (C)
+
+        #: the recorder of the compartments and of their derivatives at each evaluation of the derivatives (see :class:`cnwheat.trace.TraceRecorder`) ;
+        #: None to not record them
+        self.trace_recorder = trace_recorder
+
+        #: the monitor of the conservation of C and N at each run (see :class:`cnwheat.conservation.ConservationMonitor`) ; None to not check it
+        self.conservation_monitor = conservation_monitor
+
+        if engine not in Simulation.ENGINES:
+            message = 'Unknown engine `{}` passed to the Simulation constructor. Please choose an engine among {}.'.format(engine, Simulation.ENGINES)
+            logger.exception(message)
+            raise SimulationConstructionError(message)
+        self.engine = engine  #: the engine used to compute the derivatives of the compartments
 
-    def initialize(self, population, soils, Tair=12, Tsoil=12):
+        if analytic_jacobian and engine != 'vectorized':
+            message = 'The analytic Jacobian is only available with the vectorized engine. Please set `engine` to `vectorized` (through the Simulation constructor).'
+            logger.exception(message)
+            raise SimulationConstructionError(message)
+        self.analytic_jacobian = analytic_jacobian  #: a boolean flag which indicates if the Jacobian of the system is computed analytically (True) or by finite differences (False)
+
+        if jit_kernel and engine != 'vectorized':
+            message = 'The compiled kernel is only available with the vectorized engine. Please set `engine` to `vectorized` (through the Simulation constructor).'
+            logger.exception(message)
+            raise SimulationConstructionError(message)
+        self.jit_kernel = jit_kernel  #: a boolean flag which indicates if the fluxes of the elements are computed by the compiled kernel when Numba is installed
+        self._vectorized_system = None  #: the struct-of-arrays view of the population, used when :attr:`engine` is `'vectorized'`
+        self._last_y = None  #: the values of the compartments at the last call to :meth:`_calculate_all_derivatives_vectorized`
+        #: the times and the interpolants of the steps of the current run, used to build :attr:`dense_output` ; None when it is not built
+        self._dense_output_segments = None
+
+        if solver_policy is None:
+            solver_policy = SolverPolicy()
+        if solver_policy.method not in SolverPolicy.METHODS:
+            message = 'Unknown solver method `{}` passed to the Simulation constructor. Please choose a method among {}.'.format(solver_policy.method, SolverPolicy.METHODS)
+            logger.exception(message)
+            raise SimulationConstructionError(message)
+        if isinstance(solver_policy.atol, dict):
+            all_compartments_names = set(compartment_name for compartments_names in Simulation.MODEL_COMPARTMENTS_NAMES.values() for compartment_name in compartments_names)
+            unknown_compartments_names = sorted(set(solver_policy.atol).difference(all_compartments_names))
+            if len(unknown_compartments_names) != 0:
+                message = 'Unknown compartments {} in the absolute tolerance of the solver policy passed to the Simulation constructor.'.format(unknown_compartments_names)
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+        self.solver_policy = solver_policy  #: the settings of the solver
+
+        self.compact_state = compact_state  #: a boolean flag which indicates if the inactive compartments are removed from the system integrated by the solver
+        self.active_compartments = np.zeros(0, dtype=int)  #: the indexes of the compartments integrated by the solver at the last run
+        self.nb_dropped_compartments = 0  #: the number of inactive compartments removed from the system at the last run
+        self._solver_options = {}  #: the options passed to the solver, built from :attr:`solver_policy` at initialization
+
+        if axes_splitting is not None:
+            if axes_splitting not in Simulation.SPLITTING_SCHEMES:
+                message = 'Unknown splitting scheme `{}` passed to the Simulation constructor. Please choose a scheme among {}.'.format(axes_splitting, Simulation.SPLITTING_SCHEMES)
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+            if engine != 'objects' or interpolate_forcings:
+                message = """The splitting of the axes is only available with the `objects` engine, without interpolation of the forcings. 
+        Please set `engine` to `objects`, and `interpolate_forcings` to `False` (through the Simulation constructor)."""
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+        #: the scheme of operator splitting used to integrate each axis as its own system, coupled to the others through the nitrates of the soil:
+        #: `'lie'` or `'strang'` ; None to integrate the whole system at once (default)
+        self.axes_splitting = axes_splitting
+        #: the executor (see :mod:`concurrent.futures`) used to integrate the systems of the axes in parallel when :attr:`axes_splitting` is set ;
+        #: None to integrate them sequentially
+        self.axes_executor = axes_executor
+        self.estimate_splitting_error = estimate_splitting_error  #: a boolean flag which indicates if the whole system is also integrated to estimate the error of the splitting
+        #: the error of the splitting at the last run, in units of the tolerance of the solver: the maximum over the compartments of
+        #: abs(y_split - y_whole) / (atol + rtol * abs(y_whole)) ; None if :attr:`estimate_splitting_error` is False
+        self.splitting_error = None
+        self._axes_subsystems = []  #: the plant, the axis, the soil, the layout and the indexes of the compartments of each axis, used when :attr:`axes_splitting` is set
+
+        if quasi_steady_state is not None:
+            unknown_compartments_names = sorted(set(quasi_steady_state).difference(vectorized.ELEMENTS_COMPARTMENTS))
+            if len(unknown_compartments_names) != 0:
+                message = 'Unknown compartments {} of the photosynthetic organ elements in the quasi-steady state passed to the Simulation constructor. ' \
+                          'Please choose compartments among {}.'.format(unknown_compartments_names, vectorized.ELEMENTS_COMPARTMENTS)
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+            if engine != 'vectorized' or compact_state:
+                message = """The quasi-steady state is only available with the `vectorized` engine, without compaction of the state. 
+        Please set `engine` to `vectorized`, and `compact_state` to `False` (through the Simulation constructor)."""
+                logger.exception(message)
+                raise SimulationConstructionError(message)
+            quasi_steady_state = tuple(quasi_steady_state)
+        #: the compartments of the photosynthetic organ elements set to their quasi-steady state instead of being integrated ; None to integrate all the compartments
+        self.quasi_steady_state = quasi_steady_state
+
+    def initialize(self, population, soils, Tair=12, Tsoil=12, force_validation=False):
         """
         Initialize:
             * :attr:`population`,
             * :attr:`soils`,
             * :attr:`initial_conditions_mapping`,
+            * :attr:`layout`,
             * and :attr:`initial_conditions`
 
         from `population` and `soils`.
 
+        The consistency of `population` and `soils` is checked, and the layout of the compartments is compiled, only if their topology
+        differs from the topology at the previous initialization (see :func:`cnwheat.layout.topology_fingerprint`).
+        Otherwise, the layout is mapped to the model objects of `population` and `soils`.
+
         :param model.Population population: a population of plants.
         :param dict soils: the soil associated to each axis. `soils` must be a dictionary with the same structure as :attr:`soils`
-        :param float Tair: air temperature (C)
-        :param float Tsoil: soil temperature (C)
+        :param float Tair: air temperature (�C)
+        :param float Tsoil: soil temperature (�C)
+        :param bool force_validation: if True, check the consistency of `population` and `soils` and compile the layout even if their topology did not change.
         """
 
         logger = logging.getLogger(__name__)
@@ -467,14 +737,178 @@ class Simulation(object):
         # clean the attributes of the simulation
         del self.population.plants[:]
         self.soils.clear()
-        del self.initial_conditions[:]
         self.initial_conditions_mapping.clear()
 
         # create new population and soils
         self.population.plants.extend(population.plants)
         self.soils.update(soils)
 
-        # check the consistency of population and soils
+        # check the consistency of population and soils, and compile the layout of the compartments, only if the topology changed
+        topology_fingerprint = layout.topology_fingerprint(self.population, self.soils)
+        is_new_topology = force_validation or topology_fingerprint != self._topology_fingerprint
+        if is_new_topology:
+            self._check_consistency()
+
+        if self.interpolate_forcings:
+            # Save the new value of each forcing and set the state parameters to the previous forcing values.
+            self.new_forcings_values.clear()
+            for plant in self.population.plants:
+                for axis in plant.axes:
+                    if axis.roots is not None:
+                        roots_id = (plant.index, axis.label)
+                        self.new_forcings_values[roots_id] = {}
+                        for forcing_label in Simulation.ROOTS_FORCINGS:
+                            self.new_forcings_values[roots_id][forcing_label] = getattr(axis.roots, forcing_label)
+                            if roots_id in self.previous_forcings_values:
+                                setattr(axis.roots, forcing_label, self.previous_forcings_values[roots_id][forcing_label])
+                    for phytomer in axis.phytomers:
+                        for organ in (phytomer.lamina, phytomer.sheath):
+                            if organ is None:
+                                continue
+                            for element in (organ.exposed_element, organ.enclosed_element):
+                                if element is not None:
+                                    element_id = (plant.index, axis.label, phytomer.index, organ.label, element.label)
+                                    self.new_forcings_values[element_id] = {}
+                                    for forcing_label in Simulation.ELEMENTS_FORCINGS:
+                                        self.new_forcings_values[element_id][forcing_label] = getattr(element, forcing_label)
+                                        if element_id in self.previous_forcings_values:
+                                            setattr(element, forcing_label, self.previous_forcings_values[element_id][forcing_label])
+
+        # Update soil and air temperature using weather data
+        for soil_id, soil_inputs in self.soils.items():
+            self.soils[soil_id].Tsoil = Tsoil
+        for plant in self.population.plants:
+            plant.Tair = Tair
+        self._Tair, self._Tsoil = Tair, Tsoil
+
+        # compile the layout of the compartments and initialize the initial conditions
+        if is_new_topology:
+            self.layout = layout.CompartmentsLayout(self.population, self.soils, Simulation.MODEL_COMPARTMENTS_NAMES)
+        else:
+            self.layout.rebind(self.population, self.soils)
+        self.initial_conditions_mapping.update(self.layout.mapping)
+        self.initial_conditions = np.zeros(self.layout.size)
+
+        self.population.calculate_aggregated_variables()
+
+        if is_new_topology:
+            self.jacobian_sparsity = self._build_jacobian_sparsity()
+            self._solver_options = self.solver_policy.solver_options(self.layout)
+            self._topology_fingerprint = topology_fingerprint
+
+        del self._axes_subsystems[:]
+        if self.axes_splitting is not None:
+            axes_soils = iter(self._get_axes_soils())
+            for plant in self.population.plants:
+                for axis in plant.axes:
+                    axis_model_objects = layout.axis_model_objects(axis)
+                    axis_layout = self.layout.subset(axis_model_objects)
+                    axis_indexes = np.sort([index for model_object in axis_model_objects for index in self.layout.mapping[model_object].values()])
+                    self._axes_subsystems.append((plant, axis, next(axes_soils), axis_layout, axis_indexes))
+
+        if self.trace_recorder is not None:
+            self.trace_recorder.set_layout(self.layout, self.population, self.soils)
+
+        if self.conservation_monitor is not None:
+            self.conservation_monitor.set_layout(self.layout, self.population, self._get_axes_soils(), self.culm_density)
+
+        if self.engine == 'vectorized':
+            self._vectorized_system = self._build_vectorized_system()
+
+        logger.info('Initialization of the simulation DONE')
+
+    def save_checkpoint(self, path):
+        """Save the state of the simulation into the file `path`, so that it can be resumed bit-exactly with :meth:`load_checkpoint`.
+
+        The checkpoint is a NumPy archive of arrays (see :func:`numpy.savez`): it does not depend on the classes of :mod:`cnwheat.model`,
+        and it is read without unpickling. It contains the vector of the compartments (see :attr:`layout`), the topology ids and the state
+        of the organs, hidden zones, elements and soils (see :attr:`CHECKPOINT_TABLES`), the air and soil temperatures of the last initialization,
+        the previous and new values of the forcings when :attr:`interpolate_forcings` is True, :attr:`t_offset`, and the counters and statistics of the solver.
+        The fluxes are not saved, as they are computed again by the next run. The internal parameters are not saved either: the parameters updated
+        when the population was built must be given again to :meth:`load_checkpoint`.
+
+        :param str path: the path of the checkpoint file to write.
+        """
+        from openalea.cnwheat import converter  # imported here, as the module converter imports this module
+
+        checkpoint = {'version': np.array(Simulation.CHECKPOINT_VERSION),
+                      'compartments': self.layout.gather(),
+                      'Tair': np.array(self._Tair),
+                      'Tsoil': np.array(self._Tsoil),
+                      'interpolate_forcings': np.array(self.interpolate_forcings),
+                      't_offset': np.array(getattr(self, 't_offset', np.nan), dtype=float),
+                      'nfev_total': np.array(self.nfev_total),
+                      'elapsed_time': np.array(self._elapsed_time)}
+        _, _, _, organs_df, hiddenzones_df, elements_df, soils_df = converter.to_dataframes(self.population, self.soils)
+        for (table_name, indexes, state), table in zip(Simulation.CHECKPOINT_TABLES, (organs_df, hiddenzones_df, elements_df, soils_df)):
+            checkpoint.update(_columns_to_arrays(table_name, table[indexes + state]))
+        checkpoint.update(_columns_to_arrays('solver_statistics', self.solver_statistics_to_dataframe()))
+        if self.interpolate_forcings:
+            checkpoint.update(_forcings_to_arrays('previous_forcings_values', self.previous_forcings_values))
+            checkpoint.update(_forcings_to_arrays('new_forcings_values', self.new_forcings_values))
+        with open(path, 'wb') as checkpoint_file:
+            np.savez(checkpoint_file, **checkpoint)
+
+    def load_checkpoint(self, path, update_parameters=None):
+        """Initialize the simulation from the checkpoint file `path` written by :meth:`save_checkpoint`.
+        The next call to :meth:`run` gives the same compartments as the next run of the simulation which wrote the checkpoint.
+
+        The population and the soils are rebuilt with :func:`cnwheat.converter.from_dataframes`, which orders the phytomers of each axis by index.
+        The simulation must be constructed with the same settings as the simulation which wrote the checkpoint.
+
+        :param str path: the path of the checkpoint file to read.
+        :param dict update_parameters: the parameters updated when the population of the checkpoint was built (see :func:`cnwheat.converter.from_dataframes`).
+               Default is `None`: the model objects use the parameters of their class.
+        """
+        from openalea.cnwheat import converter  # imported here, as the module converter imports this module
+
+        logger = logging.getLogger(__name__)
+
+        try:
+            with np.load(path, allow_pickle=False) as checkpoint_file:
+                checkpoint = dict(checkpoint_file)
+        except (OSError, ValueError):
+            message = 'The file {} is not a checkpoint written by Simulation.save_checkpoint.'.format(path)
+            logger.exception(message)
+            raise SimulationInitializationError(message)
+        version = checkpoint['version'].item() if 'version' in checkpoint else None
+        if version != Simulation.CHECKPOINT_VERSION:
+            message = 'The checkpoint {} has version {}, but version {} is expected.'.format(path, version, Simulation.CHECKPOINT_VERSION)
+            logger.exception(message)
+            raise SimulationInitializationError(message)
+        if checkpoint['interpolate_forcings'].item() != self.interpolate_forcings:
+            message = 'The checkpoint {} was written by a simulation which {} the forcings.'.format(path, 'does not interpolate' if self.interpolate_forcings else 'interpolates')
+            logger.exception(message)
+            raise SimulationInitializationError(message)
+
+        tables = [pd.DataFrame(_arrays_to_columns(checkpoint, table_name, indexes + state)) for table_name, indexes, state in Simulation.CHECKPOINT_TABLES]
+        population, soils = converter.from_dataframes(*tables, update_parameters=update_parameters)
+        for (table_name, indexes, _), table in zip(Simulation.CHECKPOINT_TABLES, converter.to_dataframes(population, soils)[3:]):
+            if any(not np.array_equal(ids, checkpoint[array_name]) for array_name, ids in _columns_to_arrays(table_name, table[indexes]).items()):
+                message = 'The population of the checkpoint {} cannot be rebuilt in the order of its compartments.'.format(path)
+                logger.exception(message)
+                raise SimulationInitializationError(message)
+
+        if self.interpolate_forcings:
+            # the forcings of the checkpoint must not be replaced by the previous values of the forcings at initialization
+            self.previous_forcings_values.clear()
+        self.initialize(population, soils, Tair=checkpoint['Tair'].item(), Tsoil=checkpoint['Tsoil'].item())
+        self.layout.scatter(checkpoint['compartments'])
+        if self.interpolate_forcings:
+            self.previous_forcings_values.update(_arrays_to_forcings(checkpoint, 'previous_forcings_values'))
+            self.new_forcings_values.clear()
+            self.new_forcings_values.update(_arrays_to_forcings(checkpoint, 'new_forcings_values'))
+        if not np.isnan(checkpoint['t_offset']):
+            self.t_offset = checkpoint['t_offset'].item()
+        self.nfev_total = checkpoint['nfev_total'].item()
+        self._elapsed_time = checkpoint['elapsed_time'].item()
+        self.solver_statistics[:] = pd.DataFrame(_arrays_to_columns(checkpoint, 'solver_statistics', Simulation.SOLVER_STATISTICS)).to_dict('records')
+
+    def _check_consistency(self):
+        """Check the consistency of :attr:`population` and :attr:`soils`, and raise a :class:`SimulationInitializationError` if they are not consistent.
+        """
+        logger = logging.getLogger(__name__)
+
         if len(self.population.plants) != 0:  # population must contain at least 1 plant
             for plant in self.population.plants:
                 if len(plant.axes) != 0:  # each plant must contain at least 1 axis
@@ -540,94 +974,61 @@ class Simulation(object):
             logger.exception(message)
             raise SimulationInitializationError(message)
 
-        if self.interpolate_forcings:
-            # Save the new value of each forcing and set the state parameters to the previous forcing values.
-            self.new_forcings_values.clear()
-            for plant in self.population.plants:
-                for axis in plant.axes:
-                    if axis.roots is not None:
-                        roots_id = (plant.index, axis.label)
-                        self.new_forcings_values[roots_id] = {}
-                        for forcing_label in Simulation.ROOTS_FORCINGS:
-                            self.new_forcings_values[roots_id][forcing_label] = getattr(axis.roots, forcing_label)
-                            if roots_id in self.previous_forcings_values:
-                                setattr(axis.roots, forcing_label, self.previous_forcings_values[roots_id][forcing_label])
-                    for phytomer in axis.phytomers:
-                        for organ in (phytomer.lamina, phytomer.sheath):
-                            if organ is None:
-                                continue
-                            for element in (organ.exposed_element, organ.enclosed_element):
-                                if element is not None:
-                                    element_id = (plant.index, axis.label, phytomer.index, organ.label, element.label)
-                                    self.new_forcings_values[element_id] = {}
-                                    for forcing_label in Simulation.ELEMENTS_FORCINGS:
-                                        self.new_forcings_values[element_id][forcing_label] = getattr(element, forcing_label)
-                                        if element_id in self.previous_forcings_values:
-                                            setattr(element, forcing_label, self.previous_forcings_values[element_id][forcing_label])
+    def _get_axes_soils(self, population=None, soils=None):
+        """Return the soil of each axis of `population`, in the order of the plants and of their axes.
 
-        # Update soil and air temperature using weather data
-        for soil_id, soil_inputs in self.soils.items():
-            self.soils[soil_id].Tsoil = Tsoil
-        for plant in self.population.plants:
-            plant.Tair = Tair
-
-        # initialize initial conditions
-        def _init_initial_conditions(model_object, index):
-            class_ = model_object.__class__
-            if issubclass(class_, model.HiddenZone):
-                class_ = model.HiddenZone
-            elif issubclass(class_, model.Organ):
-                class_ = model.Organ
-            elif issubclass(class_, model.PhotosyntheticOrganElement):
-                class_ = model.PhotosyntheticOrganElement
-            compartments_names = Simulation.MODEL_COMPARTMENTS_NAMES[class_]
-            self.initial_conditions_mapping[model_object] = {}
-            for compartment_name in compartments_names:
-                if hasattr(model_object, compartment_name):
-                    self.initial_conditions_mapping[model_object][compartment_name] = index
-                    self.initial_conditions.append(0)
-                    index += 1
-            return index
+        All the axes share the soil of the main stem of the first plant.
+        This method is the only one which associates the axes to their soil: the objects and the vectorized engines, the splitting of the axes,
+        the monitor of the conservation and the members of :class:`EnsembleSimulation` use it.
 
-        i = 0
+        :param model.Population population: the population of plants. Default is `None`: :attr:`population`.
+        :param dict soils: the soils of `population`: {(plant_index, axis_label): soil_object, ...}. Default is `None`: :attr:`soils`.
 
-        for soil in soils.values():
-            i = _init_initial_conditions(soil, i)
+        :return: The soil of each axis.
+        :rtype: list [model.Soil]
 
-        for plant in self.population.plants:
-            i = _init_initial_conditions(plant, i)
-            for axis in plant.axes:
-                i = _init_initial_conditions(axis, i)
-                for organ in (axis.roots, axis.phloem, axis.grains):
-                    if organ is None:
-                        continue
-                    i = _init_initial_conditions(organ, i)
-                for phytomer in axis.phytomers:
-                    i = _init_initial_conditions(phytomer, i)
-                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath, phytomer.hiddenzone):
-                        if organ is None:
-                            continue
-                        i = _init_initial_conditions(organ, i)
-                        if organ is phytomer.hiddenzone:
-                            continue
-                        for element in (organ.exposed_element, organ.enclosed_element):
-                            if element is None:
-                                continue
-                            i = _init_initial_conditions(element, i)
+        :raise SimulationInitializationError: if no soil is associated to the main stem of the plant 1.
+        """
+        if population is None:
+            population, soils = self.population, self.soils
+        if (1, 'MS') not in soils:
+            message = 'No soil found in (plant=1,axis=MS): all the axes share the soil of the main stem of the plant 1.'
+            logger = logging.getLogger(__name__)
+            logger.exception(message)
+            raise SimulationInitializationError(message)
+        return [soils[(1, 'MS')]] * sum(len(plant.axes) for plant in population.plants)
 
-        self.population.calculate_aggregated_variables()
+    def _build_vectorized_system(self):
+        """Build the struct-of-arrays view of :attr:`population` used when :attr:`engine` is `'vectorized'`.
 
-        logger.info('Initialization of the simulation DONE')
+        :return: The struct-of-arrays view of :attr:`population`.
+        :rtype: cnwheat.vectorized.VectorizedSystem
+        """
+        return vectorized.VectorizedSystem(self.population, self._get_axes_soils(), self.layout, self.respiration_model, self.culm_density, self.delta_t,
+                                           jit_kernel=self.jit_kernel)
 
-    def run(self, show_progressbar=False):
+    def run(self, show_progressbar=False, nb_time_steps=1):
         """
         Compute CN exchanges which occurred in :attr:`population` and :attr:`soils` over :attr:`delta_t`.
 
+        When `nb_time_steps` is greater than 1, the system is integrated over `nb_time_steps` consecutive time steps with constant state parameters,
+        and the continuous solution of the solver is kept in :attr:`dense_output`, so that the compartments can be interpolated at
+        any time of the run (see :meth:`set_state`).
+
         :param bool show_progressbar: True: show the progress bar of the solver ; False: do not show the progress bar (default).
+        :param int nb_time_steps: the number of time steps integrated by the run ; default is `1`.
         """
         logger = logging.getLogger(__name__)
         logger.info('Run of CN-Wheat...')
 
+        if nb_time_steps != 1 and (self.interpolate_forcings or self.compact_state or self.axes_splitting is not None or self.quasi_steady_state is not None):
+            message = """A run over several time steps is only available without interpolation of the forcings, without compaction of the state,
+        without splitting of the axes and without quasi-steady state. Please set `nb_time_steps` to 1 (through Simulation.run)."""
+            logger.exception(message)
+            raise SimulationRunError(message)
+        self.time_grid = np.array([0.0, nb_time_steps * self.time_step])
+        self._dense_output_segments = ([self.time_grid[0]], []) if nb_time_steps != 1 else None
+
         if self.interpolate_forcings:
             # interpolate the forcings
             self._interpolate_forcings()
@@ -635,90 +1036,594 @@ class Simulation(object):
         # set the progress-bar
         self.show_progressbar = show_progressbar
         if self.show_progressbar:
-            self.progressbar.set_t_max(self.time_step)
+            self.progressbar.set_t_max(self.time_grid[1])
 
         self._update_initial_conditions()
 
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("Run the solver with delta_t = %s", self.time_step)
+            logger.debug("Run the solver with delta_t = %s", self.time_grid[1])
 
-        # call :func:`scipy.integrate.solve_ivp` to integrate the system during 1 time step ;
-        # :func:`scipy.integrate.solve_ivp` computes the derivatives of each function by calling :meth:`_calculate_all_derivatives`
-        sol = solve_ivp(fun=self._calculate_all_derivatives, t_span=self.time_grid, y0=self.initial_conditions,
-                        method='BDF', t_eval=np.array([self.time_step]), dense_output=False)
+        if self.engine == 'vectorized':
+            self._vectorized_system.update_state_parameters()
+            calculate_all_derivatives = self._calculate_all_derivatives_vectorized
+        else:
+            calculate_all_derivatives = self._calculate_all_derivatives
+
+        if self.analytic_jacobian:
+            if self.solver_policy.method == 'LSODA':
+                # LSODA only accepts a dense Jacobian
+                jacobian_kwargs = {'jac': lambda t, y: self._calculate_jacobian_vectorized(t, y).toarray()}
+            else:
+                jacobian_kwargs = {'jac': self._calculate_jacobian_vectorized}
+        elif sum(len(plant.axes) for plant in self.population.plants) > 1 and self.solver_policy.method != 'LSODA':
+            # the columns of the Jacobian can be grouped across the axes only ; with one axis, the dense estimation of the Jacobian is faster
+            jacobian_kwargs = {'jac_sparsity': self.jacobian_sparsity}
+        else:
+            jacobian_kwargs = {}
 
-        self.nfev_total += sol.nfev
+        y0 = self.initial_conditions
+        solver_options = dict(self._solver_options, **jacobian_kwargs)
+        if self.compact_state:
+            self._find_active_compartments()
+        else:
+            self.active_compartments = np.arange(self.layout.size)
+            self.nb_dropped_compartments = 0
+        if self.nb_dropped_compartments != 0 and self.axes_splitting is None:
+            calculate_all_derivatives, y0, solver_options = self._compact_system(calculate_all_derivatives, solver_options)
+        if self.quasi_steady_state is not None:
+            calculate_all_derivatives, y0, solver_options = self._reduce_system(calculate_all_derivatives, solver_options)
+
+        self._timings = {'rhs_time': 0.0, 'linear_algebra_time': 0.0}
+        self._run_start_time = self._elapsed_time
+        start_time = default_timer()
+        if self.axes_splitting is not None:
+            success, solver_message, statistics = self._integrate_axes_split(solver_options)
+        else:
+            # integrate the system during 1 time step with the integrator of the method of :attr:`solver_policy` ;
+            # the integrator computes the derivatives of each function by calling :meth:`_calculate_all_derivatives`
+            solver_options = dict(solver_options)
+            integrator_class = SolverPolicy.INTEGRATORS[solver_options.pop('method')]
+            integrator = integrator_class(self._timed(calculate_all_derivatives, 'rhs_time'), self.time_grid[0], y0, self.time_grid[1], **solver_options)
+            success, solver_message, statistics = self._step_integrator(integrator)
+
+        statistics.update(self._timings, t=self._run_start_time, method=self.solver_policy.method, state_size=len(y0),
+                          total_time=default_timer() - start_time)
+        self.solver_statistics.append(statistics)
+        self.nfev_total += statistics['nfev']
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug("Run of the solver DONE")
 
         # check the integration ; raise an exception if the integration failed
-        if not sol.success:
-            message = "Integration failed: {}".format(sol.message)
+        if not success:
+            message = "Integration failed: {}".format(solver_message)
             logger.exception(message)
             raise SimulationRunError(message)
+        self._elapsed_time += self.time_grid[1]
+
+        if self._dense_output_segments is not None:
+            self.dense_output = OdeSolution(*self._dense_output_segments)
+            self._dense_output_segments = None
+        else:
+            self.dense_output = None
+
+        if self.engine == 'vectorized':
+            # set the compartments and the fluxes of the model objects from the last computed state
+            self._vectorized_system.update_population(self._last_y)
 
         # Re-compute integrative variables
         self.population.calculate_aggregated_variables()
 
+        if self.conservation_monitor is not None:
+            self.conservation_monitor.check(self._run_start_time, self.initial_conditions, self.layout.gather(), self.time_grid[1])
+
         if logger.isEnabledFor(logging.DEBUG):
-            self.t_offset += self.time_step
+            self.t_offset += self.time_grid[1]
 
         logger.info('Run of CN-Wheat DONE')
 
+    def _step_integrator(self, integrator):
+        """Step `integrator` until the end of the time step, and count its steps.
+
+        :param scipy.integrate.OdeSolver integrator: the integrator, ready to step.
+
+        :return: True if the integration succeeded, the message of the integrator, and the statistics of the integrator during the time step:
+                 nfev, njev, nlu, nb_accepted_steps, nb_rejected_steps and last_step_size (see :attr:`SOLVER_STATISTICS`).
+        :rtype: (bool, str, dict)
+        """
+        counters_start = (integrator.nfev, integrator.njev, integrator.nlu)
+        for linear_algebra_function_name in ('lu', 'solve_lu'):
+            linear_algebra_function = getattr(integrator, linear_algebra_function_name, None)
+            if linear_algebra_function is not None and not getattr(linear_algebra_function, 'is_timed', False):
+                setattr(integrator, linear_algebra_function_name, self._timed(linear_algebra_function, 'linear_algebra_time'))
+        if not hasattr(integrator, 'lu'):
+            # LSODA does its linear algebra internally
+            self._timings['linear_algebra_time'] = np.nan
+
+        counts_steps = hasattr(integrator, 'h_abs')  # LSODA does not expose its next step
+        nb_accepted_steps = nb_rejected_steps = 0
+        solver_message = None
+        while integrator.status == 'running':
+            if counts_steps:
+                proposed_step = min(integrator.h_abs, integrator.max_step, abs(integrator.t_bound - integrator.t))
+            solver_message = integrator.step()
+            if integrator.status == 'failed':
+                break
+            nb_accepted_steps += 1
+            if self._dense_output_segments is not None:
+                self._dense_output_segments[0].append(integrator.t)
+                self._dense_output_segments[1].append(integrator.dense_output())
+            if counts_steps and integrator.step_size < proposed_step * (1 - 1E-9):
+                nb_rejected_steps += 1
+
+        statistics = {'nfev': integrator.nfev - counters_start[0], 'njev': integrator.njev - counters_start[1], 'nlu': integrator.nlu - counters_start[2],
+                      'nb_accepted_steps': nb_accepted_steps if counts_steps else np.nan, 'nb_rejected_steps': nb_rejected_steps if counts_steps else np.nan,
+                      'last_step_size': integrator.step_size if nb_accepted_steps != 0 else np.nan}
+        return integrator.status == 'finished', solver_message, statistics
+
+    def _timed(self, function, timing_name):
+        """Wrap `function` to add its wall time to :attr:`_timings` [`timing_name`].
+
+        :param function function: the function to wrap.
+        :param str timing_name: the name of the timing.
+
+        :return: The wrapped function.
+        :rtype: function
+        """
+        def timed_function(*args):
+            start_time = default_timer()
+            try:
+                return function(*args)
+            finally:
+                self._timings[timing_name] += default_timer() - start_time
+        timed_function.is_timed = True
+        return timed_function
+
+    def set_state(self, y):
+        """Set the compartments of :attr:`population` and :attr:`soils` to `y`, and compute the fluxes of the model objects
+        with the current state parameters, as at the end of :meth:`run`.
+        It is used to set the population to a state interpolated in :attr:`dense_output`.
+
+        :param numpy.ndarray y: the values of the compartments, ordered as in :attr:`layout`.
+        """
+        if self.engine == 'vectorized':
+            self._vectorized_system.update_state_parameters()
+            self._vectorized_system.update_population(y)
+        else:
+            self._calculate_all_derivatives(self.time_step, y)
+        self.population.calculate_aggregated_variables()
+
+    def solver_statistics_to_dataframe(self):
+        """Return the statistics of the solver recorded at each run (see :attr:`SOLVER_STATISTICS`).
+
+        :return: The statistics of the solver, one row per run.
+        :rtype: pandas.DataFrame
+        """
+        return pd.DataFrame(self.solver_statistics, columns=Simulation.SOLVER_STATISTICS)
+
+    def _integrate_axes_split(self, solver_options):
+        """Integrate the system during 1 time step by operator splitting: each axis is integrated as its own system with the nitrates of its soil frozen,
+        and the nitrates of each soil are integrated with the compartments of the axes frozen. The soil of each axis is given by :meth:`_get_axes_soils`.
+
+        With the scheme `'lie'`, the axes are integrated over the time step, then the soil. With the scheme `'strang'`, the soil is integrated
+        over the first half of the time step, then the axes over the time step, then the soil over the second half of the time step.
+        The systems of the axes are integrated with :attr:`axes_executor` if set. The inactive compartments (see :attr:`active_compartments`)
+        keep their values. At the end of the time step, the derivatives of the whole system are computed once, so that the model objects
+        hold the fluxes of the final state.
+
+        :param dict solver_options: the options of the solver for all the compartments.
+
+        :return: True if the integration succeeded, the message of the solver, and the statistics of the solvers (see :meth:`_step_integrator`),
+                 summed over the systems ; the steps are not counted.
+        :rtype: (bool, str, dict)
+        """
+        y = self.initial_conditions.copy()
+        statistics = {'nfev': 0, 'njev': 0, 'nlu': 0, 'nb_accepted_steps': np.nan, 'nb_rejected_steps': np.nan, 'last_step_size': np.nan}
+        self._timings = {'rhs_time': np.nan, 'linear_algebra_time': np.nan}
+
+        def add_statistics(sol):
+            for counter_name in ('nfev', 'njev', 'nlu'):
+                statistics[counter_name] += getattr(sol, counter_name)
+
+        if self.estimate_splitting_error:
+            sol = solve_ivp(fun=self._calculate_all_derivatives, t_span=self.time_grid, y0=y,
+                            t_eval=np.array([self.time_step]), dense_output=False, **solver_options)
+            add_statistics(sol)
+            if not sol.success:
+                return False, sol.message, statistics
+            y_whole = sol.y[:, -1]
+
+        atol = np.broadcast_to(solver_options['atol'], y.shape)
+        solver_options = {option_name: option_value for option_name, option_value in solver_options.items() if option_name not in ('atol', 'jac_sparsity')}
+
+        soils = []
+        for _, _, soil, _, _ in self._axes_subsystems:
+            if soil not in soils:
+                soils.append(soil)
+        for soil in soils:
+            soil.T_effect_Vmax = soil.calculate_temperature_effect_on_Vmax(soil.Tsoil)
+            soil.T_effect_conductivity = soil.calculate_temperature_effect_on_conductivity(soil.Tsoil)
+            soil.mineralisation = soil.calculate_mineralisation(soil.T_effect_Vmax)
+        for plant in self.population.plants:
+            plant.T_effect_conductivity = plant.calculate_temperature_effect_on_conductivity(plant.Tair)
+            plant.T_effect_Vmax = plant.calculate_temperature_effect_on_Vmax(plant.Tair)
+
+        def integrate_soil(soil, soil_index, t_span):
+            roots_states = [(axis.roots, plant.index, y[self.layout.mapping[axis.roots]['nitrates']], y[self.layout.mapping[axis.roots]['sucrose']])
+                            for plant, axis, axis_soil, _, _ in self._axes_subsystems if axis_soil is soil]
+
+            def calculate_soil_derivative(t, soil_nitrates):
+                Conc_Nitrates_Soil = soil.calculate_Conc_Nitrates(soil_nitrates[0])
+                soil_contributors = [(roots.calculate_Uptake_Nitrates(Conc_Nitrates_Soil, roots_nitrates, roots_sucrose, soil.T_effect_Vmax)[0], plant_index)
+                                     for roots, plant_index, roots_nitrates, roots_sucrose in roots_states]
+                return [soil.calculate_nitrates_derivative(soil.mineralisation, soil_contributors, self.culm_density, soil.constant_Conc_Nitrates)]
+
+            return solve_ivp(fun=calculate_soil_derivative, t_span=t_span, y0=y[[soil_index]], t_eval=np.array([t_span[1]]), dense_output=False,
+                             atol=atol[[soil_index]], **solver_options)
+
+        def integrate_soils(t_span):
+            for soil in soils:
+                soil_index = self.layout.mapping[soil]['nitrates']
+                sol = integrate_soil(soil, soil_index, t_span)
+                add_statistics(sol)
+                if not sol.success:
+                    return False, sol.message
+                y[soil_index] = sol.y[0, -1]
+            return True, None
+
+        if self.axes_splitting == 'lie':
+            soil_steps = [(self.time_grid[0], self.time_grid[1])]
+        else:
+            half_time_step = self.time_step / 2.0
+            soil_steps = [(self.time_grid[0], self.time_grid[0] + half_time_step), (self.time_grid[0] + half_time_step, self.time_grid[1])]
+
+        if self.axes_splitting == 'strang':
+            success, message = integrate_soils(soil_steps.pop(0))
+            if not success:
+                return False, message, statistics
+
+        for soil in soils:
+            soil.nitrates = y[self.layout.mapping[soil]['nitrates']]
+            soil.Conc_Nitrates_Soil = soil.calculate_Conc_Nitrates(soil.nitrates)
+        axes_systems = [(plant, axis, soil, axis_layout, np.intersect1d(axis_indexes, self.active_compartments), y.copy(), atol, solver_options)
+                        for plant, axis, soil, axis_layout, axis_indexes in self._axes_subsystems]
+        if self.axes_executor is None:
+            axes_solutions = list(map(self._integrate_axis, axes_systems))
+        else:
+            axes_solutions = list(self.axes_executor.map(self._integrate_axis, axes_systems))
+
+        for axis_system, sol in zip(axes_systems, axes_solutions):
+            axis_indexes = axis_system[4]
+            add_statistics(sol)
+            if not sol.success:
+                return False, sol.message, statistics
+            y[axis_indexes] = sol.y[:, -1]
+
+        success, message = integrate_soils(soil_steps.pop(0))
+        if not success:
+            return False, message, statistics
+
+        # set the compartments and the fluxes of the model objects from the final state
+        self._calculate_all_derivatives(self.time_step, y)
+        statistics['nfev'] += 1
+
+        if self.estimate_splitting_error:
+            self.splitting_error = float(np.max(np.abs(y - y_whole) / (atol + solver_options['rtol'] * np.abs(y_whole))))
+            logger = logging.getLogger(__name__)
+            logger.info('Error of the splitting of the axes: %s', self.splitting_error)
+
+        return True, None, statistics
+
+    def _integrate_axis(self, axis_system):
+        """Integrate the system of one axis during 1 time step, with the nitrates of its soil and the compartments of the other axes frozen.
+
+        :param tuple axis_system: the plant, the axis, the soil of the axis, the layout of the compartments of the axis, the indexes of the active compartments of the axis,
+               the values of all the compartments at the beginning of the time step, the absolute tolerance of the solver for all the compartments,
+               and the other options of the solver.
+
+        :return: The result of :func:`scipy.integrate.solve_ivp` for the compartments of the axis.
+        :rtype: scipy.integrate._ivp.ivp.OdeResult
+        """
+        plant, axis, soil, axis_layout, axis_indexes, y, atol, solver_options = axis_system
+        y0_axis = y[axis_indexes]
+
+        def calculate_axis_derivatives(t, y_axis):
+            if np.isnan(y_axis).any():
+                message = 'The solver did not manage to compute a compartment. See the logs. NaN found in y'
+                logger = logging.getLogger(__name__)
+                logger.exception(message)
+                raise SimulationRunError(message)
+            y[axis_indexes] = y_axis
+            axis_layout.scatter(y)
+            y_derivatives = np.zeros_like(y)
+            self._calculate_axis_derivatives(plant, axis, soil, y_derivatives)
+            return y_derivatives[axis_indexes]
+
+        return solve_ivp(fun=calculate_axis_derivatives, t_span=self.time_grid, y0=y0_axis, t_eval=np.array([self.time_step]), dense_output=False,
+                         atol=atol[axis_indexes], **solver_options)
+
+    def _find_active_compartments(self):
+        """Find the compartments which are inactive during the whole time step, and set :attr:`active_compartments` and :attr:`nb_dropped_compartments`.
+
+        The compartments of a photosynthetic organ element are inactive if the green area of the element is lower than 0.25E-6 m2
+        or if its structural mass is null, and if neither its green area nor its structural mass are interpolated inside the time step.
+        The compartments of a hidden zone with a null structural mass are inactive, as the compartments of the elements of its phytomer.
+        The derivatives of these compartments are always null (see :meth:`_calculate_all_derivatives`).
+        """
+        varying_elements = set()
+        if self.interpolate_forcings:
+            for i in self.forcings_table.varying_forcings.tolist():
+                if self.forcings_table.forcings_labels[i] in ('green_area', 'mstruct'):
+                    varying_elements.add(id(self.forcings_table.model_objects[i]))
+
+        inactive_compartments = []
+        for plant in self.population.plants:
+            for axis in plant.axes:
+                for phytomer in axis.phytomers:
+                    phytomer_is_inactive = phytomer.hiddenzone is not None and phytomer.hiddenzone.mstruct == 0
+                    if phytomer_is_inactive:
+                        inactive_compartments.extend(self.layout.mapping[phytomer.hiddenzone].values())
+                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
+                        if organ is None:
+                            continue
+                        for element in (organ.exposed_element, organ.enclosed_element):
+                            if element is None:
+                                continue
+                            if phytomer_is_inactive or ((element.green_area <= 0.25E-6 or element.mstruct <= 0.0) and id(element) not in varying_elements):
+                                inactive_compartments.extend(self.layout.mapping[element].values())
+
+        self.active_compartments = np.setdiff1d(np.arange(self.layout.size), inactive_compartments)
+        self.nb_dropped_compartments = self.layout.size - len(self.active_compartments)
+        logger = logging.getLogger(__name__)
+        logger.info('%s inactive compartments dropped from the %s compartments of the system', self.nb_dropped_compartments, self.layout.size)
+
+    def _compact_system(self, calculate_all_derivatives, solver_options):
+        """Restrict the system to :attr:`active_compartments`. The inactive compartments keep their values in :attr:`initial_conditions`.
+
+        :param function calculate_all_derivatives: the function which computes the derivatives of all the compartments.
+        :param dict solver_options: the options of the solver for all the compartments.
+
+        :return: The function which computes the derivatives of the active compartments, the initial values of the active compartments,
+                 and the options of the solver for the active compartments.
+        :rtype: (function, numpy.ndarray, dict)
+        """
+        active_compartments = self.active_compartments
+
+        def expand(y_active):
+            y = self.initial_conditions.copy()
+            y[active_compartments] = y_active
+            return y
+
+        def calculate_active_derivatives(t, y_active):
+            return calculate_all_derivatives(t, expand(y_active))[active_compartments]
+
+        solver_options = dict(solver_options)
+        if isinstance(solver_options['atol'], np.ndarray):
+            solver_options['atol'] = solver_options['atol'][active_compartments]
+        if 'jac_sparsity' in solver_options:
+            solver_options['jac_sparsity'] = solver_options['jac_sparsity'][active_compartments, :][:, active_compartments]
+        if 'jac' in solver_options:
+            calculate_jacobian = solver_options['jac']
+            solver_options['jac'] = lambda t, y_active: calculate_jacobian(t, expand(y_active))[active_compartments, :][:, active_compartments]
+
+        return calculate_active_derivatives, self.initial_conditions[active_compartments], solver_options
+
+    def _reduce_system(self, calculate_all_derivatives, solver_options):
+        """Remove the compartments :attr:`quasi_steady_state` of the active photosynthetic organ elements from the system integrated by the solver.
+
+        At each evaluation of the derivatives, these fast compartments are set to their quasi-steady state, that is the values for which their derivatives are null
+        given the values of the other compartments, then the derivatives of the other compartments are computed.
+        The quasi-steady state is computed by Newton iterations on all the elements at once, starting from the quasi-steady state of the previous evaluation:
+        the fast compartments of an element only depend on the fast compartments of the same element, so that the Jacobian of the fast compartments
+        is block-diagonal, with one small block per element. The blocks are estimated by finite differences, and kept as long as the Newton iterations converge fast enough.
+        The fast compartments are kept non-negative. If the Newton iterations do not converge in :attr:`QUASI_STEADY_STATE_MAX_ITERATIONS` iterations,
+        the last iterate is used and a warning is logged. The singular blocks are solved in the least squares sense (see :func:`_solve_jacobian_blocks`).
+
+        With the analytic Jacobian, the Jacobian of the reduced system is the Schur complement of the block of the fast compartments in the Jacobian of the whole system.
+
+        :param function calculate_all_derivatives: the function which computes the derivatives of all the compartments.
+        :param dict solver_options: the options of the solver for all the compartments.
+
+        :return: The function which computes the derivatives of the integrated compartments, the initial values of the integrated compartments,
+                 and the options of the solver for the integrated compartments.
+        :rtype: (function, numpy.ndarray, dict)
+        """
+        vectorized_system = self._vectorized_system
+        compartments_positions = [vectorized.ELEMENTS_COMPARTMENTS.index(compartment_name) for compartment_name in self.quasi_steady_state]
+        fast_indexes = vectorized_system.elements_indexes[compartments_positions][:, vectorized_system.active_elements]
+        if fast_indexes.size == 0:
+            return calculate_all_derivatives, self.initial_conditions, solver_options
+        slow_indexes = np.setdiff1d(np.arange(self.layout.size), fast_indexes.ravel())
+        fast_atol = np.broadcast_to(solver_options['atol'], (self.layout.size,))[fast_indexes]
+        rtol = solver_options['rtol']
+        y = self.initial_conditions.copy()
+        jacobian_blocks = {'blocks': None}
+
+        def estimate_jacobian_blocks(y_derivatives):
+            # perturb the same fast compartment of all the elements at once
+            blocks = np.empty((fast_indexes.shape[1],) + (len(fast_indexes),) * 2)
+            for i, compartment_indexes in enumerate(fast_indexes):
+                y_perturbed = y.copy()
+                h = 1E-6 * np.maximum(1., np.abs(y[compartment_indexes]))
+                y_perturbed[compartment_indexes] += h
+                blocks[:, :, i] = ((vectorized_system.calculate_all_derivatives(y_perturbed)[fast_indexes] - y_derivatives[fast_indexes]) / h).T
+            return blocks
+
+        def calculate_slow_derivatives(t, y_slow):
+            y[slow_indexes] = y_slow
+            y_derivatives = calculate_all_derivatives(t, y)
+            previous_change_norm = np.inf
+            for _ in range(Simulation.QUASI_STEADY_STATE_MAX_ITERATIONS):
+                if jacobian_blocks['blocks'] is None:
+                    jacobian_blocks['blocks'] = estimate_jacobian_blocks(y_derivatives)
+                fast_values = y[fast_indexes]
+                newton_steps = _solve_jacobian_blocks(jacobian_blocks['blocks'], y_derivatives[fast_indexes].T[:, :, np.newaxis])[:, :, 0].T
+                new_fast_values = np.maximum(0., fast_values - newton_steps)
+                change_norm = np.max(np.abs(new_fast_values - fast_values) / (fast_atol + rtol * np.abs(new_fast_values)))
+                if change_norm <= Simulation.QUASI_STEADY_STATE_TOLERANCE:
+                    break
+                if change_norm > previous_change_norm / 2:
+                    # the iterations converge too slowly: update the blocks of the Jacobian
+                    jacobian_blocks['blocks'] = None
+                previous_change_norm = change_norm
+                y[fast_indexes] = new_fast_values
+                y_derivatives = calculate_all_derivatives(t, y)
+            else:
+                logger = logging.getLogger(__name__)
+                logger.warning('The quasi-steady state of %s did not converge at t=%s in %s iterations (change of %s tolerance units at the last iteration): '
+                               'the last iterate is used.', self.quasi_steady_state, t, Simulation.QUASI_STEADY_STATE_MAX_ITERATIONS, change_norm)
+            return y_derivatives[slow_indexes]
+
+        solver_options = dict(solver_options)
+        if isinstance(solver_options['atol'], np.ndarray):
+            solver_options['atol'] = solver_options['atol'][slow_indexes]
+        if 'jac_sparsity' in solver_options:
+            jacobian_sparsity = sparse.csc_matrix(solver_options['jac_sparsity'])
+            # the slow compartments are coupled through the fast compartments
+            solver_options['jac_sparsity'] = ((jacobian_sparsity[slow_indexes, :][:, slow_indexes] +
+                                               jacobian_sparsity[slow_indexes, :][:, fast_indexes.ravel()] * jacobian_sparsity[fast_indexes.ravel(), :][:, slow_indexes]) != 0).astype(int)
+        if 'jac' in solver_options:
+            calculate_jacobian = solver_options['jac']
+
+            def calculate_slow_jacobian(t, y_slow):
+                # the fast compartments keep the quasi-steady state of the last evaluation of the derivatives
+                y[slow_indexes] = y_slow
+                jacobian = calculate_jacobian(t, y)
+                is_dense = isinstance(jacobian, np.ndarray)
+                jacobian = sparse.csc_matrix(jacobian)
+                fast = fast_indexes.ravel()
+                # the block of the fast compartments is block-diagonal: invert each block of each element
+                nb_fast, nb_elements = fast_indexes.shape
+                blocks_rows = np.arange(len(fast)).reshape(nb_fast, nb_elements)
+                blocks = np.empty((nb_elements, nb_fast, nb_fast))
+                for i in range(nb_fast):
+                    for j in range(nb_fast):
+                        blocks[:, i, j] = np.asarray(jacobian[fast_indexes[i], fast_indexes[j]]).ravel()
+                inverse_blocks = _solve_jacobian_blocks(blocks, np.broadcast_to(np.eye(nb_fast), blocks.shape))
+                rows = np.broadcast_to(blocks_rows.T[:, :, np.newaxis], inverse_blocks.shape)
+                columns = np.broadcast_to(blocks_rows.T[:, np.newaxis, :], inverse_blocks.shape)
+                inverse_fast_jacobian = sparse.csc_matrix((inverse_blocks.ravel(), (rows.ravel(), columns.ravel())), shape=(len(fast), len(fast)))
+                slow_jacobian = jacobian[slow_indexes, :][:, slow_indexes] - \
+                    jacobian[slow_indexes, :][:, fast] * inverse_fast_jacobian * jacobian[fast, :][:, slow_indexes]
+                return slow_jacobian.toarray() if is_dense else slow_jacobian
+
+            solver_options['jac'] = calculate_slow_jacobian
+
+        return calculate_slow_derivatives, self.initial_conditions[slow_indexes], solver_options
+
+    def _build_jacobian_sparsity(self):
+        """Build the sparsity structure of the Jacobian matrix of the system from the topology of :attr:`population` and :attr:`soils`.
+
+        The element (i, j) of the structure is 1 if the derivative of the compartment i may depend on the compartment j:
+            * the compartments of an element depend on the element, the phloem and the roots of the axis, and the hidden zone of the phytomer,
+            * the compartments of a hidden zone depend on the hidden zone, the phloem and the elements of the phytomer,
+            * the compartments of the grains depend on the grains and the phloem,
+            * the compartments of the roots depend on the roots, the phloem and the soils,
+            * the compartments of the phloem and of the axis depend on all the compartments of the axis,
+            * the compartments of the soils depend on the soils and on the roots of all the axes.
+
+        Thus, the cost of the estimation of the Jacobian by :func:`scipy.integrate.solve_ivp` depends on the number of coupling groups
+        instead of the number of compartments.
+
+        :return: The sparsity structure of the Jacobian matrix, of shape (n, n) where n is the number of compartments.
+        :rtype: scipy.sparse.csc_matrix
+        """
+        def indexes(model_object):
+            if model_object is None or model_object not in self.initial_conditions_mapping:
+                return []
+            return list(self.initial_conditions_mapping[model_object].values())
+
+        nb_compartments = len(self.initial_conditions)
+        jacobian_sparsity = sparse.lil_matrix((nb_compartments, nb_compartments), dtype=int)
+        jacobian_sparsity.setdiag(1)
+
+        def couple(rows, columns):
+            for row in rows:
+                jacobian_sparsity[row, columns] = 1
+
+        soils_indexes = []
+        for soil in self.soils.values():
+            soils_indexes.extend(indexes(soil))
+        all_roots_indexes = []
+
+        for plant in self.population.plants:
+            for axis in plant.axes:
+                phloem_indexes = indexes(axis.phloem)
+                roots_indexes = indexes(axis.roots)
+                grains_indexes = indexes(axis.grains)
+                all_roots_indexes.extend(roots_indexes)
+                axis_indexes = indexes(axis) + phloem_indexes + roots_indexes + grains_indexes
+                for phytomer in axis.phytomers:
+                    hiddenzone_indexes = indexes(phytomer.hiddenzone)
+                    phytomer_indexes = indexes(phytomer) + hiddenzone_indexes
+                    elements_indexes = []
+                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
+                        if organ is None:
+                            continue
+                        phytomer_indexes.extend(indexes(organ))
+                        for element in (organ.exposed_element, organ.enclosed_element):
+                            element_indexes = indexes(element)
+                            elements_indexes.extend(element_indexes)
+                            couple(element_indexes, element_indexes + phloem_indexes + roots_indexes + hiddenzone_indexes)
+                    couple(hiddenzone_indexes, hiddenzone_indexes + phloem_indexes + elements_indexes)
+                    axis_indexes.extend(phytomer_indexes + elements_indexes)
+                couple(grains_indexes, grains_indexes + phloem_indexes)
+                couple(roots_indexes, roots_indexes + phloem_indexes + soils_indexes)
+                couple(indexes(axis) + phloem_indexes, axis_indexes + soils_indexes)
+
+        couple(soils_indexes, soils_indexes + all_roots_indexes)
+
+        return jacobian_sparsity.tocsc()
+
     def _update_initial_conditions(self):
         """Update the compartments values in :attr:`initial_conditions` from the compartments values of :attr:`population` and :attr:`soils`.
         """
-        # Update the compartments values
-        for model_object, compartments in self.initial_conditions_mapping.items():
-            for compartment_name, compartment_index in compartments.items():
-                self.initial_conditions[compartment_index] = getattr(model_object, compartment_name)
+        self.layout.gather(self.initial_conditions)
 
     def _interpolate_forcings(self):
-        """Create functions to interpolate the forcings of the model to any time inside the time grid (see `self.time_grid`).
+        """Build the table to interpolate the forcings of the model to any time inside the time grid (see `self.time_grid`).
 
         If this is the first run of the model, then we consider that the forcings are constant.
-        The interpolation functions are stored in :attr:`interpolation_functions`, and will be used later on and as needed by the SciPy solver.
+        The table is stored in :attr:`forcings_table`, and will be used later on and as needed by the SciPy solver.
         """
-        self.interpolation_functions.clear()
+        model_objects = []
+        forcings_labels = []
+        start_values = []
+        end_values = []
         next_forcings_values = {}
+
+        def add_forcings(model_object, model_object_id, forcings_delta_t_labels):
+            next_forcings_values[model_object_id] = {}
+            for (forcing_labels, forcings_delta_t_ratio) in forcings_delta_t_labels:
+                for forcing_label in forcing_labels:
+                    if model_object_id in self.previous_forcings_values and \
+                            self.previous_forcings_values[model_object_id][forcing_label] != self.new_forcings_values[model_object_id][forcing_label]:
+                        prev_forcing_value = self.previous_forcings_values[model_object_id][forcing_label]
+                        next_forcing_value = prev_forcing_value + (self.new_forcings_values[model_object_id][forcing_label] - prev_forcing_value) / forcings_delta_t_ratio
+                    else:
+                        next_forcing_value = self.new_forcings_values[model_object_id][forcing_label]
+                        prev_forcing_value = next_forcing_value
+                    model_objects.append(model_object)
+                    forcings_labels.append(forcing_label)
+                    start_values.append(prev_forcing_value)
+                    end_values.append(next_forcing_value)
+                    next_forcings_values[model_object_id][forcing_label] = next_forcing_value
+
         for plant in self.population.plants:
             for axis in plant.axes:
                 if axis.roots is not None:
-                    roots_id = (plant.index, axis.label)
-                    self.interpolation_functions[roots_id] = {}
-                    next_forcings_values[roots_id] = {}
-                    for forcing_label in Simulation.ROOTS_FORCINGS:
-                        if roots_id in self.previous_forcings_values and \
-                                self.previous_forcings_values[roots_id][forcing_label] != self.new_forcings_values[roots_id][forcing_label]:
-                            prev_forcing_value = self.previous_forcings_values[roots_id][forcing_label]
-                            next_forcing_value = prev_forcing_value + (self.new_forcings_values[roots_id][forcing_label] - prev_forcing_value) / self.senescence_forcings_delta_t_ratio
-                        else:
-                            next_forcing_value = self.new_forcings_values[roots_id][forcing_label]
-                            prev_forcing_value = next_forcing_value
-                        self.interpolation_functions[roots_id][forcing_label] = interpolate.interp1d(self.time_grid, [prev_forcing_value, next_forcing_value], assume_sorted=True)
-                        next_forcings_values[roots_id][forcing_label] = next_forcing_value
+                    add_forcings(axis.roots, (plant.index, axis.label), ((Simulation.ROOTS_FORCINGS, self.senescence_forcings_delta_t_ratio),))
                 for phytomer in axis.phytomers:
                     for organ in (phytomer.lamina, phytomer.sheath):
                         if organ is None:
                             continue
                         for element in (organ.exposed_element, organ.enclosed_element):
                             if element is not None:
-                                element_id = (plant.index, axis.label, phytomer.index, organ.label, element.label)
-                                self.interpolation_functions[element_id] = {}
-                                next_forcings_values[element_id] = {}
-                                for (forcing_labels, forcings_delta_t_ratio) in ((Simulation.ELEMENTS_PHOTOSYNTHESIS_FORCINGS, self.photosynthesis_forcings_delta_t_ratio),
-                                                                                 (Simulation.ELEMENTS_SENESCENCE_FORCINGS, self.senescence_forcings_delta_t_ratio)):
-                                    for forcing_label in forcing_labels:
-                                        if element_id in self.previous_forcings_values and \
-                                                self.previous_forcings_values[element_id][forcing_label] != self.new_forcings_values[element_id][forcing_label]:
-                                            prev_forcing_value = self.previous_forcings_values[element_id][forcing_label]
-                                            next_forcing_value = prev_forcing_value + (self.new_forcings_values[element_id][forcing_label] - prev_forcing_value) / forcings_delta_t_ratio
-                                        else:
-                                            next_forcing_value = self.new_forcings_values[element_id][forcing_label]
-                                            prev_forcing_value = next_forcing_value
-                                        self.interpolation_functions[element_id][forcing_label] = interpolate.interp1d(self.time_grid, [prev_forcing_value, next_forcing_value], assume_sorted=True)
-                                        next_forcings_values[element_id][forcing_label] = next_forcing_value
+                                add_forcings(element, (plant.index, axis.label, phytomer.index, organ.label, element.label),
+                                             ((Simulation.ELEMENTS_PHOTOSYNTHESIS_FORCINGS, self.photosynthesis_forcings_delta_t_ratio),
+                                              (Simulation.ELEMENTS_SENESCENCE_FORCINGS, self.senescence_forcings_delta_t_ratio)))
+
+        self.forcings_table.build(model_objects, forcings_labels, start_values, end_values, self.time_step)
 
         self.previous_forcings_values.clear()
         self.previous_forcings_values.update(next_forcings_values)
@@ -791,6 +1696,78 @@ class Simulation(object):
             formatted_initial_conditions = row_sep.join([column_sep.join(row) for row in all_rows[class_]])
             compartments_logger.debug(formatted_initial_conditions)
 
+    def _set_interpolated_forcings(self, t):
+        """Set the forcings of the roots and of the photosynthetic organ elements to their values interpolated at `t`.
+
+        :param float t: The time at which the forcings are interpolated.
+        """
+        self.forcings_table.apply(t)
+
+    def _calculate_all_derivatives_vectorized(self, t, y):
+        """Compute the derivatives of the compartments with :attr:`_vectorized_system`.
+        Same as :meth:`_calculate_all_derivatives`, but the fluxes and intermediate variables are not set on the model objects
+        at each call: they are set once at the end of :meth:`run`.
+
+        :param float t: The current t at which we want to compute the derivatives.
+        :param list [float] y: The current values of y.
+
+        :return: The derivatives of `y` at `t`.
+        :rtype: numpy.ndarray
+        """
+        logger = logging.getLogger(__name__)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            t_abs = t + self.t_offset
+            logger.debug('t = {}'.format(t_abs))
+
+        if self.interpolate_forcings:
+            # Update state parameters using the table of the forcings
+            self._set_interpolated_forcings(t)
+            # Compute integrative variables
+            self.population.calculate_aggregated_variables()
+            self._vectorized_system.update_state_parameters()
+
+        compartments_logger = logging.getLogger('cnwheat.compartments')
+        if logger.isEnabledFor(logging.DEBUG) and compartments_logger.isEnabledFor(logging.DEBUG):
+            self._log_compartments(t_abs, y, Simulation.LOGGERS_NAMES['compartments'])
+
+        # check that the solver is not crashed
+        y_isnan = np.isnan(y)
+        if y_isnan.any():
+            message = 'The solver did not manage to compute a compartment. See the logs. NaN found in y'
+            logger.exception(message)
+            raise SimulationRunError(message)
+
+        self._last_y = np.array(y)
+        y_derivatives = self._vectorized_system.calculate_all_derivatives(y)
+
+        if self.show_progressbar:
+            self.progressbar.update(t)
+
+        derivatives_logger = logging.getLogger('cnwheat.derivatives')
+        if logger.isEnabledFor(logging.DEBUG) and derivatives_logger.isEnabledFor(logging.DEBUG):
+            self._log_compartments(t_abs, y_derivatives, Simulation.LOGGERS_NAMES['derivatives'])
+
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(self._run_start_time + t, y, y_derivatives)
+
+        return y_derivatives
+
+    def _calculate_jacobian_vectorized(self, t, y):
+        """Compute the Jacobian of the system with :attr:`_vectorized_system`.
+
+        :param float t: The current t at which we want to compute the Jacobian.
+        :param list [float] y: The current values of y.
+
+        :return: The Jacobian of the system at `t` and `y`.
+        :rtype: scipy.sparse.csc_matrix
+        """
+        if self.interpolate_forcings:
+            self._set_interpolated_forcings(t)
+            self.population.calculate_aggregated_variables()
+            self._vectorized_system.update_state_parameters()
+        return self._vectorized_system.calculate_jacobian(y)
+
     def _calculate_all_derivatives(self, t, y):
         """Compute the derivative of `y` at `t`.
 
@@ -825,22 +1802,8 @@ class Simulation(object):
             logger.debug('t = {}'.format(t_abs))
 
         if self.interpolate_forcings:
-            # Update state parameters using interpolation functions
-            for plant in self.population.plants:
-                for axis in plant.axes:
-                    if axis.roots is not None:
-                        roots_id = (plant.index, axis.label)
-                        for forcing_label in Simulation.ROOTS_FORCINGS:
-                            setattr(axis.roots, forcing_label, float(self.interpolation_functions[roots_id][forcing_label](t)))
-                    for phytomer in axis.phytomers:
-                        for organ in (phytomer.lamina, phytomer.sheath):
-                            if organ is None:
-                                continue
-                            for element in (organ.exposed_element, organ.enclosed_element):
-                                if element is not None:
-                                    element_id = (plant.index, axis.label, phytomer.index, organ.label, element.label)
-                                    for forcing_label in Simulation.ELEMENTS_FORCINGS:
-                                        setattr(element, forcing_label, float(self.interpolation_functions[element_id][forcing_label](t)))
+            # Update state parameters using the table of the forcings
+            self._set_interpolated_forcings(t)
 
             # Compute integrative variables
             self.population.calculate_aggregated_variables()
@@ -858,258 +1821,33 @@ class Simulation(object):
 
         y_derivatives = np.zeros_like(y)
 
-        # TODO: TEMP !!!!
-        soil_contributors = []
-        soil = self.soils[(1, 'MS')]
-        soil.nitrates = y[self.initial_conditions_mapping[soil]['nitrates']]
-        soil.Conc_Nitrates_Soil = soil.calculate_Conc_Nitrates(soil.nitrates)
+        # set the compartments of the model objects from y
+        self.layout.scatter(y)
 
-        soil.T_effect_Vmax = soil.calculate_temperature_effect_on_Vmax(soil.Tsoil)
-        soil.T_effect_conductivity = soil.calculate_temperature_effect_on_conductivity(soil.Tsoil)
+        # the soil of each axis, and the contributors of each soil to the derivative of its nitrates
+        axes_soils = self._get_axes_soils()
+        soils_contributors = {}
+        for soil in set(axes_soils):
+            soil.Conc_Nitrates_Soil = soil.calculate_Conc_Nitrates(soil.nitrates)
+            soil.T_effect_Vmax = soil.calculate_temperature_effect_on_Vmax(soil.Tsoil)
+            soil.T_effect_conductivity = soil.calculate_temperature_effect_on_conductivity(soil.Tsoil)
 
+        axes_soils = iter(axes_soils)
         for plant in self.population.plants:
 
             plant.T_effect_conductivity = plant.calculate_temperature_effect_on_conductivity(plant.Tair)
             plant.T_effect_Vmax = plant.calculate_temperature_effect_on_Vmax(plant.Tair)
 
             for axis in plant.axes:
-                sum_respi_shoot = 0.0
-                axis.C_exudated = y[self.initial_conditions_mapping[axis]['C_exudated']]
-                axis.sum_respi_shoot = y[self.initial_conditions_mapping[axis]['sum_respi_shoot']]
-                axis.sum_respi_roots = y[self.initial_conditions_mapping[axis]['sum_respi_roots']]
-
-                # Phloem
-                phloem_contributors = []
-                axis.phloem.sucrose = y[self.initial_conditions_mapping[axis.phloem]['sucrose']]
-                axis.phloem.amino_acids = y[self.initial_conditions_mapping[axis.phloem]['amino_acids']]
-                # Roots
-                axis.roots.nitrates = y[self.initial_conditions_mapping[axis.roots]['nitrates']]
-                axis.roots.amino_acids = y[self.initial_conditions_mapping[axis.roots]['amino_acids']]
-                axis.roots.sucrose = y[self.initial_conditions_mapping[axis.roots]['sucrose']]
-                axis.roots.cytokinins = y[self.initial_conditions_mapping[axis.roots]['cytokinins']]
-                phloem_contributors.append(axis.roots)
-
-                # compute total transpiration at t_inf
-                axis.Total_Transpiration = 0.0  # mmol s-1
-                total_green_area = 0.0  # m2
-                for phytomer in axis.phytomers:
-                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
-                        if organ is not None:
-                            for element in (organ.exposed_element, organ.enclosed_element):
-                                if element is not None and element.green_area > 0:
-                                    element.Transpiration = element.calculate_Total_Transpiration(element.Tr, element.green_area)
-                                    axis.Total_Transpiration += (element.Transpiration * element.nb_replications)
-                                    total_green_area += (element.green_area * element.nb_replications)
-
-                # Compute the regulating factor of root exports by shoot transpiration
-                axis.roots.regul_transpiration = axis.roots.calculate_regul_transpiration(axis.Total_Transpiration)
-
-                # compute the flows from/to the roots to/from photosynthetic organs
-                axis.roots.Uptake_Nitrates, axis.roots.HATS_LATS = axis.roots.calculate_Uptake_Nitrates(soil.Conc_Nitrates_Soil, axis.roots.nitrates, axis.roots.sucrose,
-                                                                                                        soil.T_effect_Vmax)
-                soil_contributors.append((axis.roots.Uptake_Nitrates, plant.index))  #: TODO TEMP!!!
-                axis.roots.R_Nnit_upt = self.respiration_model.RespirationModel.R_Nnit_upt(axis.roots.Uptake_Nitrates, axis.roots.sucrose)
-                axis.roots.Export_Nitrates = axis.roots.calculate_Export_Nitrates(axis.roots.nitrates, axis.roots.regul_transpiration)
-                axis.roots.Export_Amino_Acids = axis.roots.calculate_Export_Amino_Acids(axis.roots.amino_acids, axis.roots.regul_transpiration)
-                axis.roots.Export_cytokinins = axis.roots.calculate_Export_cytokinins(axis.roots.cytokinins, axis.roots.regul_transpiration)
-
-                # compute the derivative of each photosynthetic organ element compartment
-                for phytomer in axis.phytomers:
-                    # Hidden zone
-                    hiddenzone = phytomer.hiddenzone
-                    if phytomer.hiddenzone is not None:
-                        if hiddenzone.mstruct == 0:
-                            continue
-                        hiddenzone.sucrose = y[self.initial_conditions_mapping[hiddenzone]['sucrose']]
-                        hiddenzone.fructan = y[self.initial_conditions_mapping[hiddenzone]['fructan']]
-                        hiddenzone.amino_acids = y[self.initial_conditions_mapping[hiddenzone]['amino_acids']]
-                        hiddenzone.proteins = y[self.initial_conditions_mapping[hiddenzone]['proteins']]
-                        phloem_contributors.append(hiddenzone)
-
-                    hiddenzone_Loading_Sucrose_contribution = 0
-                    hiddenzone_Loading_Amino_Acids_contribution = 0
-                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
-                        if organ is None:
-                            continue
-
-                        for element in (organ.exposed_element, organ.enclosed_element):
-                            if element is None or element.green_area <= 0.25E-6 or element.mstruct <= 0.0:
-                                continue
-
-                            element.starch = y[self.initial_conditions_mapping[element]['starch']]
-                            element.sucrose = y[self.initial_conditions_mapping[element]['sucrose']]
-                            element.triosesP = y[self.initial_conditions_mapping[element]['triosesP']]
-                            element.fructan = y[self.initial_conditions_mapping[element]['fructan']]
-                            element.nitrates = y[self.initial_conditions_mapping[element]['nitrates']]
-                            element.amino_acids = y[self.initial_conditions_mapping[element]['amino_acids']]
-                            element.proteins = y[self.initial_conditions_mapping[element]['proteins']]
-                            element.cytokinins = y[self.initial_conditions_mapping[element]['cytokinins']]
-
-                            # intermediate variables
-                            element.Photosynthesis = element.calculate_total_Photosynthesis(element.Ag, element.green_area)
-
-                            # flows
-                            if element.is_growing:  #: Export of sucrose and amino acids towards the HZ. Several growing elements might export toward the HZ at the same time (leaf and internode)
-                                element.Loading_Sucrose = element.calculate_export_sucrose(element.sucrose, hiddenzone.sucrose, hiddenzone.mstruct, plant.T_effect_conductivity)
-                                hiddenzone_Loading_Sucrose_contribution += element.Loading_Sucrose
-                                element.Loading_Amino_Acids = element.calculate_Export_Amino_Acids(element.amino_acids, hiddenzone.amino_acids, hiddenzone.mstruct, plant.T_effect_conductivity)
-                                hiddenzone_Loading_Amino_Acids_contribution += element.Loading_Amino_Acids
-
-                            else:  #: Loading of sucrose and amino acids towards the phloem
-                                phloem_contributors.append(element)
-                                element.Loading_Sucrose = element.calculate_Loading_Sucrose(element.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
-                                element.Loading_Amino_Acids = element.calculate_Loading_Amino_Acids(element.amino_acids, axis.phloem.amino_acids, axis.mstruct, plant.T_effect_conductivity)
-
-                            element.Regul_S_Fructan = element.calculate_Regul_S_Fructan(element.Loading_Sucrose)
-                            element.S_Fructan = element.calculate_S_Fructan(element.sucrose, element.Regul_S_Fructan, plant.T_effect_Vmax)
-                            element.D_Fructan = element.calculate_D_Fructan(element.sucrose, element.fructan, plant.T_effect_Vmax)
-                            element.S_Starch = element.calculate_S_Starch(element.triosesP, plant.T_effect_Vmax)
-                            element.D_Starch = element.calculate_D_Starch(element.starch, plant.T_effect_Vmax)
-                            element.S_Sucrose = element.calculate_S_Sucrose(element.triosesP, plant.T_effect_Vmax)
-                            element.R_phloem_loading, element.Loading_Sucrose = self.respiration_model.RespirationModel.R_phloem(element.Loading_Sucrose,
-                                                                                                                                 element.mstruct * element.__class__.PARAMETERS.ALPHA)
-                            element.Nitrates_import = element.calculate_Nitrates_import(axis.roots.Export_Nitrates, element.Transpiration, axis.Total_Transpiration)
-                            element.Amino_Acids_import = element.calculate_Amino_Acids_import(axis.roots.Export_Amino_Acids, element.Transpiration, axis.Total_Transpiration)
-                            element.S_Amino_Acids = element.calculate_S_amino_acids(element.nitrates, element.triosesP, plant.T_effect_Vmax)
-                            element.R_Nnit_red, element.S_Amino_Acids = self.respiration_model.RespirationModel.R_Nnit_red(element.S_Amino_Acids, element.sucrose,
-                                                                                                                           element.mstruct * element.__class__.PARAMETERS.ALPHA)
-                            element.S_Proteins = element.calculate_S_proteins(element.amino_acids, plant.T_effect_Vmax)
-                            element.D_Proteins = element.calculate_D_Proteins(element.proteins, element.cytokinins, plant.T_effect_Vmax)
-                            element.cytokinins_import = element.calculate_cytokinins_import(axis.roots.Export_cytokinins, element.Transpiration, axis.Total_Transpiration)
-                            element.D_cytokinins = element.calculate_D_cytokinins(element.cytokinins, plant.T_effect_Vmax)
-
-                            # compartments derivatives
-                            starch_derivative = element.calculate_starch_derivative(element.S_Starch, element.D_Starch)
-                            element.R_residual = self.respiration_model.RespirationModel.R_residual(element.sucrose, element.mstruct * element.__class__.PARAMETERS.ALPHA,
-                                                                                                                           element.Total_Organic_Nitrogen, element.Ts)
-                            element.sum_respi = element.R_phloem_loading + element.R_Nnit_red + element.R_residual
-                            sum_respi_shoot += element.sum_respi * element.nb_replications
-                            sucrose_derivative = element.calculate_sucrose_derivative(element.S_Sucrose, element.D_Starch, element.Loading_Sucrose, element.S_Fructan,
-                                                                                      element.D_Fructan, element.sum_respi)
-                            triosesP_derivative = element.calculate_triosesP_derivative(element.Photosynthesis, element.S_Sucrose, element.S_Starch, element.S_Amino_Acids)
-                            fructan_derivative = element.calculate_fructan_derivative(element.S_Fructan, element.D_Fructan)
-                            nitrates_derivative = element.calculate_nitrates_derivative(element.Nitrates_import, element.S_Amino_Acids)
-                            amino_acids_derivative = element.calculate_amino_acids_derivative(element.Amino_Acids_import, element.S_Amino_Acids, element.S_Proteins, element.D_Proteins,
-                                                                                              element.Loading_Amino_Acids)
-                            proteins_derivative = element.calculate_proteins_derivative(element.S_Proteins, element.D_Proteins)
-                            cytokinins_derivative = element.calculate_cytokinins_derivative(element.cytokinins_import, element.D_cytokinins)
-
-                            y_derivatives[self.initial_conditions_mapping[element]['starch']] = starch_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['sucrose']] = sucrose_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['triosesP']] = triosesP_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['fructan']] = fructan_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['nitrates']] = nitrates_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['amino_acids']] = amino_acids_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['proteins']] = proteins_derivative
-                            y_derivatives[self.initial_conditions_mapping[element]['cytokinins']] = cytokinins_derivative
-
-                    if phytomer.hiddenzone is not None:
-                        # Unloading of sucrose from phloem
-                        hiddenzone.Unloading_Sucrose = hiddenzone.calculate_Unloading_Sucrose(hiddenzone.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
-
-                        # Unloading of AA from phloem
-                        hiddenzone.Unloading_Amino_Acids = hiddenzone.calculate_Unloading_Amino_Acids(hiddenzone.amino_acids, axis.phloem.amino_acids, axis.mstruct, plant.T_effect_conductivity)
-
-                        # Fructan synthesis
-                        Regul_Sfructanes = hiddenzone.calculate_Regul_S_Fructan(hiddenzone.Unloading_Sucrose)
-                        hiddenzone.S_Fructan = hiddenzone.calculate_S_Fructan(hiddenzone.sucrose, Regul_Sfructanes, plant.T_effect_Vmax)
-
-                        # Fructan degradation
-                        hiddenzone.D_Fructan = hiddenzone.calculate_D_Fructan(hiddenzone.sucrose, hiddenzone.fructan, plant.T_effect_Vmax)
-
-                        # Synthesis proteins
-                        hiddenzone.S_Proteins = hiddenzone.calculate_S_proteins(hiddenzone.amino_acids, plant.T_effect_Vmax)
-
-                        # Degradation proteins
-                        hiddenzone.D_Proteins = hiddenzone.calculate_D_Proteins(hiddenzone.proteins, plant.T_effect_Vmax)
-
-                        # Residual respiration
-                        hiddenzone.R_residual = self.respiration_model.RespirationModel.R_residual(hiddenzone.sucrose,
-                                                                                                                             hiddenzone.mstruct * hiddenzone.__class__.PARAMETERS.ALPHA,
-                                                                                                                             hiddenzone.Total_Organic_Nitrogen,
-                                                                                                                             plant.Tair)
-                        sum_respi_shoot += hiddenzone.R_residual * hiddenzone.nb_replications
-
-                        # compute the derivatives of the hidden zone
-                        y_derivatives[self.initial_conditions_mapping[hiddenzone]['sucrose']] = hiddenzone.calculate_sucrose_derivative(hiddenzone.Unloading_Sucrose, hiddenzone.S_Fructan,
-                                                                                                                                        hiddenzone.D_Fructan,
-                                                                                                                                        hiddenzone_Loading_Sucrose_contribution, hiddenzone.R_residual)
-                        y_derivatives[self.initial_conditions_mapping[hiddenzone]['amino_acids']] = hiddenzone.calculate_amino_acids_derivative(hiddenzone.Unloading_Amino_Acids, hiddenzone.S_Proteins,
-                                                                                                                                                hiddenzone.D_Proteins,
-                                                                                                                                                hiddenzone_Loading_Amino_Acids_contribution)
-                        y_derivatives[self.initial_conditions_mapping[hiddenzone]['fructan']] = hiddenzone.calculate_fructan_derivative(hiddenzone.S_Fructan, hiddenzone.D_Fructan)
-                        y_derivatives[self.initial_conditions_mapping[hiddenzone]['proteins']] = hiddenzone.calculate_proteins_derivative(hiddenzone.S_Proteins, hiddenzone.D_Proteins)
-
-                if axis.grains is not None:
-                    phloem_contributors.append(axis.grains)
-                    # compute the derivative of each compartment of grains
-                    axis.grains.structure = y[self.initial_conditions_mapping[axis.grains]['structure']]
-                    axis.grains.starch = y[self.initial_conditions_mapping[axis.grains]['starch']]
-                    axis.grains.proteins = y[self.initial_conditions_mapping[axis.grains]['proteins']]
-                    axis.grains.age_from_flowering = y[self.initial_conditions_mapping[axis.grains]['age_from_flowering']]
-
-                    # intermediate variables
-                    T_effect_growth = axis.grains.calculate_temperature_effect_on_growth(plant.Tair)
-                    axis.grains.RGR_Structure = axis.grains.calculate_RGR_Structure(axis.phloem.sucrose, axis.mstruct, T_effect_growth)
-                    axis.grains.structural_dry_mass = axis.grains.calculate_structural_dry_mass(axis.grains.structure)
-
-                    # flows
-                    axis.grains.S_grain_structure = axis.grains.calculate_S_grain_structure(axis.grains.structure, axis.grains.RGR_Structure)
-                    axis.grains.S_grain_starch = axis.grains.calculate_S_grain_starch(axis.phloem.sucrose, axis.mstruct, plant.T_effect_Vmax)
-                    axis.grains.S_Proteins = axis.grains.calculate_S_proteins(axis.grains.S_grain_structure, axis.grains.S_grain_starch, axis.phloem.amino_acids, axis.phloem.sucrose,
-                                                                              axis.grains.structural_dry_mass)
-                    # compartments derivatives
-                    axis.grains.R_grain_growth_struct, axis.grains.R_grain_growth_starch = self.respiration_model.RespirationModel.R_grain_growth(axis.grains.S_grain_structure,
-                                                                                                                                                  axis.grains.S_grain_starch,
-                                                                                                                                                  axis.grains.structural_dry_mass)
-                    sum_respi_shoot += axis.grains.R_grain_growth_struct + axis.grains.R_grain_growth_starch
-                    structure_derivative = axis.grains.calculate_structure_derivative(axis.grains.S_grain_structure, axis.grains.R_grain_growth_struct)
-                    starch_derivative = axis.grains.calculate_starch_derivative(axis.grains.S_grain_starch, axis.grains.structural_dry_mass, axis.grains.R_grain_growth_starch)
-                    proteins_derivative = axis.grains.calculate_proteins_derivative(axis.grains.S_Proteins)
-                    y_derivatives[self.initial_conditions_mapping[axis.grains]['structure']] = structure_derivative
-                    y_derivatives[self.initial_conditions_mapping[axis.grains]['starch']] = starch_derivative
-                    y_derivatives[self.initial_conditions_mapping[axis.grains]['proteins']] = proteins_derivative
-                    y_derivatives[self.initial_conditions_mapping[axis.grains]['age_from_flowering']] += (self.delta_t * T_effect_growth) #TODO: create a function
-
-                # compute the derivative of each compartment of roots
-                # flows
-                axis.roots.Unloading_Sucrose = axis.roots.calculate_Unloading_Sucrose(axis.roots.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
-                axis.roots.Unloading_Amino_Acids = axis.roots.calculate_Unloading_Amino_Acids(axis.roots.Unloading_Sucrose, axis.phloem.sucrose, axis.phloem.amino_acids)
-                axis.roots.S_Amino_Acids = axis.roots.calculate_S_amino_acids(axis.roots.nitrates, axis.roots.sucrose, soil.T_effect_Vmax)
-                axis.roots.R_Nnit_red, axis.roots.S_Amino_Acids = self.respiration_model.RespirationModel.R_Nnit_red(axis.roots.S_Amino_Acids, axis.roots.sucrose,
-                                                                                                                     axis.roots.mstruct * model.Roots.PARAMETERS.ALPHA, root=True)
-                axis.roots.C_exudation, axis.roots.N_exudation = axis.roots.calculate_exudation(axis.roots.Unloading_Sucrose, axis.roots.sucrose, axis.roots.amino_acids, axis.phloem.amino_acids)
-                axis.roots.S_cytokinins = axis.roots.calculate_S_cytokinins(axis.roots.sucrose, axis.roots.nitrates, soil.T_effect_Vmax)
-
-                # compartments derivatives
-                axis.roots.R_residual = self.respiration_model.RespirationModel.R_residual(axis.roots.sucrose, axis.roots.mstruct * model.Roots.PARAMETERS.ALPHA, axis.roots.Total_Organic_Nitrogen,
-                                                                                              soil.Tsoil)
-                axis.roots.sum_respi = axis.roots.R_Nnit_upt + axis.roots.R_Nnit_red + axis.roots.R_residual
-                sucrose_derivative = axis.roots.calculate_sucrose_derivative(axis.roots.Unloading_Sucrose, axis.roots.S_Amino_Acids, axis.roots.C_exudation, axis.roots.sum_respi)
-                nitrates_derivative = axis.roots.calculate_nitrates_derivative(axis.roots.Uptake_Nitrates, axis.roots.Export_Nitrates, axis.roots.S_Amino_Acids)
-                amino_acids_derivative = axis.roots.calculate_amino_acids_derivative(axis.roots.Unloading_Amino_Acids, axis.roots.S_Amino_Acids, axis.roots.Export_Amino_Acids, axis.roots.N_exudation)
-                cytokinins_derivative = axis.roots.calculate_cytokinins_derivative(axis.roots.S_cytokinins, axis.roots.Export_cytokinins)
-
-                y_derivatives[self.initial_conditions_mapping[axis.roots]['sucrose']] = sucrose_derivative
-                y_derivatives[self.initial_conditions_mapping[axis.roots]['nitrates']] = nitrates_derivative
-                y_derivatives[self.initial_conditions_mapping[axis.roots]['amino_acids']] = amino_acids_derivative
-                y_derivatives[self.initial_conditions_mapping[axis.roots]['cytokinins']] = cytokinins_derivative
-
-                # compute the derivative of each compartment of phloem
-                sucrose_phloem_derivative = axis.phloem.calculate_sucrose_derivative(phloem_contributors)
-                amino_acids_phloem_derivative = axis.phloem.calculate_amino_acids_derivative(phloem_contributors)
-                y_derivatives[self.initial_conditions_mapping[axis.phloem]['sucrose']] = sucrose_phloem_derivative
-                y_derivatives[self.initial_conditions_mapping[axis.phloem]['amino_acids']] = amino_acids_phloem_derivative
-
-                # compute the derivative of each compartment of axis
-                C_exudated = axis.calculate_C_exudated(axis.roots.C_exudation, axis.roots.N_exudation, axis.roots.mstruct)
-                y_derivatives[self.initial_conditions_mapping[axis]['C_exudated']] += C_exudated
-                y_derivatives[self.initial_conditions_mapping[axis]['sum_respi_roots']] += axis.roots.sum_respi
-                y_derivatives[self.initial_conditions_mapping[axis]['sum_respi_shoot']] += sum_respi_shoot
+                soil = next(axes_soils)
+                self._calculate_axis_derivatives(plant, axis, soil, y_derivatives)
+                soils_contributors.setdefault(soil, []).append((axis.roots.Uptake_Nitrates, plant.index))
 
         # compute the derivative of each compartment of soil
-        soil.mineralisation = soil.calculate_mineralisation(soil.T_effect_Vmax)
-        y_derivatives[self.initial_conditions_mapping[soil]['nitrates']] = soil.calculate_nitrates_derivative(soil.mineralisation, soil_contributors, self.culm_density, soil.constant_Conc_Nitrates)
+        for soil, soil_contributors in soils_contributors.items():
+            soil.mineralisation = soil.calculate_mineralisation(soil.T_effect_Vmax)
+            y_derivatives[self.initial_conditions_mapping[soil]['nitrates']] = soil.calculate_nitrates_derivative(soil.mineralisation, soil_contributors, self.culm_density,
+                                                                                                                    soil.constant_Conc_Nitrates)
 
         if self.show_progressbar:
             self.progressbar.update(t)
@@ -1118,4 +1856,484 @@ class Simulation(object):
         if logger.isEnabledFor(logging.DEBUG) and derivatives_logger.isEnabledFor(logging.DEBUG):
             self._log_compartments(t_abs, y_derivatives, Simulation.LOGGERS_NAMES['derivatives'])
 
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(self._run_start_time + t, y, y_derivatives)
+
         return y_derivatives
+
+    def _calculate_axis_derivatives(self, plant, axis, soil, y_derivatives):
+        """Compute the derivatives of the compartments of `axis` and set them in `y_derivatives`.
+        The compartments of the model objects of `axis` must have been set, as well as the temperature effects of `plant` and `soil`,
+        and the concentration of nitrates in `soil`. The other compartments of `y_derivatives` are not modified.
+
+        :param model.Plant plant: the plant of the axis.
+        :param model.Axis axis: the axis.
+        :param model.Soil soil: the soil of the axis.
+        :param numpy.ndarray y_derivatives: the derivatives of all the compartments.
+        """
+        sum_respi_shoot = 0.0
+
+        # Phloem
+        phloem_contributors = []
+        # Roots
+        phloem_contributors.append(axis.roots)
+
+        # compute total transpiration at t_inf
+        axis.Total_Transpiration = 0.0  # mmol s-1
+        total_green_area = 0.0  # m2
+        for phytomer in axis.phytomers:
+            for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
+                if organ is not None:
+                    for element in (organ.exposed_element, organ.enclosed_element):
+                        if element is not None and element.green_area > 0:
+                            element.Transpiration = element.calculate_Total_Transpiration(element.Tr, element.green_area)
+                            axis.Total_Transpiration += (element.Transpiration * element.nb_replications)
+                            total_green_area += (element.green_area * element.nb_replications)
+
+        # Compute the regulating factor of root exports by shoot transpiration
+        axis.roots.regul_transpiration = axis.roots.calculate_regul_transpiration(axis.Total_Transpiration)
+
+        # compute the flows from/to the roots to/from photosynthetic organs
+        axis.roots.Uptake_Nitrates, axis.roots.HATS_LATS = axis.roots.calculate_Uptake_Nitrates(soil.Conc_Nitrates_Soil, axis.roots.nitrates, axis.roots.sucrose,
+                                                                                                soil.T_effect_Vmax)
+        axis.roots.R_Nnit_upt = self.respiration_model.RespirationModel.R_Nnit_upt(axis.roots.Uptake_Nitrates, axis.roots.sucrose)
+        axis.roots.Export_Nitrates = axis.roots.calculate_Export_Nitrates(axis.roots.nitrates, axis.roots.regul_transpiration)
+        axis.roots.Export_Amino_Acids = axis.roots.calculate_Export_Amino_Acids(axis.roots.amino_acids, axis.roots.regul_transpiration)
+        axis.roots.Export_cytokinins = axis.roots.calculate_Export_cytokinins(axis.roots.cytokinins, axis.roots.regul_transpiration)
+
+        # compute the derivative of each photosynthetic organ element compartment
+        for phytomer in axis.phytomers:
+            # Hidden zone
+            hiddenzone = phytomer.hiddenzone
+            if phytomer.hiddenzone is not None:
+                if hiddenzone.mstruct == 0:
+                    continue
+                phloem_contributors.append(hiddenzone)
+
+            hiddenzone_Loading_Sucrose_contribution = 0
+            hiddenzone_Loading_Amino_Acids_contribution = 0
+            for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
+                if organ is None:
+                    continue
+
+                for element in (organ.exposed_element, organ.enclosed_element):
+                    if element is None or element.green_area <= 0.25E-6 or element.mstruct <= 0.0:
+                        continue
+
+                    # intermediate variables
+                    element.Photosynthesis = element.calculate_total_Photosynthesis(element.Ag, element.green_area)
+
+                    # flows
+                    if element.is_growing:  #: Export of sucrose and amino acids towards the HZ. Several growing elements might export toward the HZ at the same time (leaf and internode)
+                        element.Loading_Sucrose = element.calculate_export_sucrose(element.sucrose, hiddenzone.sucrose, hiddenzone.mstruct, plant.T_effect_conductivity,
+                                                                                   hiddenzone.PARAMETERS)
+                        hiddenzone_Loading_Sucrose_contribution += element.Loading_Sucrose
+                        element.Loading_Amino_Acids = element.calculate_Export_Amino_Acids(element.amino_acids, hiddenzone.amino_acids, hiddenzone.mstruct, plant.T_effect_conductivity,
+                                                                                          hiddenzone.PARAMETERS)
+                        hiddenzone_Loading_Amino_Acids_contribution += element.Loading_Amino_Acids
+
+                    else:  #: Loading of sucrose and amino acids towards the phloem
+                        phloem_contributors.append(element)
+                        element.Loading_Sucrose = element.calculate_Loading_Sucrose(element.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
+                        element.Loading_Amino_Acids = element.calculate_Loading_Amino_Acids(element.amino_acids, axis.phloem.amino_acids, axis.mstruct, plant.T_effect_conductivity)
+
+                    element.Regul_S_Fructan = element.calculate_Regul_S_Fructan(element.Loading_Sucrose)
+                    element.S_Fructan = element.calculate_S_Fructan(element.sucrose, element.Regul_S_Fructan, plant.T_effect_Vmax)
+                    element.D_Fructan = element.calculate_D_Fructan(element.sucrose, element.fructan, plant.T_effect_Vmax)
+                    element.S_Starch = element.calculate_S_Starch(element.triosesP, plant.T_effect_Vmax)
+                    element.D_Starch = element.calculate_D_Starch(element.starch, plant.T_effect_Vmax)
+                    element.S_Sucrose = element.calculate_S_Sucrose(element.triosesP, plant.T_effect_Vmax)
+                    element.R_phloem_loading, element.Loading_Sucrose = self.respiration_model.RespirationModel.R_phloem(element.Loading_Sucrose,
+                                                                                                                         element.mstruct * element.PARAMETERS.ALPHA)
+                    element.Nitrates_import = element.calculate_Nitrates_import(axis.roots.Export_Nitrates, element.Transpiration, axis.Total_Transpiration)
+                    element.Amino_Acids_import = element.calculate_Amino_Acids_import(axis.roots.Export_Amino_Acids, element.Transpiration, axis.Total_Transpiration)
+                    element.S_Amino_Acids = element.calculate_S_amino_acids(element.nitrates, element.triosesP, plant.T_effect_Vmax)
+                    element.R_Nnit_red, element.S_Amino_Acids = self.respiration_model.RespirationModel.R_Nnit_red(element.S_Amino_Acids, element.sucrose,
+                                                                                                                   element.mstruct * element.PARAMETERS.ALPHA)
+                    element.S_Proteins = element.calculate_S_proteins(element.amino_acids, plant.T_effect_Vmax)
+                    element.D_Proteins = element.calculate_D_Proteins(element.proteins, element.cytokinins, plant.T_effect_Vmax)
+                    element.cytokinins_import = element.calculate_cytokinins_import(axis.roots.Export_cytokinins, element.Transpiration, axis.Total_Transpiration)
+                    element.D_cytokinins = element.calculate_D_cytokinins(element.cytokinins, plant.T_effect_Vmax)
+
+                    # compartments derivatives
+                    starch_derivative = element.calculate_starch_derivative(element.S_Starch, element.D_Starch)
+                    element.R_residual = self.respiration_model.RespirationModel.R_residual(element.sucrose, element.mstruct * element.PARAMETERS.ALPHA,
+                                                                                                                   element.Total_Organic_Nitrogen, element.Ts)
+                    element.sum_respi = element.R_phloem_loading + element.R_Nnit_red + element.R_residual
+                    sum_respi_shoot += element.sum_respi * element.nb_replications
+                    sucrose_derivative = element.calculate_sucrose_derivative(element.S_Sucrose, element.D_Starch, element.Loading_Sucrose, element.S_Fructan,
+                                                                              element.D_Fructan, element.sum_respi)
+                    triosesP_derivative = element.calculate_triosesP_derivative(element.Photosynthesis, element.S_Sucrose, element.S_Starch, element.S_Amino_Acids)
+                    fructan_derivative = element.calculate_fructan_derivative(element.S_Fructan, element.D_Fructan)
+                    nitrates_derivative = element.calculate_nitrates_derivative(element.Nitrates_import, element.S_Amino_Acids)
+                    amino_acids_derivative = element.calculate_amino_acids_derivative(element.Amino_Acids_import, element.S_Amino_Acids, element.S_Proteins, element.D_Proteins,
+                                                                                      element.Loading_Amino_Acids)
+                    proteins_derivative = element.calculate_proteins_derivative(element.S_Proteins, element.D_Proteins)
+                    cytokinins_derivative = element.calculate_cytokinins_derivative(element.cytokinins_import, element.D_cytokinins)
+
+                    y_derivatives[self.initial_conditions_mapping[element]['starch']] = starch_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['sucrose']] = sucrose_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['triosesP']] = triosesP_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['fructan']] = fructan_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['nitrates']] = nitrates_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['amino_acids']] = amino_acids_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['proteins']] = proteins_derivative
+                    y_derivatives[self.initial_conditions_mapping[element]['cytokinins']] = cytokinins_derivative
+
+            if phytomer.hiddenzone is not None:
+                # Unloading of sucrose from phloem
+                hiddenzone.Unloading_Sucrose = hiddenzone.calculate_Unloading_Sucrose(hiddenzone.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
+
+                # Unloading of AA from phloem
+                hiddenzone.Unloading_Amino_Acids = hiddenzone.calculate_Unloading_Amino_Acids(hiddenzone.amino_acids, axis.phloem.amino_acids, axis.mstruct, plant.T_effect_conductivity)
+
+                # Fructan synthesis
+                Regul_Sfructanes = hiddenzone.calculate_Regul_S_Fructan(hiddenzone.Unloading_Sucrose)
+                hiddenzone.S_Fructan = hiddenzone.calculate_S_Fructan(hiddenzone.sucrose, Regul_Sfructanes, plant.T_effect_Vmax)
+
+                # Fructan degradation
+                hiddenzone.D_Fructan = hiddenzone.calculate_D_Fructan(hiddenzone.sucrose, hiddenzone.fructan, plant.T_effect_Vmax)
+
+                # Synthesis proteins
+                hiddenzone.S_Proteins = hiddenzone.calculate_S_proteins(hiddenzone.amino_acids, plant.T_effect_Vmax)
+
+                # Degradation proteins
+                hiddenzone.D_Proteins = hiddenzone.calculate_D_Proteins(hiddenzone.proteins, plant.T_effect_Vmax)
+
+                # Residual respiration
+                hiddenzone.R_residual = self.respiration_model.RespirationModel.R_residual(hiddenzone.sucrose,
+                                                                                                                     hiddenzone.mstruct * hiddenzone.PARAMETERS.ALPHA,
+                                                                                                                     hiddenzone.Total_Organic_Nitrogen,
+                                                                                                                     plant.Tair)
+                sum_respi_shoot += hiddenzone.R_residual * hiddenzone.nb_replications
+
+                # compute the derivatives of the hidden zone
+                y_derivatives[self.initial_conditions_mapping[hiddenzone]['sucrose']] = hiddenzone.calculate_sucrose_derivative(hiddenzone.Unloading_Sucrose, hiddenzone.S_Fructan,
+                                                                                                                                hiddenzone.D_Fructan,
+                                                                                                                                hiddenzone_Loading_Sucrose_contribution, hiddenzone.R_residual)
+                y_derivatives[self.initial_conditions_mapping[hiddenzone]['amino_acids']] = hiddenzone.calculate_amino_acids_derivative(hiddenzone.Unloading_Amino_Acids, hiddenzone.S_Proteins,
+                                                                                                                                        hiddenzone.D_Proteins,
+                                                                                                                                        hiddenzone_Loading_Amino_Acids_contribution)
+                y_derivatives[self.initial_conditions_mapping[hiddenzone]['fructan']] = hiddenzone.calculate_fructan_derivative(hiddenzone.S_Fructan, hiddenzone.D_Fructan)
+                y_derivatives[self.initial_conditions_mapping[hiddenzone]['proteins']] = hiddenzone.calculate_proteins_derivative(hiddenzone.S_Proteins, hiddenzone.D_Proteins)
+
+        if axis.grains is not None:
+            phloem_contributors.append(axis.grains)
+            # compute the derivative of each compartment of grains
+            # intermediate variables
+            T_effect_growth = axis.grains.calculate_temperature_effect_on_growth(plant.Tair)
+            axis.grains.RGR_Structure = axis.grains.calculate_RGR_Structure(axis.phloem.sucrose, axis.mstruct, T_effect_growth)
+            axis.grains.structural_dry_mass = axis.grains.calculate_structural_dry_mass(axis.grains.structure)
+
+            # flows
+            axis.grains.S_grain_structure = axis.grains.calculate_S_grain_structure(axis.grains.structure, axis.grains.RGR_Structure)
+            axis.grains.S_grain_starch = axis.grains.calculate_S_grain_starch(axis.phloem.sucrose, axis.mstruct, plant.T_effect_Vmax)
+            axis.grains.S_Proteins = axis.grains.calculate_S_proteins(axis.grains.S_grain_structure, axis.grains.S_grain_starch, axis.phloem.amino_acids, axis.phloem.sucrose,
+                                                                      axis.grains.structural_dry_mass)
+            # compartments derivatives
+            axis.grains.R_grain_growth_struct, axis.grains.R_grain_growth_starch = self.respiration_model.RespirationModel.R_grain_growth(axis.grains.S_grain_structure,
+                                                                                                                                          axis.grains.S_grain_starch,
+                                                                                                                                          axis.grains.structural_dry_mass)
+            sum_respi_shoot += axis.grains.R_grain_growth_struct + axis.grains.R_grain_growth_starch
+            structure_derivative = axis.grains.calculate_structure_derivative(axis.grains.S_grain_structure, axis.grains.R_grain_growth_struct)
+            starch_derivative = axis.grains.calculate_starch_derivative(axis.grains.S_grain_starch, axis.grains.structural_dry_mass, axis.grains.R_grain_growth_starch)
+            proteins_derivative = axis.grains.calculate_proteins_derivative(axis.grains.S_Proteins)
+            y_derivatives[self.initial_conditions_mapping[axis.grains]['structure']] = structure_derivative
+            y_derivatives[self.initial_conditions_mapping[axis.grains]['starch']] = starch_derivative
+            y_derivatives[self.initial_conditions_mapping[axis.grains]['proteins']] = proteins_derivative
+            y_derivatives[self.initial_conditions_mapping[axis.grains]['age_from_flowering']] += (self.delta_t * T_effect_growth) #TODO: create a function
+
+        # compute the derivative of each compartment of roots
+        # flows
+        axis.roots.Unloading_Sucrose = axis.roots.calculate_Unloading_Sucrose(axis.roots.sucrose, axis.phloem.sucrose, axis.mstruct, plant.T_effect_conductivity)
+        axis.roots.Unloading_Amino_Acids = axis.roots.calculate_Unloading_Amino_Acids(axis.roots.Unloading_Sucrose, axis.phloem.sucrose, axis.phloem.amino_acids)
+        axis.roots.S_Amino_Acids = axis.roots.calculate_S_amino_acids(axis.roots.nitrates, axis.roots.sucrose, soil.T_effect_Vmax)
+        axis.roots.R_Nnit_red, axis.roots.S_Amino_Acids = self.respiration_model.RespirationModel.R_Nnit_red(axis.roots.S_Amino_Acids, axis.roots.sucrose,
+                                                                                                             axis.roots.mstruct * axis.roots.PARAMETERS.ALPHA, root=True)
+        axis.roots.C_exudation, axis.roots.N_exudation = axis.roots.calculate_exudation(axis.roots.Unloading_Sucrose, axis.roots.sucrose, axis.roots.amino_acids, axis.phloem.amino_acids)
+        axis.roots.S_cytokinins = axis.roots.calculate_S_cytokinins(axis.roots.sucrose, axis.roots.nitrates, soil.T_effect_Vmax)
+
+        # compartments derivatives
+        axis.roots.R_residual = self.respiration_model.RespirationModel.R_residual(axis.roots.sucrose, axis.roots.mstruct * axis.roots.PARAMETERS.ALPHA, axis.roots.Total_Organic_Nitrogen,
+                                                                                      soil.Tsoil)
+        axis.roots.sum_respi = axis.roots.R_Nnit_upt + axis.roots.R_Nnit_red + axis.roots.R_residual
+        sucrose_derivative = axis.roots.calculate_sucrose_derivative(axis.roots.Unloading_Sucrose, axis.roots.S_Amino_Acids, axis.roots.C_exudation, axis.roots.sum_respi)
+        nitrates_derivative = axis.roots.calculate_nitrates_derivative(axis.roots.Uptake_Nitrates, axis.roots.Export_Nitrates, axis.roots.S_Amino_Acids)
+        amino_acids_derivative = axis.roots.calculate_amino_acids_derivative(axis.roots.Unloading_Amino_Acids, axis.roots.S_Amino_Acids, axis.roots.Export_Amino_Acids, axis.roots.N_exudation)
+        cytokinins_derivative = axis.roots.calculate_cytokinins_derivative(axis.roots.S_cytokinins, axis.roots.Export_cytokinins)
+
+        y_derivatives[self.initial_conditions_mapping[axis.roots]['sucrose']] = sucrose_derivative
+        y_derivatives[self.initial_conditions_mapping[axis.roots]['nitrates']] = nitrates_derivative
+        y_derivatives[self.initial_conditions_mapping[axis.roots]['amino_acids']] = amino_acids_derivative
+        y_derivatives[self.initial_conditions_mapping[axis.roots]['cytokinins']] = cytokinins_derivative
+
+        # compute the derivative of each compartment of phloem
+        sucrose_phloem_derivative = axis.phloem.calculate_sucrose_derivative(phloem_contributors)
+        amino_acids_phloem_derivative = axis.phloem.calculate_amino_acids_derivative(phloem_contributors)
+        y_derivatives[self.initial_conditions_mapping[axis.phloem]['sucrose']] = sucrose_phloem_derivative
+        y_derivatives[self.initial_conditions_mapping[axis.phloem]['amino_acids']] = amino_acids_phloem_derivative
+
+        # compute the derivative of each compartment of axis
+        C_exudated = axis.calculate_C_exudated(axis.roots.C_exudation, axis.roots.N_exudation, axis.roots.mstruct)
+        y_derivatives[self.initial_conditions_mapping[axis]['C_exudated']] += C_exudated
+        y_derivatives[self.initial_conditions_mapping[axis]['sum_respi_roots']] += axis.roots.sum_respi
+        y_derivatives[self.initial_conditions_mapping[axis]['sum_respi_shoot']] += sum_respi_shoot
+
+
+class EnsembleSimulation(Simulation):
+    """
+    The EnsembleSimulation class permits to integrate several members, which share the same population and soils but not the same internal parameters,
+    as one system integrated by a single call to the solver.
+
+    At initialization, the population and the soils are copied for each member, and the plants of the copies are renumbered
+    so that the members are gathered into one population. The derivatives of all the members are computed at once by the vectorized engine
+    (see :class:`cnwheat.vectorized.VectorizedSystem`), each member having its own soil, and the members are not coupled:
+    the Jacobian of the system is block-diagonal.
+
+    Only the internal parameters which are gathered into arrays by the vectorized engine can differ between the members:
+    the parameters :attr:`cnwheat.vectorized.ELEMENTS_PARAMETERS` of the photosynthetic organ elements, and the parameters of the roots.
+
+    Use :func:`cnwheat.converter.ensemble_to_dataframes` to convert the members to dataframes.
+
+    :param class respiration_model: the model of respiration to use (see :class:`Simulation`).
+    :param list [dict] members_parameters: the internal parameters of each member: [{model_class_name: {parameter_name: value, ...}, ...}, ...],
+           where `model_class_name` is the name of a class of photosynthetic organ elements (e.g. `'LaminaElement'`), `'PhotosyntheticOrganElement'`
+           for all the photosynthetic organ elements, or `'Roots'`. The parameters which are not set keep the values of the parameters of the model objects.
+    :param kwargs: the other parameters of :class:`Simulation`. `engine` must be `'vectorized'` (default) and `axes_splitting` must be `None` (default).
+    """
+
+    def __init__(self, respiration_model, members_parameters, **kwargs):
+
+        logger = logging.getLogger(__name__)
+
+        kwargs.setdefault('engine', 'vectorized')
+        if kwargs['engine'] != 'vectorized' or kwargs.get('axes_splitting') is not None:
+            message = """The ensemble integration is only available with the `vectorized` engine, without splitting of the axes. 
+        Please set `engine` to `vectorized` and `axes_splitting` to `None` (through the EnsembleSimulation constructor)."""
+            logger.exception(message)
+            raise SimulationConstructionError(message)
+
+        for member_parameters in members_parameters:
+            for model_class_name, parameters_values in member_parameters.items():
+                model_class = getattr(model, model_class_name, None)
+                if model_class is model.Roots:
+                    parameters_names = set(vars(model.Roots.PARAMETERS))
+                elif isinstance(model_class, type) and issubclass(model_class, model.PhotosyntheticOrganElement):
+                    parameters_names = set(vectorized.ELEMENTS_PARAMETERS)
+                else:
+                    message = 'The parameters of `{}` cannot differ between the members of the ensemble. Please choose a class among `Roots` and the classes of photosynthetic organ elements.'.format(model_class_name)
+                    logger.exception(message)
+                    raise SimulationConstructionError(message)
+                unknown_parameters_names = sorted(set(parameters_values).difference(parameters_names))
+                if len(unknown_parameters_names) != 0:
+                    message = 'The parameters {} of `{}` cannot differ between the members of the ensemble.'.format(unknown_parameters_names, model_class_name)
+                    logger.exception(message)
+                    raise SimulationConstructionError(message)
+
+        super(EnsembleSimulation, self).__init__(respiration_model, **kwargs)
+
+        self.members_parameters = list(members_parameters)  #: the internal parameters of each member
+        self.members_culm_density = self.culm_density  #: culm density of the plants of the population shared by the members (culm m-2)
+        self.members_populations = []  #: the population of each member
+        self.members_soils = []  #: the soils of each member: {(plant_index, axis_label): soil_object, ...}, with the indexes of the plants in :attr:`population`
+        self.members_plants_indexes = []  #: the index of the plants of each member in the population passed to :meth:`initialize`: {plant_index: initial_plant_index, ...}
+        self._axes_soils = []  #: the soil of each axis of :attr:`population`
+
+    def initialize(self, population, soils, Tair=12, Tsoil=12, force_validation=False):
+        """
+        Copy `population` and `soils` for each member, and initialize the simulation from the copies (see :meth:`Simulation.initialize`).
+
+        :param model.Population population: the population of plants shared by the members.
+        :param dict soils: the soil associated to each axis of `population` (see :attr:`soils`).
+        :param float Tair: air temperature (C)
+        :param float Tsoil: soil temperature (C)
+        :param bool force_validation: if True, check the consistency of the population even if its topology did not change.
+        """
+        del self.members_populations[:]
+        del self.members_soils[:]
+        del self.members_plants_indexes[:]
+        del self._axes_soils[:]
+        ensemble_plants = []
+        ensemble_soils = {}
+        ensemble_culm_density = {} if self.members_culm_density is not None else None
+
+        for _ in self.members_parameters:
+            member_population, member_soils = copy.deepcopy((population, soils))
+            plants_indexes = {}
+            new_plants_indexes = {}
+            self._axes_soils.extend(self._get_axes_soils(member_population, member_soils))
+            for plant in member_population.plants:
+                new_plant_index = len(ensemble_plants) + 1
+                plants_indexes[new_plant_index] = plant.index
+                new_plants_indexes[plant.index] = new_plant_index
+                if ensemble_culm_density is not None:
+                    ensemble_culm_density[new_plant_index] = self.members_culm_density[plant.index]
+                plant.index = new_plant_index
+                ensemble_plants.append(plant)
+            member_soils = {(new_plants_indexes[plant_index], axis_label): soil for (plant_index, axis_label), soil in member_soils.items()
+                            if plant_index in new_plants_indexes}
+            ensemble_soils.update(member_soils)
+            self.members_populations.append(member_population)
+            self.members_soils.append(member_soils)
+            self.members_plants_indexes.append(plants_indexes)
+
+        self.culm_density = ensemble_culm_density
+        super(EnsembleSimulation, self).initialize(model.Population(ensemble_plants), ensemble_soils, Tair, Tsoil, force_validation)
+
+    def load_checkpoint(self, path, update_parameters=None):
+        """The checkpoints of an ensemble are not supported: :meth:`initialize` would replicate the population of the checkpoint for each member.
+
+        :param str path: the path of the checkpoint file to read.
+        :param dict update_parameters: the parameters updated when the population of the checkpoint was built.
+        """
+        message = 'The checkpoints of an ensemble of members are not supported.'
+        logger = logging.getLogger(__name__)
+        logger.exception(message)
+        raise SimulationInitializationError(message)
+
+    def _get_axes_soils(self, population=None, soils=None):
+        """Return the soil of each axis of `population`. The soil of each axis of :attr:`population` is the soil of its member.
+
+        :param model.Population population: the population of a member. Default is `None`: :attr:`population`.
+        :param dict soils: the soils of the member. Default is `None`: :attr:`soils`.
+
+        :return: The soil of each axis.
+        :rtype: list [model.Soil]
+        """
+        if population is None:
+            return self._axes_soils
+        return super(EnsembleSimulation, self)._get_axes_soils(population, soils)
+
+    def _build_vectorized_system(self):
+        """Build the struct-of-arrays view of :attr:`population`, with the soil and the internal parameters of each member.
+
+        :return: The struct-of-arrays view of :attr:`population`.
+        :rtype: cnwheat.vectorized.VectorizedSystem
+        """
+        vectorized_system = super(EnsembleSimulation, self)._build_vectorized_system()
+        for member_population, member_parameters in zip(self.members_populations, self.members_parameters):
+            # the parameters of all the photosynthetic organ elements are set before the parameters of the specific classes of elements
+            for model_class_name, parameters_values in sorted(member_parameters.items(), key=lambda item: item[0] != 'PhotosyntheticOrganElement'):
+                model_class = getattr(model, model_class_name)
+                model_objects = [model_object for plant in member_population.plants for axis in plant.axes for model_object in layout.axis_model_objects(axis)
+                                 if isinstance(model_object, model_class)]
+                vectorized_system.set_parameters(model_objects, parameters_values)
+        return vectorized_system
+
+    def _build_jacobian_sparsity(self):
+        """Build the sparsity structure of the Jacobian matrix of the system (see :meth:`Simulation._build_jacobian_sparsity`),
+        without the couplings between the members.
+
+        :return: The sparsity structure of the Jacobian matrix, of shape (n, n) where n is the number of compartments.
+        :rtype: scipy.sparse.csc_matrix
+        """
+        compartments_members = np.zeros(self.layout.size, dtype=int)
+        for member, (member_population, member_soils) in enumerate(zip(self.members_populations, self.members_soils)):
+            member_model_objects = list(member_soils.values())
+            for plant in member_population.plants:
+                member_model_objects.append(plant)
+                for axis in plant.axes:
+                    member_model_objects.extend(layout.axis_model_objects(axis))
+            for model_object in member_model_objects:
+                compartments_members[list(self.layout.mapping[model_object].values())] = member
+        jacobian_sparsity = super(EnsembleSimulation, self)._build_jacobian_sparsity().tocoo()
+        is_in_member = compartments_members[jacobian_sparsity.row] == compartments_members[jacobian_sparsity.col]
+        return sparse.csc_matrix((jacobian_sparsity.data[is_in_member], (jacobian_sparsity.row[is_in_member], jacobian_sparsity.col[is_in_member])),
+                                 shape=jacobian_sparsity.shape)
+
+
+def _columns_to_arrays(prefix, columns):
+    """Convert columns to arrays of numbers or of strings, which are saved in a NumPy archive without pickling (see :meth:`Simulation.save_checkpoint`).
+
+    :param str prefix: the prefix of the names of the arrays.
+    :param columns: the columns: a :class:`pandas.DataFrame` or a dictionary {column_name: values, ...}.
+
+    :return: The arrays: {'<prefix>.<column_name>': numpy.ndarray, ...}
+    :rtype: dict
+    """
+    arrays = {}
+    for column_name, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays['{}.{}'.format(prefix, column_name)] = values
+    return arrays
+
+
+def _arrays_to_columns(arrays, prefix, columns_names):
+    """Return the columns `columns_names` converted by :func:`_columns_to_arrays` with the prefix `prefix`.
+
+    :param dict arrays: the arrays read from a NumPy archive.
+    :param str prefix: the prefix of the names of the arrays.
+    :param list [str] columns_names: the names of the columns.
+
+    :return: The columns: {column_name: numpy.ndarray, ...}
+    :rtype: dict
+    """
+    return {column_name: arrays['{}.{}'.format(prefix, column_name)] for column_name in columns_names}
+
+
+def _forcings_to_arrays(prefix, forcings_values):
+    """Convert the values of the forcings of the roots and of the elements (see :attr:`Simulation.new_forcings_values`) to arrays,
+    one table per class of model object (see :attr:`Simulation.CHECKPOINT_FORCINGS_TABLES`).
+
+    :param str prefix: the prefix of the names of the arrays.
+    :param dict forcings_values: the values of the forcings: {model_object_id: {forcing_label: value, ...}, ...}
+
+    :return: The arrays: {'<prefix>.<table_name>.<column_name>': numpy.ndarray, ...}
+    :rtype: dict
+    """
+    arrays = {}
+    for table_name, ids_names, forcings_labels in Simulation.CHECKPOINT_FORCINGS_TABLES:
+        ids = [model_object_id for model_object_id in forcings_values if len(model_object_id) == len(ids_names)]
+        columns = {id_name: [model_object_id[i] for model_object_id in ids] for i, id_name in enumerate(ids_names)}
+        columns.update((forcing_label, np.array([forcings_values[model_object_id][forcing_label] for model_object_id in ids], dtype=float))
+                       for forcing_label in forcings_labels)
+        arrays.update(_columns_to_arrays('{}.{}'.format(prefix, table_name), columns))
+    return arrays
+
+
+def _arrays_to_forcings(arrays, prefix):
+    """Return the values of the forcings converted by :func:`_forcings_to_arrays` with the prefix `prefix`.
+
+    :param dict arrays: the arrays read from a NumPy archive.
+    :param str prefix: the prefix of the names of the arrays.
+
+    :return: The values of the forcings: {model_object_id: {forcing_label: value, ...}, ...}
+    :rtype: dict
+    """
+    forcings_values = {}
+    for table_name, ids_names, forcings_labels in Simulation.CHECKPOINT_FORCINGS_TABLES:
+        columns = _arrays_to_columns(arrays, '{}.{}'.format(prefix, table_name), list(ids_names) + list(forcings_labels))
+        ids = zip(*[columns[id_name].tolist() for id_name in ids_names])
+        values = zip(*[columns[forcing_label].tolist() for forcing_label in forcings_labels])
+        forcings_values.update((model_object_id, dict(zip(forcings_labels, model_object_values))) for model_object_id, model_object_values in zip(ids, values))
+    return forcings_values
+
+
+def _solve_jacobian_blocks(blocks, right_hand_sides):
+    """Solve the linear system of each block of a block-diagonal Jacobian matrix with :func:`numpy.linalg.solve`.
+
+    If a block is singular, its system is solved in the least squares sense with :func:`numpy.linalg.lstsq`, and a warning is logged.
+
+    :param numpy.ndarray blocks: the blocks, of shape (number of blocks, size of the blocks, size of the blocks).
+    :param numpy.ndarray right_hand_sides: the right-hand sides of the systems, of shape (number of blocks, size of the blocks, number of right-hand sides).
+
+    :return: The solutions of the systems, with the shape of `right_hand_sides`.
+    :rtype: numpy.ndarray
+    """
+    try:
+        return np.linalg.solve(blocks, right_hand_sides)
+    except np.linalg.LinAlgError:
+        solutions = np.empty(right_hand_sides.shape)
+        singular_blocks = []
+        for i, (block, block_right_hand_sides) in enumerate(zip(blocks, right_hand_sides)):
+            try:
+                solutions[i] = np.linalg.solve(block, block_right_hand_sides)
+            except np.linalg.LinAlgError:
+                solutions[i] = np.linalg.lstsq(block, block_right_hand_sides, rcond=None)[0]
+                singular_blocks.append(i)
+        logger = logging.getLogger(__name__)
+        logger.warning('%s singular blocks of the Jacobian of the quasi-steady state (blocks %s): they are solved in the least squares sense.',
+                       len(singular_blocks), singular_blocks)
+        return solutions
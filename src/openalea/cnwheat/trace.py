@@ -0,0 +1,212 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+import glob
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+"""
+    cnwheat.trace
+    ~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.trace` defines a recorder of the compartments and of their derivatives at each evaluation
+    of the derivatives by the solver, and the functions to read the recorded traces.
+
+    The recorder appends the vectors of compartments and of derivatives to preallocated NumPy buffers, and flushes them
+    into compressed NumPy files (see :func:`numpy.savez_compressed`) along with the description of the layout of the compartments.
+    Unlike the loggers `cnwheat.compartments` and `cnwheat.derivatives`, it does not format any value during the run,
+    so that it can stay enabled in production runs.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+#: the scales of the traces: {scale: the names of the indexes of the model objects of the scale}.
+#: The scales and the indexes are the same as the ones of the loggers `cnwheat.compartments` and `cnwheat.derivatives`.
+SCALES_INDEXES = OrderedDict([('soils', ['plant', 'axis']),
+                              ('plants', ['plant']),
+                              ('axes', ['plant', 'axis']),
+                              ('phytomers', ['plant', 'axis', 'metamer']),
+                              ('organs', ['plant', 'axis', 'organ']),
+                              ('hiddenzones', ['plant', 'axis', 'metamer']),
+                              ('elements', ['plant', 'axis', 'metamer', 'organ', 'element'])])
+
+#: the maximum number of indexes of a model object
+MAX_NB_INDEXES = max(len(indexes_names) for indexes_names in SCALES_INDEXES.values())
+
+
+class TraceRecorder(object):
+    """
+    A recorder of the compartments and of their derivatives at each evaluation of the derivatives by the solver.
+
+    The values are stored in buffers of `capacity` rows. The buffers are flushed into a new file `<filepath_prefix>_<segment>.npz`
+    when they are full, when the layout of the compartments changes, and when :meth:`flush` is called.
+    Each file contains one segment of the trace: the times, the compartments, the derivatives, and the description of the layout of the compartments.
+
+    :param str filepath_prefix: the prefix of the paths of the files of the trace.
+    :param int capacity: the number of evaluations stored in the buffers before they are flushed ; default is `1000`.
+    """
+
+    def __init__(self, filepath_prefix, capacity=1000):
+        self.filepath_prefix = filepath_prefix  #: the prefix of the paths of the files of the trace
+        self.capacity = capacity  #: the number of evaluations stored in the buffers before they are flushed
+        self.filepaths = []  #: the paths of the files written so far
+        self._description = None  #: the description of the layout of the compartments of the current segment (see :func:`describe_layout`)
+        self._signature = None  #: the signature of the layout of the current segment
+        self._t = np.zeros(0)  #: the buffer of the times
+        self._compartments = np.zeros((0, 0))  #: the buffer of the compartments
+        self._derivatives = np.zeros((0, 0))  #: the buffer of the derivatives
+        self._size = 0  #: the number of evaluations in the buffers
+
+    def set_layout(self, layout_, population, soils):
+        """Set the layout of the compartments of the next evaluations. If the layout changes, the buffers are flushed first.
+
+        :param cnwheat.layout.CompartmentsLayout layout_: the layout of the compartments.
+        :param model.Population population: the population of the layout.
+        :param dict soils: the soils of the layout.
+        """
+        description = describe_layout(layout_, population, soils)
+        signature = (layout_.signature, tuple(description['objects_indexes'].ravel().tolist()))
+        if signature == self._signature:
+            return
+        self.flush()
+        self._signature = signature
+        self._description = description
+        self._t = np.zeros(self.capacity)
+        self._compartments = np.zeros((self.capacity, layout_.size))
+        self._derivatives = np.zeros((self.capacity, layout_.size))
+
+    def record(self, t, y, y_derivatives):
+        """Append an evaluation of the derivatives to the buffers.
+
+        :param float t: the time of the evaluation (in hours).
+        :param numpy.ndarray y: the compartments.
+        :param numpy.ndarray y_derivatives: the derivatives of the compartments.
+        """
+        if self._size == self.capacity:
+            self.flush()
+        self._t[self._size] = t
+        self._compartments[self._size] = y
+        self._derivatives[self._size] = y_derivatives
+        self._size += 1
+
+    def flush(self):
+        """Write the evaluations of the buffers into a new file of the trace, and empty the buffers.
+        """
+        if self._size == 0:
+            return
+        filepath = '{}_{:05d}.npz'.format(self.filepath_prefix, len(self.filepaths))
+        np.savez_compressed(filepath, t=self._t[:self._size], compartments=self._compartments[:self._size], derivatives=self._derivatives[:self._size],
+                            **self._description)
+        self.filepaths.append(filepath)
+        self._size = 0
+
+
+def describe_layout(layout_, population, soils):
+    """Describe the compartments of `layout_` with arrays which can be written in a NumPy file.
+
+    :param cnwheat.layout.CompartmentsLayout layout_: the layout of the compartments.
+    :param model.Population population: the population of the layout.
+    :param dict soils: the soils of the layout.
+
+    :return: The description of the layout: {'scales': the scale of each compartment (see :attr:`SCALES_INDEXES`),
+             'objects': the number of the model object of each compartment, 'compartments_names': the name of each compartment,
+             'objects_indexes': the indexes of each model object, as strings completed with empty strings up to :attr:`MAX_NB_INDEXES`}.
+    :rtype: dict
+    """
+    scales = np.empty(layout_.size, dtype=object)
+    objects = np.zeros(layout_.size, dtype=int)
+    compartments_names = np.empty(layout_.size, dtype=object)
+    objects_indexes = []
+
+    def add(model_object, scale, indexes):
+        for compartment_name, compartment_index in layout_.mapping[model_object].items():
+            scales[compartment_index] = scale
+            objects[compartment_index] = len(objects_indexes)
+            compartments_names[compartment_index] = compartment_name
+        objects_indexes.append([str(index) for index in indexes] + [''] * (MAX_NB_INDEXES - len(indexes)))
+
+    for soil_id, soil in soils.items():
+        add(soil, 'soils', soil_id)
+    for plant in population.plants:
+        add(plant, 'plants', (plant.index,))
+        for axis in plant.axes:
+            add(axis, 'axes', (plant.index, axis.label))
+            for organ in (axis.roots, axis.phloem, axis.grains):
+                if organ is None:
+                    continue
+                add(organ, 'organs', (plant.index, axis.label, organ.label))
+            for phytomer in axis.phytomers:
+                add(phytomer, 'phytomers', (plant.index, axis.label, phytomer.index))
+                for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath, phytomer.hiddenzone):
+                    if organ is None:
+                        continue
+                    if organ is phytomer.hiddenzone:
+                        add(organ, 'hiddenzones', (plant.index, axis.label, phytomer.index))
+                        continue
+                    for element in (organ.exposed_element, organ.enclosed_element):
+                        if element is None:
+                            continue
+                        add(element, 'elements', (plant.index, axis.label, phytomer.index, organ.label, element.label))
+
+    return {'scales': scales.astype(str), 'objects': objects, 'compartments_names': compartments_names.astype(str),
+            'objects_indexes': np.array(objects_indexes, dtype=str).reshape(len(objects_indexes), MAX_NB_INDEXES)}
+
+
+def read(filepath_prefix):
+    """Read the files of the trace written by a :class:`TraceRecorder`, in the order of writing.
+
+    :param str filepath_prefix: the prefix of the paths of the files of the trace.
+
+    :return: The segments of the trace: a list of dictionaries with keys 't', 'compartments', 'derivatives', and the keys of the description
+             of the layout (see :func:`describe_layout`).
+    :rtype: list [dict]
+    """
+    segments = []
+    for filepath in sorted(glob.glob('{}_[0-9][0-9][0-9][0-9][0-9].npz'.format(glob.escape(filepath_prefix)))):
+        with np.load(filepath) as trace_file:
+            segments.append({key: trace_file[key] for key in trace_file.files})
+    return segments
+
+
+def to_dataframes(filepath_prefix, values='compartments'):
+    """Rebuild the views of the trace at each scale, with the same indexes and columns as the loggers `cnwheat.compartments`
+    and `cnwheat.derivatives`. Only the compartments are traced: the state parameters of the model objects are not in the views.
+
+    :param str filepath_prefix: the prefix of the paths of the files of the trace.
+    :param str values: the traced values: `'compartments'` (default) or `'derivatives'`.
+
+    :return: The view of each scale which has compartments: {scale: pandas.DataFrame, ...} (see :attr:`SCALES_INDEXES`).
+    :rtype: dict
+    """
+    scales_dataframes = OrderedDict()
+    for segment in read(filepath_prefix):
+        t = segment['t']
+        for scale, indexes_names in SCALES_INDEXES.items():
+            scale_compartments = np.flatnonzero(segment['scales'] == scale)
+            if len(scale_compartments) == 0:
+                continue
+            scale_objects, objects_positions = np.unique(segment['objects'][scale_compartments], return_inverse=True)
+            compartments_names = list(OrderedDict.fromkeys(segment['compartments_names'][scale_compartments].tolist()))
+            names_positions = np.array([compartments_names.index(compartment_name) for compartment_name in segment['compartments_names'][scale_compartments]])
+            scale_values = np.full((len(t), len(scale_objects), len(compartments_names)), np.nan)
+            scale_values[:, objects_positions, names_positions] = segment[values][:, scale_compartments]
+            scale_df = pd.DataFrame(scale_values.reshape(-1, len(compartments_names)), columns=compartments_names)
+            objects_indexes = segment['objects_indexes'][scale_objects]
+            for i, index_name in reversed(list(enumerate(indexes_names))):
+                index_values = np.tile(objects_indexes[:, i], len(t))
+                if index_name in ('plant', 'metamer'):
+                    index_values = index_values.astype(int)
+                scale_df.insert(0, index_name, index_values)
+            scale_df.insert(0, 't', np.repeat(t, len(scale_objects)))
+            scales_dataframes.setdefault(scale, []).append(scale_df)
+    return OrderedDict((scale, pd.concat(scale_dfs, ignore_index=True)) for scale, scale_dfs in scales_dataframes.items())
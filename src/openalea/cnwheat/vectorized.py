@@ -0,0 +1,1153 @@
+# -*- coding: latin-1 -*-
+
+from __future__ import division  # use "//" to do integer division
+
+import copy
+
+import numpy as np
+from scipy import sparse
+
+from openalea.cnwheat import model, parameters, kernels
+
+"""
+    cnwheat.vectorized
+    ~~~~~~~~~~~~~~~~~~
+
+    The module :mod:`cnwheat.vectorized` defines a struct-of-arrays view of a population of plants.
+
+    The compartments of the elements, hidden zones, roots, phloems and grains are gathered into contiguous NumPy arrays
+    grouped by class, and all the fluxes and derivatives of the model are computed with array operations.
+    The equations are the same as in :mod:`cnwheat.model`.
+
+    This module is used by :class:`cnwheat.simulation.Simulation` when the simulation is created with `engine='vectorized'`.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+#: the compartments of the axes, in the order used by the arrays
+AXES_COMPARTMENTS = ('C_exudated', 'sum_respi_shoot', 'sum_respi_roots')
+#: the compartments of the phloems, in the order used by the arrays
+PHLOEMS_COMPARTMENTS = ('sucrose', 'amino_acids')
+#: the compartments of the roots, in the order used by the arrays
+ROOTS_COMPARTMENTS = ('sucrose', 'nitrates', 'amino_acids', 'cytokinins')
+#: the compartments of the grains, in the order used by the arrays
+GRAINS_COMPARTMENTS = ('structure', 'starch', 'proteins', 'age_from_flowering')
+#: the compartments of the hidden zones, in the order used by the arrays
+HIDDENZONES_COMPARTMENTS = ('sucrose', 'fructan', 'amino_acids', 'proteins')
+#: the compartments of the photosynthetic organ elements, in the order used by the arrays
+ELEMENTS_COMPARTMENTS = ('starch', 'sucrose', 'triosesP', 'fructan', 'nitrates', 'amino_acids', 'proteins', 'cytokinins')
+
+#: the parameters of the photosynthetic organ elements which are gathered into arrays
+ELEMENTS_PARAMETERS = ('ALPHA', 'BETA', 'SIGMA_SUCROSE', 'SIGMA_AMINO_ACIDS', 'VMAX_SFRUCTAN_POT', 'K_REGUL_SFRUCTAN', 'N_REGUL_SFRUCTAN',
+                       'K_SFRUCTAN', 'VMAX_DFRUCTAN', 'K_DFRUCTAN', 'VMAX_STARCH', 'K_STARCH', 'DELTA_DSTARCH', 'VMAX_SUCROSE', 'K_SUCROSE',
+                       'VMAX_AMINO_ACIDS', 'K_AMINO_ACIDS_NITRATES', 'K_AMINO_ACIDS_TRIOSESP', 'VMAX_SPROTEINS', 'K_SPROTEINS',
+                       'VMAX_DPROTEINS_CYTOK', 'K_DPROTEINS_CYTOK', 'N_DPROTEINS', 'VMAX_DPROTEINS', 'K_DPROTEINS', 'DELTA_D_CYTOKININS')
+
+#: the minimal green area of an element to compute its fluxes (m2)
+MIN_GREEN_AREA = 0.25E-6
+
+#: conversion factor from seconds to hours
+HOUR = parameters.SECOND_TO_HOUR_RATE_CONVERSION
+
+#: ratio between the number of mol of C and the number of mol of N in amino acids
+AMINO_ACIDS_C_N_RATIO = model.EcophysiologicalConstants.AMINO_ACIDS_C_RATIO / model.EcophysiologicalConstants.AMINO_ACIDS_N_RATIO
+
+
+class RespirationFunctions(object):
+    """
+    Element-wise versions of the functions of a model of respiration (see :class:`cnwheat.simulation.Simulation`).
+
+    The array versions of the functions of the class `RespirationModel` of the model of respiration (e.g. `R_phloem_array`)
+    are used when the model provides them. Otherwise, the scalar functions are applied element-wise
+    on the arrays of :class:`VectorizedSystem`.
+
+    :param module respiration_model: the model of respiration to use.
+    """
+
+    def __init__(self, respiration_model):
+        respiration_model_class = respiration_model.RespirationModel
+        self.R_Nnit_upt = self._array_function(respiration_model_class, 'R_Nnit_upt', [float])
+        self.R_phloem = self._array_function(respiration_model_class, 'R_phloem', [float, float])
+        self.R_Nnit_red = self._array_function(respiration_model_class, 'R_Nnit_red', [float, float])
+        self.R_residual = self._array_function(respiration_model_class, 'R_residual', [float])
+        self.R_grain_growth = self._array_function(respiration_model_class, 'R_grain_growth', [float, float])
+        #: the constants of the model of respiration used by :func:`cnwheat.kernels.elements_kernel`
+        self.kernel_constants = tuple(float(getattr(respiration_model_class, name)) for name in kernels.RESPIRATION_CONSTANTS)
+        self._respiration_model_class = respiration_model_class
+
+    @staticmethod
+    def _array_function(respiration_model_class, function_name, otypes):
+        """Return the array version of the function `function_name` of `respiration_model_class` if any,
+        or the element-wise application of its scalar version."""
+        array_function = getattr(respiration_model_class, function_name + '_array', None)
+        if array_function is not None:
+            return array_function
+        return np.vectorize(getattr(respiration_model_class, function_name), otypes=otypes)
+
+    # Partial derivatives of the functions of respiration, used to compute the Jacobian of the system.
+    # They follow the equations of :mod:`respiwheat.model`.
+
+    def d_R_phloem(self, sucrose_loading, mstruct):
+        """Derivative of R_phloem with respect to `sucrose_loading`."""
+        CPHLOEM = self._respiration_model_class.CPHLOEM
+        return np.where(CPHLOEM * sucrose_loading * mstruct > 0, CPHLOEM * mstruct, 0.)
+
+    def d_R_Nnit_upt(self, sucrose):
+        """Derivative of R_Nnit_upt with respect to the uptake of nitrates."""
+        return np.where(sucrose > 0, self._respiration_model_class.C_NIT_UPT, 0.)
+
+    def d_R_Nnit_red(self, mstruct, root=False):
+        """Derivative of R_Nnit_red with respect to the synthesis of amino acids (when the synthesis is not cancelled)."""
+        respiration_model_class = self._respiration_model_class
+        if root:
+            return respiration_model_class.C_NIT_RED * mstruct
+        return respiration_model_class.F_NIT_RED_SH_CS * respiration_model_class.C_NIT_RED * mstruct
+
+    def d_R_residual(self, sucrose, mstruct, Ntot, Ts):
+        """Derivative of R_residual with respect to `sucrose`."""
+        respiration_model_class = self._respiration_model_class
+        is_respiring = (sucrose > 0) & (mstruct > 0)
+        conc_sucrose = np.where(is_respiring, sucrose / mstruct, 0.)
+        return np.where(is_respiring,
+                        (respiration_model_class.KM_MAX * respiration_model_class.KM) / (respiration_model_class.KM + conc_sucrose) ** 2 / mstruct *
+                        Ntot * 2. ** ((Ts - 20.) / 10) * respiration_model_class.SECOND_TO_HOUR_RATE_CONVERSION,
+                        0.)
+
+    def d_R_grain_growth(self):
+        """Derivative of R_grain_growth with respect to the growth of grain structure and starch."""
+        YG_GRAINS = self._respiration_model_class.YG_GRAINS
+        return (1 - YG_GRAINS) / YG_GRAINS
+
+
+class VectorizedSystem(object):
+    """
+    The class :class:`VectorizedSystem` gathers the compartments and the state parameters of a population of plants
+    into NumPy arrays, and computes the derivatives of the compartments with array operations.
+
+    The topology of the population and the internal parameters of the model objects are read at construction time.
+    The state parameters (temperatures, structural masses, forcings...) are read by :meth:`update_state_parameters`,
+    which must be called each time they change.
+
+    :param model.Population population: the population of plants.
+    :param list axes_soils: the soil of each axis of `population`, in the order of the plants and of their axes
+           (see :meth:`cnwheat.simulation.Simulation._get_axes_soils`).
+    :param cnwheat.layout.CompartmentsLayout layout: the layout of the compartments in the vector of compartments
+           (see :attr:`cnwheat.simulation.Simulation.layout`).
+    :param module respiration_model: the model of respiration to use.
+    :param dict [int, int] culm_density: culm density (culm m-2).
+    :param int delta_t: the delta t of the simulation (in seconds).
+    :param bool jit_kernel: if True and Numba is installed, the fluxes and the derivatives of the elements are computed by the compiled kernel
+           :func:`cnwheat.kernels.elements_kernel`. Default is `False`: they are computed with array operations.
+    """
+
+    def __init__(self, population, axes_soils, layout, respiration_model, culm_density, delta_t, jit_kernel=False):
+
+        self.layout = layout  #: the layout of the compartments in the vector of compartments
+        self.delta_t = delta_t  #: the delta t of the simulation (in seconds)
+        self.respiration = RespirationFunctions(respiration_model)  #: the element-wise functions of the model of respiration
+        #: the kernel which computes the fluxes and the derivatives of the elements (see :func:`cnwheat.kernels.elements_kernel`) ; None to use array operations
+        self.elements_kernel = kernels.elements_kernel if jit_kernel and kernels.IS_COMPILED else None
+
+        self.plants = []  #: the plant of each axis
+        self.axes = []  #: the axes
+        self.hiddenzones = []  #: the hidden zones
+        self.grains = []  #: the grains
+        self.elements = []  #: the photosynthetic organ elements
+
+        hiddenzones_axes = []
+        grains_axes = []
+        elements_axes = []
+        elements_hiddenzones = []
+        for plant in population.plants:
+            for axis in plant.axes:
+                axis_index = len(self.axes)
+                self.plants.append(plant)
+                self.axes.append(axis)
+                if axis.grains is not None:
+                    self.grains.append(axis.grains)
+                    grains_axes.append(axis_index)
+                for phytomer in axis.phytomers:
+                    hiddenzone_index = -1
+                    if phytomer.hiddenzone is not None:
+                        hiddenzone_index = len(self.hiddenzones)
+                        self.hiddenzones.append(phytomer.hiddenzone)
+                        hiddenzones_axes.append(axis_index)
+                    for organ in (phytomer.chaff, phytomer.peduncle, phytomer.lamina, phytomer.internode, phytomer.sheath):
+                        if organ is None:
+                            continue
+                        for element in (organ.exposed_element, organ.enclosed_element):
+                            if element is None:
+                                continue
+                            self.elements.append(element)
+                            elements_axes.append(axis_index)
+                            elements_hiddenzones.append(hiddenzone_index)
+
+        self.phloems = [axis.phloem for axis in self.axes]  #: the phloems
+        self.roots = [axis.roots for axis in self.axes]  #: the roots
+        self.hiddenzones_axes = np.array(hiddenzones_axes, dtype=int)  #: the index of the axis of each hidden zone
+        self.grains_axes = np.array(grains_axes, dtype=int)  #: the index of the axis of each grains
+        self.elements_axes = np.array(elements_axes, dtype=int)  #: the index of the axis of each element
+        self.elements_hiddenzones = np.array(elements_hiddenzones, dtype=int)  #: the index of the hidden zone of the phytomer of each element, -1 if none
+
+        self.soils = []  #: the soils of the axes
+        axes_soils_indexes = []
+        for soil in axes_soils:
+            if soil not in self.soils:
+                self.soils.append(soil)
+            axes_soils_indexes.append(self.soils.index(soil))
+        self.axes_soils = np.array(axes_soils_indexes, dtype=int)  #: the index in :attr:`soils` of the soil of each axis
+        self.soils_indexes = layout.indexes(self.soils, ('nitrates',))[0]  #: the index of the nitrates of each soil in the vector of compartments
+        #: the internal parameters of the roots, as arrays aligned with :attr:`roots` when they differ from one roots to another (see :func:`_gather_parameters`)
+        self.roots_parameters = _gather_parameters(self.roots, model.Roots.PARAMETERS)
+        #: the internal parameters of the hidden zones, as arrays aligned with :attr:`hiddenzones` when they differ from one hidden zone to another
+        self.hiddenzones_parameters = _gather_parameters(self.hiddenzones, model.HiddenZone.PARAMETERS)
+        #: the internal parameters of the grains, as arrays aligned with :attr:`grains` when they differ from one grains to another
+        self.grains_parameters = _gather_parameters(self.grains, model.Grains.PARAMETERS)
+
+        # the indexes of the compartments in the vector of compartments, as 2D arrays of shape (number of compartments, number of objects)
+        self.axes_indexes = layout.indexes(self.axes, AXES_COMPARTMENTS)
+        self.phloems_indexes = layout.indexes(self.phloems, PHLOEMS_COMPARTMENTS)
+        self.roots_indexes = layout.indexes(self.roots, ROOTS_COMPARTMENTS)
+        self.grains_indexes = layout.indexes(self.grains, GRAINS_COMPARTMENTS)
+        self.hiddenzones_indexes = layout.indexes(self.hiddenzones, HIDDENZONES_COMPARTMENTS)
+        self.elements_indexes = layout.indexes(self.elements, ELEMENTS_COMPARTMENTS)
+
+        # internal parameters
+        self.elements_parameters = {}  #: the internal parameters of each element
+        objects_parameters = {}
+        for element in self.elements:
+            if id(element.PARAMETERS) not in objects_parameters:
+                objects_parameters[id(element.PARAMETERS)] = [getattr(element.PARAMETERS, name) for name in ELEMENTS_PARAMETERS]
+        elements_parameters_values = np.array([objects_parameters[id(element.PARAMETERS)] for element in self.elements], dtype=float).reshape(len(self.elements), len(ELEMENTS_PARAMETERS))
+        for i, name in enumerate(ELEMENTS_PARAMETERS):
+            self.elements_parameters[name] = elements_parameters_values[:, i]
+
+        if culm_density is not None:
+            self.axes_culm_density = np.array([culm_density[plant.index] for plant in self.plants], dtype=float)  #: the culm density of the plant of each axis
+        else:
+            self.axes_culm_density = None
+
+        self.update_state_parameters()
+
+    def update_state_parameters(self):
+        """Read the state parameters (temperatures, structural masses, forcings, aggregated variables...) of the model objects,
+        and update the sets of active elements and hidden zones accordingly.
+        """
+        # soils
+        self.soils_Tsoil = np.array([soil.Tsoil for soil in self.soils], dtype=float)
+        self.soils_volume = np.array([soil.volume for soil in self.soils], dtype=float)
+        self.soils_constant_Conc_Nitrates = np.array([soil.constant_Conc_Nitrates for soil in self.soils], dtype=bool)
+        self.soils_T_effect_Vmax = model.Soil.calculate_temperature_effect_on_Vmax(self.soils_Tsoil)
+        self.soils_T_effect_conductivity = model.Soil.calculate_temperature_effect_on_conductivity(self.soils_Tsoil)
+
+        # plants and axes
+        self.axes_Tair = np.array([plant.Tair for plant in self.plants], dtype=float)
+        self.axes_T_effect_conductivity = model.Plant.calculate_temperature_effect_on_conductivity(self.axes_Tair)
+        self.axes_T_effect_Vmax = model.Plant.calculate_temperature_effect_on_Vmax(self.axes_Tair)
+        self.axes_mstruct = np.array([axis.mstruct for axis in self.axes], dtype=float)
+
+        # roots
+        self.roots_mstruct = np.array([roots.mstruct for roots in self.roots], dtype=float)
+        self.roots_Total_Organic_Nitrogen = np.array([roots.Total_Organic_Nitrogen for roots in self.roots], dtype=float)
+
+        # grains
+        self.grains_T_effect_growth = np.array([grains.calculate_temperature_effect_on_growth(self.plants[axis_index].Tair)
+                                                for grains, axis_index in zip(self.grains, self.grains_axes)], dtype=float)
+
+        # hidden zones
+        self.hiddenzones_mstruct = np.array([hiddenzone.mstruct for hiddenzone in self.hiddenzones], dtype=float)
+        self.hiddenzones_ratio_DZ = np.array([hiddenzone.ratio_DZ for hiddenzone in self.hiddenzones], dtype=float)
+        self.hiddenzones_nb_replications = np.array([hiddenzone.nb_replications for hiddenzone in self.hiddenzones], dtype=float)
+        self.hiddenzones_Total_Organic_Nitrogen = np.array([hiddenzone.Total_Organic_Nitrogen for hiddenzone in self.hiddenzones], dtype=float)
+        #: the hidden zones for which the fluxes are computed
+        self.active_hiddenzones = np.flatnonzero(self.hiddenzones_mstruct != 0)
+
+        # elements
+        self.elements_mstruct = np.array([element.mstruct for element in self.elements], dtype=float)
+        self.elements_green_area = np.array([element.green_area for element in self.elements], dtype=float)
+        self.elements_Ag = np.array([element.Ag for element in self.elements], dtype=float)
+        self.elements_Tr = np.array([element.Tr for element in self.elements], dtype=float)
+        self.elements_Ts = np.array([element.Ts for element in self.elements], dtype=float)
+        self.elements_is_growing = np.array([element.is_growing for element in self.elements], dtype=bool)
+        self.elements_nb_replications = np.array([element.nb_replications for element in self.elements], dtype=float)
+        self.elements_Total_Organic_Nitrogen = np.array([element.Total_Organic_Nitrogen for element in self.elements], dtype=float)
+        # the elements of a phytomer whose hidden zone has no structural mass are skipped
+        phytomer_is_active = np.ones(len(self.elements), dtype=bool)
+        if len(self.hiddenzones) != 0:
+            has_hiddenzone = self.elements_hiddenzones >= 0
+            phytomer_is_active[has_hiddenzone] = self.hiddenzones_mstruct[self.elements_hiddenzones[has_hiddenzone]] != 0
+        #: the elements for which the fluxes are computed
+        self.active_elements = np.flatnonzero((self.elements_green_area > MIN_GREEN_AREA) & (self.elements_mstruct > 0.0) & phytomer_is_active)
+
+    def set_parameters(self, model_objects, parameters_values):
+        """Set the internal parameters of some elements or roots of the system, instead of the parameters of the model objects.
+
+        :param list model_objects: the elements or the roots of the system.
+        :param dict parameters_values: the values of the parameters: {parameter_name: value, ...}. The names of the parameters
+               must be in :attr:`ELEMENTS_PARAMETERS` for the elements, and be attributes of the internal parameters of the roots for the roots.
+        """
+        model_objects = set(model_objects)
+        elements_positions = [i for i, element in enumerate(self.elements) if element in model_objects]
+        if len(elements_positions) != 0:
+            for name, value in parameters_values.items():
+                self.elements_parameters[name][elements_positions] = value
+        roots_positions = [i for i, roots in enumerate(self.roots) if roots in model_objects]
+        if len(roots_positions) != 0:
+            self.roots_parameters = _parameters_arrays(self.roots_parameters, len(self.roots))
+            for name, value in parameters_values.items():
+                getattr(self.roots_parameters, name)[roots_positions] = value
+
+    def calculate_all_derivatives(self, y):
+        """Compute the derivatives of the compartments in `y`.
+
+        :param numpy.ndarray y: the current values of the compartments.
+
+        :return: The derivatives of `y`.
+        :rtype: numpy.ndarray
+        """
+        y_derivatives, _ = self._calculate(np.asarray(y, dtype=float))
+        return y_derivatives
+
+    def update_population(self, y):
+        """Set the compartments of the model objects from `y`, and set the fluxes and intermediate variables computed at `y`.
+
+        :param numpy.ndarray y: the values of the compartments.
+        """
+        y = np.asarray(y, dtype=float)
+        _, variables = self._calculate(y)
+
+        # compartments
+        self.layout.scatter(y)
+
+        # fluxes and intermediate variables
+        _set_attributes(self.soils, dict(variables['soils'], T_effect_Vmax=self.soils_T_effect_Vmax, T_effect_conductivity=self.soils_T_effect_conductivity))
+        for plant, T_effect_conductivity, T_effect_Vmax in zip(self.plants, self.axes_T_effect_conductivity.tolist(), self.axes_T_effect_Vmax.tolist()):
+            plant.T_effect_conductivity = T_effect_conductivity
+            plant.T_effect_Vmax = T_effect_Vmax
+        _set_attributes(self.axes, variables['axes'])
+        _set_attributes(self.roots, variables['roots'])
+        _set_attributes(self.grains, variables['grains'])
+        _set_attributes([self.hiddenzones[i] for i in self.active_hiddenzones], variables['hiddenzones'])
+        transpiring_elements = np.flatnonzero(self.elements_green_area > 0)
+        _set_attributes([self.elements[i] for i in transpiring_elements], {'Transpiration': variables['elements_transpiration'][transpiring_elements]})
+        _set_attributes([self.elements[i] for i in self.active_elements], variables['elements'])
+
+    def _calculate(self, y):
+        """Compute the derivatives of the compartments in `y`, and the fluxes and intermediate variables of the model objects.
+
+        :param numpy.ndarray y: the current values of the compartments.
+
+        :return: The derivatives of `y`, and a dictionary of the fluxes and intermediate variables for each group of model objects.
+        :rtype: (numpy.ndarray, dict)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._calculate_unchecked(y)
+
+    def _calculate_unchecked(self, y):
+        y_derivatives = np.zeros_like(y)
+        respiration = self.respiration
+        nb_axes = len(self.axes)
+
+        T_effect_conductivity = self.axes_T_effect_conductivity
+        T_effect_Vmax = self.axes_T_effect_Vmax
+        axes_mstruct = self.axes_mstruct
+
+        # ---------- soils ----------
+        soils_Conc_Nitrates = np.maximum(0, (y[self.soils_indexes] / self.soils_volume))
+        Conc_Nitrates_Soil = soils_Conc_Nitrates[self.axes_soils]
+        soil_T_effect_Vmax = self.soils_T_effect_Vmax[self.axes_soils]
+
+        # ---------- phloem ----------
+        phloem_sucrose, phloem_amino_acids = y[self.phloems_indexes]
+        phloem_sucrose_derivative = np.zeros(nb_axes)
+        phloem_amino_acids_derivative = np.zeros(nb_axes)
+        sum_respi_shoot = np.zeros(nb_axes)
+
+        # ---------- transpiration ----------
+        elements_transpiration = self.elements_Tr * self.elements_green_area
+        transpiring = self.elements_green_area > 0
+        Total_Transpiration = np.bincount(self.elements_axes[transpiring], weights=(elements_transpiration * self.elements_nb_replications)[transpiring], minlength=nb_axes)
+
+        # ---------- roots: exports and uptake ----------
+        roots_sucrose, roots_nitrates, roots_amino_acids, roots_cytokinins = y[self.roots_indexes]
+        roots_mstruct = self.roots_mstruct
+        roots_parameters = self.roots_parameters
+        roots_mstruct_alpha = roots_mstruct * roots_parameters.ALPHA
+        regul_transpiration = Total_Transpiration
+
+        conc_nitrates_roots = roots_nitrates / roots_mstruct
+        VMAX_HATS_MAX = np.maximum(0., roots_parameters.A_VMAX_HATS * conc_nitrates_roots + roots_parameters.B_VMAX_HATS)
+        K_HATS = np.maximum(0., roots_parameters.A_K_HATS * conc_nitrates_roots + roots_parameters.B_K_HATS)
+        HATS = (VMAX_HATS_MAX * Conc_Nitrates_Soil) / (K_HATS + Conc_Nitrates_Soil)
+        K_LATS = np.maximum(0., roots_parameters.A_LATS * conc_nitrates_roots + roots_parameters.B_LATS)
+        LATS = (K_LATS * Conc_Nitrates_Soil)
+        HATS_LATS = (HATS + LATS)
+        nitrate_influx = HATS_LATS * HOUR * soil_T_effect_Vmax * roots_mstruct
+        regul_C = (roots_sucrose / roots_mstruct) * roots_parameters.RELATIVE_VMAX_N_UPTAKE / ((roots_sucrose / roots_mstruct) + roots_parameters.K_C)
+        Uptake_Nitrates = np.where(HATS_LATS < roots_parameters.MIN_INFLUX_FOR_UPTAKE, 0., nitrate_influx * roots_parameters.NET_INFLUX_UPTAKE_RATIO * regul_C)
+        roots_R_Nnit_upt = respiration.R_Nnit_upt(Uptake_Nitrates, roots_sucrose)
+
+        Export_Nitrates = np.maximum(np.minimum((roots_nitrates / roots_mstruct_alpha) * roots_parameters.K_NITRATE_EXPORT * roots_mstruct * regul_transpiration * HOUR,
+                                                roots_nitrates), 0.)
+        Export_Amino_Acids = np.maximum(np.minimum((roots_amino_acids / roots_mstruct_alpha) * roots_parameters.K_AMINO_ACIDS_EXPORT * roots_mstruct * regul_transpiration * HOUR,
+                                                   roots_amino_acids), 0.)
+        Export_cytokinins = np.maximum(np.minimum((roots_cytokinins / roots_mstruct_alpha) * roots_parameters.K_CYTOKININS_EXPORT * roots_mstruct * regul_transpiration * HOUR,
+                                                  roots_cytokinins), 0.)
+
+        # ---------- elements ----------
+        act = self.active_elements
+        elements_variables = {}
+        if len(act) != 0:
+            elements_compartments = y[self.elements_indexes[:, act]]
+            mstruct = self.elements_mstruct[act]
+            axes_ = self.elements_axes[act]
+            element_T_effect_Vmax = T_effect_Vmax[axes_]
+            element_T_effect_conductivity = T_effect_conductivity[axes_]
+            nb_replications = self.elements_nb_replications[act]
+            transpiration = elements_transpiration[act]
+            axis_Total_Transpiration = Total_Transpiration[axes_]
+            hiddenzones_ = self.elements_hiddenzones[act]
+            is_growing = self.elements_is_growing[act] & (hiddenzones_ >= 0)
+
+            Photosynthesis = self.elements_Ag[act] * self.elements_green_area[act] * HOUR
+            conc_sucrose_phloem = phloem_sucrose[axes_] / (axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA)
+            conc_amino_acids_phloem = phloem_amino_acids[axes_] / (axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA)
+
+            if self.elements_kernel is not None:
+                elements_derivatives, elements_variables = self._calculate_elements_kernel(y, act, elements_compartments, mstruct, Photosynthesis, element_T_effect_Vmax,
+                                                                                           element_T_effect_conductivity, conc_sucrose_phloem, conc_amino_acids_phloem,
+                                                                                           transpiration, axis_Total_Transpiration, Export_Nitrates[axes_],
+                                                                                           Export_Amino_Acids[axes_], Export_cytokinins[axes_], is_growing, hiddenzones_)
+            else:
+                elements_derivatives, elements_variables = self._calculate_elements(y, act, elements_compartments, mstruct, Photosynthesis, element_T_effect_Vmax,
+                                                                                    element_T_effect_conductivity, conc_sucrose_phloem, conc_amino_acids_phloem,
+                                                                                    transpiration, axis_Total_Transpiration, Export_Nitrates[axes_],
+                                                                                    Export_Amino_Acids[axes_], Export_cytokinins[axes_], is_growing, hiddenzones_)
+            Loading_Sucrose = elements_variables['Loading_Sucrose']
+            Loading_Amino_Acids = elements_variables['Loading_Amino_Acids']
+            sum_respi_shoot += np.bincount(axes_, weights=elements_variables['sum_respi'] * nb_replications, minlength=nb_axes)
+            y_derivatives[self.elements_indexes[:, act]] = elements_derivatives
+
+            # contributions of the elements to the phloem and to the hidden zones
+            loading = ~is_growing
+            phloem_sucrose_derivative += np.bincount(axes_[loading], weights=(Loading_Sucrose * nb_replications)[loading], minlength=nb_axes)
+            phloem_amino_acids_derivative += np.bincount(axes_[loading], weights=(Loading_Amino_Acids * nb_replications)[loading], minlength=nb_axes)
+            hiddenzones_Loading_Sucrose_contribution = np.bincount(hiddenzones_[is_growing], weights=Loading_Sucrose[is_growing], minlength=len(self.hiddenzones))
+            hiddenzones_Loading_Amino_Acids_contribution = np.bincount(hiddenzones_[is_growing], weights=Loading_Amino_Acids[is_growing], minlength=len(self.hiddenzones))
+        else:
+            hiddenzones_Loading_Sucrose_contribution = np.zeros(len(self.hiddenzones))
+            hiddenzones_Loading_Amino_Acids_contribution = np.zeros(len(self.hiddenzones))
+
+        # ---------- hidden zones ----------
+        act = self.active_hiddenzones
+        hiddenzones_variables = {}
+        if len(act) != 0:
+            hiddenzone_parameters = _select_parameters(self.hiddenzones_parameters, act)
+            sucrose, fructan, amino_acids, proteins = y[self.hiddenzones_indexes[:, act]]
+            mstruct = self.hiddenzones_mstruct[act]
+            axes_ = self.hiddenzones_axes[act]
+            hiddenzone_T_effect_Vmax = T_effect_Vmax[axes_]
+            nb_replications = self.hiddenzones_nb_replications[act]
+
+            conductance = hiddenzone_parameters.SIGMA * hiddenzone_parameters.BETA * mstruct ** (2 / 3) * T_effect_conductivity[axes_]
+            Unloading_Sucrose = (phloem_sucrose[axes_] / axes_mstruct[axes_] - sucrose / mstruct) * conductance * HOUR
+            Unloading_Amino_Acids = (phloem_amino_acids[axes_] / axes_mstruct[axes_] - amino_acids / mstruct) * conductance * HOUR
+
+            rate_Loading_Sucrose_massic = np.maximum(-Unloading_Sucrose, 0.) / mstruct / HOUR
+            K_REGUL_SFRUCTAN_N = hiddenzone_parameters.K_REGUL_SFRUCTAN ** hiddenzone_parameters.N_REGUL_SFRUCTAN
+            Regul_S_Fructan = np.where(Unloading_Sucrose >= 0, hiddenzone_parameters.VMAX_SFRUCTAN_POT,
+                                       hiddenzone_parameters.VMAX_SFRUCTAN_POT * (K_REGUL_SFRUCTAN_N /
+                                                                                  (np.maximum(0., rate_Loading_Sucrose_massic ** hiddenzone_parameters.N_REGUL_SFRUCTAN) +
+                                                                                   K_REGUL_SFRUCTAN_N)))
+            conc_sucrose_positive = np.maximum(0., sucrose) / mstruct
+            S_Fructan = (conc_sucrose_positive * hiddenzone_parameters.VMAX_SFRUCTAN_RELATIVE * Regul_S_Fructan) / \
+                (conc_sucrose_positive + hiddenzone_parameters.K_SFRUCTAN) * HOUR * hiddenzone_T_effect_Vmax
+            D_Fructan = np.minimum(((hiddenzone_parameters.K_DFRUCTAN * hiddenzone_parameters.VMAX_DFRUCTAN * hiddenzone_T_effect_Vmax) /
+                                    (conc_sucrose_positive + hiddenzone_parameters.K_DFRUCTAN)) * HOUR,
+                                   np.maximum(0., fructan))
+            vmax = hiddenzone_parameters.VMAX_SPROTEINS_EMZ * (1 - self.hiddenzones_ratio_DZ[act]) + hiddenzone_parameters.VMAX_SPROTEINS_DZ * self.hiddenzones_ratio_DZ[act]
+            conc_amino_acids_positive = np.maximum(0, (amino_acids / mstruct))
+            S_Proteins = ((vmax * conc_amino_acids_positive) / (hiddenzone_parameters.K_SPROTEINS + conc_amino_acids_positive)) * HOUR * hiddenzone_T_effect_Vmax
+            D_Proteins = np.maximum(0, (hiddenzone_parameters.delta_Dproteins * (proteins / mstruct))) * HOUR * hiddenzone_T_effect_Vmax
+            R_residual = respiration.R_residual(sucrose, mstruct * hiddenzone_parameters.ALPHA, self.hiddenzones_Total_Organic_Nitrogen[act], self.axes_Tair[axes_])
+            sum_respi_shoot += np.bincount(axes_, weights=R_residual * nb_replications, minlength=nb_axes)
+
+            y_derivatives[self.hiddenzones_indexes[:, act]] = (
+                Unloading_Sucrose + (D_Fructan - S_Fructan) * mstruct + hiddenzones_Loading_Sucrose_contribution[act] - R_residual,
+                (S_Fructan - D_Fructan) * mstruct,
+                Unloading_Amino_Acids + (D_Proteins - S_Proteins) * mstruct + hiddenzones_Loading_Amino_Acids_contribution[act],
+                (S_Proteins - D_Proteins) * mstruct)
+
+            phloem_sucrose_derivative -= np.bincount(axes_, weights=Unloading_Sucrose * nb_replications, minlength=nb_axes)
+            phloem_amino_acids_derivative -= np.bincount(axes_, weights=Unloading_Amino_Acids * nb_replications, minlength=nb_axes)
+
+            hiddenzones_variables = {'Unloading_Sucrose': Unloading_Sucrose, 'Unloading_Amino_Acids': Unloading_Amino_Acids, 'S_Fructan': S_Fructan,
+                                     'D_Fructan': D_Fructan, 'S_Proteins': S_Proteins, 'D_Proteins': D_Proteins, 'R_residual': R_residual}
+
+        # ---------- grains ----------
+        grains_variables = {}
+        if len(self.grains) != 0:
+            grains_parameters = self.grains_parameters
+            structure, starch, proteins, age_from_flowering = y[self.grains_indexes]
+            axes_ = self.grains_axes
+            T_effect_growth = self.grains_T_effect_growth
+            conc_sucrose_phloem_positive = np.maximum(0., phloem_sucrose[axes_]) / (axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA)
+            RGR_Structure = ((conc_sucrose_phloem_positive * grains_parameters.VMAX_RGR) / (conc_sucrose_phloem_positive + grains_parameters.K_RGR)) * T_effect_growth
+            structural_dry_mass = model.Grains.calculate_structural_dry_mass(structure)
+            is_enlarging = age_from_flowering <= grains_parameters.FILLING_INIT
+            S_grain_structure = np.where(is_enlarging, structure * RGR_Structure * HOUR, 0.)
+            S_grain_starch = np.where(is_enlarging | (age_from_flowering > grains_parameters.FILLING_END), 0.,
+                                      ((conc_sucrose_phloem_positive * grains_parameters.VMAX_STARCH) / (conc_sucrose_phloem_positive + grains_parameters.K_STARCH)) *
+                                      HOUR * T_effect_Vmax[axes_])
+            grains_phloem_sucrose = phloem_sucrose[axes_]
+            S_Proteins = np.where(grains_phloem_sucrose > 0,
+                                  (S_grain_structure + S_grain_starch * structural_dry_mass) * (phloem_amino_acids[axes_] / np.where(grains_phloem_sucrose > 0, grains_phloem_sucrose, 1.)),
+                                  0.)
+            R_grain_growth_struct, R_grain_growth_starch = respiration.R_grain_growth(S_grain_structure, S_grain_starch, structural_dry_mass)
+            sum_respi_shoot += np.bincount(axes_, weights=R_grain_growth_struct + R_grain_growth_starch, minlength=nb_axes)
+
+            y_derivatives[self.grains_indexes] = (
+                S_grain_structure - R_grain_growth_struct,
+                (S_grain_starch * structural_dry_mass) - R_grain_growth_starch,
+                S_Proteins,
+                self.delta_t * T_effect_growth)
+
+            phloem_sucrose_derivative -= np.bincount(axes_, weights=S_grain_structure + (S_grain_starch * structural_dry_mass), minlength=nb_axes)
+            phloem_amino_acids_derivative -= np.bincount(axes_, weights=S_Proteins, minlength=nb_axes)
+
+            grains_variables = {'RGR_Structure': RGR_Structure, 'structural_dry_mass': structural_dry_mass, 'S_grain_structure': S_grain_structure,
+                                'S_grain_starch': S_grain_starch, 'S_Proteins': S_Proteins, 'R_grain_growth_struct': R_grain_growth_struct,
+                                'R_grain_growth_starch': R_grain_growth_starch}
+
+        # ---------- roots ----------
+        conc_sucrose_roots = roots_sucrose / roots_mstruct_alpha
+        conc_sucrose_phloem = phloem_sucrose / (axes_mstruct * parameters.AXIS_PARAMETERS.ALPHA)
+        roots_Unloading_Sucrose = np.maximum(conc_sucrose_roots, conc_sucrose_phloem) * (conc_sucrose_phloem - conc_sucrose_roots) * \
+            roots_parameters.SIGMA_SUCROSE * roots_parameters.BETA * roots_mstruct ** (2 / 3) * T_effect_conductivity * HOUR
+        has_unloading = (phloem_amino_acids > 0) & (phloem_sucrose > 0) & (roots_Unloading_Sucrose > 0)
+        roots_Unloading_Amino_Acids = np.where(has_unloading, roots_Unloading_Sucrose * (phloem_amino_acids / np.where(has_unloading, phloem_sucrose, 1.)), 0.)
+        roots_S_Amino_Acids = soil_T_effect_Vmax * roots_parameters.VMAX_AMINO_ACIDS / ((1 + roots_parameters.K_AMINO_ACIDS_NITRATES / (roots_nitrates / roots_mstruct_alpha)) *
+                                                                                             (1 + roots_parameters.K_AMINO_ACIDS_SUCROSE / (roots_sucrose / roots_mstruct_alpha))) * HOUR
+        roots_R_Nnit_red, roots_S_Amino_Acids = respiration.R_Nnit_red(roots_S_Amino_Acids, roots_sucrose, roots_mstruct_alpha, root=True)
+        has_C_exudation = (roots_sucrose > 0) & (roots_Unloading_Sucrose > 0)
+        C_exudation = np.where(has_C_exudation, np.minimum(roots_sucrose, roots_Unloading_Sucrose * roots_parameters.C_EXUDATION), 0.)
+        has_N_exudation = (phloem_amino_acids > 0) & (roots_amino_acids > 0) & (roots_sucrose > 0)
+        N_exudation = np.where(has_N_exudation, np.minimum(roots_amino_acids / np.where(has_N_exudation, roots_sucrose, 1.), roots_parameters.N_EXUDATION_MAX) * C_exudation, 0.)
+        conc_sucrose_roots_positive = np.maximum(0, (roots_sucrose / roots_mstruct))
+        conc_nitrates_roots_positive = np.maximum(0, (roots_nitrates / roots_mstruct))
+        f_sucrose = conc_sucrose_roots_positive ** roots_parameters.N_SUC_CYTOKININS / (conc_sucrose_roots_positive ** roots_parameters.N_SUC_CYTOKININS +
+                                                                                        roots_parameters.K_SUCROSE_CYTOKININS ** roots_parameters.N_SUC_CYTOKININS)
+        f_nitrates = conc_nitrates_roots_positive ** roots_parameters.N_NIT_CYTOKININS / (conc_nitrates_roots_positive ** roots_parameters.N_NIT_CYTOKININS +
+                                                                                          roots_parameters.K_NITRATES_CYTOKININS ** roots_parameters.N_NIT_CYTOKININS)
+        S_cytokinins = roots_parameters.VMAX_S_CYTOKININS * f_sucrose * f_nitrates * HOUR * soil_T_effect_Vmax
+        roots_R_residual = respiration.R_residual(roots_sucrose, roots_mstruct_alpha, self.roots_Total_Organic_Nitrogen, self.soils_Tsoil[self.axes_soils])
+        roots_sum_respi = roots_R_Nnit_upt + roots_R_Nnit_red + roots_R_residual
+
+        y_derivatives[self.roots_indexes] = (
+            (roots_Unloading_Sucrose - roots_S_Amino_Acids * AMINO_ACIDS_C_N_RATIO - C_exudation) * roots_mstruct - roots_sum_respi,
+            Uptake_Nitrates - Export_Nitrates - roots_S_Amino_Acids * roots_mstruct,
+            (roots_Unloading_Amino_Acids + roots_S_Amino_Acids - N_exudation) * roots_mstruct - Export_Amino_Acids,
+            S_cytokinins * roots_mstruct - Export_cytokinins)
+
+        phloem_sucrose_derivative -= roots_Unloading_Sucrose * roots_mstruct_alpha
+        phloem_amino_acids_derivative -= roots_Unloading_Amino_Acids * roots_mstruct_alpha
+        y_derivatives[self.phloems_indexes] = (phloem_sucrose_derivative, phloem_amino_acids_derivative)
+
+        # ---------- axes ----------
+        C_exudated = (C_exudation + N_exudation * AMINO_ACIDS_C_N_RATIO) * roots_mstruct
+        y_derivatives[self.axes_indexes] = (C_exudated, sum_respi_shoot, roots_sum_respi)
+
+        # ---------- soils ----------
+        mineralisation = model.Soil.calculate_mineralisation(self.soils_T_effect_Vmax)
+        variable_soils = np.flatnonzero(~self.soils_constant_Conc_Nitrates)
+        if len(variable_soils) != 0:
+            soils_Uptake_Nitrates = np.bincount(self.axes_soils, weights=Uptake_Nitrates * self.axes_culm_density, minlength=len(self.soils))
+            y_derivatives[self.soils_indexes[variable_soils]] = (mineralisation - soils_Uptake_Nitrates)[variable_soils]
+
+        roots_variables = {'regul_transpiration': regul_transpiration, 'Uptake_Nitrates': Uptake_Nitrates, 'HATS_LATS': nitrate_influx,
+                           'R_Nnit_upt': roots_R_Nnit_upt, 'Export_Nitrates': Export_Nitrates, 'Export_Amino_Acids': Export_Amino_Acids,
+                           'Export_cytokinins': Export_cytokinins, 'Unloading_Sucrose': roots_Unloading_Sucrose,
+                           'Unloading_Amino_Acids': roots_Unloading_Amino_Acids, 'S_Amino_Acids': roots_S_Amino_Acids, 'R_Nnit_red': roots_R_Nnit_red,
+                           'C_exudation': C_exudation, 'N_exudation': N_exudation, 'S_cytokinins': S_cytokinins, 'R_residual': roots_R_residual,
+                           'sum_respi': roots_sum_respi}
+
+        variables = {'soils': {'Conc_Nitrates_Soil': soils_Conc_Nitrates, 'mineralisation': mineralisation},
+                     'axes': {'Total_Transpiration': Total_Transpiration},
+                     'roots': roots_variables,
+                     'grains': grains_variables,
+                     'hiddenzones': hiddenzones_variables,
+                     'elements': elements_variables,
+                     'elements_transpiration': elements_transpiration}
+
+        return y_derivatives, variables
+
+    def _calculate_elements(self, y, act, elements_compartments, mstruct, Photosynthesis, element_T_effect_Vmax, element_T_effect_conductivity,
+                            conc_sucrose_phloem, conc_amino_acids_phloem, transpiration, axis_Total_Transpiration, Export_Nitrates, Export_Amino_Acids,
+                            Export_cytokinins, is_growing, hiddenzones_):
+        """Compute the fluxes and the derivatives of the compartments of the active elements `act` with array operations.
+        The arrays are aligned with `act` (see :func:`cnwheat.kernels.elements_kernel` for their description).
+
+        :return: The derivatives of the compartments of the elements, and a dictionary of their fluxes and intermediate variables.
+        :rtype: (tuple [numpy.ndarray], dict)
+        """
+        respiration = self.respiration
+        (starch, sucrose, triosesP, fructan,
+         nitrates, amino_acids, proteins, cytokinins) = elements_compartments
+        p = dict((name, values[act]) for name, values in self.elements_parameters.items())
+        mstruct_alpha = mstruct * p['ALPHA']
+
+        # loading to the phloem, or export to the hidden zone for growing elements
+        conc_sucrose_element = sucrose / mstruct_alpha
+        conc_amino_acids_element = amino_acids / mstruct_alpha
+        mstruct_conductance = mstruct ** (2 / 3) * element_T_effect_conductivity
+        Loading_Sucrose = np.maximum(conc_sucrose_element, conc_sucrose_phloem) * (conc_sucrose_element - conc_sucrose_phloem) * \
+            p['SIGMA_SUCROSE'] * p['BETA'] * mstruct_conductance * HOUR
+        Loading_Amino_Acids = np.maximum(conc_amino_acids_element, conc_amino_acids_phloem) * (conc_amino_acids_element - conc_amino_acids_phloem) * \
+            p['SIGMA_AMINO_ACIDS'] * p['BETA'] * mstruct_conductance * HOUR
+        if is_growing.any():
+            growing_hiddenzones = hiddenzones_[is_growing]
+            hiddenzone_mstruct = self.hiddenzones_mstruct[growing_hiddenzones]
+            hiddenzone_sucrose, _, hiddenzone_amino_acids, _ = y[self.hiddenzones_indexes[:, growing_hiddenzones]]
+            hiddenzone_conductance = _select_parameters(self.hiddenzones_parameters, growing_hiddenzones).SIGMA * p['BETA'][is_growing] * hiddenzone_mstruct ** (2 / 3) * element_T_effect_conductivity[is_growing] * HOUR
+            Loading_Sucrose[is_growing] = (conc_sucrose_element[is_growing] - hiddenzone_sucrose / hiddenzone_mstruct) * hiddenzone_conductance
+            Loading_Amino_Acids[is_growing] = (conc_amino_acids_element[is_growing] - hiddenzone_amino_acids / hiddenzone_mstruct) * hiddenzone_conductance
+
+        # fructan
+        rate_Loading_Sucrose_massic = np.maximum(Loading_Sucrose, 0.) / mstruct / HOUR
+        K_REGUL_SFRUCTAN_N = p['K_REGUL_SFRUCTAN'] ** p['N_REGUL_SFRUCTAN']
+        Regul_S_Fructan = np.where(Loading_Sucrose <= 0, p['VMAX_SFRUCTAN_POT'],
+                                   (p['VMAX_SFRUCTAN_POT'] * K_REGUL_SFRUCTAN_N) / (np.maximum(0, rate_Loading_Sucrose_massic ** p['N_REGUL_SFRUCTAN']) + K_REGUL_SFRUCTAN_N))
+        conc_sucrose_positive = np.maximum(0., sucrose) / mstruct_alpha
+        S_Fructan = (conc_sucrose_positive * Regul_S_Fructan) / (conc_sucrose_positive + p['K_SFRUCTAN']) * HOUR * element_T_effect_Vmax
+        D_Fructan = np.minimum((p['K_DFRUCTAN'] * p['VMAX_DFRUCTAN']) / (conc_sucrose_positive + p['K_DFRUCTAN']) * HOUR * element_T_effect_Vmax,
+                               np.maximum(0., fructan))
+
+        # starch and sucrose
+        conc_triosesP_positive = np.maximum(triosesP, 0.) / mstruct_alpha
+        S_Starch = ((conc_triosesP_positive * p['VMAX_STARCH']) / (conc_triosesP_positive + p['K_STARCH'])) * HOUR * element_T_effect_Vmax
+        D_Starch = np.maximum(0, p['DELTA_DSTARCH'] * (starch / mstruct_alpha)) * HOUR * element_T_effect_Vmax
+        S_Sucrose = ((conc_triosesP_positive * p['VMAX_SUCROSE']) / (conc_triosesP_positive + p['K_SUCROSE'])) * HOUR * element_T_effect_Vmax
+        R_phloem_loading, Loading_Sucrose = respiration.R_phloem(Loading_Sucrose, mstruct_alpha)
+
+        # imports from roots
+        transpiration_ratio = np.where(axis_Total_Transpiration > 0, transpiration / np.where(axis_Total_Transpiration > 0, axis_Total_Transpiration, 1.), 0.)
+        Nitrates_import = Export_Nitrates * transpiration_ratio
+        Amino_Acids_import = Export_Amino_Acids * transpiration_ratio
+        cytokinins_import = Export_cytokinins * transpiration_ratio
+
+        # amino acids and proteins
+        has_substrates = (nitrates > 0) & (triosesP > 0)
+        S_Amino_Acids = np.where(has_substrates,
+                                 p['VMAX_AMINO_ACIDS'] / ((1 + p['K_AMINO_ACIDS_NITRATES'] / (np.where(has_substrates, nitrates, 1.) / mstruct_alpha)) *
+                                                          (1 + p['K_AMINO_ACIDS_TRIOSESP'] / (np.where(has_substrates, triosesP, 1.) / mstruct_alpha))) * HOUR * element_T_effect_Vmax,
+                                 0.)
+        R_Nnit_red, S_Amino_Acids = respiration.R_Nnit_red(S_Amino_Acids, sucrose, mstruct_alpha)
+        conc_amino_acids_positive = np.maximum(0., amino_acids) / mstruct_alpha
+        S_Proteins = ((conc_amino_acids_positive * p['VMAX_SPROTEINS']) / (conc_amino_acids_positive + p['K_SPROTEINS'])) * HOUR * element_T_effect_Vmax
+        conc_proteins = proteins / mstruct_alpha
+        conc_cytokinins = np.maximum(0, cytokinins / mstruct)
+        K_DPROTEINS_CYTOK_N = p['K_DPROTEINS_CYTOK'] ** p['N_DPROTEINS']
+        regul_cytokinins = (p['VMAX_DPROTEINS_CYTOK'] * K_DPROTEINS_CYTOK_N) / (conc_cytokinins ** p['N_DPROTEINS'] + K_DPROTEINS_CYTOK_N)
+        D_Proteins = np.maximum(0, (conc_proteins * p['VMAX_DPROTEINS'] / (conc_proteins + p['K_DPROTEINS'])) * HOUR * regul_cytokinins * element_T_effect_Vmax)
+        D_cytokinins = np.maximum(0, p['DELTA_D_CYTOKININS'] * (cytokinins / mstruct_alpha)) * HOUR * element_T_effect_Vmax
+
+        # respiration
+        R_residual = respiration.R_residual(sucrose, mstruct_alpha, self.elements_Total_Organic_Nitrogen[act], self.elements_Ts[act])
+        sum_respi = R_phloem_loading + R_Nnit_red + R_residual
+
+        elements_derivatives = (
+            (S_Starch - D_Starch) * mstruct_alpha,
+            (S_Sucrose + D_Starch + D_Fructan - S_Fructan) * mstruct - sum_respi - Loading_Sucrose,
+            Photosynthesis - (S_Sucrose + S_Starch + S_Amino_Acids * AMINO_ACIDS_C_N_RATIO) * mstruct_alpha,
+            (S_Fructan - D_Fructan) * mstruct_alpha,
+            Nitrates_import - (S_Amino_Acids * mstruct * p['ALPHA']),
+            Amino_Acids_import - Loading_Amino_Acids + (S_Amino_Acids + D_Proteins - S_Proteins) * mstruct_alpha,
+            (S_Proteins - D_Proteins) * mstruct_alpha,
+            cytokinins_import - D_cytokinins * mstruct_alpha)
+
+        elements_variables = {'Photosynthesis': Photosynthesis, 'Loading_Sucrose': Loading_Sucrose, 'Loading_Amino_Acids': Loading_Amino_Acids,
+                              'Regul_S_Fructan': Regul_S_Fructan, 'S_Fructan': S_Fructan, 'D_Fructan': D_Fructan, 'S_Starch': S_Starch,
+                              'D_Starch': D_Starch, 'S_Sucrose': S_Sucrose, 'R_phloem_loading': R_phloem_loading, 'Nitrates_import': Nitrates_import,
+                              'Amino_Acids_import': Amino_Acids_import, 'S_Amino_Acids': S_Amino_Acids, 'R_Nnit_red': R_Nnit_red,
+                              'S_Proteins': S_Proteins, 'D_Proteins': D_Proteins, 'cytokinins_import': cytokinins_import,
+                              'D_cytokinins': D_cytokinins, 'R_residual': R_residual, 'sum_respi': sum_respi}
+
+        return elements_derivatives, elements_variables
+
+    def _calculate_elements_kernel(self, y, act, elements_compartments, mstruct, Photosynthesis, element_T_effect_Vmax, element_T_effect_conductivity,
+                                   conc_sucrose_phloem, conc_amino_acids_phloem, transpiration, axis_Total_Transpiration, Export_Nitrates, Export_Amino_Acids,
+                                   Export_cytokinins, is_growing, hiddenzones_):
+        """Compute the fluxes and the derivatives of the compartments of the active elements `act` with :attr:`elements_kernel`.
+        The arguments and the outputs are the same as the ones of :meth:`_calculate_elements`.
+        """
+        hiddenzones_compartments = np.zeros((2, len(act)))
+        hiddenzones_mstruct = np.ones(len(act))
+        hiddenzones_SIGMA = np.zeros(len(act))
+        if is_growing.any():
+            growing_hiddenzones = hiddenzones_[is_growing]
+            hiddenzones_mstruct[is_growing] = self.hiddenzones_mstruct[growing_hiddenzones]
+            hiddenzones_SIGMA[is_growing] = _select_parameters(self.hiddenzones_parameters, growing_hiddenzones).SIGMA
+            hiddenzone_sucrose, _, hiddenzone_amino_acids, _ = y[self.hiddenzones_indexes[:, growing_hiddenzones]]
+            hiddenzones_compartments[:, is_growing] = hiddenzone_sucrose, hiddenzone_amino_acids
+        parameters_values = np.array([self.elements_parameters[name][act] for name in ELEMENTS_PARAMETERS])
+        elements_derivatives, elements_variables_values = self.elements_kernel(elements_compartments, parameters_values, mstruct, Photosynthesis, element_T_effect_Vmax,
+                                                                               element_T_effect_conductivity, conc_sucrose_phloem, conc_amino_acids_phloem, transpiration,
+                                                                               axis_Total_Transpiration, np.array([Export_Nitrates, Export_Amino_Acids, Export_cytokinins]),
+                                                                               is_growing, hiddenzones_compartments, hiddenzones_mstruct,
+                                                                               self.elements_Total_Organic_Nitrogen[act], self.elements_Ts[act],
+                                                                               hiddenzones_SIGMA, self.respiration.kernel_constants)
+        return elements_derivatives, dict(zip(kernels.ELEMENTS_VARIABLES, elements_variables_values))
+
+    def calculate_jacobian(self, y):
+        """Compute the Jacobian matrix of the derivatives of the compartments at `y`.
+
+        The partial derivatives of the fluxes are computed analytically, from the same equations as :meth:`calculate_all_derivatives`.
+        At the discontinuities of the fluxes (thresholds, `min` and `max`), the derivative of the branch used by the fluxes is taken.
+
+        :param numpy.ndarray y: the current values of the compartments.
+
+        :return: The Jacobian matrix: the element (i, j) is the partial derivative of the derivative of the compartment i with respect to the compartment j.
+        :rtype: scipy.sparse.csc_matrix
+        """
+        y = np.asarray(y, dtype=float)
+        rows, columns, values = [], [], []
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._calculate_jacobian_entries(y, rows, columns, values)
+        if len(rows) != 0:
+            rows, columns, values = np.concatenate(rows), np.concatenate(columns), np.concatenate(values)
+            is_finite = np.isfinite(values)
+            rows, columns, values = rows[is_finite], columns[is_finite], values[is_finite]
+        return sparse.coo_matrix((values, (rows, columns)), shape=(len(y), len(y))).tocsc()
+
+    def _calculate_jacobian_entries(self, y, rows, columns, values):
+        """Append the entries of the Jacobian matrix at `y` to `rows`, `columns` and `values`.
+
+        The partial derivatives of each flux are stored in a dictionary {variable_name: partial_derivative, ...},
+        and the variables names are mapped to the indexes of the compartments at the end of each block.
+        """
+        respiration = self.respiration
+        nb_axes = len(self.axes)
+        T_effect_conductivity = self.axes_T_effect_conductivity
+        T_effect_Vmax = self.axes_T_effect_Vmax
+        axes_mstruct = self.axes_mstruct
+        axes_sucrose_indexes, axes_amino_acids_indexes = self.phloems_indexes
+        axes_C_exudated_indexes, axes_sum_respi_shoot_indexes, axes_sum_respi_roots_indexes = self.axes_indexes
+        roots_sucrose_indexes, roots_nitrates_indexes, roots_amino_acids_indexes, roots_cytokinins_indexes = self.roots_indexes
+
+        def add(rows_indexes, gradient, columns_indexes):
+            for variable_name, partial_derivative in gradient.items():
+                partial_derivative, rows_, columns_ = np.broadcast_arrays(partial_derivative, rows_indexes, columns_indexes[variable_name])
+                rows.append(rows_.ravel())
+                columns.append(columns_.ravel())
+                values.append(partial_derivative.ravel().astype(float))
+
+        # ---------- roots exports, shared by the roots and the elements ----------
+        roots_sucrose, roots_nitrates, roots_amino_acids, roots_cytokinins = y[self.roots_indexes]
+        roots_parameters = self.roots_parameters
+        roots_mstruct = self.roots_mstruct
+        roots_mstruct_alpha = roots_mstruct * roots_parameters.ALPHA
+        elements_transpiration = self.elements_Tr * self.elements_green_area
+        transpiring = self.elements_green_area > 0
+        Total_Transpiration = np.bincount(self.elements_axes[transpiring], weights=(elements_transpiration * self.elements_nb_replications)[transpiring], minlength=nb_axes)
+
+        def d_export(amount, K_EXPORT):
+            rate = K_EXPORT * Total_Transpiration * HOUR / roots_parameters.ALPHA
+            export = np.minimum(rate * amount, amount)
+            return np.where(export > 0, np.where(rate * amount <= amount, rate, 1.), 0.)
+
+        d_Export_Nitrates = d_export(roots_nitrates, roots_parameters.K_NITRATE_EXPORT)
+        d_Export_Amino_Acids = d_export(roots_amino_acids, roots_parameters.K_AMINO_ACIDS_EXPORT)
+        d_Export_cytokinins = d_export(roots_cytokinins, roots_parameters.K_CYTOKININS_EXPORT)
+
+        phloem_sucrose, phloem_amino_acids = y[self.phloems_indexes]
+
+        # ---------- elements ----------
+        act = self.active_elements
+        if len(act) != 0:
+            (starch, sucrose, triosesP, fructan,
+             nitrates, amino_acids, proteins, cytokinins) = y[self.elements_indexes[:, act]]
+            p = dict((name, values_[act]) for name, values_ in self.elements_parameters.items())
+            mstruct = self.elements_mstruct[act]
+            mstruct_alpha = mstruct * p['ALPHA']
+            axes_ = self.elements_axes[act]
+            TV = T_effect_Vmax[axes_]
+            TC = T_effect_conductivity[axes_]
+            nb_replications = self.elements_nb_replications[act]
+            hiddenzones_ = self.elements_hiddenzones[act]
+            is_growing = self.elements_is_growing[act] & (hiddenzones_ >= 0)
+            axis_Total_Transpiration = Total_Transpiration[axes_]
+            transpiration_ratio = np.where(axis_Total_Transpiration > 0, elements_transpiration[act] / np.where(axis_Total_Transpiration > 0, axis_Total_Transpiration, 1.), 0.)
+
+            # loading to the phloem, or export to the hidden zone: derivatives with respect to the element (E) and to the phloem or the hidden zone (X)
+            def d_loading(amount_element, amount_phloem, SIGMA):
+                conc_element = amount_element / mstruct_alpha
+                conc_phloem = amount_phloem / (axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA)
+                conductance = SIGMA * p['BETA'] * mstruct ** (2 / 3) * TC * HOUR
+                driving_compartment = np.maximum(conc_element, conc_phloem)
+                loading = driving_compartment * (conc_element - conc_phloem) * conductance
+                d_E = conductance * (driving_compartment + np.where(conc_element >= conc_phloem, conc_element - conc_phloem, 0.)) / mstruct_alpha
+                d_X = conductance * (np.where(conc_element >= conc_phloem, 0., conc_element - conc_phloem) - driving_compartment) / \
+                    (axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA)
+                return loading, d_E, d_X
+
+            Loading_Sucrose, d_Loading_Sucrose_E, d_Loading_Sucrose_X = d_loading(sucrose, phloem_sucrose[axes_], p['SIGMA_SUCROSE'])
+            _, d_Loading_Amino_Acids_E, d_Loading_Amino_Acids_X = d_loading(amino_acids, phloem_amino_acids[axes_], p['SIGMA_AMINO_ACIDS'])
+            X_sucrose_indexes = axes_sucrose_indexes[axes_].copy()
+            X_amino_acids_indexes = axes_amino_acids_indexes[axes_].copy()
+            if is_growing.any():
+                growing_hiddenzones = hiddenzones_[is_growing]
+                hiddenzone_mstruct = self.hiddenzones_mstruct[growing_hiddenzones]
+                hiddenzone_sucrose, _, hiddenzone_amino_acids, _ = y[self.hiddenzones_indexes[:, growing_hiddenzones]]
+                conductance = _select_parameters(self.hiddenzones_parameters, growing_hiddenzones).SIGMA * p['BETA'][is_growing] * hiddenzone_mstruct ** (2 / 3) * TC[is_growing] * HOUR
+                Loading_Sucrose[is_growing] = (sucrose[is_growing] / mstruct_alpha[is_growing] - hiddenzone_sucrose / hiddenzone_mstruct) * conductance
+                d_Loading_Sucrose_E[is_growing] = d_Loading_Amino_Acids_E[is_growing] = conductance / mstruct_alpha[is_growing]
+                d_Loading_Sucrose_X[is_growing] = d_Loading_Amino_Acids_X[is_growing] = - conductance / hiddenzone_mstruct
+                X_sucrose_indexes[is_growing] = self.hiddenzones_indexes[0, growing_hiddenzones]
+                X_amino_acids_indexes[is_growing] = self.hiddenzones_indexes[2, growing_hiddenzones]
+            d_Loading_Sucrose = {'sucrose': d_Loading_Sucrose_E, 'X_sucrose': d_Loading_Sucrose_X}
+            d_Loading_Amino_Acids = {'amino_acids': d_Loading_Amino_Acids_E, 'X_amino_acids': d_Loading_Amino_Acids_X}
+
+            # fructan
+            K_REGUL_SFRUCTAN_N = p['K_REGUL_SFRUCTAN'] ** p['N_REGUL_SFRUCTAN']
+            rate_Loading_Sucrose_massic = np.maximum(Loading_Sucrose, 0.) / mstruct / HOUR
+            Regul_S_Fructan = np.where(Loading_Sucrose <= 0, p['VMAX_SFRUCTAN_POT'],
+                                       (p['VMAX_SFRUCTAN_POT'] * K_REGUL_SFRUCTAN_N) / (rate_Loading_Sucrose_massic ** p['N_REGUL_SFRUCTAN'] + K_REGUL_SFRUCTAN_N))
+            d_Regul_S_Fructan_d_Loading = np.where(Loading_Sucrose <= 0, 0.,
+                                                   - p['VMAX_SFRUCTAN_POT'] * K_REGUL_SFRUCTAN_N * p['N_REGUL_SFRUCTAN'] * rate_Loading_Sucrose_massic ** (p['N_REGUL_SFRUCTAN'] - 1) /
+                                                   (rate_Loading_Sucrose_massic ** p['N_REGUL_SFRUCTAN'] + K_REGUL_SFRUCTAN_N) ** 2 / (mstruct * HOUR))
+            conc_sucrose_positive = np.maximum(0., sucrose) / mstruct_alpha
+            d_conc_sucrose_positive = np.where(sucrose > 0, 1. / mstruct_alpha, 0.)
+            S_Fructan_factor = conc_sucrose_positive / (conc_sucrose_positive + p['K_SFRUCTAN']) * HOUR * TV
+            d_S_Fructan = {'sucrose': Regul_S_Fructan * p['K_SFRUCTAN'] / (conc_sucrose_positive + p['K_SFRUCTAN']) ** 2 * HOUR * TV * d_conc_sucrose_positive +
+                           S_Fructan_factor * d_Regul_S_Fructan_d_Loading * d_Loading_Sucrose_E,
+                           'X_sucrose': S_Fructan_factor * d_Regul_S_Fructan_d_Loading * d_Loading_Sucrose_X}
+            D_Fructan_potential = (p['K_DFRUCTAN'] * p['VMAX_DFRUCTAN']) / (conc_sucrose_positive + p['K_DFRUCTAN']) * HOUR * TV
+            is_potential = D_Fructan_potential <= np.maximum(0., fructan)
+            d_D_Fructan = {'sucrose': np.where(is_potential, - (p['K_DFRUCTAN'] * p['VMAX_DFRUCTAN']) / (conc_sucrose_positive + p['K_DFRUCTAN']) ** 2 * HOUR * TV *
+                                               d_conc_sucrose_positive, 0.),
+                           'fructan': np.where(is_potential | (fructan <= 0), 0., 1.)}
+
+            # starch and sucrose
+            def d_michaelis_menten(amount, VMAX, K):
+                conc = np.maximum(amount, 0.) / mstruct_alpha
+                return np.where(amount > 0, VMAX * K / (conc + K) ** 2 / mstruct_alpha, 0.) * HOUR * TV
+
+            d_S_Starch = {'triosesP': d_michaelis_menten(triosesP, p['VMAX_STARCH'], p['K_STARCH'])}
+            d_S_Sucrose = {'triosesP': d_michaelis_menten(triosesP, p['VMAX_SUCROSE'], p['K_SUCROSE'])}
+            d_D_Starch = {'starch': np.where(p['DELTA_DSTARCH'] * starch > 0, p['DELTA_DSTARCH'] / mstruct_alpha, 0.) * HOUR * TV}
+
+            # amino acids and proteins
+            has_substrates = (nitrates > 0) & (triosesP > 0)
+            conc_nitrates = np.where(has_substrates, nitrates, 1.) / mstruct_alpha
+            conc_triosesP = np.where(has_substrates, triosesP, 1.) / mstruct_alpha
+            S_Amino_Acids = np.where(has_substrates, p['VMAX_AMINO_ACIDS'] / ((1 + p['K_AMINO_ACIDS_NITRATES'] / conc_nitrates) * (1 + p['K_AMINO_ACIDS_TRIOSESP'] / conc_triosesP)) *
+                                     HOUR * TV, 0.)
+            d_S_Amino_Acids = {'nitrates': np.where(has_substrates, S_Amino_Acids * p['K_AMINO_ACIDS_NITRATES'] / (conc_nitrates * (conc_nitrates + p['K_AMINO_ACIDS_NITRATES'])) /
+                                                    mstruct_alpha, 0.),
+                               'triosesP': np.where(has_substrates, S_Amino_Acids * p['K_AMINO_ACIDS_TRIOSESP'] / (conc_triosesP * (conc_triosesP + p['K_AMINO_ACIDS_TRIOSESP'])) /
+                                                    mstruct_alpha, 0.)}
+            d_S_Proteins = {'amino_acids': d_michaelis_menten(amino_acids, p['VMAX_SPROTEINS'], p['K_SPROTEINS'])}
+            conc_proteins = proteins / mstruct_alpha
+            conc_cytokinins = np.maximum(0, cytokinins / mstruct)
+            K_DPROTEINS_CYTOK_N = p['K_DPROTEINS_CYTOK'] ** p['N_DPROTEINS']
+            regul_cytokinins = (p['VMAX_DPROTEINS_CYTOK'] * K_DPROTEINS_CYTOK_N) / (conc_cytokinins ** p['N_DPROTEINS'] + K_DPROTEINS_CYTOK_N)
+            d_regul_cytokinins = np.where(cytokinins > 0, - p['VMAX_DPROTEINS_CYTOK'] * K_DPROTEINS_CYTOK_N * p['N_DPROTEINS'] * conc_cytokinins ** (p['N_DPROTEINS'] - 1) /
+                                          (conc_cytokinins ** p['N_DPROTEINS'] + K_DPROTEINS_CYTOK_N) ** 2 / mstruct, 0.)
+            D_Proteins_potential = (conc_proteins * p['VMAX_DPROTEINS'] / (conc_proteins + p['K_DPROTEINS'])) * HOUR * TV
+            d_D_Proteins = {'proteins': np.where(D_Proteins_potential * regul_cytokinins > 0,
+                                                 p['VMAX_DPROTEINS'] * p['K_DPROTEINS'] / (conc_proteins + p['K_DPROTEINS']) ** 2 * HOUR * TV * regul_cytokinins / mstruct_alpha, 0.),
+                            'cytokinins': np.where(D_Proteins_potential * regul_cytokinins > 0, D_Proteins_potential * d_regul_cytokinins, 0.)}
+            d_D_cytokinins = {'cytokinins': np.where(p['DELTA_D_CYTOKININS'] * cytokinins > 0, p['DELTA_D_CYTOKININS'] / mstruct_alpha, 0.) * HOUR * TV}
+
+            # respiration
+            d_R_phloem_loading = respiration.d_R_phloem(Loading_Sucrose, mstruct_alpha)
+            d_R_Nnit_red = respiration.d_R_Nnit_red(mstruct_alpha)
+            d_R_residual = respiration.d_R_residual(sucrose, mstruct_alpha, self.elements_Total_Organic_Nitrogen[act], self.elements_Ts[act])
+            d_sum_respi = _combine((d_R_phloem_loading, d_Loading_Sucrose), (d_R_Nnit_red, d_S_Amino_Acids), (1., {'sucrose': d_R_residual}))
+
+            element_indexes = dict(zip(ELEMENTS_COMPARTMENTS, self.elements_indexes[:, act]))
+            element_indexes.update({'X_sucrose': X_sucrose_indexes, 'X_amino_acids': X_amino_acids_indexes,
+                                    'roots_nitrates': roots_nitrates_indexes[axes_], 'roots_amino_acids': roots_amino_acids_indexes[axes_],
+                                    'roots_cytokinins': roots_cytokinins_indexes[axes_]})
+            starch_index, sucrose_index, triosesP_index, fructan_index, nitrates_index, amino_acids_index, proteins_index, cytokinins_index = self.elements_indexes[:, act]
+            AA_C = AMINO_ACIDS_C_N_RATIO
+
+            add(starch_index, _combine((mstruct_alpha, d_S_Starch), (-mstruct_alpha, d_D_Starch)), element_indexes)
+            add(sucrose_index, _combine((mstruct, d_S_Sucrose), (mstruct, d_D_Starch), (mstruct, d_D_Fructan), (-mstruct, d_S_Fructan), (-1., d_sum_respi), (-1., d_Loading_Sucrose)),
+                element_indexes)
+            add(triosesP_index, _combine((-mstruct_alpha, d_S_Sucrose), (-mstruct_alpha, d_S_Starch), (-mstruct_alpha * AA_C, d_S_Amino_Acids)), element_indexes)
+            add(fructan_index, _combine((mstruct_alpha, d_S_Fructan), (-mstruct_alpha, d_D_Fructan)), element_indexes)
+            add(nitrates_index, _combine((transpiration_ratio, {'roots_nitrates': d_Export_Nitrates[axes_]}), (-mstruct_alpha, d_S_Amino_Acids)), element_indexes)
+            add(amino_acids_index, _combine((transpiration_ratio, {'roots_amino_acids': d_Export_Amino_Acids[axes_]}), (-1., d_Loading_Amino_Acids),
+                                            (mstruct_alpha, d_S_Amino_Acids), (mstruct_alpha, d_D_Proteins), (-mstruct_alpha, d_S_Proteins)), element_indexes)
+            add(proteins_index, _combine((mstruct_alpha, d_S_Proteins), (-mstruct_alpha, d_D_Proteins)), element_indexes)
+            add(cytokinins_index, _combine((transpiration_ratio, {'roots_cytokinins': d_Export_cytokinins[axes_]}), (-mstruct_alpha, d_D_cytokinins)), element_indexes)
+
+            # contributions to the phloem, the hidden zones and the axes
+            loading = np.where(is_growing, 0., nb_replications)
+            growing = np.where(is_growing, 1., 0.)
+            add(axes_sucrose_indexes[axes_], _combine((loading, d_Loading_Sucrose)), element_indexes)
+            add(axes_amino_acids_indexes[axes_], _combine((loading, d_Loading_Amino_Acids)), element_indexes)
+            if is_growing.any():
+                add(X_sucrose_indexes, _combine((growing, d_Loading_Sucrose)), element_indexes)
+                add(X_amino_acids_indexes, _combine((growing, d_Loading_Amino_Acids)), element_indexes)
+            add(axes_sum_respi_shoot_indexes[axes_], _combine((nb_replications, d_sum_respi)), element_indexes)
+
+        # ---------- hidden zones ----------
+        act = self.active_hiddenzones
+        if len(act) != 0:
+            hz_parameters = _select_parameters(self.hiddenzones_parameters, act)
+            sucrose, fructan, amino_acids, proteins = y[self.hiddenzones_indexes[:, act]]
+            mstruct = self.hiddenzones_mstruct[act]
+            axes_ = self.hiddenzones_axes[act]
+            TV = T_effect_Vmax[axes_]
+            nb_replications = self.hiddenzones_nb_replications[act]
+
+            conductance = hz_parameters.SIGMA * hz_parameters.BETA * mstruct ** (2 / 3) * T_effect_conductivity[axes_] * HOUR
+            Unloading_Sucrose = (phloem_sucrose[axes_] / axes_mstruct[axes_] - sucrose / mstruct) * conductance
+            d_Unloading_Sucrose = {'phloem_sucrose': conductance / axes_mstruct[axes_], 'sucrose': - conductance / mstruct}
+            d_Unloading_Amino_Acids = {'phloem_amino_acids': conductance / axes_mstruct[axes_], 'amino_acids': - conductance / mstruct}
+
+            K_REGUL_SFRUCTAN_N = hz_parameters.K_REGUL_SFRUCTAN ** hz_parameters.N_REGUL_SFRUCTAN
+            rate_Loading_Sucrose_massic = np.maximum(-Unloading_Sucrose, 0.) / mstruct / HOUR
+            Regul_S_Fructan = np.where(Unloading_Sucrose >= 0, hz_parameters.VMAX_SFRUCTAN_POT,
+                                       hz_parameters.VMAX_SFRUCTAN_POT * K_REGUL_SFRUCTAN_N / (rate_Loading_Sucrose_massic ** hz_parameters.N_REGUL_SFRUCTAN + K_REGUL_SFRUCTAN_N))
+            d_Regul_S_Fructan_d_Unloading = np.where(Unloading_Sucrose >= 0, 0.,
+                                                     hz_parameters.VMAX_SFRUCTAN_POT * K_REGUL_SFRUCTAN_N * hz_parameters.N_REGUL_SFRUCTAN *
+                                                     rate_Loading_Sucrose_massic ** (hz_parameters.N_REGUL_SFRUCTAN - 1) /
+                                                     (rate_Loading_Sucrose_massic ** hz_parameters.N_REGUL_SFRUCTAN + K_REGUL_SFRUCTAN_N) ** 2 / (mstruct * HOUR))
+            conc_sucrose_positive = np.maximum(0., sucrose) / mstruct
+            d_conc_sucrose_positive = np.where(sucrose > 0, 1. / mstruct, 0.)
+            S_Fructan_factor = conc_sucrose_positive * hz_parameters.VMAX_SFRUCTAN_RELATIVE / (conc_sucrose_positive + hz_parameters.K_SFRUCTAN) * HOUR * TV
+            d_S_Fructan = _combine((S_Fructan_factor * d_Regul_S_Fructan_d_Unloading, d_Unloading_Sucrose),
+                                   (1., {'sucrose': hz_parameters.VMAX_SFRUCTAN_RELATIVE * Regul_S_Fructan * hz_parameters.K_SFRUCTAN /
+                                         (conc_sucrose_positive + hz_parameters.K_SFRUCTAN) ** 2 * HOUR * TV * d_conc_sucrose_positive}))
+            D_Fructan_potential = (hz_parameters.K_DFRUCTAN * hz_parameters.VMAX_DFRUCTAN * TV) / (conc_sucrose_positive + hz_parameters.K_DFRUCTAN) * HOUR
+            is_potential = D_Fructan_potential <= np.maximum(0., fructan)
+            d_D_Fructan = {'sucrose': np.where(is_potential, - (hz_parameters.K_DFRUCTAN * hz_parameters.VMAX_DFRUCTAN * TV) / (conc_sucrose_positive + hz_parameters.K_DFRUCTAN) ** 2 *
+                                               HOUR * d_conc_sucrose_positive, 0.),
+                           'fructan': np.where(is_potential | (fructan <= 0), 0., 1.)}
+            vmax = hz_parameters.VMAX_SPROTEINS_EMZ * (1 - self.hiddenzones_ratio_DZ[act]) + hz_parameters.VMAX_SPROTEINS_DZ * self.hiddenzones_ratio_DZ[act]
+            conc_amino_acids_positive = np.maximum(0, amino_acids / mstruct)
+            d_S_Proteins = {'amino_acids': np.where(amino_acids > 0, vmax * hz_parameters.K_SPROTEINS / (hz_parameters.K_SPROTEINS + conc_amino_acids_positive) ** 2 / mstruct, 0.) *
+                            HOUR * TV}
+            d_D_Proteins = {'proteins': np.where(hz_parameters.delta_Dproteins * proteins > 0, hz_parameters.delta_Dproteins / mstruct, 0.) * HOUR * TV}
+            d_R_residual = {'sucrose': respiration.d_R_residual(sucrose, mstruct * hz_parameters.ALPHA, self.hiddenzones_Total_Organic_Nitrogen[act], self.axes_Tair[axes_])}
+
+            hiddenzone_indexes = dict(zip(HIDDENZONES_COMPARTMENTS, self.hiddenzones_indexes[:, act]))
+            hiddenzone_indexes.update({'phloem_sucrose': axes_sucrose_indexes[axes_], 'phloem_amino_acids': axes_amino_acids_indexes[axes_]})
+            sucrose_index, fructan_index, amino_acids_index, proteins_index = self.hiddenzones_indexes[:, act]
+            add(sucrose_index, _combine((1., d_Unloading_Sucrose), (mstruct, d_D_Fructan), (-mstruct, d_S_Fructan), (-1., d_R_residual)), hiddenzone_indexes)
+            add(fructan_index, _combine((mstruct, d_S_Fructan), (-mstruct, d_D_Fructan)), hiddenzone_indexes)
+            add(amino_acids_index, _combine((1., d_Unloading_Amino_Acids), (mstruct, d_D_Proteins), (-mstruct, d_S_Proteins)), hiddenzone_indexes)
+            add(proteins_index, _combine((mstruct, d_S_Proteins), (-mstruct, d_D_Proteins)), hiddenzone_indexes)
+            add(axes_sucrose_indexes[axes_], _combine((-nb_replications, d_Unloading_Sucrose)), hiddenzone_indexes)
+            add(axes_amino_acids_indexes[axes_], _combine((-nb_replications, d_Unloading_Amino_Acids)), hiddenzone_indexes)
+            add(axes_sum_respi_shoot_indexes[axes_], _combine((nb_replications, d_R_residual)), hiddenzone_indexes)
+
+        # ---------- grains ----------
+        if len(self.grains) != 0:
+            grains_parameters = self.grains_parameters
+            structure, starch, proteins, age_from_flowering = y[self.grains_indexes]
+            axes_ = self.grains_axes
+            T_effect_growth = self.grains_T_effect_growth
+            grains_phloem_sucrose = phloem_sucrose[axes_]
+            grains_phloem_amino_acids = phloem_amino_acids[axes_]
+            mstruct_axis_alpha = axes_mstruct[axes_] * parameters.AXIS_PARAMETERS.ALPHA
+            conc_sucrose_phloem_positive = np.maximum(0., grains_phloem_sucrose) / mstruct_axis_alpha
+            d_conc_sucrose_phloem_positive = np.where(grains_phloem_sucrose > 0, 1. / mstruct_axis_alpha, 0.)
+            RGR_Structure = ((conc_sucrose_phloem_positive * grains_parameters.VMAX_RGR) / (conc_sucrose_phloem_positive + grains_parameters.K_RGR)) * T_effect_growth
+            d_RGR_Structure = grains_parameters.VMAX_RGR * grains_parameters.K_RGR / (conc_sucrose_phloem_positive + grains_parameters.K_RGR) ** 2 * T_effect_growth * \
+                d_conc_sucrose_phloem_positive
+            d_structural_dry_mass = model.Grains.calculate_structural_dry_mass(1.)
+            structural_dry_mass = structure * d_structural_dry_mass
+            is_enlarging = age_from_flowering <= grains_parameters.FILLING_INIT
+            is_filling = ~is_enlarging & (age_from_flowering <= grains_parameters.FILLING_END)
+            S_grain_structure = np.where(is_enlarging, structure * RGR_Structure * HOUR, 0.)
+            d_S_grain_structure = {'structure': np.where(is_enlarging, RGR_Structure * HOUR, 0.), 'phloem_sucrose': np.where(is_enlarging, structure * d_RGR_Structure * HOUR, 0.)}
+            S_grain_starch = np.where(is_filling, ((conc_sucrose_phloem_positive * grains_parameters.VMAX_STARCH) / (conc_sucrose_phloem_positive + grains_parameters.K_STARCH)) *
+                                      HOUR * T_effect_Vmax[axes_], 0.)
+            d_S_grain_starch = np.where(is_filling, grains_parameters.VMAX_STARCH * grains_parameters.K_STARCH / (conc_sucrose_phloem_positive + grains_parameters.K_STARCH) ** 2 *
+                                        HOUR * T_effect_Vmax[axes_] * d_conc_sucrose_phloem_positive, 0.)
+            # growth of structure and starch
+            growth = S_grain_structure + S_grain_starch * structural_dry_mass
+            d_growth = _combine((1., d_S_grain_structure), (1., {'structure': S_grain_starch * d_structural_dry_mass, 'phloem_sucrose': d_S_grain_starch * structural_dry_mass}))
+            d_S_starch_growth = {'structure': S_grain_starch * d_structural_dry_mass, 'phloem_sucrose': d_S_grain_starch * structural_dry_mass}
+            has_sucrose = grains_phloem_sucrose > 0
+            ratio_amino_acids_sucrose = np.where(has_sucrose, grains_phloem_amino_acids / np.where(has_sucrose, grains_phloem_sucrose, 1.), 0.)
+            d_S_Proteins = _combine((ratio_amino_acids_sucrose, d_growth),
+                                    (1., {'phloem_sucrose': np.where(has_sucrose, - growth * ratio_amino_acids_sucrose / np.where(has_sucrose, grains_phloem_sucrose, 1.), 0.),
+                                          'phloem_amino_acids': np.where(has_sucrose, growth / np.where(has_sucrose, grains_phloem_sucrose, 1.), 0.)}))
+            d_R_grain_growth = respiration.d_R_grain_growth()
+
+            grains_indexes = dict(zip(GRAINS_COMPARTMENTS, self.grains_indexes))
+            grains_indexes.update({'phloem_sucrose': axes_sucrose_indexes[axes_], 'phloem_amino_acids': axes_amino_acids_indexes[axes_]})
+            structure_index, starch_index, proteins_index, _ = self.grains_indexes
+            add(structure_index, _combine((1. - d_R_grain_growth, d_S_grain_structure)), grains_indexes)
+            add(starch_index, _combine((1. - d_R_grain_growth, d_S_starch_growth)), grains_indexes)
+            add(proteins_index, d_S_Proteins, grains_indexes)
+            add(axes_sucrose_indexes[axes_], _combine((-1., d_growth)), grains_indexes)
+            add(axes_amino_acids_indexes[axes_], _combine((-1., d_S_Proteins)), grains_indexes)
+            add(axes_sum_respi_shoot_indexes[axes_], _combine((d_R_grain_growth, d_growth)), grains_indexes)
+
+        # ---------- roots ----------
+        soils_Conc_Nitrates = np.maximum(0, (y[self.soils_indexes] / self.soils_volume))
+        Conc_Nitrates_Soil = soils_Conc_Nitrates[self.axes_soils]
+        d_Conc_Nitrates_Soil = np.where(soils_Conc_Nitrates > 0, 1. / self.soils_volume, 0.)[self.axes_soils]
+        soil_T_effect_Vmax = self.soils_T_effect_Vmax[self.axes_soils]
+        conc_nitrates_roots = roots_nitrates / roots_mstruct
+        VMAX_HATS = roots_parameters.A_VMAX_HATS * conc_nitrates_roots + roots_parameters.B_VMAX_HATS
+        VMAX_HATS_MAX = np.maximum(0., VMAX_HATS)
+        d_VMAX_HATS_MAX = np.where(VMAX_HATS > 0, roots_parameters.A_VMAX_HATS / roots_mstruct, 0.)
+        K_HATS_ = roots_parameters.A_K_HATS * conc_nitrates_roots + roots_parameters.B_K_HATS
+        K_HATS = np.maximum(0., K_HATS_)
+        d_K_HATS = np.where(K_HATS_ > 0, roots_parameters.A_K_HATS / roots_mstruct, 0.)
+        HATS = (VMAX_HATS_MAX * Conc_Nitrates_Soil) / (K_HATS + Conc_Nitrates_Soil)
+        K_LATS_ = roots_parameters.A_LATS * conc_nitrates_roots + roots_parameters.B_LATS
+        K_LATS = np.maximum(0., K_LATS_)
+        d_K_LATS = np.where(K_LATS_ > 0, roots_parameters.A_LATS / roots_mstruct, 0.)
+        HATS_LATS = HATS + K_LATS * Conc_Nitrates_Soil
+        d_HATS_LATS = {'nitrates': d_VMAX_HATS_MAX * Conc_Nitrates_Soil / (K_HATS + Conc_Nitrates_Soil) - VMAX_HATS_MAX * Conc_Nitrates_Soil * d_K_HATS / (K_HATS + Conc_Nitrates_Soil) ** 2 +
+                       d_K_LATS * Conc_Nitrates_Soil,
+                       'soil_nitrates': (VMAX_HATS_MAX * K_HATS / (K_HATS + Conc_Nitrates_Soil) ** 2 + K_LATS) * d_Conc_Nitrates_Soil}
+        influx_factor = HOUR * soil_T_effect_Vmax * roots_mstruct
+        conc_sucrose_roots_ = roots_sucrose / roots_mstruct
+        regul_C = conc_sucrose_roots_ * roots_parameters.RELATIVE_VMAX_N_UPTAKE / (conc_sucrose_roots_ + roots_parameters.K_C)
+        d_regul_C = roots_parameters.RELATIVE_VMAX_N_UPTAKE * roots_parameters.K_C / (conc_sucrose_roots_ + roots_parameters.K_C) ** 2 / roots_mstruct
+        is_uptaking = np.where(HATS_LATS < roots_parameters.MIN_INFLUX_FOR_UPTAKE, 0., roots_parameters.NET_INFLUX_UPTAKE_RATIO)
+        d_Uptake_Nitrates = _combine((is_uptaking * influx_factor * regul_C, d_HATS_LATS), (1., {'sucrose': is_uptaking * influx_factor * HATS_LATS * d_regul_C}))
+        d_R_Nnit_upt = _combine((respiration.d_R_Nnit_upt(roots_sucrose), d_Uptake_Nitrates))
+
+        conc_sucrose_roots = roots_sucrose / roots_mstruct_alpha
+        mstruct_axis_alpha = axes_mstruct * parameters.AXIS_PARAMETERS.ALPHA
+        conc_sucrose_phloem = phloem_sucrose / mstruct_axis_alpha
+        conductance = roots_parameters.SIGMA_SUCROSE * roots_parameters.BETA * roots_mstruct ** (2 / 3) * T_effect_conductivity * HOUR
+        driving_compartment = np.maximum(conc_sucrose_roots, conc_sucrose_phloem)
+        Unloading_Sucrose = driving_compartment * (conc_sucrose_phloem - conc_sucrose_roots) * conductance
+        roots_is_driving = conc_sucrose_roots >= conc_sucrose_phloem
+        d_Unloading_Sucrose = {'phloem_sucrose': conductance * (np.where(roots_is_driving, 0., conc_sucrose_phloem - conc_sucrose_roots) + driving_compartment) / mstruct_axis_alpha,
+                               'sucrose': conductance * (np.where(roots_is_driving, conc_sucrose_phloem - conc_sucrose_roots, 0.) - driving_compartment) / roots_mstruct_alpha}
+        has_unloading = (phloem_amino_acids > 0) & (phloem_sucrose > 0) & (Unloading_Sucrose > 0)
+        safe_phloem_sucrose = np.where(has_unloading, phloem_sucrose, 1.)
+        ratio_amino_acids_sucrose = np.where(has_unloading, phloem_amino_acids / safe_phloem_sucrose, 0.)
+        Unloading_Amino_Acids = Unloading_Sucrose * ratio_amino_acids_sucrose
+        d_Unloading_Amino_Acids = _combine((ratio_amino_acids_sucrose, d_Unloading_Sucrose),
+                                           (1., {'phloem_sucrose': np.where(has_unloading, - Unloading_Amino_Acids / safe_phloem_sucrose, 0.),
+                                                 'phloem_amino_acids': np.where(has_unloading, Unloading_Sucrose / safe_phloem_sucrose, 0.)}))
+
+        conc_nitrates_roots_alpha = roots_nitrates / roots_mstruct_alpha
+        S_Amino_Acids = soil_T_effect_Vmax * roots_parameters.VMAX_AMINO_ACIDS / ((1 + roots_parameters.K_AMINO_ACIDS_NITRATES / conc_nitrates_roots_alpha) *
+                                                                                       (1 + roots_parameters.K_AMINO_ACIDS_SUCROSE / conc_sucrose_roots)) * HOUR
+        R_Nnit_red_factor = respiration.d_R_Nnit_red(roots_mstruct_alpha, root=True)
+        is_reducing = np.where(roots_sucrose < R_Nnit_red_factor * S_Amino_Acids, 0., 1.)
+        d_S_Amino_Acids = {'nitrates': is_reducing * S_Amino_Acids * roots_parameters.K_AMINO_ACIDS_NITRATES /
+                           (conc_nitrates_roots_alpha * (conc_nitrates_roots_alpha + roots_parameters.K_AMINO_ACIDS_NITRATES)) / roots_mstruct_alpha,
+                           'sucrose': is_reducing * S_Amino_Acids * roots_parameters.K_AMINO_ACIDS_SUCROSE /
+                           (conc_sucrose_roots * (conc_sucrose_roots + roots_parameters.K_AMINO_ACIDS_SUCROSE)) / roots_mstruct_alpha}
+        d_R_Nnit_red = _combine((R_Nnit_red_factor, d_S_Amino_Acids))
+
+        has_C_exudation = (roots_sucrose > 0) & (Unloading_Sucrose > 0)
+        is_sucrose_limiting = roots_sucrose <= Unloading_Sucrose * roots_parameters.C_EXUDATION
+        C_exudation = np.where(has_C_exudation, np.minimum(roots_sucrose, Unloading_Sucrose * roots_parameters.C_EXUDATION), 0.)
+        d_C_exudation = _combine((np.where(has_C_exudation & ~is_sucrose_limiting, roots_parameters.C_EXUDATION, 0.), d_Unloading_Sucrose),
+                                 (1., {'sucrose': np.where(has_C_exudation & is_sucrose_limiting, 1., 0.)}))
+        has_N_exudation = (phloem_amino_acids > 0) & (roots_amino_acids > 0) & (roots_sucrose > 0)
+        safe_roots_sucrose = np.where(has_N_exudation, roots_sucrose, 1.)
+        ratio_roots = roots_amino_acids / safe_roots_sucrose
+        is_ratio_limiting = has_N_exudation & (ratio_roots <= roots_parameters.N_EXUDATION_MAX)
+        N_exudation_ratio = np.where(has_N_exudation, np.minimum(ratio_roots, roots_parameters.N_EXUDATION_MAX), 0.)
+        d_N_exudation = _combine((N_exudation_ratio, d_C_exudation),
+                                 (1., {'amino_acids': np.where(is_ratio_limiting, C_exudation / safe_roots_sucrose, 0.),
+                                       'sucrose': np.where(is_ratio_limiting, - ratio_roots * C_exudation / safe_roots_sucrose, 0.)}))
+
+        def d_hill(amount, N, K):
+            conc = np.maximum(0, amount / roots_mstruct)
+            hill = conc ** N / (conc ** N + K ** N)
+            d_hill_ = np.where(amount > 0, N * conc ** (N - 1) * K ** N / (conc ** N + K ** N) ** 2 / roots_mstruct, 0.)
+            return hill, d_hill_
+
+        f_sucrose, d_f_sucrose = d_hill(roots_sucrose, roots_parameters.N_SUC_CYTOKININS, roots_parameters.K_SUCROSE_CYTOKININS)
+        f_nitrates, d_f_nitrates = d_hill(roots_nitrates, roots_parameters.N_NIT_CYTOKININS, roots_parameters.K_NITRATES_CYTOKININS)
+        S_cytokinins_factor = roots_parameters.VMAX_S_CYTOKININS * HOUR * soil_T_effect_Vmax
+        d_S_cytokinins = {'sucrose': S_cytokinins_factor * d_f_sucrose * f_nitrates, 'nitrates': S_cytokinins_factor * f_sucrose * d_f_nitrates}
+        d_R_residual = {'sucrose': respiration.d_R_residual(roots_sucrose, roots_mstruct_alpha, self.roots_Total_Organic_Nitrogen, self.soils_Tsoil[self.axes_soils])}
+        d_sum_respi = _combine((1., d_R_Nnit_upt), (1., d_R_Nnit_red), (1., d_R_residual))
+
+        roots_indexes = dict(zip(ROOTS_COMPARTMENTS, self.roots_indexes))
+        roots_indexes.update({'phloem_sucrose': axes_sucrose_indexes, 'phloem_amino_acids': axes_amino_acids_indexes, 'soil_nitrates': self.soils_indexes[self.axes_soils]})
+        add(roots_sucrose_indexes, _combine((roots_mstruct, d_Unloading_Sucrose), (-roots_mstruct * AMINO_ACIDS_C_N_RATIO, d_S_Amino_Acids), (-roots_mstruct, d_C_exudation),
+                                            (-1., d_sum_respi)), roots_indexes)
+        add(roots_nitrates_indexes, _combine((1., d_Uptake_Nitrates), (-1., {'nitrates': d_Export_Nitrates}), (-roots_mstruct, d_S_Amino_Acids)), roots_indexes)
+        add(roots_amino_acids_indexes, _combine((roots_mstruct, d_Unloading_Amino_Acids), (roots_mstruct, d_S_Amino_Acids), (-roots_mstruct, d_N_exudation),
+                                                (-1., {'amino_acids': d_Export_Amino_Acids})), roots_indexes)
+        add(roots_cytokinins_indexes, _combine((roots_mstruct, d_S_cytokinins), (-1., {'cytokinins': d_Export_cytokinins})), roots_indexes)
+        add(axes_sucrose_indexes, _combine((-roots_mstruct_alpha, d_Unloading_Sucrose)), roots_indexes)
+        add(axes_amino_acids_indexes, _combine((-roots_mstruct_alpha, d_Unloading_Amino_Acids)), roots_indexes)
+        add(axes_C_exudated_indexes, _combine((roots_mstruct, d_C_exudation), (roots_mstruct * AMINO_ACIDS_C_N_RATIO, d_N_exudation)), roots_indexes)
+        add(axes_sum_respi_roots_indexes, d_sum_respi, roots_indexes)
+
+        # ---------- soils ----------
+        axes_soil_is_variable = ~self.soils_constant_Conc_Nitrates[self.axes_soils]
+        if axes_soil_is_variable.any():
+            add(self.soils_indexes[self.axes_soils], _combine((-self.axes_culm_density * axes_soil_is_variable, d_Uptake_Nitrates)), roots_indexes)
+
+
+def _combine(*terms):
+    """Linear combination of partial derivatives: `terms` are pairs (coefficient, {variable_name: partial_derivative, ...}).
+    """
+    combination = {}
+    for coefficient, gradient in terms:
+        for variable_name, partial_derivative in gradient.items():
+            combination[variable_name] = combination.get(variable_name, 0.) + coefficient * partial_derivative
+    return combination
+
+
+def _gather_parameters(model_objects, default_parameters):
+    """Gather the internal parameters of `model_objects`. If all the model objects have the same values of parameters,
+    return the internal parameters of the first one ; otherwise, return a copy where each parameter is an array aligned with `model_objects`.
+    Return `default_parameters` if `model_objects` is empty.
+    """
+    if len(model_objects) == 0:
+        return default_parameters
+    first_parameters = model_objects[0].PARAMETERS
+    if all(model_object.PARAMETERS is first_parameters or vars(model_object.PARAMETERS) == vars(first_parameters) for model_object in model_objects):
+        return first_parameters
+    gathered_parameters = copy.copy(first_parameters)
+    for name in vars(first_parameters):
+        setattr(gathered_parameters, name, np.array([getattr(model_object.PARAMETERS, name) for model_object in model_objects], dtype=float))
+    return gathered_parameters
+
+
+def _parameters_arrays(parameters_, size):
+    """Return a copy of the internal parameters `parameters_` where each parameter is an array of `size` values.
+    """
+    parameters_arrays = copy.copy(parameters_)
+    for name, value in vars(parameters_).items():
+        setattr(parameters_arrays, name, np.array(np.broadcast_to(value, size), dtype=float))
+    return parameters_arrays
+
+
+def _select_parameters(parameters_, positions):
+    """Select the internal parameters at `positions` in `parameters_`, as returned by :func:`_gather_parameters`.
+    """
+    if not any(isinstance(value, np.ndarray) for value in vars(parameters_).values()):
+        return parameters_
+    selected_parameters = copy.copy(parameters_)
+    for name, value in vars(parameters_).items():
+        setattr(selected_parameters, name, value[positions])
+    return selected_parameters
+
+
+def _set_attributes(model_objects, values):
+    """Set the attributes of `model_objects` from `values`, a dictionary of arrays aligned with `model_objects`.
+    """
+    for name, array in values.items():
+        for model_object, value in zip(model_objects, np.asarray(array).tolist()):
+            setattr(model_object, name, value)
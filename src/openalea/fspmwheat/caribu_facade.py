@@ -255,13 +255,14 @@ class CaribuFacade(object):
 
         # Built alea table if does not exist yet
         if self._alea_canopy.empty:
+            topology_index = tools.get_topology_index(self._shared_mtg)
             elements_vid_list = []
-            for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-                for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                    for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                        for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                            for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                                if self._shared_mtg.label(mtg_element_vid) == 'LeafElement1':
+            for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+                for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                    for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                        for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                            for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                                if topology_index.vids_ids[mtg_element_vid][4] == 'LeafElement1':
                                     elements_vid_list.append(mtg_element_vid)
             elements_vid_df = pd.DataFrame({'vid': elements_vid_list, 'tmp': 1})
             positions_df = pd.DataFrame({'pos': range(len(positions)),
@@ -330,6 +331,7 @@ class CaribuFacade(object):
         Update the dataframes shared between all models from the inputs dataframes or the outputs dataframes of the model.
         :param dict aggregated_outputs: {'param1': { vid1: , vid2, ...}, 'param2': { vid1: , vid2, ...}}
         """
+        topology_index = tools.get_topology_index(self._shared_mtg)
         ids = []
         ids_lidt_built = False
         aggregated_outputs_list = {}
@@ -338,8 +340,7 @@ class CaribuFacade(object):
             aggregated_outputs_list[param] = []
             for vid in sorted(aggregated_outputs[param].keys()):
                 if not ids_lidt_built:
-                    ind = int(self._shared_mtg.index(self._shared_mtg.complex_at_scale(vid, 1))), self._shared_mtg.label(self._shared_mtg.complex_at_scale(vid, 2)), \
-                          int(self._shared_mtg.index(self._shared_mtg.complex_at_scale(vid, 3))), self._shared_mtg.label(self._shared_mtg.complex_at_scale(vid, 4)), self._shared_mtg.label(vid)
+                    ind = topology_index.vids_ids[vid]
                     ids.append(ind)
                 aggregated_outputs_list[param].append(aggregated_outputs[param][vid])
             ids_lidt_built = True
@@ -58,6 +58,12 @@ MTG_RUN_VARIABLES = set(list(POPULATION_RUN_VARIABLES) + cnwheat_simulation.Simu
 # number of seconds in 1 hour
 HOUR_TO_SECOND_CONVERSION_FACTOR = 3600
 
+#: the state parameters compared between consecutive runs to decide if they can be merged into one integration (see :meth:`CNWheatFacade.run`):
+#: [(class of the group of model objects in the layout of the compartments, names of the state parameters), ...]
+MERGED_RUNS_FORCINGS = [(cnwheat_model.PhotosyntheticOrganElement, ('Ag', 'Tr', 'green_area', 'mstruct')),
+                        (cnwheat_model.HiddenZone, ('mstruct',)),
+                        (cnwheat_model.Roots, ('mstruct',))]
+
 
 class CNWheatFacade(object):
     """
@@ -79,7 +85,10 @@ class CNWheatFacade(object):
                  shared_hiddenzones_inputs_outputs_df,
                  shared_elements_inputs_outputs_df,
                  shared_soils_inputs_outputs_df,
-                 update_shared_df=True):
+                 update_shared_df=True,
+                 merge_threshold=None,
+                 merge_temperature_threshold=1.0,
+                 max_merged_steps=6):
         """
         :param openalea.mtg.mtg.MTG shared_mtg: The MTG shared between all models.
         :param int delta_t: The delta between two runs, in seconds.
@@ -95,6 +104,10 @@ class CNWheatFacade(object):
         :param pandas.DataFrame shared_elements_inputs_outputs_df: the dataframe of inputs and outputs at elements scale shared between all models.
         :param pandas.DataFrame shared_soils_inputs_outputs_df: the dataframe of inputs and outputs at soils scale shared between all models.
         :param bool update_shared_df: If `True`  update the shared dataframes at init and at each run (unless stated otherwise)
+        :param float merge_threshold: The maximum relative change of the forcings (see :attr:`MERGED_RUNS_FORCINGS`) under which consecutive runs are merged
+                                      into one integration of the model (see :meth:`run`). `None` (default) to integrate the model at each run.
+        :param float merge_temperature_threshold: The maximum change of the air, soil and organs temperatures under which consecutive runs are merged, in C.
+        :param int max_merged_steps: The maximum number of time steps of one integration of merged runs.
 
         """
 
@@ -106,6 +119,12 @@ class CNWheatFacade(object):
 
         self._update_parameters = update_parameters
 
+        #: the model objects of CNWheat built from the MTG at the previous run, kept from one run to the next (see :meth:`_initialize_model`):
+        #: {(MTG vertex id, CNWheat class): CNWheat model object, ...}
+        self._model_objects = {}
+        #: the number of replications per cohort rank, shared by all the model objects and updated in place at each run
+        self._cohorts_replications = {}
+
         self._simulation.initialize(self.population, self.soils)
 
         self._update_shared_MTG()
@@ -116,6 +135,19 @@ class CNWheatFacade(object):
         self._shared_elements_inputs_outputs_df = shared_elements_inputs_outputs_df  #: the dataframe at elements scale shared between all models
         self._shared_soils_inputs_outputs_df = shared_soils_inputs_outputs_df  #: the dataframe at soils scale shared between all models
         self._update_shared_df = update_shared_df
+
+        self._merge_threshold = merge_threshold if max_merged_steps > 1 else None  #: the maximum relative change of the forcings of merged runs
+        self._merge_temperature_threshold = merge_temperature_threshold  #: the maximum change of the temperatures of merged runs (C)
+        self._max_merged_steps = max_merged_steps  #: the maximum number of time steps of one integration of merged runs
+        self.nb_merged_runs = 0  #: the number of runs which were interpolated in the integration of a previous run instead of being integrated
+        self._merged_dense_output = None  #: the continuous solution of the current integration of merged runs
+        self._merged_signature = None  #: the signature of the layout of the compartments of the current integration of merged runs
+        self._merged_forcings = None  #: the forcings at the beginning of the current integration of merged runs
+        self._merged_nb_steps = 0  #: the number of time steps of the current integration of merged runs
+        self._merged_step = 0  #: the number of time steps of the current integration of merged runs already done
+        self._merged_increments = None  #: the changes of the compartments made by the other models since the beginning of the current integration
+        self._merged_last_y = None  #: the compartments set at the last run
+
         if self._update_shared_df:
             self._update_shared_dataframes(cnwheat_organs_data_df=model_organs_inputs_df,
                                            cnwheat_hiddenzones_data_df=model_hiddenzones_inputs_df,
@@ -126,6 +158,10 @@ class CNWheatFacade(object):
         """
         Run the model and update the MTG and the dataframes shared between all models.
 
+        If `merge_threshold` was given to the constructor, consecutive runs are merged while their forcings do not change more than the thresholds
+        (see :meth:`_run_merged`): the model is integrated over one or several time steps at the first of them, and the outputs of the next ones are
+        interpolated in the continuous solution of the solver.
+
         :param update_shared_df:
         :param float Tair: air temperature (C)
         :param float Tsoil: soil temperature (C)
@@ -134,7 +170,10 @@ class CNWheatFacade(object):
         """
 
         self._initialize_model(Tair=Tair, Tsoil=Tsoil, tillers_replications=tillers_replications)
-        self._simulation.run()
+        if self._merge_threshold is None:
+            self._simulation.run()
+        else:
+            self._run_merged(Tair, Tsoil)
         self._update_shared_MTG()
 
         if update_shared_df or (update_shared_df is None and self._update_shared_df):
@@ -146,6 +185,18 @@ class CNWheatFacade(object):
                                            cnwheat_elements_data_df=cnwheat_elements_inputs_outputs_df,
                                            cnwheat_soils_data_df=cnwheat_soils_inputs_outputs_df)
 
+    def write_solver_statistics(self, outputs_filepath, precision=None):
+        """
+        Write the statistics of the solver of CNWheat recorded at each run (see :attr:`openalea.cnwheat.simulation.Simulation.SOLVER_STATISTICS`)
+        in a CSV file, for example next to the outputs of the model.
+
+        :param str outputs_filepath: the path of the CSV file to write.
+        :param int precision: the number of decimals of the floats written ; default is `None`: write all the decimals.
+        """
+        solver_statistics_df = self._simulation.solver_statistics_to_dataframe()
+        float_format = None if precision is None else '%.{}f'.format(precision)
+        solver_statistics_df.to_csv(outputs_filepath, na_rep='NA', index=False, float_format=float_format)
+
     @staticmethod
     def postprocessing(axes_outputs_df, organs_outputs_df, hiddenzone_outputs_df, elements_outputs_df, soils_outputs_df, delta_t):
         """
@@ -201,17 +252,105 @@ class CNWheatFacade(object):
                                                soils_df=soils_postprocessing_df,
                                                graphs_dirpath=graphs_dirpath)
 
+    def _run_merged(self, Tair, Tsoil):
+        """
+        Set the population of the model to its state at the end of the current time step, merging the current run with the previous ones if possible.
+
+        If the current run can be merged (see :meth:`_can_merge_run`) and is covered by the current integration, the compartments are interpolated
+        at the end of the current time step in the continuous solution of this integration.
+        Otherwise, the model is integrated with the current forcings: over one time step if the forcings changed, so that the runs which cannot be merged
+        do not pay for the time steps they do not use, or over twice the time steps of the previous integration, up to `max_merged_steps`,
+        if the forcings did not change but the previous integration is over.
+        The changes of the compartments made by the other models since the beginning of the integration are added to the interpolated compartments,
+        and the compartments of the axes, which are reset at each run, are set to their change during the current time step.
+
+        :param float Tair: air temperature (C)
+        :param float Tsoil: soil temperature (C)
+        """
+        simulation = self._simulation
+        y = simulation.layout.gather()
+        forcings = self._get_merged_runs_forcings(Tair, Tsoil)
+        axes_indexes = np.concatenate([np.zeros(0, dtype=int)] + list(simulation.layout.groups_indexes.get(cnwheat_model.Axis, {}).values()))
+        can_merge_run = self._can_merge_run(forcings)
+        if can_merge_run and self._merged_step < self._merged_nb_steps:
+            increments = y - self._merged_last_y
+            increments[axes_indexes] = 0
+            self._merged_increments += increments
+            self._merged_step += 1
+            self.nb_merged_runs += 1
+        else:
+            nb_time_steps = min(2 * self._merged_nb_steps, self._max_merged_steps) if can_merge_run else 1
+            simulation.run(nb_time_steps=nb_time_steps)
+            self._merged_dense_output = simulation.dense_output
+            self._merged_signature = simulation.layout.signature
+            self._merged_forcings = forcings
+            self._merged_nb_steps = nb_time_steps
+            self._merged_step = 1
+            self._merged_increments = np.zeros_like(y)
+            if nb_time_steps == 1:
+                # the population is already set to its state at the end of the time step
+                self._merged_last_y = simulation.layout.gather()
+                return
+
+        t = self._merged_step * simulation.time_step
+        y = self._merged_dense_output(t) + self._merged_increments
+        y[axes_indexes] -= self._merged_dense_output(t - simulation.time_step)[axes_indexes]
+        simulation.set_state(y)
+        self._merged_last_y = y
+
+    def _get_merged_runs_forcings(self, Tair, Tsoil):
+        """
+        Get the forcings compared between consecutive runs to decide if they can be merged.
+
+        :param float Tair: air temperature (C)
+        :param float Tsoil: soil temperature (C)
+
+        :return: The values of the state parameters :attr:`MERGED_RUNS_FORCINGS` of the model objects, ordered as in the layout of the compartments,
+                 and the temperatures: air, soil, then the organs.
+        :rtype: (list [numpy.ndarray], numpy.ndarray)
+        """
+        groups_objects = self._simulation.layout.groups_objects
+        forcings = [np.array([getattr(model_object, forcing_name) for model_object in groups_objects.get(group_class, [])], dtype=float)
+                    for group_class, forcings_names in MERGED_RUNS_FORCINGS for forcing_name in forcings_names]
+        temperatures = np.array([Tair, Tsoil] + [element.Ts for element in groups_objects.get(cnwheat_model.PhotosyntheticOrganElement, [])], dtype=float)
+        return forcings, temperatures
+
+    def _can_merge_run(self, forcings):
+        """
+        Tell if the current run can be merged with the previous ones: the layout of the compartments must be the same,
+        and the forcings must not have changed since the beginning of the integration by more than
+        `merge_threshold` relatively to their largest absolute value, nor the temperatures by more than `merge_temperature_threshold`.
+
+        :param tuple forcings: the current forcings (see :meth:`_get_merged_runs_forcings`).
+
+        :return: True if the current run can be merged with the previous ones, False otherwise.
+        :rtype: bool
+        """
+        if self._merged_forcings is None or self._simulation.layout.signature != self._merged_signature:
+            return False
+        (current_forcings, current_temperatures), (merged_forcings, merged_temperatures) = forcings, self._merged_forcings
+        for current_values, merged_values in zip(current_forcings, merged_forcings):
+            scale = max(np.abs(current_values).max(initial=0), np.abs(merged_values).max(initial=0))
+            if scale > 0 and np.abs(current_values - merged_values).max() > self._merge_threshold * scale:
+                return False
+        return np.abs(current_temperatures - merged_temperatures).max() <= self._merge_temperature_threshold
+
     def _initialize_model(self, Tair=12, Tsoil=12, tillers_replications=None):
         """
         Initialize the inputs of the model from the MTG shared between all models and the soils.
 
+        The model objects of the population are kept from one run to the next: only the objects of the vertices of the MTG which appeared since
+        the previous run are created, and the objects of the vertices which disappeared are dropped. The other objects are updated in place
+        from the properties of the MTG.
+
         :param float Tair: air temperature (C)
         :param float Tsoil: soil temperature (C)
         :param dict [str, float] tillers_replications: a dictionary with tiller id as key, and weight of replication as value.
         """
 
         # Convert number of replications per tiller into number of replications per cohort
-        cohorts_replications = {}
+        cohorts_replications = self._cohorts_replications
+        cohorts_replications.clear()
         if tillers_replications is not None:
             for tiller_id, replication_weight in tillers_replications.items():
                 try:
@@ -221,16 +360,25 @@ class CNWheatFacade(object):
                 cohorts_replications[tiller_rank + 3] = replication_weight
 
         self.population = cnwheat_model.Population()
+        model_objects = {}  # the model objects of the current run
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # traverse the MTG recursively from top
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            # create a new plant
-            cnwheat_plant = cnwheat_model.Plant(mtg_plant_index)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            cnwheat_plant = self._model_objects.get((mtg_plant_vid, cnwheat_model.Plant))
+            if cnwheat_plant is None:
+                # create a new plant
+                cnwheat_plant = cnwheat_model.Plant(mtg_plant_index)
+            else:
+                # reuse the plant of the previous run
+                cnwheat_plant.axes = []
+                del cnwheat_plant.cohorts[:]
+            model_objects[(mtg_plant_vid, cnwheat_model.Plant)] = cnwheat_plant
             is_valid_plant = False
 
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
 
                 #: Hack to treat tillering cases : TEMPORARY
                 if mtg_axis_label != 'MS':
@@ -241,13 +389,27 @@ class CNWheatFacade(object):
                     cnwheat_plant.cohorts.append(tiller_rank + 3)
 
                 #: MS
-                # create a new axis
-                cnwheat_axis = cnwheat_model.Axis(mtg_axis_label)
+                cnwheat_axis = self._model_objects.get((mtg_axis_vid, cnwheat_model.Axis))
+                if cnwheat_axis is None:
+                    # create a new axis
+                    cnwheat_axis = cnwheat_model.Axis(mtg_axis_label)
+                else:
+                    # reuse the axis of the previous run, and reset its compartments which accumulate the fluxes of a run
+                    cnwheat_axis.roots = cnwheat_axis.phloem = cnwheat_axis.grains = None
+                    cnwheat_axis.phytomers = []
+                    cnwheat_axis.C_exudated = cnwheat_model.Axis.INIT_COMPARTMENTS.C_exudated
+                    cnwheat_axis.sum_respi_shoot = cnwheat_model.Axis.INIT_COMPARTMENTS.sum_respi_shoot
+                    cnwheat_axis.sum_respi_roots = cnwheat_model.Axis.INIT_COMPARTMENTS.sum_respi_roots
+                model_objects[(mtg_axis_vid, cnwheat_model.Axis)] = cnwheat_axis
                 is_valid_axis = True
                 for cnwheat_organ_class in (cnwheat_model.Roots, cnwheat_model.Phloem, cnwheat_model.Grains):
                     mtg_organ_label = cnwheat_converter.CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[cnwheat_organ_class]
-                    # create a new organ
-                    cnwheat_organ = cnwheat_organ_class(mtg_organ_label)
+                    cnwheat_organ = self._model_objects.get((mtg_axis_vid, cnwheat_organ_class))
+                    is_new_organ = cnwheat_organ is None
+                    if is_new_organ:
+                        # create a new organ
+                        cnwheat_organ = cnwheat_organ_class(mtg_organ_label)
+                    model_objects[(mtg_axis_vid, cnwheat_organ_class)] = cnwheat_organ
                     mtg_axis_properties = self._shared_mtg.get_vertex_property(mtg_axis_vid)
                     if mtg_organ_label in mtg_axis_properties:
                         mtg_organ_properties = mtg_axis_properties[mtg_organ_label]
@@ -264,11 +426,11 @@ class CNWheatFacade(object):
                             cnwheat_organ.__dict__.update(cnwheat_organ_data_dict)
 
                             # Update parameters if specified
-                            if mtg_organ_label in self._update_parameters:
-                                cnwheat_organ.PARAMETERS.__dict__.update(self._update_parameters[mtg_organ_label])
+                            if is_new_organ and mtg_organ_label in self._update_parameters:
+                                cnwheat_organ.PARAMETERS = cnwheat_parameters.copy_parameters(cnwheat_organ.PARAMETERS, self._update_parameters[mtg_organ_label])
 
                             cnwheat_organ.initialize()
-                            # add the new organ to current axis
+                            # add the organ to current axis
                             setattr(cnwheat_axis, mtg_organ_label, cnwheat_organ)
                         elif cnwheat_organ_class is not cnwheat_model.Grains:
                             is_valid_axis = False
@@ -281,11 +443,19 @@ class CNWheatFacade(object):
                     continue
 
                 has_valid_phytomer = False
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
 
-                    # create a new phytomer
-                    cnwheat_phytomer = cnwheat_model.Phytomer(mtg_metamer_index, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications)  #: Hack to treat tillering cases :TEMPORARY
+                    cnwheat_phytomer = self._model_objects.get((mtg_metamer_vid, cnwheat_model.Phytomer))
+                    if cnwheat_phytomer is None:
+                        # create a new phytomer
+                        cnwheat_phytomer = cnwheat_model.Phytomer(mtg_metamer_index, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications)  #: Hack to treat tillering cases :TEMPORARY
+                    else:
+                        # reuse the phytomer of the previous run
+                        for cnwheat_organ_class in MTG_TO_CNWHEAT_PHYTOMERS_ORGANS_MAPPING.values():
+                            setattr(cnwheat_phytomer, CNWHEAT_ATTRIBUTES_MAPPING[cnwheat_organ_class], None)
+                        cnwheat_phytomer.cohorts, cnwheat_phytomer.cohorts_replications = cnwheat_plant.cohorts, cohorts_replications
+                    model_objects[(mtg_metamer_vid, cnwheat_model.Phytomer)] = cnwheat_phytomer
 
                     mtg_hiddenzone_label = cnwheat_converter.CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[cnwheat_model.HiddenZone]
                     mtg_metamer_properties = self._shared_mtg.get_vertex_property(mtg_metamer_vid)
@@ -298,16 +468,23 @@ class CNWheatFacade(object):
                             for cnwheat_hiddenzone_data_name in cnwheat_simulation.Simulation.HIDDENZONE_STATE:
                                 cnwheat_hiddenzone_data_dict[cnwheat_hiddenzone_data_name] = mtg_hiddenzone_properties[cnwheat_hiddenzone_data_name]
 
-                            # create a new hiddenzone
-                            cnwheat_hiddenzone = cnwheat_model.HiddenZone(mtg_hiddenzone_label, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications, index=cnwheat_phytomer.index,
-                                                                          **cnwheat_hiddenzone_data_dict)
-
-                            # Update parameters if specified
-                            if mtg_hiddenzone_label in self._update_parameters:
-                                cnwheat_hiddenzone.PARAMETERS.__dict__.update(self._update_parameters[mtg_hiddenzone_label])
+                            cnwheat_hiddenzone = self._model_objects.get((mtg_metamer_vid, cnwheat_model.HiddenZone))
+                            if cnwheat_hiddenzone is None:
+                                # create a new hiddenzone
+                                cnwheat_hiddenzone = cnwheat_model.HiddenZone(mtg_hiddenzone_label, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications, index=cnwheat_phytomer.index,
+                                                                              **cnwheat_hiddenzone_data_dict)
+
+                                # Update parameters if specified
+                                if mtg_hiddenzone_label in self._update_parameters:
+                                    cnwheat_hiddenzone.PARAMETERS = cnwheat_parameters.copy_parameters(cnwheat_hiddenzone.PARAMETERS, self._update_parameters[mtg_hiddenzone_label])
+                            else:
+                                # update the hiddenzone of the previous run
+                                cnwheat_hiddenzone.__dict__.update(cnwheat_hiddenzone_data_dict)
+                                cnwheat_hiddenzone.cohorts, cnwheat_hiddenzone.cohorts_replications = cnwheat_plant.cohorts, cohorts_replications
+                            model_objects[(mtg_metamer_vid, cnwheat_model.HiddenZone)] = cnwheat_hiddenzone
 
                             cnwheat_hiddenzone.initialize()
-                            # add the new hiddenzone to current phytomer
+                            # add the hiddenzone to current phytomer
                             setattr(cnwheat_phytomer, mtg_hiddenzone_label, cnwheat_hiddenzone)
                         else:
                             has_valid_hiddenzone = False
@@ -315,26 +492,32 @@ class CNWheatFacade(object):
                         has_valid_hiddenzone = False
 
                     has_valid_organ = False
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         if mtg_organ_label not in MTG_TO_CNWHEAT_PHYTOMERS_ORGANS_MAPPING or self._shared_mtg.get_vertex_property(mtg_organ_vid)['length'] == 0:
                             continue
 
-                        # create a new organ
                         cnwheat_organ_class = MTG_TO_CNWHEAT_PHYTOMERS_ORGANS_MAPPING[mtg_organ_label]
-                        cnwheat_organ = cnwheat_organ_class(mtg_organ_label)
+                        cnwheat_organ = self._model_objects.get((mtg_organ_vid, cnwheat_organ_class))
+                        if cnwheat_organ is None:
+                            # create a new organ
+                            cnwheat_organ = cnwheat_organ_class(mtg_organ_label)
 
-                        # Update parameters if specified
-                        if 'PhotosyntheticOrgan' in self._update_parameters:
-                            cnwheat_organ.PARAMETERS.__dict__.update(self._update_parameters['PhotosyntheticOrgan'])
+                            # Update parameters if specified
+                            if 'PhotosyntheticOrgan' in self._update_parameters:
+                                cnwheat_organ.PARAMETERS = cnwheat_parameters.copy_parameters(cnwheat_organ.PARAMETERS, self._update_parameters['PhotosyntheticOrgan'])
+                        else:
+                            # reuse the organ of the previous run
+                            cnwheat_organ.exposed_element = cnwheat_organ.enclosed_element = None
+                        model_objects[(mtg_organ_vid, cnwheat_organ_class)] = cnwheat_organ
 
                         cnwheat_organ.initialize()
                         has_valid_element = False
 
-                        # Create a new element
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
+                        # Create the elements
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
                             mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             if mtg_element_label not in cnwheat_converter.DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING \
                                     or (self._shared_mtg.get_vertex_property(mtg_element_vid)['length'] == 0) \
                                     or (self._shared_mtg.get_vertex_property(mtg_element_vid).get('mstruct', 0) == 0) \
@@ -353,12 +536,21 @@ class CNWheatFacade(object):
                                     else:
                                         mtg_element_data_value = cnwheat_parameters.PhotosyntheticOrganElementInitCompartments().__dict__[cnwheat_element_data_name]
                                 cnwheat_element_data_dict[cnwheat_element_data_name] = mtg_element_data_value
-                            cnwheat_element = CNWHEAT_ORGANS_TO_ELEMENTS_MAPPING[cnwheat_organ_class](mtg_element_label, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications,
-                                                                                                      index=cnwheat_phytomer.index, **cnwheat_element_data_dict)
-                            # Add parameters from organ scale
-                            cnwheat_element.PARAMETERS.__dict__.update(cnwheat_organ.PARAMETERS.__dict__)
-
-                            # add the new element to current organ
+                            cnwheat_element_class = CNWHEAT_ORGANS_TO_ELEMENTS_MAPPING[cnwheat_organ_class]
+                            cnwheat_element = self._model_objects.get((mtg_element_vid, cnwheat_element_class))
+                            if cnwheat_element is None:
+                                # create a new element
+                                cnwheat_element = cnwheat_element_class(mtg_element_label, cohorts=cnwheat_plant.cohorts, cohorts_replications=cohorts_replications,
+                                                                        index=cnwheat_phytomer.index, **cnwheat_element_data_dict)
+                                # Add parameters from organ scale
+                                cnwheat_element.PARAMETERS = cnwheat_parameters.copy_parameters(cnwheat_element.PARAMETERS, cnwheat_organ.PARAMETERS.__dict__)
+                            else:
+                                # update the element of the previous run
+                                cnwheat_element.__dict__.update(cnwheat_element_data_dict)
+                                cnwheat_element.cohorts, cnwheat_element.cohorts_replications = cnwheat_plant.cohorts, cohorts_replications
+                            model_objects[(mtg_element_vid, cnwheat_element_class)] = cnwheat_element
+
+                            # add the element to current organ
                             setattr(cnwheat_organ, cnwheat_converter.DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING[mtg_element_label], cnwheat_element)
 
                         if has_valid_element:
@@ -379,6 +571,9 @@ class CNWheatFacade(object):
             if is_valid_plant:
                 self.population.plants.append(cnwheat_plant)
 
+        # drop the model objects of the vertices which disappeared from the MTG
+        self._model_objects = model_objects
+
         self._simulation.initialize(self.population, self.soils, Tair=Tair, Tsoil=Tsoil)
 
     def _update_shared_MTG(self):
@@ -394,21 +589,13 @@ class CNWheatFacade(object):
             if cnwheat_organ_label not in mtg_property_names:
                 self._shared_mtg.add_property(cnwheat_organ_label)
 
-        mtg_plants_iterator = self._shared_mtg.components_iter(self._shared_mtg.root)
-        # traverse CN-Wheat population from top
+        topology_index = tools.get_topology_index(self._shared_mtg)
+        # traverse CN-Wheat population from top, and find the vertices of the MTG from their ids
         for cnwheat_plant in self.population.plants:
             cnwheat_plant_index = cnwheat_plant.index
-            while True:
-                mtg_plant_vid = next(mtg_plants_iterator)
-                if int(self._shared_mtg.index(mtg_plant_vid)) == cnwheat_plant_index:
-                    break
-            mtg_axes_iterator = self._shared_mtg.components_iter(mtg_plant_vid)
             for cnwheat_axis in cnwheat_plant.axes:
                 cnwheat_axis_label = cnwheat_axis.label
-                while True:
-                    mtg_axis_vid = next(mtg_axes_iterator)
-                    if self._shared_mtg.label(mtg_axis_vid) == cnwheat_axis_label:
-                        break
+                mtg_axis_vid = topology_index.ids_vids[(cnwheat_plant_index, cnwheat_axis_label)]
 
                 cnwheat_axis_property_names = [property_name for property_name in cnwheat_simulation.Simulation.AXES_RUN_VARIABLES if hasattr(cnwheat_axis, property_name)]
                 for cnwheat_axis_property_name in cnwheat_axis_property_names:
@@ -425,13 +612,9 @@ class CNWheatFacade(object):
                     for cnwheat_property_name in cnwheat_simulation.Simulation.ORGANS_RUN_VARIABLES:
                         if hasattr(cnwheat_organ, cnwheat_property_name):
                             mtg_organ_properties[cnwheat_property_name] = getattr(cnwheat_organ, cnwheat_property_name)
-                mtg_metamers_iterator = self._shared_mtg.components_iter(mtg_axis_vid)
                 for cnwheat_phytomer in cnwheat_axis.phytomers:
                     cnwheat_phytomer_index = cnwheat_phytomer.index
-                    while True:
-                        mtg_metamer_vid = next(mtg_metamers_iterator)
-                        if int(self._shared_mtg.index(mtg_metamer_vid)) == cnwheat_phytomer_index:
-                            break
+                    mtg_metamer_vid = topology_index.ids_vids[(cnwheat_plant_index, cnwheat_axis_label, cnwheat_phytomer_index)]
                     if cnwheat_phytomer.hiddenzone is not None:
                         mtg_hiddenzone_label = cnwheat_converter.CNWHEAT_CLASSES_TO_DATAFRAME_ORGANS_MAPPING[cnwheat_model.HiddenZone]
                         if mtg_hiddenzone_label not in self._shared_mtg.get_vertex_property(mtg_metamer_vid):
@@ -442,8 +625,8 @@ class CNWheatFacade(object):
                         for cnwheat_property_name in cnwheat_simulation.Simulation.HIDDENZONE_RUN_VARIABLES:
                             if hasattr(cnwheat_phytomer.hiddenzone, cnwheat_property_name):
                                 mtg_hiddenzone_properties[cnwheat_property_name] = getattr(cnwheat_phytomer.hiddenzone, cnwheat_property_name)
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         if mtg_organ_label not in MTG_TO_CNWHEAT_PHYTOMERS_ORGANS_MAPPING:
                             continue
                         cnwheat_organ = getattr(cnwheat_phytomer, CNWHEAT_ATTRIBUTES_MAPPING[MTG_TO_CNWHEAT_PHYTOMERS_ORGANS_MAPPING[mtg_organ_label]])
@@ -458,8 +641,8 @@ class CNWheatFacade(object):
                             elif cnwheat_organ_property_name not in self._shared_mtg.get_vertex_property(mtg_organ_vid):
                                 self._shared_mtg.property(cnwheat_organ_property_name)[mtg_organ_vid] = attribute_value
 
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             if mtg_element_label not in cnwheat_converter.DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING:
                                 continue
                             cnwheat_element = getattr(cnwheat_organ, cnwheat_converter.DATAFRAME_TO_CNWHEAT_ELEMENTS_NAMES_MAPPING[mtg_element_label])
@@ -110,12 +110,13 @@ class ElongWheatFacade(object):
         all_elongwheat_length_dict = {}
         elongwheat_cumulated_internode_length = {}
 
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
+        topology_index = tools.get_topology_index(self._shared_mtg)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
 
             # Axis scale
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 # if mtg_axis_label != 'MS':
                 #     continue
                 mtg_axis_properties = self._shared_mtg.get_vertex_property(mtg_axis_vid)
@@ -140,8 +141,8 @@ class ElongWheatFacade(object):
                     elongwheat_cumulated_internode_length[axis_id] = []
 
                 # Metamer scale
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
                     elongwheat_hiddenzone_data_from_mtg_organs_data = {}  # TODO: a voir si c'est toujours utile
 
                     mtg_metamer_properties = self._shared_mtg.get_vertex_property(mtg_metamer_vid)
@@ -172,15 +173,15 @@ class ElongWheatFacade(object):
                                 elongwheat_cumulated_internode_length[axis_id].append(mtg_hiddenzone_properties['internode_L'])
                                 all_elongwheat_length_dict[axis_id][mtg_metamer_index]['cumulated_internode'].extend(elongwheat_cumulated_internode_length[axis_id])
                             else:
-                                internode_organ_vid = self._shared_mtg.components_at_scale(mtg_metamer_vid, 4)[0]
-                                assert self._shared_mtg.label(internode_organ_vid) == 'internode'
-                                internode_element_labels = [self._shared_mtg.label(internode_element) for internode_element in self._shared_mtg.components_at_scale(internode_organ_vid, 5)]
+                                internode_organ_vid = topology_index.components[mtg_metamer_vid][0]
+                                assert topology_index.vids_ids[internode_organ_vid][3] == 'internode'
+                                internode_element_labels = [topology_index.vids_ids[internode_element][4] for internode_element in topology_index.components[internode_organ_vid]]
                                 if internode_element_labels == ['baseElement', 'topElement']:
                                     all_elongwheat_length_dict[axis_id][mtg_metamer_index]['cumulated_internode'].extend(elongwheat_cumulated_internode_length[axis_id])
 
                     # Organ scale
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         mtg_organ_properties = self._shared_mtg.get_vertex_property(mtg_organ_vid)
                         if np.nan_to_num(self._shared_mtg.property('length').get(mtg_organ_vid, 0)) == 0:
                             continue
@@ -188,8 +189,8 @@ class ElongWheatFacade(object):
                             elongwheat_hiddenzone_data_from_mtg_organs_data['lamina_Lmax'] = mtg_organ_properties['shape_mature_length']
                             elongwheat_hiddenzone_data_from_mtg_organs_data['leaf_Wmax'] = mtg_organ_properties['shape_max_width']
                         # Element scale
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
                             if np.nan_to_num(self._shared_mtg.property('length').get(mtg_element_vid, 0)) == 0:
                                 continue
@@ -94,11 +94,12 @@ class FarquharWheatFacade(object):
         all_farquharwheat_elements_inputs_dict = {}
         all_farquharwheat_axes_inputs_dict = {}
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # traverse the MTG recursively from top ...
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 if mtg_axis_label != 'MS':
                     continue
                 axis_id = (mtg_plant_index, mtg_axis_label)
@@ -108,17 +109,17 @@ class FarquharWheatFacade(object):
 
                 height_element_list = [0.]
 
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         # mtg_organ_length = np.nan_to_num(self._shared_mtg.get_vertex_property(mtg_organ_vid).get('length', 0))
                         if mtg_organ_label not in FARQUHARWHEAT_ORGANS_NAMES:  # or mtg_organ_length <= 0
                             continue
 
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
                             mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             mtg_element_length = np.nan_to_num(self._shared_mtg.get_vertex_property(mtg_element_vid).get('length', 0.))
                             mtg_element_green_area = np.nan_to_num(self._shared_mtg.get_vertex_property(mtg_element_vid).get('green_area', 0.))
 
@@ -174,19 +175,20 @@ class FarquharWheatFacade(object):
             if farquharwheat_elements_data_name not in mtg_property_names:
                 self._shared_mtg.add_property(farquharwheat_elements_data_name)
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # traverse the MTG recursively from top ...
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         if mtg_organ_label not in FARQUHARWHEAT_ORGANS_NAMES:
                             continue
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             element_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index, mtg_organ_label, mtg_element_label)
                             if element_id not in farquharwheat_data_dict['elements']:
                                 continue
@@ -4,6 +4,7 @@ from openalea.elongwheat import simulation as elongwheat_simulation
 from openalea.farquharwheat import converter as farquharwheat_converter
 from openalea.growthwheat import simulation as growthwheat_simulation
 from openalea.senescwheat import converter as senescwheat_converter
+from openalea.fspmwheat import tools
 import numpy as np
 import pandas as pd
 
@@ -106,12 +107,13 @@ class FSPMWheatFacade(object):
         organs_dict = {}
         soils_dict = {}
 
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
+        topology_index = tools.get_topology_index(self._shared_mtg)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
 
             # Axis scale
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 mtg_axis_properties = self._shared_mtg.get_vertex_property(mtg_axis_vid)
                 axis_id = (mtg_plant_index, mtg_axis_label)
                 axis_dict = {}
@@ -147,8 +149,8 @@ class FSPMWheatFacade(object):
                     soils_dict[axis_id] = soil_dict
 
                 # Metamer scale
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
                     mtg_metamer_properties = self._shared_mtg.get_vertex_property(mtg_metamer_vid)
                     if 'hiddenzone' in mtg_metamer_properties:
                         hiddenzone_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index)
@@ -161,11 +163,11 @@ class FSPMWheatFacade(object):
                         hiddenzones_dict[hiddenzone_id] = hiddenzone_dict
 
                     # Photosynthetic organ scale
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         # Element scale
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
                             if np.nan_to_num(self._shared_mtg.property('length').get(mtg_element_vid, 0)) == 0:
                                 continue
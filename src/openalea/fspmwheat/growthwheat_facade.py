@@ -114,10 +114,11 @@ class GrowthWheatFacade(object):
         all_growthwheat_roots_inputs_dict = {}
         all_growthwheat_axes_inputs_dict = {}
 
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+        topology_index = tools.get_topology_index(self._shared_mtg)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 if mtg_axis_label != 'MS':
                     continue
 
@@ -140,9 +141,9 @@ class GrowthWheatFacade(object):
                             growthwheat_roots_inputs_dict[growthwheat_roots_input_name] = mtg_roots_properties[growthwheat_roots_input_name]
                         all_growthwheat_roots_inputs_dict[roots_id] = growthwheat_roots_inputs_dict
 
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
 
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
 
                     mtg_metamer_properties = self._shared_mtg.get_vertex_property(mtg_metamer_vid)
                     if 'hiddenzone' in mtg_metamer_properties:
@@ -156,11 +157,11 @@ class GrowthWheatFacade(object):
                             all_growthwheat_hiddenzones_inputs_dict[hiddenzone_id] = growthwheat_hiddenzone_inputs_dict
 
                         # We take only the elements of growing metamers ie. the ones with hiddenzones
-                        for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                            mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                        for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                            mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
 
-                            for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                                mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                            for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                                mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                                 element_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index, mtg_organ_label, mtg_element_label)
                                 mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
 
@@ -208,11 +209,12 @@ class GrowthWheatFacade(object):
             if growthwheat_data_name not in mtg_property_names:
                 self._shared_mtg.add_property(growthwheat_data_name)
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # update the properties of the MTG
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 axis_id = (mtg_plant_index, mtg_axis_label)
 
                 if mtg_axis_label != 'MS':
@@ -232,8 +234,8 @@ class GrowthWheatFacade(object):
                         self._shared_mtg.property('roots')[mtg_axis_vid][roots_data_name] = roots_data_value
 
                 #: Metamer scale
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
                     hiddenzone_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index)
                     if hiddenzone_id in all_growthwheat_hiddenzones_data_dict:
                         growthwheat_hiddenzone_data_dict = all_growthwheat_hiddenzones_data_dict[hiddenzone_id]
@@ -248,12 +250,12 @@ class GrowthWheatFacade(object):
                         del self._shared_mtg.property('hiddenzone')[mtg_metamer_vid]
 
                     #: Organ scale
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
 
                         #: Element scale
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             element_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index, mtg_organ_label, mtg_element_label)
 
                             if element_id in all_growthwheat_elements_data_dict:
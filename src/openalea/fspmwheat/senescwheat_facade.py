@@ -100,11 +100,12 @@ class SenescWheatFacade(object):
         all_senescwheat_axes_inputs_dict = {}
         all_senescwheat_elements_inputs_dict = {}
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # traverse the MTG recursively from the top ...
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 if mtg_axis_label != 'MS':
                     continue
                 axis_id = (mtg_plant_index, mtg_axis_label)
@@ -121,16 +122,16 @@ class SenescWheatFacade(object):
                         for senescwheat_roots_input_name in converter.SENESCWHEAT_ROOTS_INPUTS:
                             senescwheat_roots_inputs_dict[senescwheat_roots_input_name] = mtg_roots_properties[senescwheat_roots_input_name]
                         all_senescwheat_roots_inputs_dict[axis_id] = senescwheat_roots_inputs_dict
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         if mtg_organ_label not in PHOTOSYNTHETIC_ORGANS_NAMES:
                             continue
                         # if np.nan_to_num( self._shared_mtg.property('length').get(mtg_organ_vid,0)) == 0: continue
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
                             mtg_element_properties = self._shared_mtg.get_vertex_property(mtg_element_vid)
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             element_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index, mtg_organ_label, mtg_element_label)
                             if np.nan_to_num(self._shared_mtg.property('length').get(mtg_element_vid, 0)) == 0:
                                 continue
@@ -169,11 +170,12 @@ class SenescWheatFacade(object):
             if senescwheat_elements_data_name not in mtg_property_names:
                 self._shared_mtg.add_property(senescwheat_elements_data_name)
 
+        topology_index = tools.get_topology_index(self._shared_mtg)
         # traverse the MTG recursively from top ...
-        for mtg_plant_vid in self._shared_mtg.components_iter(self._shared_mtg.root):
-            mtg_plant_index = int(self._shared_mtg.index(mtg_plant_vid))
-            for mtg_axis_vid in self._shared_mtg.components_iter(mtg_plant_vid):
-                mtg_axis_label = self._shared_mtg.label(mtg_axis_vid)
+        for mtg_plant_vid in topology_index.components[self._shared_mtg.root]:
+            mtg_plant_index = topology_index.vids_ids[mtg_plant_vid][0]
+            for mtg_axis_vid in topology_index.components[mtg_plant_vid]:
+                mtg_axis_label = topology_index.vids_ids[mtg_axis_vid][1]
                 if mtg_axis_label != 'MS':
                     continue
 
@@ -188,15 +190,15 @@ class SenescWheatFacade(object):
                     self._shared_mtg.property('roots')[mtg_axis_vid] = {}
                 mtg_roots_properties = self._shared_mtg.get_vertex_property(mtg_axis_vid)['roots']
                 mtg_roots_properties.update(senescwheat_roots_data_dict[axis_id])
-                for mtg_metamer_vid in self._shared_mtg.components_iter(mtg_axis_vid):
-                    mtg_metamer_index = int(self._shared_mtg.index(mtg_metamer_vid))
-                    for mtg_organ_vid in self._shared_mtg.components_iter(mtg_metamer_vid):
-                        mtg_organ_label = self._shared_mtg.label(mtg_organ_vid)
+                for mtg_metamer_vid in topology_index.components[mtg_axis_vid]:
+                    mtg_metamer_index = topology_index.vids_ids[mtg_metamer_vid][2]
+                    for mtg_organ_vid in topology_index.components[mtg_metamer_vid]:
+                        mtg_organ_label = topology_index.vids_ids[mtg_organ_vid][3]
                         # senesced_length_organ = 0.  # Temporaire
                         if mtg_organ_label not in PHOTOSYNTHETIC_ORGANS_NAMES:
                             continue
-                        for mtg_element_vid in self._shared_mtg.components_iter(mtg_organ_vid):
-                            mtg_element_label = self._shared_mtg.label(mtg_element_vid)
+                        for mtg_element_vid in topology_index.components[mtg_organ_vid]:
+                            mtg_element_label = topology_index.vids_ids[mtg_element_vid][4]
                             element_id = (mtg_plant_index, mtg_axis_label, mtg_metamer_index, mtg_organ_label, mtg_element_label)
                             if element_id not in senescwheat_elements_data_dict:
                                 continue
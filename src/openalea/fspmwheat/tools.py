@@ -21,6 +21,9 @@ from openalea.plantgl.all import Viewer, Vector3
 
 """
 
+#: the name of the attribute of the MTG which holds its topology index (see :func:`get_topology_index`)
+TOPOLOGY_INDEX_ATTRIBUTE_NAME = '_fspmwheat_topology_index'
+
 
 def combine_dataframes_inplace(model_dataframe, shared_column_indexes, shared_dataframe_to_update):
     """Combine `model_dataframe` and `shared_dataframe_to_update` in-place:
@@ -31,12 +34,82 @@ def combine_dataframes_inplace(model_dataframe, shared_column_indexes, shared_da
            * reorder the columns: first columns in `shared_column_indexes`, then others columns alphabetically,
            * and reset the index in `shared_dataframe_to_update`.
 
+    When `shared_dataframe_to_update` already has the rows and the columns of `model_dataframe`, which is the case at most
+    of the steps of a simulation, only the values which changed are written (see :func:`upsert_dataframe_inplace`).
+    Otherwise, `shared_dataframe_to_update` is rebuilt.
+
     :param pandas.DataFrame model_dataframe: dataframe to use for updating `shared_dataframe_to_update`.
     :param list shared_column_indexes: The indexes to re-index `model_dataframe` and `shared_dataframe_to_update` before combining them.
     :param pandas.DataFrame shared_dataframe_to_update: The dataframe to update.
 
     .. note:: `shared_dataframe_to_update` is updated in-place. Thus, `shared_dataframe_to_update` keeps the same object's memory address.
 
+    """
+    if not upsert_dataframe_inplace(model_dataframe, shared_column_indexes, shared_dataframe_to_update):
+        _rebuild_dataframe_inplace(model_dataframe, shared_column_indexes, shared_dataframe_to_update)
+
+
+def upsert_dataframe_inplace(model_dataframe, shared_column_indexes, shared_dataframe_to_update):
+    """Write the values of `model_dataframe` in the rows of `shared_dataframe_to_update` with the same keys `shared_column_indexes`.
+    Only the cells whose value changed are written, and the null values of `model_dataframe` are ignored, as with pd.DataFrame.combine_first().
+
+    The update is done only if `shared_dataframe_to_update` is as built by :func:`combine_dataframes_inplace`
+    (sorted by unique keys, with the columns in the same order and a default index),
+    and already has all the rows and all the columns of `model_dataframe`.
+
+    :param pandas.DataFrame model_dataframe: dataframe to use for updating `shared_dataframe_to_update`.
+    :param list shared_column_indexes: The columns which identify the rows of `model_dataframe` and `shared_dataframe_to_update`.
+    :param pandas.DataFrame shared_dataframe_to_update: The dataframe to update.
+
+    :return: True if `shared_dataframe_to_update` has been updated, False if it must be rebuilt.
+    :rtype: bool
+
+    .. note:: `shared_dataframe_to_update` is updated in-place, so the references to `shared_dataframe_to_update` see the new values.
+
+    """
+    shared_columns = list(shared_dataframe_to_update.columns)
+    if len(shared_dataframe_to_update) == 0 \
+            or shared_columns != list(shared_column_indexes) + sorted(set(shared_columns).difference(shared_column_indexes)) \
+            or not set(model_dataframe.columns).issubset(shared_columns) \
+            or not shared_dataframe_to_update.index.equals(pd.RangeIndex(len(shared_dataframe_to_update))) \
+            or not all(model_dataframe[column].dtype == shared_dataframe_to_update[column].dtype for column in shared_column_indexes):
+        return False
+
+    # find the row of each key of the model in the shared dataframe
+    shared_keys = pd.MultiIndex.from_frame(shared_dataframe_to_update[shared_column_indexes])
+    if not (shared_keys.is_unique and shared_keys.is_monotonic_increasing):
+        return False
+    positions = shared_keys.get_indexer(pd.MultiIndex.from_frame(model_dataframe[shared_column_indexes]))
+    if (positions < 0).any() or len(np.unique(positions)) != len(positions):
+        return False
+
+    for column in model_dataframe.columns.difference(shared_column_indexes):
+        model_column = model_dataframe[column].reset_index(drop=True)
+        shared_column = shared_dataframe_to_update[column]
+        is_changed = model_column.notnull() & model_column.ne(shared_column.iloc[positions].reset_index(drop=True)).fillna(True)
+        is_changed = is_changed.to_numpy(dtype=bool)
+        if model_column.dtype == shared_column.dtype:
+            # write only the changed cells
+            if is_changed.any():
+                shared_dataframe_to_update.iloc[positions[is_changed], shared_columns.index(column)] = model_column.to_numpy()[is_changed]
+        else:
+            # the type of the column is the type of the model, as in :func:`combine_dataframes_inplace`
+            new_column = shared_column.astype(object)
+            new_column.iloc[positions[is_changed]] = model_column.to_numpy()[is_changed]
+            data_type = model_column.dtype
+            if isinstance(data_type, np.dtype) and np.issubdtype(np.int64, data_type) and new_column.isnull().values.any():
+                data_type = float
+            shared_dataframe_to_update[column] = new_column.astype(data_type)
+    return True
+
+
+def _rebuild_dataframe_inplace(model_dataframe, shared_column_indexes, shared_dataframe_to_update):
+    """Rebuild `shared_dataframe_to_update` in-place from the combination of `model_dataframe` and `shared_dataframe_to_update`
+    (see :func:`combine_dataframes_inplace`).
+
+    :param pandas.DataFrame model_dataframe: dataframe to use for updating `shared_dataframe_to_update`.
+    :param list shared_column_indexes: The indexes to re-index `model_dataframe` and `shared_dataframe_to_update` before combining them.
+    :param pandas.DataFrame shared_dataframe_to_update: The dataframe to update.
     """
 
     # re-index the dataframes to have common indexes
@@ -81,6 +154,82 @@ def combine_dataframes_inplace(model_dataframe, shared_column_indexes, shared_da
     shared_dataframe_to_update.reset_index(0, drop=True, inplace=True)
     
     
+class MTGTopologyIndex(object):
+    """
+    The class :class:`MTGTopologyIndex` indexes the topology of a MTG of wheat plants, at the scales of the plants (1), the axes (2),
+    the metamers (3), the organs (4) and the elements (5).
+
+    The index is built with one traversal of the MTG. Use :func:`get_topology_index` to get the index attached to a MTG,
+    which is rebuilt only when vertices are added to or removed from the MTG.
+
+    :param openalea.mtg.MTG mtg: the MTG to index.
+    """
+
+    #: the number of scales of the index
+    SCALES_NUMBER = 5
+
+    def __init__(self, mtg):
+        self.signature = MTGTopologyIndex.topology_signature(mtg)  #: the signature of the vertices of the MTG indexed (see :meth:`topology_signature`)
+        self.components = {}  #: the components of each vertex, in the order of the MTG: {vid: [component_vid, ...], ...}
+        #: the ids of each vertex: {vid: (plant_index, axis_label, metamer_index, organ_label, element_label), ...}, truncated at the scale of the vertex
+        self.vids_ids = {}
+        self.ids_vids = {}  #: the vertex of each id: {(plant_index, axis_label, ...): vid, ...}
+        self.scales_vids = dict((scale, []) for scale in range(1, MTGTopologyIndex.SCALES_NUMBER + 1))  #: the vertices at each scale, in the order of the MTG
+
+        complexes = [(mtg.root, ())]
+        for scale in range(1, MTGTopologyIndex.SCALES_NUMBER + 1):
+            scale_vertices = []
+            for complex_vid, complex_ids in complexes:
+                components = list(mtg.components_iter(complex_vid))
+                self.components[complex_vid] = components
+                for vid in components:
+                    # the plants and the metamers are identified by their index, the axes, the organs and the elements by their label
+                    vid_ids = complex_ids + ((int(mtg.index(vid)),) if scale in (1, 3) else (mtg.label(vid),))
+                    self.vids_ids[vid] = vid_ids
+                    self.ids_vids[vid_ids] = vid
+                    self.scales_vids[scale].append(vid)
+                    scale_vertices.append((vid, vid_ids))
+            complexes = scale_vertices
+        for vid, _ in complexes:
+            self.components[vid] = []
+
+    @staticmethod
+    def topology_signature(mtg):
+        """Return a signature of the vertices of `mtg`, which changes when vertices are added to or removed from `mtg`.
+
+        :param openalea.mtg.MTG mtg: the MTG.
+
+        :return: The number of vertices and the greatest vertex id of `mtg`. The MTG gives a new id to each new vertex.
+        :rtype: tuple
+        """
+        return mtg.nb_vertices(), max(mtg.vertices())
+
+    def is_valid(self, mtg):
+        """Return True if the vertices of `mtg` are the vertices indexed.
+
+        :param openalea.mtg.MTG mtg: the MTG.
+
+        :rtype: bool
+        """
+        return MTGTopologyIndex.topology_signature(mtg) == self.signature
+
+
+def get_topology_index(mtg):
+    """Return the topology index attached to `mtg`. The index is built at the first call, and rebuilt when vertices were
+    added to or removed from `mtg` since the previous call. Thus, the facades sharing `mtg` share its index.
+
+    :param openalea.mtg.MTG mtg: the MTG.
+
+    :return: The topology index of `mtg`.
+    :rtype: MTGTopologyIndex
+    """
+    topology_index = getattr(mtg, TOPOLOGY_INDEX_ATTRIBUTE_NAME, None)
+    if topology_index is None or not topology_index.is_valid(mtg):
+        topology_index = MTGTopologyIndex(mtg)
+        setattr(mtg, TOPOLOGY_INDEX_ATTRIBUTE_NAME, topology_index)
+    return topology_index
+
+
 def plot_linear_regression(x_array, y_array, x_label='x', y_label='y', plot_filepath=None):
     """Perform a linear regression of `x_array` vs `y_array`
     and create a plot showing the fit against the original data.
@@ -166,13 +315,9 @@ def color_MTG_Nitrogen(g, df, t, SCREENSHOT_DIRPATH):
     colors = {}
 
     groups_df = df.groupby(['plant', 'axis', 'metamer', 'organ', 'element'])
-    for vid in g.components_at_scale(g.root, scale=5):
-        pid = int(g.index(g.complex_at_scale(vid, scale=1)))
-        axid = g.property('label')[g.complex_at_scale(vid, scale=2)]
-        mid = int(g.index(g.complex_at_scale(vid, scale=3)))
-        org = g.property('label')[g.complex_at_scale(vid, scale=4)]
-        elid = g.property('label')[vid]
-        id_map = (pid, axid, mid, org, elid)
+    topology_index = get_topology_index(g)
+    for vid in topology_index.scales_vids[5]:
+        id_map = topology_index.vids_ids[vid]
         if id_map in groups_df.groups.keys():
             N = (g.property('proteins')[vid] * 14E-3) / groups_df.get_group(id_map)['mstruct'].iloc[0]
             # N = (calculate_Total_Organic_Nitrogen(g.property('amino_acids')[vid], g.property('proteins')[vid], g.property('Nstruct')[vid])) / g.property('mstruct')[vid]
@@ -2,6 +2,8 @@
 
 from __future__ import division  # use '//' to do integer division
 
+import numpy as np
+
 """
     respiwheat.model
     ~~~~~~~~~~~~~~~~~~~
@@ -221,3 +223,94 @@ class RespirationModel(object):
             R_residual = 5.21E-4 * Q10 ** ((Tsoil - T_ref) / 10) * cls.SECOND_TO_HOUR_RATE_CONVERSION
 
         return R_residual
+
+    # Array versions of the functions above: all the arguments can be NumPy arrays (or scalars broadcastable with them),
+    # and the results are the ones of the scalar functions applied element-wise.
+
+    @classmethod
+    def R_grain_growth_array(cls, mstruct_growth, starch_filling, mstruct):
+        """ Grain growth respiration, applied element-wise (see :meth:`R_grain_growth`)
+
+        :param numpy.ndarray mstruct_growth: gross growth of grain structure (mol C added in grain structure)
+        :param numpy.ndarray starch_filling: gross growth of grain starch (mol C added in grain starch g-1 mstruct)
+        :param numpy.ndarray mstruct: structural dry mass of organ (g)
+
+        :return: R_grain_growth_struct, R_grain_growth_starch (mol C respired)
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        R_grain_growth_struct = ((1 - cls.YG_GRAINS) / cls.YG_GRAINS) * np.asarray(mstruct_growth, dtype=float)
+        R_grain_growth_starch = ((1 - cls.YG_GRAINS) / cls.YG_GRAINS) * (np.asarray(starch_filling, dtype=float) * mstruct)
+        return R_grain_growth_struct, R_grain_growth_starch
+
+    @classmethod
+    def R_phloem_array(cls, sucrose_loading, mstruct):
+        """ Phloem loading respiration, applied element-wise (see :meth:`R_phloem`)
+
+        :param numpy.ndarray sucrose_loading: Loading flux from the C substrate pool to phloem (mol C g-1 mstruct)
+        :param numpy.ndarray mstruct: structural dry mass of organ (g)
+
+        :return: R_phloem, sucrose_loading (mol C respired, mol C)
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        sucrose_loading = np.asarray(sucrose_loading, dtype=float)
+        R_phloem = np.maximum(0., cls.CPHLOEM * sucrose_loading * mstruct)
+        return R_phloem, sucrose_loading
+
+    @classmethod
+    def R_Nnit_upt_array(cls, U_Nnit, sucrose):
+        """ Nitrate uptake respiration, applied element-wise (see :meth:`R_Nnit_upt`)
+
+        :param numpy.ndarray U_Nnit: uptake of N nitrates (mol N)
+        :param numpy.ndarray sucrose: amount of C sucrose in organ (mol C)
+
+        :return: R_Nnit_upt (mol C respired)
+        :rtype: numpy.ndarray
+        """
+        return np.where(np.asarray(sucrose) > 0, cls.C_NIT_UPT * np.asarray(U_Nnit, dtype=float), 0.)
+
+    @classmethod
+    def R_Nnit_red_array(cls, s_amino_acids, sucrose, mstruct, root=False):
+        """ Nitrate reduction-linked respiration, applied element-wise (see :meth:`R_Nnit_red`)
+
+        :param numpy.ndarray s_amino_acids: consumption of N for the synthesis of amino acids (mol N g-1 mstruct)
+        :param numpy.ndarray sucrose: amount of C sucrose in organ (mol C)
+        :param numpy.ndarray mstruct: structural dry mass of organ (g)
+        :param bool|numpy.ndarray root: specifies if the nitrate reduction-linked respiration is computed for shoot (False) or root (True) tissues.
+        Either a single flag for all the organs, or a boolean mask.
+
+        :return: R_Nnit_upt, s_amino_acids (mol C respired, mol N g-1 mstruct)
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        s_amino_acids = np.asarray(s_amino_acids, dtype=float)
+        root = np.asarray(root, dtype=bool)
+        R_Nnit_red = np.where(root,
+                              cls.C_NIT_RED * s_amino_acids * mstruct,  # Respiration in root tissues
+                              cls.F_NIT_RED_SH_CS * cls.C_NIT_RED * s_amino_acids * mstruct)  # Respiration in shoot tissues
+        is_cancelled = root & (np.asarray(sucrose) < R_Nnit_red)
+        R_Nnit_red = np.where(is_cancelled, 0., R_Nnit_red)
+        s_amino_acids = np.where(is_cancelled, 0., s_amino_acids)
+        return R_Nnit_red, s_amino_acids
+
+    @classmethod
+    def R_residual_array(cls, sucrose, mstruct, Ntot, Ts):
+        """ Residual respiration, applied element-wise (see :meth:`R_residual`)
+
+        :param numpy.ndarray sucrose: amount of C sucrose (mol C)
+        :param numpy.ndarray mstruct: structural dry mass of organ (g)
+        :param numpy.ndarray Ntot: total N in organ (mol N)
+        :param numpy.ndarray Ts : organ temperature (C)
+
+        :return: R_residual (mol C respired h-1)
+        :rtype: numpy.ndarray
+        """
+
+        Q10 = 2.
+        T_ref = 20.
+
+        sucrose = np.asarray(sucrose, dtype=float)
+        mstruct = np.asarray(mstruct, dtype=float)
+        is_respiring = (sucrose > 0.) & (mstruct > 0.)
+        conc_sucrose = np.where(is_respiring, sucrose, 0.) / np.where(is_respiring, mstruct, 1.)
+        R_residual = ((cls.KM_MAX * conc_sucrose) / (cls.KM + conc_sucrose)) * Ntot * Q10 ** ((np.asarray(Ts, dtype=float) - T_ref) / 10) * cls.SECOND_TO_HOUR_RATE_CONVERSION
+
+        return np.where(is_respiring, R_residual, 0.)
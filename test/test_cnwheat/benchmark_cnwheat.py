@@ -0,0 +1,109 @@
+# -*- coding: latin-1 -*-
+
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from openalea.cnwheat import simulation as cnwheat_simulation, converter as cnwheat_converter
+from openalea.respiwheat import model as respiwheat_model
+
+from test_cnwheat import force_senescence_and_photosynthesis, load_inputs_dataframes, HOUR_TO_SECOND_CONVERSION_FACTOR
+
+"""
+    benchmark_cnwheat
+    ~~~~~~~~~~~~~~~~~
+
+    Benchmark the run of CN-Wheat on the inputs of the test `simulation_run` (see :mod:`test_cnwheat`),
+    for several configurations of the simulation (engine, Jacobian, policy of the solver and reduction of the system).
+    For each configuration, the benchmark reports the time spent to run the model, the number of evaluations of the derivatives,
+    and the drift of the compartments at the end of the simulation compared to the first configuration
+    (in units of the default tolerance of the solver).
+
+    This script is not a test: run it with the command `python benchmark_cnwheat.py` from the directory `test/test_cnwheat`.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+INPUTS_DIRPATH = os.path.join('simulation_run', 'inputs')
+
+SIMULATION_LENGTH = 48  # hours
+CULM_DENSITY = {1: 410}
+
+#: absolute tolerances of the solver adapted to the magnitude of the compartments
+ATOL_PER_COMPARTMENT = {'age_from_flowering': 1E-2, 'structure': 1E-3, 'C_exudated': 1E-3, 'sum_respi_shoot': 1E-3, 'sum_respi_roots': 1E-3,
+                        'cytokinins': 1E-8}
+
+#: the configurations of the simulation to benchmark: {name: keyword arguments of the Simulation constructor, ...}
+CONFIGURATIONS = OrderedDict([('objects engine, finite differences Jacobian', {}),
+                              ('vectorized engine, finite differences Jacobian', {'engine': 'vectorized'}),
+                              ('vectorized engine, analytic Jacobian', {'engine': 'vectorized', 'analytic_jacobian': True}),
+                              ('BDF, rtol=1E-4', {'solver_policy': cnwheat_simulation.SolverPolicy(rtol=1E-4)}),
+                              ('BDF, rtol=1E-2', {'solver_policy': cnwheat_simulation.SolverPolicy(rtol=1E-2)}),
+                              ('BDF, atol per compartment', {'solver_policy': cnwheat_simulation.SolverPolicy(atol=ATOL_PER_COMPARTMENT)}),
+                              ('Lie splitting of the axes', {'axes_splitting': 'lie'}),
+                              ('Strang splitting of the axes', {'axes_splitting': 'strang'}),
+                              ('Radau', {'solver_policy': cnwheat_simulation.SolverPolicy(method='Radau')}),
+                              ('LSODA', {'solver_policy': cnwheat_simulation.SolverPolicy(method='LSODA')}),
+                              ('LSODA, analytic Jacobian', {'engine': 'vectorized', 'analytic_jacobian': True,
+                                                            'solver_policy': cnwheat_simulation.SolverPolicy(method='LSODA')}),
+                              ('quasi-steady state of triosesP', {'engine': 'vectorized', 'quasi_steady_state': ('triosesP',)}),
+                              ('quasi-steady state of triosesP, analytic Jacobian', {'engine': 'vectorized', 'analytic_jacobian': True,
+                                                                                     'quasi_steady_state': ('triosesP',)}),
+                              ('quasi-steady state of triosesP and sucrose', {'engine': 'vectorized', 'analytic_jacobian': True,
+                                                                              'quasi_steady_state': ('triosesP', 'sucrose')})])
+
+
+def run_simulation(simulation_length=SIMULATION_LENGTH, **simulation_kwargs):
+    """Run a simulation of `simulation_length` hours on the inputs of the test `simulation_run`.
+
+    :param int simulation_length: the length of the simulation (in hours).
+    :param simulation_kwargs: keyword arguments passed to the constructor of :class:`cnwheat.simulation.Simulation`.
+
+    :return: The simulation, and the time spent to run the model (in seconds).
+    :rtype: (cnwheat.simulation.Simulation, float)
+    """
+    population, soils = cnwheat_converter.from_dataframes(*load_inputs_dataframes())
+
+    photosynthesis_elements_data_grouped = pd.read_csv(os.path.join(INPUTS_DIRPATH, 'elements_photosynthesis_forcings.csv')).groupby(cnwheat_simulation.Simulation.ELEMENTS_T_INDEXES)
+    senescence_roots_data_grouped = pd.read_csv(os.path.join(INPUTS_DIRPATH, 'roots_senescence_forcings.csv')).groupby(cnwheat_simulation.Simulation.AXES_T_INDEXES)
+    senescence_elements_data_grouped = pd.read_csv(os.path.join(INPUTS_DIRPATH, 'elements_senescence_forcings.csv')).groupby(cnwheat_simulation.Simulation.ELEMENTS_T_INDEXES)
+
+    simulation_ = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=HOUR_TO_SECOND_CONVERSION_FACTOR, culm_density=CULM_DENSITY, **simulation_kwargs)
+
+    run_time = 0.
+    for t in range(simulation_length):
+        force_senescence_and_photosynthesis(t, population, senescence_roots_data_grouped, senescence_elements_data_grouped, photosynthesis_elements_data_grouped)
+        simulation_.initialize(population, soils)
+        start = time.time()
+        simulation_.run()
+        run_time += time.time() - start
+
+    return simulation_, run_time
+
+
+def drift(compartments, reference_compartments):
+    """Return the maximal difference between `compartments` and `reference_compartments`,
+    in units of the default tolerance of the solver (see :class:`cnwheat.simulation.SolverPolicy`)."""
+    tolerance = cnwheat_simulation.SolverPolicy.DEFAULT_ATOL + cnwheat_simulation.SolverPolicy.DEFAULT_RTOL * np.abs(reference_compartments)
+    return np.max(np.abs(compartments - reference_compartments) / tolerance)
+
+
+if __name__ == '__main__':
+    print('{:<50}{:>12}{:>12}{:>12}'.format('configuration', 'run (s)', 'nfev', 'drift'))
+    reference_compartments = None
+    for configuration_name, configuration_kwargs in CONFIGURATIONS.items():
+        simulation_, run_time = run_simulation(**configuration_kwargs)
+        compartments = simulation_.layout.gather()
+        if reference_compartments is None:
+            reference_compartments = compartments
+        print('{:<50}{:>12.2f}{:>12}{:>12.2e}'.format(configuration_name, run_time, simulation_.nfev_total, drift(compartments, reference_compartments)))
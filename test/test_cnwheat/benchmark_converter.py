@@ -0,0 +1,63 @@
+# -*- coding: latin-1 -*-
+
+import os
+import time
+
+import pandas as pd
+
+from openalea.cnwheat import converter as cnwheat_converter
+
+"""
+    benchmark_converter
+    ~~~~~~~~~~~~~~~~~~~
+
+    Benchmark the conversions of :mod:`cnwheat.converter` on synthetic canopies, made of copies of the plant
+    of the inputs of the test `simulation_run` (see :mod:`test_cnwheat`).
+    For each size of canopy, the benchmark reports the number of elements, the time spent to convert the inputs dataframes
+    to a population, and the time spent to convert the population back to dataframes.
+
+    This script is not a test: run it with the command `python benchmark_converter.py` from the directory `test/test_cnwheat`.
+
+    :copyright: Copyright 2014-2017 INRA-ECOSYS, see AUTHORS.
+    :license: CeCILL-C, see LICENSE for details.
+
+    **Acknowledgments**: The research leading these results has received funding through the
+    Investment for the Future programme managed by the Research National Agency
+    (BreedWheat project ANR-10-BTBR-03).
+
+    .. seealso:: Barillot et al. 2016.
+"""
+
+INPUTS_DIRPATH = os.path.join('simulation_run', 'inputs')
+
+#: the numbers of plants of the synthetic canopies
+PLANTS_NUMBERS = (10, 100, 1000)
+
+
+def synthetic_inputs(plants_number):
+    """Build the inputs dataframes of a canopy of `plants_number` copies of the plant of the inputs of the test `simulation_run`.
+
+    :param int plants_number: the number of plants of the canopy.
+
+    :return: The inputs dataframes of the organs, the hidden zones and the elements.
+    :rtype: (pandas.DataFrame, pandas.DataFrame, pandas.DataFrame)
+    """
+    synthetic_inputs_dataframes = []
+    for inputs_filename in ('organs_initial_state.csv', 'hiddenzones_initial_state.csv', 'elements_initial_state.csv'):
+        inputs_dataframe = pd.read_csv(os.path.join(INPUTS_DIRPATH, inputs_filename))
+        synthetic_inputs_dataframes.append(pd.concat([inputs_dataframe.assign(plant=plant_index) for plant_index in range(1, plants_number + 1)],
+                                                     ignore_index=True))
+    return tuple(synthetic_inputs_dataframes)
+
+
+if __name__ == '__main__':
+    print('{:<12}{:>12}{:>22}{:>22}'.format('plants', 'elements', 'from_dataframes (s)', 'to_dataframes (s)'))
+    for plants_number in PLANTS_NUMBERS:
+        inputs_dataframes = synthetic_inputs(plants_number)
+        start = time.time()
+        population = cnwheat_converter.from_dataframes(*inputs_dataframes)
+        from_dataframes_time = time.time() - start
+        start = time.time()
+        cnwheat_converter.to_dataframes(population)
+        to_dataframes_time = time.time() - start
+        print('{:<12}{:>12}{:>22.3f}{:>22.3f}'.format(plants_number, len(inputs_dataframes[-1]), from_dataframes_time, to_dataframes_time))
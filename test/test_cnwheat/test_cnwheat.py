@@ -2,13 +2,18 @@
 
 import glob
 import os
+import shutil
+import tempfile
 import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 
-from openalea.cnwheat import simulation as cnwheat_simulation, converter as cnwheat_converter, \
-    tools as cnwheat_tools, postprocessing as cnwheat_postprocessing
+from openalea.cnwheat import simulation as cnwheat_simulation, model as cnwheat_model, converter as cnwheat_converter, \
+    forcings as cnwheat_forcings, tools as cnwheat_tools, postprocessing as cnwheat_postprocessing, trace as cnwheat_trace, \
+    layout as cnwheat_layout, conservation as cnwheat_conservation, kernels as cnwheat_kernels
 from openalea.respiwheat import model as respiwheat_model
 
 """
@@ -18,6 +23,17 @@ from openalea.respiwheat import model as respiwheat_model
     Test:
 
         * the run of a simulation with/without interpolation of the forcings,
+        * the sparsity structure of the Jacobian,
+        * the layout of the compartments and its mapping to a new population with the same topology,
+        * the quasi-steady state of the fast compartments,
+        * the ensemble of members with different parameters,
+        * the dense output of a run over several time steps,
+        * the monitor of the conservation of C and N,
+        * the checkpoint and the restart of a simulation,
+        * the kernel of the elements,
+        * the parameters owned by the model objects of each population,
+        * the policy of the solver,
+        * the table of the forcings,
         * the logging,
         * the postprocessing,
         * and the graphs generation.
@@ -83,7 +99,112 @@ def force_senescence_and_photosynthesis(t, population, senescence_roots_data_gro
                         element.__dict__.update(photosynthesis_elements_data_to_use)
 
 
-def test_simulation_run(overwrite_desired_data=False):
+def load_inputs_dataframes():
+    """Read the initial states of the organs, the hidden zones, the elements and the soils of the test `simulation_run`.
+    Return the dataframes in the order of the arguments of :func:`cnwheat.converter.from_dataframes`."""
+    INPUTS_DIRPATH = os.path.join('simulation_run', 'inputs')
+    return [pd.read_csv(os.path.join(INPUTS_DIRPATH, inputs_filename))
+            for inputs_filename in ('organs_initial_state.csv', 'hiddenzones_initial_state.csv', 'elements_initial_state.csv', 'soils_initial_state.csv')]
+
+
+def initialize_simulation(**simulation_kwargs):
+    """Create a simulation and initialize it from the initial states of the test `simulation_run`.
+    Return the simulation and the values of the compartments."""
+    population, soils = cnwheat_converter.from_dataframes(*load_inputs_dataframes())
+    simulation_ = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=HOUR_TO_SECOND_CONVERSION_FACTOR, culm_density={1: 410}, **simulation_kwargs)
+    simulation_.initialize(population, soils)
+    simulation_._update_initial_conditions()
+    return simulation_, np.array(simulation_.initial_conditions, dtype=float)
+
+
+def finite_differences_jacobian(simulation_, y):
+    """Estimate the Jacobian of the derivatives of `simulation_` at `y` by forward finite differences."""
+    y_derivatives = simulation_._calculate_all_derivatives(0, y)
+    jacobian = np.zeros((len(y), len(y)))
+    for j in range(len(y)):
+        y_perturbed = y.copy()
+        h = 1E-6 * max(1., abs(y[j]))
+        y_perturbed[j] += h
+        jacobian[:, j] = (simulation_._calculate_all_derivatives(0, y_perturbed) - y_derivatives) / h
+    return jacobian
+
+
+def test_jacobian_sparsity():
+    """Test that the sparsity structure of the Jacobian contains all the non-zero elements of the Jacobian."""
+    simulation_, y = initialize_simulation()
+    jacobian = finite_differences_jacobian(simulation_, y)
+    jacobian_sparsity = simulation_.jacobian_sparsity.toarray()
+    assert jacobian_sparsity.shape == jacobian.shape
+    assert not np.any((jacobian != 0) & (jacobian_sparsity == 0))
+
+
+def test_layout():
+    """Test that the layout of the compartments gathers and scatters the compartments at the indexes of :attr:`initial_conditions_mapping`."""
+    simulation_, y = initialize_simulation()
+    layout = simulation_.layout
+    assert layout.size == len(y)
+    for model_object, compartments in simulation_.initial_conditions_mapping.items():
+        for compartment_name, compartment_index in compartments.items():
+            assert y[compartment_index] == getattr(model_object, compartment_name)
+    layout.scatter(y + 1)
+    np.testing.assert_allclose(layout.gather(), y + 1)
+    assert sorted(np.concatenate([indexes for compartments_indexes in layout.groups_indexes.values()
+                                  for indexes in compartments_indexes.values()]).tolist()) == list(range(layout.size))
+
+
+def test_layout_rebind():
+    """Test that the layout is mapped to the model objects of a new population with the same topology without being compiled again,
+    and that it is compiled again when the topology changes or when the validation is forced."""
+    simulation_, y = initialize_simulation()
+    inputs_dataframes = load_inputs_dataframes()
+    layout = simulation_.layout
+    population, soils = cnwheat_converter.from_dataframes(*inputs_dataframes)
+    simulation_.initialize(population, soils)
+    assert simulation_.layout is layout
+    assert set(layout.mapping) == set(cnwheat_layout._iter_model_objects(population, soils))
+    simulation_._update_initial_conditions()
+    np.testing.assert_array_equal(simulation_.initial_conditions, y)
+    population, soils = cnwheat_converter.from_dataframes(*inputs_dataframes)
+    simulation_.initialize(population, soils, force_validation=True)
+    assert simulation_.layout is not layout
+    layout = simulation_.layout
+    hiddenzones_df = inputs_dataframes[1]
+    inputs_dataframes[1] = hiddenzones_df[hiddenzones_df['metamer'] != hiddenzones_df['metamer'].max()]
+    population, soils = cnwheat_converter.from_dataframes(*inputs_dataframes)
+    simulation_.initialize(population, soils)
+    assert simulation_.layout is not layout and simulation_.layout.size < layout.size
+
+
+def test_solver_policy():
+    """Test the absolute tolerance of each compartment built from the policy of the solver, and the check of the policy."""
+    solver_policy = cnwheat_simulation.SolverPolicy(method='Radau', atol={'age_from_flowering': 1E-2, 'cytokinins': 1E-9})
+    simulation_, _ = initialize_simulation(solver_policy=solver_policy)
+    atol = simulation_._solver_options['atol']
+    for model_object, compartments in simulation_.initial_conditions_mapping.items():
+        for compartment_name, compartment_index in compartments.items():
+            assert atol[compartment_index] == solver_policy.atol.get(compartment_name, cnwheat_simulation.SolverPolicy.DEFAULT_ATOL)
+    for invalid_solver_policy in (cnwheat_simulation.SolverPolicy(method='RK45'), cnwheat_simulation.SolverPolicy(atol={'unknown': 1E-2})):
+        try:
+            cnwheat_simulation.Simulation(respiration_model=respiwheat_model, solver_policy=invalid_solver_policy)
+        except cnwheat_simulation.SimulationConstructionError:
+            pass
+        else:
+            assert False, 'SimulationConstructionError not raised'
+
+
+def test_forcings_table():
+    """Test the interpolation of the forcings inside the time step with the linear and the piecewise-constant schemes."""
+    elements = [cnwheat_model.LaminaElement(), cnwheat_model.SheathElement()]
+    for scheme, expected_values in (('linear', [15., 2.5, 20.]), ('constant', [10., 2., 20.])):
+        forcings_table = cnwheat_forcings.ForcingsTable(scheme)
+        forcings_table.build(elements + [elements[0]], ['Ag', 'Ag', 'Ts'], [10., 2., 20.], [20., 3., 20.], 2.)
+        assert elements[0].Ag == 10. and elements[1].Ag == 2. and elements[0].Ts == 20.
+        np.testing.assert_allclose(forcings_table.evaluate(1.), expected_values)
+        forcings_table.apply(1.)
+        assert [elements[0].Ag, elements[1].Ag, elements[0].Ts] == expected_values
+
+
+def test_simulation_run(overwrite_desired_data=False, **simulation_kwargs):
     """Test the run of a simulation, without interpolation of the forcings."""
 
     TEST_DIR_PATH = 'simulation_run'
@@ -133,7 +254,7 @@ def test_simulation_run(overwrite_desired_data=False):
                                                           inputs_dataframes[SOILS_INITIAL_STATE_FILENAME])
 
     # Create the simulation
-    simulation_ = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=time_step_seconds, culm_density=CULM_DENSITY)
+    simulation_ = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=time_step_seconds, culm_density=CULM_DENSITY, **simulation_kwargs)
 
     # Initialize the simulation from the population of plants and the dictionary of soils created previously
     simulation_.initialize(population, soils)
@@ -209,6 +330,299 @@ def test_simulation_run(overwrite_desired_data=False):
                                                 actual_outputs_filename, precision=PRECISION, overwrite_desired_data=overwrite_desired_data)
 
 
+def test_simulation_run_vectorized():
+    """Test the run of a simulation with the vectorized engine, against the outputs of the objects engine."""
+    test_simulation_run(overwrite_desired_data=False, engine='vectorized')
+
+
+def test_simulation_run_compact_state():
+    """Test the run of a simulation with the inactive compartments removed from the system, against a run with all the compartments.
+    The solver is run with tight tolerances, so that both runs give the same compartments whatever the steps chosen by the solver."""
+    compartments = []
+    for simulation_kwargs in ({}, {'compact_state': True}):
+        simulation_, _ = initialize_simulation(solver_policy=cnwheat_simulation.SolverPolicy(rtol=1E-10, atol=1E-14), **simulation_kwargs)
+        population, soils = cnwheat_model.Population(list(simulation_.population.plants)), dict(simulation_.soils)
+        senesced_element = population.plants[0].axes[0].phytomers[0].lamina.exposed_element
+        senesced_element.green_area = 0
+        simulation_.initialize(population, soils)
+        senesced_element_indexes = list(simulation_.layout.mapping[senesced_element].values())
+        senesced_element_compartments = simulation_.layout.gather()[senesced_element_indexes]
+        simulation_.run()
+        assert simulation_.nb_dropped_compartments == simulation_.layout.size - len(simulation_.active_compartments)
+        assert np.isin(senesced_element_indexes, simulation_.active_compartments).any() != simulation_.compact_state
+        compartments.append(simulation_.layout.gather())
+        np.testing.assert_array_equal(compartments[-1][senesced_element_indexes], senesced_element_compartments)
+    np.testing.assert_allclose(compartments[1], compartments[0], rtol=1E-6, atol=1E-9)
+
+
+def test_simulation_run_axes_splitting():
+    """Test the run of a simulation with the axes integrated by operator splitting, against a run of the whole system.
+    The difference with the run of the whole system must be bounded by the sum of the errors of the splitting estimated at each run."""
+    compartments = []
+    splitting_errors = []
+    with ThreadPoolExecutor(max_workers=2) as axes_executor:
+        for simulation_kwargs in ({}, {'axes_splitting': 'lie', 'estimate_splitting_error': True},
+                                  {'axes_splitting': 'strang', 'axes_executor': axes_executor, 'estimate_splitting_error': True}):
+            simulation_, _ = initialize_simulation(**simulation_kwargs)
+            splitting_error = 0
+            for _ in range(6):
+                simulation_.run()
+                if simulation_.axes_splitting is not None:
+                    assert simulation_.splitting_error < 1
+                    splitting_error += simulation_.splitting_error
+            compartments.append(simulation_.layout.gather())
+            splitting_errors.append(splitting_error)
+    # the errors of the splitting are in tolerance units of the solver
+    tolerance = cnwheat_simulation.SolverPolicy.DEFAULT_ATOL + cnwheat_simulation.SolverPolicy.DEFAULT_RTOL * np.abs(compartments[0])
+    for splitting_compartments, splitting_error in zip(compartments[1:], splitting_errors[1:]):
+        np.testing.assert_array_less(np.abs(splitting_compartments - compartments[0]), splitting_error * tolerance)
+
+    try:
+        cnwheat_simulation.Simulation(respiration_model=respiwheat_model, axes_splitting='strang', engine='vectorized')
+    except cnwheat_simulation.SimulationConstructionError:
+        pass
+    else:
+        raise AssertionError('The splitting of the axes must require the objects engine.')
+
+
+def test_solver_statistics():
+    """Test the statistics of the solver recorded at each run."""
+    simulation_, _ = initialize_simulation()
+    for _ in range(2):
+        simulation_.run()
+    solver_statistics_df = simulation_.solver_statistics_to_dataframe()
+    assert solver_statistics_df.columns.tolist() == cnwheat_simulation.Simulation.SOLVER_STATISTICS
+    np.testing.assert_array_equal(solver_statistics_df['t'], [0, 1])
+    assert solver_statistics_df['nfev'].sum() == simulation_.nfev_total
+    assert (solver_statistics_df['state_size'] == simulation_.layout.size).all()
+    assert (solver_statistics_df['nb_accepted_steps'] > 0).all()
+    assert (solver_statistics_df['rhs_time'] <= solver_statistics_df['total_time']).all()
+
+
+def test_trace_recorder():
+    """Test the recording of the compartments and of their derivatives, and the views rebuilt from the trace."""
+    trace_dirpath = tempfile.mkdtemp()
+    try:
+        trace_recorder = cnwheat_trace.TraceRecorder(os.path.join(trace_dirpath, 'trace'), capacity=50)
+        simulation_, _ = initialize_simulation(trace_recorder=trace_recorder)
+        for _ in range(2):
+            simulation_.run()
+        trace_recorder.flush()
+        segments = cnwheat_trace.read(trace_recorder.filepath_prefix)
+        assert len(segments) == len(trace_recorder.filepaths) > 1
+        t = np.concatenate([segment['t'] for segment in segments])
+        assert len(t) >= simulation_.nfev_total
+        np.testing.assert_array_equal(segments[-1]['compartments'][-1], simulation_.layout.gather())
+
+        elements_df = cnwheat_trace.to_dataframes(trace_recorder.filepath_prefix)['elements']
+        assert elements_df.columns.tolist() == cnwheat_simulation.Simulation.ELEMENTS_T_INDEXES + cnwheat_simulation.Simulation.MODEL_COMPARTMENTS_NAMES[cnwheat_model.PhotosyntheticOrganElement]
+        assert len(elements_df) == len(t) * len(simulation_.layout.groups_objects[cnwheat_model.PhotosyntheticOrganElement])
+    finally:
+        shutil.rmtree(trace_dirpath)
+
+
+def test_simulation_run_quasi_steady_state():
+    """Test the run of a simulation with the triose phosphates at quasi-steady state, against a run where they are integrated.
+    At each run, the difference may grow by one tolerance unit of the solver, plus the tolerance of the Newton iterations of the quasi-steady state."""
+    compartments = []
+    nb_runs = 3
+    for simulation_kwargs in ({}, {'quasi_steady_state': ('triosesP',)}):
+        simulation_, _ = initialize_simulation(engine='vectorized', analytic_jacobian=True, **simulation_kwargs)
+        for _ in range(nb_runs):
+            simulation_.run()
+        compartments.append(simulation_.layout.gather())
+    nb_active_elements = len(simulation_._vectorized_system.active_elements)
+    assert (simulation_.solver_statistics_to_dataframe()['state_size'] == simulation_.layout.size - nb_active_elements).all()
+    tolerance = cnwheat_simulation.SolverPolicy.DEFAULT_ATOL + cnwheat_simulation.SolverPolicy.DEFAULT_RTOL * np.abs(compartments[0])
+    np.testing.assert_array_less(np.abs(compartments[1] - compartments[0]), nb_runs * (1 + cnwheat_simulation.Simulation.QUASI_STEADY_STATE_TOLERANCE) * tolerance)
+
+    # a singular block of the Jacobian of the quasi-steady state is solved in the least squares sense
+    blocks = np.array([[[2., 0.], [0., 4.]], [[1., 1.], [1., 1.]]])
+    right_hand_sides = np.array([[[2.], [4.]], [[2.], [2.]]])
+    np.testing.assert_allclose(cnwheat_simulation._solve_jacobian_blocks(blocks, right_hand_sides), [[[1.], [1.]], [[1.], [1.]]])
+
+    try:
+        cnwheat_simulation.Simulation(respiration_model=respiwheat_model, quasi_steady_state=('triosesP',))
+    except cnwheat_simulation.SimulationConstructionError:
+        pass
+    else:
+        raise AssertionError('The quasi-steady state must require the vectorized engine.')
+
+
+def test_ensemble_simulation():
+    """Test the run of an ensemble of members with different parameters, against the run of a simulation with the default parameters.
+    The solver is run with tight tolerances, so that the first member and the simulation give the same compartments whatever the steps chosen by the solver."""
+    solver_policy = cnwheat_simulation.SolverPolicy(rtol=1E-10, atol=1E-14)
+    simulation_, _ = initialize_simulation(engine='vectorized', solver_policy=solver_policy)
+    population, soils = cnwheat_converter.from_dataframes(*load_inputs_dataframes())
+    members_parameters = [{}, {'Roots': {'VMAX_AMINO_ACIDS': 2E-3}, 'LaminaElement': {'SIGMA_SUCROSE': 2E-8}}]
+    ensemble = cnwheat_simulation.EnsembleSimulation(respiwheat_model, members_parameters, delta_t=HOUR_TO_SECOND_CONVERSION_FACTOR, culm_density={1: 410},
+                                                     analytic_jacobian=True, solver_policy=solver_policy)
+    ensemble.initialize(population, soils)
+    for _ in range(3):
+        simulation_.run()
+        ensemble.run()
+    members_compartments = [cnwheat_layout.CompartmentsLayout(member_population, member_soils, cnwheat_simulation.Simulation.MODEL_COMPARTMENTS_NAMES).gather()
+                            for member_population, member_soils in zip(ensemble.members_populations, ensemble.members_soils)]
+    np.testing.assert_allclose(members_compartments[0], simulation_.layout.gather(), rtol=1E-6, atol=1E-9)
+    assert not np.allclose(members_compartments[1], members_compartments[0], rtol=1E-2, atol=1E-3)
+
+    members_dataframes = cnwheat_converter.ensemble_to_dataframes(ensemble)
+    for member_dataframe, dataframe in zip(members_dataframes, cnwheat_converter.to_dataframes(simulation_.population, simulation_.soils)):
+        assert member_dataframe.columns.tolist() == ['member'] + dataframe.columns.tolist()
+        assert len(member_dataframe) == len(members_parameters) * len(dataframe)
+        assert set(member_dataframe['plant']) == set(dataframe['plant'])
+
+    try:
+        cnwheat_simulation.EnsembleSimulation(respiwheat_model, [{'Grains': {'VMAX_RGR': 1}}])
+    except cnwheat_simulation.SimulationConstructionError:
+        pass
+    else:
+        raise AssertionError('The parameters of the grains must not differ between the members.')
+
+    try:
+        cnwheat_simulation.EnsembleSimulation(respiwheat_model, members_parameters).initialize(population, {(1, 'T1'): soils[(1, 'MS')]})
+    except cnwheat_simulation.SimulationInitializationError:
+        pass
+    else:
+        raise AssertionError('The members must have a soil for the main stem of the plant 1.')
+
+
+def test_simulation_run_dense_output():
+    """Test the dense output of a run over 2 time steps, against 2 runs of 1 time step."""
+    simulation_, _ = initialize_simulation(engine='vectorized')
+    steps_compartments = []
+    for _ in range(2):
+        simulation_.run()
+        steps_compartments.append(simulation_.layout.gather())
+    assert simulation_.dense_output is None
+
+    simulation_, _ = initialize_simulation(engine='vectorized')
+    simulation_.run(nb_time_steps=2)
+    np.testing.assert_allclose(simulation_.time_grid, [0, 2 * simulation_.time_step])
+    for i, step_compartments in enumerate(steps_compartments):
+        np.testing.assert_allclose(simulation_.dense_output((i + 1) * simulation_.time_step), step_compartments, rtol=1E-2, atol=1E-3)
+    y = simulation_.dense_output(simulation_.time_step)
+    simulation_.set_state(y)
+    np.testing.assert_allclose(simulation_.layout.gather(), y)
+
+    # the next run starts at the end of the 2 time steps
+    simulation_.run()
+    np.testing.assert_allclose(simulation_.solver_statistics_to_dataframe()['t'], [0, 2 * simulation_.time_step])
+
+
+def test_conservation_monitor():
+    """Test the monitor of the conservation of C and N, with a conservative run and with a run which does not conserve C."""
+    conservation_monitor = cnwheat_conservation.ConservationMonitor(threshold=1E-9, action='raise')
+    simulation_, _ = initialize_simulation(engine='vectorized', conservation_monitor=conservation_monitor)
+    for _ in range(2):
+        simulation_.run()
+    records_df = conservation_monitor.to_dataframe()
+    assert records_df.columns.tolist() == cnwheat_conservation.RECORDS_COLUMNS
+    assert len(records_df) == 2
+    assert (records_df[['C_total', 'N_total']] > 0).all().all()
+
+    # the quasi-steady state of the sucrose of the elements does not conserve C
+    conservation_monitor = cnwheat_conservation.ConservationMonitor(threshold=1E-3, action='raise')
+    simulation_, _ = initialize_simulation(engine='vectorized', quasi_steady_state=('triosesP', 'sucrose'), conservation_monitor=conservation_monitor)
+    try:
+        simulation_.run()
+    except cnwheat_simulation.SimulationConservationError:
+        pass
+    else:
+        raise AssertionError('The imbalance of C must be above the threshold.')
+
+
+def test_checkpoint():
+    """Test that a simulation restarted from a checkpoint gives the same compartments as the simulation which wrote the checkpoint."""
+    simulation_, _ = initialize_simulation(engine='vectorized')
+    simulation_.run()
+    checkpoint_dirpath = tempfile.mkdtemp()
+    try:
+        checkpoint_filepath = os.path.join(checkpoint_dirpath, 'checkpoint.npz')
+        simulation_.save_checkpoint(checkpoint_filepath)
+        simulation_.run()
+
+        restarted_simulation = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=HOUR_TO_SECOND_CONVERSION_FACTOR, culm_density={1: 410},
+                                                             engine='vectorized')
+        restarted_simulation.load_checkpoint(checkpoint_filepath)
+        restarted_simulation.run()
+
+        # the checkpoint is a NumPy archive, read without unpickling
+        with np.load(checkpoint_filepath, allow_pickle=False) as checkpoint:
+            assert checkpoint['Tair'] == simulation_.population.plants[0].Tair
+        not_checkpoint_filepath = os.path.join(checkpoint_dirpath, 'not_checkpoint.csv')
+        pd.DataFrame({'plant': [1]}).to_csv(not_checkpoint_filepath)
+        try:
+            restarted_simulation.load_checkpoint(not_checkpoint_filepath)
+        except cnwheat_simulation.SimulationInitializationError:
+            pass
+        else:
+            raise AssertionError('Only the files written by save_checkpoint can be loaded.')
+    finally:
+        shutil.rmtree(checkpoint_dirpath)
+    np.testing.assert_array_equal(restarted_simulation.layout.gather(), simulation_.layout.gather())
+    assert len(restarted_simulation.solver_statistics) == len(simulation_.solver_statistics)
+    assert [plant.Tair for plant in restarted_simulation.population.plants] == [plant.Tair for plant in simulation_.population.plants]
+
+
+def test_jacobian_analytic():
+    """Test the analytic Jacobian against the Jacobian estimated by finite differences."""
+    simulation_, y = initialize_simulation(engine='vectorized', analytic_jacobian=True)
+    y += 0.1 * np.abs(y) + 0.1  # move away from the thresholds of the fluxes, where the derivatives are one-sided
+    jacobian = finite_differences_jacobian(simulation_, y)
+    analytic_jacobian = simulation_._vectorized_system.calculate_jacobian(y).toarray()
+    np.testing.assert_allclose(analytic_jacobian, jacobian, rtol=1E-4, atol=1E-8 * np.abs(jacobian).max())
+
+
+def test_elements_kernel():
+    """Test the kernel of the elements against the array operations of the vectorized engine, for elements loading the phloem and for growing elements."""
+    simulation_, y = initialize_simulation(engine='vectorized')
+    vectorized_system = simulation_._vectorized_system
+    for is_growing in (False, True):
+        vectorized_system.elements_is_growing[:] = is_growing
+        vectorized_system.elements_kernel = None
+        y_derivatives, variables = vectorized_system._calculate(y)
+        vectorized_system.elements_kernel = cnwheat_kernels.elements_kernel
+        kernel_y_derivatives, kernel_variables = vectorized_system._calculate(y)
+        np.testing.assert_allclose(kernel_y_derivatives, y_derivatives, rtol=1E-12, atol=1E-15)
+        for variable_name, values in variables['elements'].items():
+            np.testing.assert_allclose(kernel_variables['elements'][variable_name], values, rtol=1E-12, atol=1E-15)
+    try:
+        cnwheat_simulation.Simulation(respiration_model=respiwheat_model, jit_kernel=True)
+    except cnwheat_simulation.SimulationConstructionError:
+        pass
+    else:
+        raise AssertionError('The compiled kernel must require the vectorized engine.')
+
+
+def test_parameters_per_population():
+    """Test that the parameters updated at the conversion of a population are owned by its model objects:
+    the parameters of the classes of the model and the runs of the other populations do not change."""
+    inputs_dataframes = load_inputs_dataframes()
+    default_K_C = cnwheat_model.Roots.PARAMETERS.K_C
+    for engine in ('objects', 'vectorized'):
+        default_simulation, _ = initialize_simulation(engine=engine)
+        default_simulation.run()
+
+        population, soils = cnwheat_converter.from_dataframes(*inputs_dataframes, update_parameters={'roots': {'K_C': 2 * default_K_C}})
+        assert cnwheat_model.Roots.PARAMETERS.K_C == default_K_C
+        assert all(axis.roots.PARAMETERS.K_C == 2 * default_K_C for plant in population.plants for axis in plant.axes)
+        simulation_ = cnwheat_simulation.Simulation(respiration_model=respiwheat_model, delta_t=HOUR_TO_SECOND_CONVERSION_FACTOR, culm_density={1: 410}, engine=engine)
+        simulation_.initialize(population, soils)
+        simulation_.run()
+        assert not np.array_equal(simulation_.layout.gather(), default_simulation.layout.gather())
+
+        other_simulation, _ = initialize_simulation(engine=engine)
+        other_simulation.run()
+        np.testing.assert_array_equal(other_simulation.layout.gather(), default_simulation.layout.gather())
+
+
+def test_simulation_run_analytic_jacobian():
+    """Test the run of a simulation with the analytic Jacobian, against the outputs of the objects engine."""
+    test_simulation_run(overwrite_desired_data=False, engine='vectorized', analytic_jacobian=True)
+
+
 def test_simulation_run_with_interpolation(overwrite_desired_data=False):
     """Test the run of a simulation, with interpolation of the forcings."""
 
@@ -635,6 +1049,63 @@ if __name__ == '__main__':
     test_simulation_run(overwrite_desired_data=False)
     print('Simulation Run - OK')
 
+    test_jacobian_sparsity()
+    print('Jacobian sparsity - OK')
+
+    test_layout()
+    print('Layout - OK')
+
+    test_layout_rebind()
+    print('Layout rebind - OK')
+
+    test_solver_policy()
+    print('Solver policy - OK')
+
+    test_forcings_table()
+    print('Forcings table - OK')
+
+    test_simulation_run_vectorized()
+    print('Simulation Run with vectorized engine - OK')
+
+    test_simulation_run_compact_state()
+    print('Simulation Run with compact state - OK')
+
+    test_simulation_run_axes_splitting()
+    print('Simulation Run with axes splitting - OK')
+
+    test_solver_statistics()
+    print('Solver statistics - OK')
+
+    test_trace_recorder()
+    print('Trace recorder - OK')
+
+    test_simulation_run_quasi_steady_state()
+    print('Simulation Run with quasi-steady state - OK')
+
+    test_ensemble_simulation()
+    print('Ensemble simulation - OK')
+
+    test_simulation_run_dense_output()
+    print('Simulation Run with dense output - OK')
+
+    test_conservation_monitor()
+    print('Conservation monitor - OK')
+
+    test_checkpoint()
+    print('Checkpoint - OK')
+
+    test_jacobian_analytic()
+    print('Analytic Jacobian - OK')
+
+    test_elements_kernel()
+    print('Elements kernel - OK')
+
+    test_parameters_per_population()
+    print('Parameters per population - OK')
+
+    test_simulation_run_analytic_jacobian()
+    print('Simulation Run with analytic Jacobian - OK')
+
     test_simulation_run_with_interpolation(overwrite_desired_data=False)
     print('Simulation Run with interpolation - OK')
 
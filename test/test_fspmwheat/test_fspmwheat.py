@@ -8,6 +8,7 @@ import random
 
 from alinea.adel.adel_dynamic import AdelDyn
 from alinea.adel.echap_leaf import echap_leaves
+from openalea.mtg import MTG
 
 from openalea.fspmwheat import caribu_facade
 from openalea.fspmwheat import cnwheat_facade
@@ -16,6 +17,7 @@ from openalea.fspmwheat import farquharwheat_facade
 from openalea.fspmwheat import growthwheat_facade
 from openalea.fspmwheat import senescwheat_facade
 from openalea.fspmwheat import fspmwheat_facade
+from openalea.fspmwheat import tools
 
 from openalea.cnwheat import tools as cnwheat_tools
 from openalea.cnwheat import simulation as cnwheat_simulation
@@ -369,5 +371,119 @@ def test_run(overwrite_desired_data=False):
                                                 actual_outputs_filename, precision=PRECISION, overwrite_desired_data=overwrite_desired_data)
 
 
+def test_combine_dataframes_inplace():
+    """Test that the in-place update of a shared dataframe gives the same dataframe as its rebuild."""
+    indexes = ['plant', 'axis', 'metamer', 'organ', 'element']
+    keys = [(1, 'MS', metamer, organ, 'LeafElement1') for metamer in (1, 2, 3) for organ in ('blade', 'sheath')]
+    shared_df = pd.DataFrame(keys, columns=indexes)
+    shared_df['green_area'] = np.arange(len(keys), dtype=float)
+    shared_df['is_growing'] = False
+    shared_df['nb_replications'] = 1
+    tools.combine_dataframes_inplace(shared_df.copy(), indexes, shared_df)
+    shared_df_id = id(shared_df)
+
+    model_df = pd.DataFrame(keys[::-2], columns=indexes)
+    model_df['green_area'] = [10., np.nan, 2.]
+    model_df['nb_replications'] = [1, 2, 1]
+    rebuilt_shared_df = shared_df.copy()
+    tools._rebuild_dataframe_inplace(model_df.copy(), indexes, rebuilt_shared_df)
+    assert tools.upsert_dataframe_inplace(model_df, indexes, shared_df)
+    assert id(shared_df) == shared_df_id
+    pd.testing.assert_frame_equal(shared_df, rebuilt_shared_df)
+
+
+def test_topology_index():
+    """Test that the topology index of a MTG gives the ids of its vertices, and that it is rebuilt when a vertex is added."""
+    g = MTG()
+    for plant_index in (1, 2):
+        plant_vid = g.add_component(g.root, label='plant', index=plant_index)
+        axis_vid = g.add_component(plant_vid, label='MS')
+        for metamer_index in (1, 2):
+            metamer_vid = g.add_component(axis_vid, label='metamer', index=metamer_index)
+            for organ_label in ('blade', 'sheath'):
+                organ_vid = g.add_component(metamer_vid, label=organ_label)
+                g.add_component(organ_vid, label='StemElement')
+
+    topology_index = tools.get_topology_index(g)
+    assert tools.get_topology_index(g) is topology_index
+    assert len(topology_index.scales_vids[5]) == 8
+    for vid in topology_index.scales_vids[5]:
+        desired_ids = (int(g.index(g.complex_at_scale(vid, 1))), g.label(g.complex_at_scale(vid, 2)), int(g.index(g.complex_at_scale(vid, 3))),
+                       g.label(g.complex_at_scale(vid, 4)), g.label(vid))
+        assert topology_index.vids_ids[vid] == desired_ids
+        assert topology_index.ids_vids[desired_ids] == vid
+
+    new_vid = g.add_component(topology_index.ids_vids[(2, 'MS', 2, 'blade')], label='LeafElement1')
+    new_topology_index = tools.get_topology_index(g)
+    assert new_topology_index is not topology_index
+    assert new_topology_index.vids_ids[new_vid] == (2, 'MS', 2, 'blade', 'LeafElement1')
+
+
+def test_cnwheat_merged_runs():
+    """Test that the runs of CNWheat merged under constant forcings give the compartments interpolated in the integration of the merged runs
+    plus the changes made by the other models between the runs, and the same compartments as hourly runs."""
+    INPUTS_DIRPATH = 'inputs'
+    cnwheat_inputs = []
+    for inputs_filename, variables in (('organs_initial_state.csv', cnwheat_facade.cnwheat_converter.ORGANS_VARIABLES),
+                                       ('hiddenzones_initial_state.csv', cnwheat_facade.cnwheat_converter.HIDDENZONE_VARIABLES),
+                                       ('elements_initial_state.csv', cnwheat_facade.cnwheat_converter.ELEMENTS_VARIABLES),
+                                       ('soils_initial_state.csv', cnwheat_facade.cnwheat_converter.SOILS_VARIABLES)):
+        inputs_dataframe = pd.read_csv(os.path.join(INPUTS_DIRPATH, inputs_filename))
+        inputs_dataframe = inputs_dataframe.where(inputs_dataframe.notnull(), None)
+        cnwheat_inputs.append(inputs_dataframe[[i for i in variables if i in inputs_dataframe.columns]].copy())
+
+    nb_runs = 12
+    max_merged_steps = 6
+    # the merged runs are integrated over 1, 2, 4, then `max_merged_steps` time steps
+    integrations_runs = [0, 1, 3, 7]
+    # the relative change of the sucrose of the roots made by the other models after each run
+    for roots_sucrose_change in (0, 1E-3):
+        facades_compartments = []
+        facades = []
+        for merge_threshold in (None, 0.01):
+            adel_wheat = AdelDyn(seed=1, scene_unit='m', leaves=echap_leaves(xy_model='Soissons_byleafclass'))
+            g = adel_wheat.load(directory=INPUTS_DIRPATH)
+            axis_vid = tools.get_topology_index(g).ids_vids[(1, 'MS')]
+            shared_inputs_outputs = [pd.DataFrame() for _ in ('axes', 'organs', 'hiddenzones', 'elements', 'soils')]
+            cnwheat_facade_ = cnwheat_facade.CNWheatFacade(g, HOUR_TO_SECOND_CONVERSION_FACTOR, {1: 410}, {}, *(cnwheat_inputs + shared_inputs_outputs),
+                                                           update_shared_df=False, merge_threshold=merge_threshold, max_merged_steps=max_merged_steps)
+            compartments = []
+            roots_sucrose_increments = 0.
+            for run_index in range(nb_runs):
+                nb_integrations = len(cnwheat_facade_._simulation.solver_statistics)
+                cnwheat_facade_.run(Tair=12, Tsoil=12)
+                simulation = cnwheat_facade_._simulation
+                y = simulation.layout.gather()
+                compartments.append(y)
+                roots_sucrose_index = simulation.layout.indexes([simulation.population.plants[0].axes[0].roots], ('sucrose',))[0, 0]
+                if merge_threshold is not None and len(simulation.solver_statistics) == nb_integrations:
+                    # the compartments of the merged run are interpolated in the integration, plus the changes made since its beginning
+                    roots_sucrose_increments += roots_sucrose_change * compartments[-2][roots_sucrose_index]
+                    desired_y = cnwheat_facade_._merged_dense_output(cnwheat_facade_._merged_step * simulation.time_step)
+                    desired_y[roots_sucrose_index] -= roots_sucrose_increments
+                    axes_indexes = np.concatenate([np.zeros(0, dtype=int)] + list(simulation.layout.groups_indexes.get(cnwheat_facade.cnwheat_model.Axis, {}).values()))
+                    np.testing.assert_allclose(np.delete(y, axes_indexes), np.delete(desired_y, axes_indexes), rtol=1E-10, atol=1E-12)
+                else:
+                    roots_sucrose_increments = 0.
+                # change the sucrose of the roots as another model would do
+                g.property('roots')[axis_vid]['sucrose'] *= 1 - roots_sucrose_change
+            facades_compartments.append(compartments)
+            facades.append(cnwheat_facade_)
+
+        hourly_facade, merged_facade = facades
+        assert hourly_facade.nb_merged_runs == 0
+        assert merged_facade.nb_merged_runs == nb_runs - len(integrations_runs)
+        # the statistics of the solver are dated with the beginning of each integration
+        time_step = merged_facade._simulation.time_step
+        np.testing.assert_allclose(hourly_facade._simulation.solver_statistics_to_dataframe()['t'], np.arange(nb_runs) * time_step)
+        np.testing.assert_allclose(merged_facade._simulation.solver_statistics_to_dataframe()['t'], np.array(integrations_runs) * time_step)
+        # the hourly runs restart the integration at each time step, hence a difference larger than the tolerance of the solver
+        for hourly_compartments, merged_compartments in zip(*facades_compartments):
+            np.testing.assert_allclose(merged_compartments, hourly_compartments, rtol=5E-3, atol=1E-3)
+
+
 if __name__ == '__main__':
+    test_combine_dataframes_inplace()
+    test_topology_index()
+    test_cnwheat_merged_runs()
     test_run(overwrite_desired_data=False)
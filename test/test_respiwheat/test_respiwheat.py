@@ -1,5 +1,7 @@
 # -*- coding: latin-1 -*-
 
+import numpy as np
+
 from openalea.respiwheat import model
 
 """
@@ -55,5 +57,47 @@ def test_calculate_respiwheat():
         assert_close(actual_respirations[R], desired_R, tolerance=1e-3)
 
 
+def test_respiwheat_arrays():
+    """Check that the array versions of the functions of respiration are the scalar ones applied element-wise."""
+
+    rng = np.random.RandomState(0)
+    n = 200
+    mstruct_growth = rng.uniform(-10, 10, n)
+    starch_filling = rng.uniform(-10, 10, n)
+    sucrose_loading = rng.uniform(-10, 10, n)
+    U_Nnit = rng.uniform(0, 10, n)
+    s_amino_acids = rng.uniform(0, 10, n)
+    sucrose = rng.uniform(-5, 30, n)
+    mstruct = rng.uniform(-0.1, 1, n)
+    Ntot = rng.uniform(0, 10, n)
+    Ts = rng.uniform(-5, 35, n)
+    root = rng.uniform(size=n) < 0.5
+    sucrose[:10] = 0.
+    mstruct[10:20] = 0.
+
+    RespirationModel = model.RespirationModel
+
+    def scalar(function, *args, **kwargs):
+        """Apply the scalar `function` element-wise, and gather its outputs in arrays."""
+        outputs = [function(*[arg[i] for arg in args], **{key: value[i] for key, value in kwargs.items()}) for i in range(n)]
+        return np.array(outputs, dtype=float).T
+
+    np.testing.assert_array_equal(RespirationModel.R_grain_growth_array(mstruct_growth, starch_filling, mstruct),
+                                  scalar(RespirationModel.R_grain_growth, mstruct_growth, starch_filling, mstruct))
+    np.testing.assert_array_equal(RespirationModel.R_phloem_array(sucrose_loading, mstruct),
+                                  scalar(RespirationModel.R_phloem, sucrose_loading, mstruct))
+    np.testing.assert_array_equal(RespirationModel.R_Nnit_upt_array(U_Nnit, sucrose),
+                                  scalar(RespirationModel.R_Nnit_upt, U_Nnit, sucrose))
+    np.testing.assert_array_equal(RespirationModel.R_Nnit_red_array(s_amino_acids, sucrose, mstruct, root=root),
+                                  scalar(RespirationModel.R_Nnit_red, s_amino_acids, sucrose, mstruct, root=root))
+    for flag in (False, True):
+        np.testing.assert_array_equal(RespirationModel.R_Nnit_red_array(s_amino_acids, sucrose, mstruct, root=flag),
+                                      scalar(RespirationModel.R_Nnit_red, s_amino_acids, sucrose, mstruct, root=np.full(n, flag)))
+    # the power of NumPy can differ from the one of Python in the last bit
+    np.testing.assert_allclose(RespirationModel.R_residual_array(sucrose, mstruct, Ntot, Ts),
+                               scalar(RespirationModel.R_residual, sucrose, mstruct, Ntot, Ts), rtol=1e-14, atol=0)
+
+
 if __name__ == '__main__':
     test_calculate_respiwheat()
+    test_respiwheat_arrays()